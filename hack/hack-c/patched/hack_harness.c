@@ -12,6 +12,9 @@
  *     { "key": "h", "cursor": [col, row], "screen": ["...80 chars...", ...24 rows] }
  *   ]
  * }
+ *
+ * With --batch the harness reads jobs from stdin instead and writes one
+ * session record per line to stdout; see "Batch mode" below.
  */
 
 #define _GNU_SOURCE
@@ -20,6 +23,13 @@
 #include <string.h>
 #include <stdarg.h>
 #include <setjmp.h>
+#include <errno.h>
+#include <signal.h>
+#include <time.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <poll.h>
+#include <sys/wait.h>
 
 /* ===== Screen buffer ===== */
 #define SCRCOLS 80
@@ -501,11 +511,13 @@ int harness_do_fork(void) {
 /* ===== exit capture ===== */
 static unsigned int g_seed = 42;
 static const char *g_outfile = NULL;
+static FILE *g_outfp = NULL;  /* batch mode: the pipe back to the parent */
 
 void harness_exit(int code) {
   FILE *out;
   (void)code;
-  out = g_outfile ? fopen(g_outfile, "w") : stdout;
+  if (g_outfp) out = g_outfp;
+  else out = g_outfile ? fopen(g_outfile, "w") : stdout;
   if (!out) out = stdout;
   emit_session_json(out, g_seed);
   if (g_outfile && out != stdout) fclose(out);
@@ -520,18 +532,8 @@ char *harness_index(const char *s, int c) {
 /* ===== game_main() forward declaration ===== */
 extern void game_main(void);
 
-/* ===== main() — harness entry point ===== */
-int main(int argc, char **argv) {
-  unsigned int seed = 42;
-  const char *keys = "Q";
-  int i;
-
-  for (i = 1; i < argc; i++) {
-    if (strcmp(argv[i], "--seed") == 0 && i+1 < argc) seed = (unsigned int)atoi(argv[++i]);
-    else if (strcmp(argv[i], "--keys") == 0 && i+1 < argc) keys = argv[++i];
-    else if (strcmp(argv[i], "--out") == 0 && i+1 < argc) g_outfile = argv[++i];
-  }
-
+/* Run one game; does not return (the game ends in harness_exit()). */
+static void run_game(unsigned int seed, const char *keys) {
   g_seed = seed;
   seed_override = seed;
   has_seed_override = 1;
@@ -545,5 +547,265 @@ int main(int argc, char **argv) {
 
   /* Reached if game_main returns without calling exit (shouldn't happen) */
   harness_exit(0);
+}
+
+/* ===== Batch mode ===== */
+/*
+ * hack_harness --batch [--timeout SECS] reads one job per stdin line,
+ *   {"id": 7, "seed": 42, "keys": "hhjj.Q"}
+ * and answers each with one line on stdout, in order:
+ *   {"id": 7, "ok": true, "session": {...session JSON...}}
+ *   {"id": 7, "ok": false, "error": "timed out after 60s"}
+ * "id" is echoed verbatim (a number or string); other scalar fields are
+ * ignored.
+ *
+ * Each job runs in a fork()ed child of this process, which never starts a
+ * game itself, so every job begins from the same pristine static state a
+ * fresh exec would have -- without re-running the loader, and without a
+ * reset function that would have to know every game global.  A job that
+ * crashes or hangs (past --timeout, default 60s) only fails its own
+ * record.
+ */
+typedef struct {
+  char id[64];
+  unsigned int seed;
+  char *keys;
+} BatchJob;
+
+static const char *bj_ws(const char *p) {
+  while (*p == ' ' || *p == '\t' || *p == '\r' || *p == '\n') p++;
+  return p;
+}
+
+/* Decode the JSON string at p (just after its opening quote) into a
+ * malloc'd byte string; \u escapes must be < 0x100 (keys are bytes). */
+static const char *bj_string(const char *p, char **out) {
+  char *buf = malloc(strlen(p) + 1);
+  char *o = buf;
+  while (*p && *p != '"') {
+    if (*p != '\\') { *o++ = *p++; continue; }
+    p++;
+    switch (*p) {
+    case '"': case '\\': case '/': *o++ = *p; break;
+    case 'b': *o++ = '\b'; break;
+    case 'f': *o++ = '\f'; break;
+    case 'n': *o++ = '\n'; break;
+    case 'r': *o++ = '\r'; break;
+    case 't': *o++ = '\t'; break;
+    case 'u': {
+      char hex[5];
+      char *end;
+      unsigned long v;
+      memcpy(hex, p + 1, 4);
+      hex[4] = '\0';
+      v = strtoul(hex, &end, 16);
+      if (strlen(p + 1) < 4 || end != hex + 4 || v > 0xff) { free(buf); return NULL; }
+      *o++ = (char)v;
+      p += 4;
+      break;
+    }
+    default: free(buf); return NULL;
+    }
+    p++;
+  }
+  if (*p != '"') { free(buf); return NULL; }
+  *o = '\0';
+  *out = buf;
+  return p + 1;
+}
+
+/* Skip a scalar JSON value (string, number, true/false/null). */
+static const char *bj_skip(const char *p) {
+  if (*p == '"') {
+    for (p++; *p && *p != '"'; p++)
+      if (*p == '\\' && p[1]) p++;
+    return *p ? p + 1 : NULL;
+  }
+  if (!*p || !strchr("-0123456789tfn", *p)) return NULL;
+  while (*p && !strchr(",} \t\r\n", *p)) p++;
+  return p;
+}
+
+/* Parse one job line; returns an error message or NULL. */
+static const char *bj_parse(const char *p, BatchJob *job) {
+  memset(job, 0, sizeof(*job));
+  strcpy(job->id, "null");
+  job->seed = 42;
+  p = bj_ws(p);
+  if (*p++ != '{') return "job is not a JSON object";
+  for (;;) {
+    char *key = NULL;
+    const char *v;
+    p = bj_ws(p);
+    if (*p == '}') break;
+    if (*p != '"' || !(p = bj_string(p + 1, &key))) return "bad field name";
+    p = bj_ws(p);
+    if (*p++ != ':') { free(key); return "expected ':'"; }
+    v = bj_ws(p);
+    if (strcmp(key, "id") == 0) {
+      p = bj_skip(v);
+      if (!p || (size_t)(p - v) >= sizeof(job->id)) { free(key); return "bad id"; }
+      memcpy(job->id, v, p - v);
+      job->id[p - v] = '\0';
+    } else if (strcmp(key, "seed") == 0) {
+      char *end;
+      job->seed = (unsigned int)strtol(v, &end, 10);
+      if (end == v) { free(key); return "bad seed"; }
+      p = end;
+    } else if (strcmp(key, "keys") == 0) {
+      free(job->keys);
+      job->keys = NULL;
+      if (*v != '"' || !(p = bj_string(v + 1, &job->keys))) { free(key); return "bad keys"; }
+    } else if (!(p = bj_skip(v))) {
+      free(key);
+      return "bad value";
+    }
+    free(key);
+    p = bj_ws(p);
+    if (*p == ',') { p++; continue; }
+    if (*p == '}') break;
+    return "expected ',' or '}'";
+  }
+  if (!job->keys) job->keys = strdup("Q");
+  return NULL;
+}
+
+static void bj_error(const char *id, const char *msg) {
+  printf("{\"id\": %s, \"ok\": false, \"error\": ", id);
+  json_escape(stdout, msg);
+  fputs("}\n", stdout);
+}
+
+/* Run one job in a child; the session JSON comes back through a pipe and
+ * is written out on one line.  The game's own stdout (e.g. "No record
+ * file" at the end) goes to stderr so it cannot corrupt the stream. */
+static void batch_run_job(const BatchJob *job, unsigned int timeout) {
+  int fds[2];
+  pid_t pid;
+  char *out = NULL;
+  size_t len = 0, cap = 0;
+  ssize_t n;
+  int status;
+  int timed_out = 0;
+  time_t deadline = time(NULL) + timeout;
+
+  fflush(stdout);
+  if (pipe(fds) != 0) { bj_error(job->id, "pipe failed"); return; }
+  pid = fork();
+  if (pid < 0) {
+    close(fds[0]);
+    close(fds[1]);
+    bj_error(job->id, "fork failed");
+    return;
+  }
+  if (pid == 0) {
+    close(fds[0]);
+    dup2(STDERR_FILENO, STDOUT_FILENO);
+    /* stdin shares its file offset with the parent.  When it is a regular
+     * file, exit()'s stdio cleanup would seek it back over the jobs the
+     * parent has buffered, and the parent would run them again. */
+    {
+      int devnull = open("/dev/null", O_RDONLY);
+      if (devnull >= 0) {
+        dup2(devnull, STDIN_FILENO);
+        close(devnull);
+      }
+    }
+    g_outfp = fdopen(fds[1], "w");
+    signal(SIGPIPE, SIG_DFL);
+    run_game(job->seed, job->keys);
+    _exit(1);
+  }
+  close(fds[1]);
+  for (;;) {
+    if (timeout) {
+      struct pollfd pfd;
+      long left = (long)(deadline - time(NULL));
+      if (left <= 0) {
+        kill(pid, SIGKILL);
+        timed_out = 1;
+        break;
+      }
+      pfd.fd = fds[0];
+      pfd.events = POLLIN;
+      if (poll(&pfd, 1, (int)(left * 1000)) <= 0) continue;
+    }
+    if (cap - len < 65536) {
+      cap = cap ? cap * 2 : 1 << 20;
+      out = realloc(out, cap);
+    }
+    n = read(fds[0], out + len, cap - len);
+    if (n > 0) { len += (size_t)n; continue; }
+    if (n < 0 && errno == EINTR) continue;
+    break;
+  }
+  close(fds[0]);
+  while (waitpid(pid, &status, 0) < 0 && errno == EINTR)
+    ;
+  if (timed_out) {
+    char msg[64];
+    snprintf(msg, sizeof(msg), "timed out after %us", timeout);
+    bj_error(job->id, msg);
+  } else if (WIFSIGNALED(status)) {
+    char msg[64];
+    snprintf(msg, sizeof(msg), "killed by signal %d", WTERMSIG(status));
+    bj_error(job->id, msg);
+  } else if (WEXITSTATUS(status) != 0) {
+    char msg[64];
+    snprintf(msg, sizeof(msg), "exit status %d", WEXITSTATUS(status));
+    bj_error(job->id, msg);
+  } else if (len == 0 || out[0] != '{') {
+    bj_error(job->id, "no session output");
+  } else {
+    /* The session JSON escapes control characters inside strings, so raw
+     * newlines (and the indentation after them) are layout only. */
+    size_t i;
+    printf("{\"id\": %s, \"ok\": true, \"session\": ", job->id);
+    for (i = 0; i < len; i++) {
+      if (out[i] != '\n') { putchar(out[i]); continue; }
+      while (i + 1 < len && out[i + 1] == ' ') i++;
+    }
+    fputs("}\n", stdout);
+  }
+  free(out);
+}
+
+static int batch_main(unsigned int timeout) {
+  char *line = NULL;
+  size_t cap = 0;
+  BatchJob job;
+  const char *err;
+
+  signal(SIGPIPE, SIG_IGN);
+  while (getline(&line, &cap, stdin) > 0) {
+    if (*bj_ws(line) == '\0') continue;
+    err = bj_parse(line, &job);
+    if (err) bj_error(job.id, err);
+    else batch_run_job(&job, timeout);
+    free(job.keys);
+    fflush(stdout);
+  }
+  free(line);
+  return 0;
+}
+
+/* ===== main() — harness entry point ===== */
+int main(int argc, char **argv) {
+  unsigned int seed = 42;
+  const char *keys = "Q";
+  unsigned int timeout = 60;
+  int batch = 0;
+  int i;
+
+  for (i = 1; i < argc; i++) {
+    if (strcmp(argv[i], "--seed") == 0 && i+1 < argc) seed = (unsigned int)atoi(argv[++i]);
+    else if (strcmp(argv[i], "--keys") == 0 && i+1 < argc) keys = argv[++i];
+    else if (strcmp(argv[i], "--out") == 0 && i+1 < argc) g_outfile = argv[++i];
+    else if (strcmp(argv[i], "--batch") == 0) batch = 1;
+    else if (strcmp(argv[i], "--timeout") == 0 && i+1 < argc) timeout = (unsigned int)atoi(argv[++i]);
+  }
+
+  if (batch) return batch_main(timeout);
+  run_game(seed, keys);
   return 0;
 }
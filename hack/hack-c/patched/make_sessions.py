@@ -6,14 +6,16 @@ Produces 22 session files covering navigation, combat, item use, and stair desce
 Sessions are written to hack/test/sessions/ in v1 format (with rng arrays).
 
 Usage:
-  python3 make_sessions.py [--out-dir DIR] [--harness PATH]
+  python3 make_sessions.py [--out-dir DIR] [--harness PATH] [--jobs N]
+
+Sessions are played through the harness's batch mode (run_session.py).
 """
 
 import argparse
-import subprocess
 import sys
 import os
-import json
+
+from run_session import HarnessError, run_sessions, write_session
 
 # Each entry: (seed, keys, description)
 # Key vocabulary:
@@ -75,23 +77,12 @@ SESSIONS = [
 ]
 
 
-def run_session(seed, keys, outfile, harness):
-    """Run the harness and write session JSON to outfile."""
-    args = [harness, '--seed', str(seed), '--keys', keys, '--out', outfile]
-    result = subprocess.run(args, capture_output=True, text=True, timeout=60)
-    if result.returncode != 0:
-        print(f'  ERROR: harness failed (seed={seed})', file=sys.stderr)
-        if result.stderr:
-            print(result.stderr[:200], file=sys.stderr)
-        return False
-    return True
-
-
 def main():
     parser = argparse.ArgumentParser(description='Generate Hack 1982 reference sessions')
     parser.add_argument('--out-dir', default=None, help='Output directory for session files')
     parser.add_argument('--harness', default=None, help='Path to hack_harness binary')
     parser.add_argument('--seeds', default=None, help='Comma-separated seed list (default: all)')
+    parser.add_argument('--jobs', type=int, default=None, help='Batch harness processes (default: CPUs)')
     args = parser.parse_args()
 
     script_dir = os.path.dirname(os.path.abspath(__file__))
@@ -119,18 +110,19 @@ def main():
     print(f'Generating {len(sessions)} session(s) → {out_dir}')
     ok = 0
     fail = 0
-    for seed, keys, desc in sessions:
+    jobs = [{'seed': seed, 'keys': keys} for seed, keys, desc in sessions]
+    results = run_sessions(jobs, harness, workers=args.jobs, timeout=60)
+    for (seed, keys, desc), data in zip(sessions, results):
         outfile = os.path.join(out_dir, f'seed{seed}.json')
         print(f'  seed={seed:6d}  {desc:20s}  keys={len(keys):3d}  ...', end='', flush=True)
-        if run_session(seed, keys, outfile, harness):
-            with open(outfile) as f:
-                data = json.load(f)
+        if not isinstance(data, HarnessError):
+            write_session(data, outfile)
             nsteps = len(data.get('steps', []))
             rng0 = len(data['steps'][0].get('rng', [])) if nsteps > 0 else 0
             print(f' {nsteps} steps, rng[0]={rng0}')
             ok += 1
         else:
-            print(' FAILED')
+            print(f' FAILED ({data})')
             fail += 1
 
     print(f'\nDone: {ok} ok, {fail} failed')
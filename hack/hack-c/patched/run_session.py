@@ -4,9 +4,16 @@ run_session.py — Run patched Hack with seed + keystrokes → session JSON.
 
 Usage:
   python3 run_session.py --seed 42 --keys "hhhljj.ss" --out sessions/seed42.json
+  python3 run_session.py --batch jobs.jsonl --jobs 4 --out results.jsonl
 
 The harness binary must be built first:
   cd hack-c/patched && make
+
+Batch mode: `hack_harness --batch` plays one job per stdin line and
+answers each with one JSON line on stdout (see hack_harness.c).
+HarnessBatch drives one such process; run_sessions() spreads many jobs
+over several of them, so bulk generation pays no per-session process
+start or temp-file round trip.
 """
 
 import argparse
@@ -14,6 +21,14 @@ import subprocess
 import sys
 import os
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+HARNESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hack_harness')
+
+
+class HarnessError(RuntimeError):
+    """A batch job failed (bad job, crash, timeout or harness exit)."""
 
 def run_session(seed, keys, outfile=None, harness='./hack_harness'):
     """Run the harness and return session JSON."""
@@ -31,22 +46,136 @@ def run_session(seed, keys, outfile=None, harness='./hack_harness'):
     return json.loads(result.stdout)
 
 
+class HarnessBatch:
+    """One `hack_harness --batch` process; run() plays a job and returns its session."""
+
+    def __init__(self, harness=HARNESS, timeout=30):
+        self.harness = harness
+        self.proc = subprocess.Popen(
+            [harness, '--batch', '--timeout', str(int(timeout))],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self._next_id = 0
+
+    def run(self, seed, keys, **fields):
+        self._next_id += 1
+        job = {'id': self._next_id, 'seed': seed, 'keys': keys, **fields}
+        try:
+            self.proc.stdin.write(json.dumps(job) + '\n')
+            self.proc.stdin.flush()
+            line = self.proc.stdout.readline()
+        except (BrokenPipeError, OSError) as err:
+            raise HarnessError(f'{self.harness} --batch exited: {err}') from err
+        if not line:
+            raise HarnessError(f'{self.harness} --batch exited (rebuild it: make)')
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise HarnessError(f'{self.harness} does not speak --batch (rebuild it: make)') from None
+        if record.get('id') != job['id']:
+            raise HarnessError(f'batch reply for job {record.get("id")}, expected {job["id"]}')
+        if not record.get('ok'):
+            raise HarnessError(f'seed {seed}: {record.get("error")}')
+        return record['session']
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_sessions(jobs, harness=HARNESS, workers=None, timeout=30):
+    """Play job dicts ({'seed', 'keys'}) on `workers` batch processes.
+
+    Yields one result per job, in job order: the session dict, or the
+    HarnessError that job raised.
+    """
+    local = threading.local()
+    batches = []
+
+    def play(job):
+        batch = getattr(local, 'batch', None)
+        if batch is None:
+            batch = local.batch = HarnessBatch(harness, timeout)
+            batches.append(batch)
+        try:
+            return batch.run(**job)
+        except HarnessError as err:
+            if batch.proc.poll() is not None:
+                local.batch = None
+            return err
+
+    pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    try:
+        yield from pool.map(play, jobs)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        for batch in batches:
+            batch.close()
+
+
+def write_session(session, outfile):
+    """Write a session in the layout of the checked-in session files."""
+    with open(outfile, 'w') as f:
+        json.dump(session, f, indent=2)
+        f.write('\n')
+
+
+def run_batch_file(jobs_path, out, harness, workers):
+    """--batch: jobs JSONL in, one result record per job out (in order)."""
+    with open(jobs_path) as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+    failed = 0
+    plays = [{k: v for k, v in job.items() if k != 'id'} for job in jobs]
+    for job, result in zip(jobs, run_sessions(plays, harness, workers)):
+        if isinstance(result, HarnessError):
+            record = {'id': job.get('id'), 'ok': False, 'error': str(result)}
+            failed += 1
+        else:
+            record = {'id': job.get('id'), 'ok': True, 'session': result}
+        out.write(json.dumps(record) + '\n')
+    return failed
+
+
 def main():
     parser = argparse.ArgumentParser(description='Run Hack 1982 harness session')
     parser.add_argument('--seed', type=int, default=42, help='RNG seed')
     parser.add_argument('--keys', default='Q', help='Keystroke sequence')
     parser.add_argument('--out', default=None, help='Output JSON file')
     parser.add_argument('--harness', default=None, help='Path to hack_harness binary')
+    parser.add_argument('--batch', default=None, metavar='JOBS_JSONL',
+                        help='Run {"id", "seed", "keys"} jobs; --out gets one result per line')
+    parser.add_argument('--jobs', type=int, default=None, help='Batch harness processes (default: CPUs)')
     args = parser.parse_args()
 
     # Find harness binary
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    harness = args.harness or os.path.join(script_dir, 'hack_harness')
+    harness = args.harness or HARNESS
     if not os.path.exists(harness):
         print(f'Harness not found: {harness}', file=sys.stderr)
         print('Build it first: cd hack-c/patched && make', file=sys.stderr)
         sys.exit(1)
 
+    if args.batch:
+        if args.out:
+            with open(args.out, 'w') as out:
+                failed = run_batch_file(args.batch, out, harness, args.jobs)
+        else:
+            failed = run_batch_file(args.batch, sys.stdout, harness, args.jobs)
+        sys.exit(1 if failed else 0)
+
     session = run_session(args.seed, args.keys, args.out, harness)
     if session is None:
         sys.exit(1)
@@ -7,55 +7,17 @@ Usage:
   python3 hack/test/find_monster_seed.py E,R,N,A,y  # any of these on level 1
   python3 hack/test/find_monster_seed.py P --dlevel 5 --keys "...descent..."
   python3 hack/test/find_monster_seed.py E --maxdist 2 --limit 5 --start 1
-"""
-import subprocess, json, sys, os, argparse
 
-HARNESS = os.path.join(os.path.dirname(__file__), '../hack-c/patched/hack_harness')
-RUN_SESSION = os.path.join(os.path.dirname(__file__), '../hack-c/patched/run_session.py')
+A thin front end to scripts/seed_scan.py: hack_harness runs directly in a
+process pool (--jobs) and the condition is near(LETTERS, MAXDIST); use
+--where to add more, e.g. --where 'not screen("You die")'.
+"""
+import sys, os, json, argparse
 
-def find_at(screen):
-    """Find player '@' position on screen."""
-    for r, row in enumerate(screen):
-        c = row.find('@')
-        if c >= 0:
-            return (c, r)
-    return None
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'scripts'))
+from seed_scan import scan, format_hit, parse_condition, check_harness
 
-def scan_seed(seed, target_mlets, keys, maxdist):
-    """Run seed with keys, check if any target monster is within maxdist of player."""
-    import tempfile
-    with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
-        outpath = f.name
-    try:
-        result = subprocess.run(
-            [sys.executable, RUN_SESSION, '--seed', str(seed), '--keys', keys, '--out', outpath],
-            capture_output=True, timeout=10
-        )
-        if result.returncode != 0:
-            return None
-        with open(outpath) as f:
-            data = json.load(f)
-        # Look at last step's screen
-        if not data.get('steps'):
-            return None
-        screen = data['steps'][-1]['screen']
-        player = find_at(screen)
-        if not player:
-            return None
-        px, py = player
-        found = []
-        for r, row in enumerate(screen):
-            for c, ch in enumerate(row):
-                if ch in target_mlets:
-                    dist = max(abs(c - px), abs(r - py))
-                    if dist <= maxdist:
-                        found.append({'mlet': ch, 'x': c, 'y': r, 'dist': dist})
-        return found if found else None
-    except (subprocess.TimeoutExpired, Exception):
-        return None
-    finally:
-        try: os.unlink(outpath)
-        except: pass
+HARNESS = os.path.join(os.path.dirname(__file__), '../hack-c/patched/hack_harness')
 
 def main():
     p = argparse.ArgumentParser()
@@ -66,6 +28,9 @@ def main():
     p.add_argument('--limit', type=int, default=10)
     p.add_argument('--start', type=int, default=1)
     p.add_argument('--end', type=int, default=50000)
+    p.add_argument('--jobs', type=int, default=0, help='Worker processes (0 = one per CPU)')
+    p.add_argument('--harness', default=HARNESS, help='Path to hack_harness binary')
+    p.add_argument('--where', default=None, help='Extra seed_scan.py condition, ANDed with the monster test')
     args = p.parse_args()
 
     target = set(args.mlets.split(','))
@@ -80,16 +45,23 @@ def main():
         descent = 'jjjjhhjjjjl>'
         keys = descent * (args.dlevel - 1) + 'h'
 
+    condition = f"near({json.dumps(''.join(sorted(target)))}, {args.maxdist})"
+    if args.where:
+        condition = f'{condition} and ({args.where})'
+    try:
+        parse_condition(condition)
+        check_harness('hack', args.harness)
+    except (ValueError, FileNotFoundError) as e:
+        p.error(str(e))
+
     print(f"Scanning seeds {args.start}-{args.end} for {target} at dlevel={args.dlevel} maxdist={args.maxdist}")
     found_count = 0
-    for seed in range(args.start, args.end + 1):
-        matches = scan_seed(seed, target, keys, args.maxdist)
-        if matches:
-            for m in matches:
-                print(f"seed={seed:6d}  mlet={m['mlet']}  pos=({m['x']:2d},{m['y']:2d})  dist={m['dist']}")
-            found_count += 1
-            if found_count >= args.limit:
-                break
+    for seed, hits in scan('hack', keys, condition, range(args.start, args.end + 1),
+                           jobs=args.jobs or os.cpu_count() or 1, limit=args.limit, harness=args.harness):
+        for m in hits:
+            if 'mlet' in m:
+                print(format_hit(seed, m), flush=True)
+        found_count += 1
     if found_count == 0:
         print('No seeds found.')
 
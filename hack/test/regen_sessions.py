@@ -3,26 +3,34 @@
 regen_sessions.py — Regenerate all sessions broken by the diverse-dungeon-map change.
 
 Run from the repo root (mac/):
-  python3 hack/test/regen_sessions.py
+  python3 hack/test/regen_sessions.py [--jobs N] [--speculate K]
 
 For each session, it:
   1. Runs the appropriate JS bot to generate a key sequence
   2. Records the session with the C harness
   3. Saves to hack/test/sessions/<name>.json
+
+With --jobs 1 the seeds of each session are tried one after another;
+with more jobs (default: CPU count) the trials are pipelined across
+sessions and seeds, see regen_parallel().
 """
 
 import subprocess, sys, os, json, time
+import argparse, shutil, tempfile, threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 
 ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))  # mac/
 SESSION_DIR = os.path.join(ROOT, 'hack', 'test', 'sessions')
 HARNESS_DIR = os.path.join(ROOT, 'hack', 'hack-c', 'patched')
 HARNESS     = os.path.join(HARNESS_DIR, 'hack_harness')
-RUN_SESSION = os.path.join(HARNESS_DIR, 'run_session.py')
 DEEPBOT     = os.path.join(ROOT, 'hack', 'test', 'deepbot.mjs')
 CAMPBOT     = os.path.join(ROOT, 'hack', 'test', 'campbot.mjs')
 RINGBOT     = os.path.join(ROOT, 'hack', 'test', 'ringbot.mjs')
 REPLAY      = os.path.join(ROOT, 'hack', 'test', 'replay_test.mjs')
 
+sys.path.insert(0, HARNESS_DIR)
+from run_session import HarnessBatch, HarnessError, write_session
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Monster tier reference (from data.js):
 # tier 0: B(at) G(nome) H(obgoblin) J(ackal) K(obold) L(eprechaun) r(at)
@@ -360,13 +368,55 @@ OBSOLETE_SESSIONS = [
 
 # ──────────────────────────────────────────────────────────────────────────────
 
-def run_bot(bot_script, bot_args, timeout=120):
+class TrialCancelled(Exception):
+    """A speculative seed trial was cancelled because an earlier seed passed."""
+
+class Trial:
+    """One seed attempt; cancel() kills whichever bot/replay it is running."""
+
+    def __init__(self, seed):
+        self.seed = seed
+        self.cancelled = False
+        self._proc = None
+        self._lock = threading.Lock()
+
+    def run(self, cmd, timeout, cwd):
+        with self._lock:
+            if self.cancelled:
+                raise TrialCancelled()
+            proc = self._proc = subprocess.Popen(
+                cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, cwd=cwd)
+        try:
+            out, err = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.communicate()
+            raise
+        finally:
+            with self._lock:
+                self._proc = None
+        if self.cancelled:
+            raise TrialCancelled()
+        return subprocess.CompletedProcess(cmd, proc.returncode, out, err)
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._proc is not None and self._proc.poll() is None:
+                self._proc.kill()
+
+def _run(cmd, timeout, cwd, trial=None):
+    if trial is None:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=cwd)
+    return trial.run(cmd, timeout, cwd)
+
+def run_bot(bot_script, bot_args, timeout=120, trial=None):
     """Run a bot and return (keys, stderr) or (None, stderr) on failure."""
     if not os.path.exists(bot_script):
         return None, f'MISSING: {bot_script}'
     cmd = ['node', bot_script] + [str(a) for a in bot_args]
     try:
-        r = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=ROOT)
+        r = _run(cmd, timeout, ROOT, trial)
         if r.returncode != 0:
             return None, f'EXIT {r.returncode}: {r.stderr[:200]}'
         keys = r.stdout.strip()
@@ -376,22 +426,30 @@ def run_bot(bot_script, bot_args, timeout=120):
     except subprocess.TimeoutExpired:
         return None, f'TIMEOUT after {timeout}s'
 
+_local = threading.local()
+_batches = []
+
 def record_session(seed, keys, outfile, timeout=120):
-    """Record a session with the C harness."""
-    cmd = ['python3', RUN_SESSION,
-           '--seed', str(seed), '--keys', keys, '--out', outfile,
-           '--harness', HARNESS]
-    r = subprocess.run(cmd, capture_output=True, text=True, timeout=timeout, cwd=HARNESS_DIR)
-    if r.returncode != 0:
-        return False, r.stderr
+    """Record a session with the C harness (one --batch process per thread)."""
+    batch = getattr(_local, 'batch', None)
+    if batch is None or batch.proc.poll() is not None:
+        batch = _local.batch = HarnessBatch(HARNESS, timeout)
+        _batches.append(batch)
+    try:
+        session = batch.run(seed, keys)
+    except HarnessError as err:
+        return False, str(err)
+    write_session(session, outfile)
     return True, ''
 
-def verify_session(session_file):
+def close_harnesses():
+    for batch in _batches:
+        batch.close()
+    _batches.clear()
+
+def verify_session(session_file, trial=None):
     """Run parity check on a session file."""
-    r = subprocess.run(
-        ['node', REPLAY, session_file],
-        capture_output=True, text=True, timeout=120, cwd=ROOT
-    )
+    r = _run(['node', REPLAY, session_file], 120, ROOT, trial)
     if r.returncode != 0:
         return False, r.stderr
     try:
@@ -400,62 +458,207 @@ def verify_session(session_file):
     except:
         return False, r.stdout
 
+def try_seed(bot_script, seed, bot_arg_fn, success_fn, out_path, say, trial=None):
+    """Bot, record and verify one seed; returns True if out_path is a keeper.
+
+    `say` receives the progress text.  A cancelled trial raises
+    TrialCancelled from its bot or replay run.
+    """
+    bot_args = bot_arg_fn(seed)
+    keys, stderr = run_bot(bot_script, bot_args, timeout=300, trial=trial)
+
+    if keys is None:
+        say(f' FAIL: {stderr[:100]}\n')
+        return False
+
+    if not success_fn(stderr):
+        if len(keys) < 10:
+            say(f' too few keys ({len(keys)}), skipping\n')
+            return False
+        if 'Game over' in stderr and len(keys) < 200:
+            say(f' died too early ({len(keys)} keys), trying next seed\n')
+            return False
+        say(f' incomplete ({len(keys)} keys)')
+        if len(keys) < 30:
+            say(' — too short, skipping\n')
+            return False
+        say('\n')
+    else:
+        say(f' OK ({len(keys)} keys)')
+
+    say(f' — recording...')
+    ok, err = record_session(seed, keys, out_path)
+    if not ok:
+        say(f' RECORD FAILED: {err[:80]}\n')
+        return False
+
+    say(' verifying...')
+    passed, result = verify_session(out_path, trial=trial)
+    if passed:
+        say(f' PASS ✓ (seed={seed})\n')
+        return True
+    say(f' PARITY FAIL — trying next seed\n')
+    try:
+        r = json.loads(result.strip())
+        if r.get('screen_pct', 0) == 100:
+            say(f'  (100% screen parity, keeping)\n')
+            return True
+    except:
+        pass
+    return False
+
+def _say(text):
+    print(text, end='', flush=True)
+
 def regen_session(name, bot_script, seeds, bot_arg_fn, success_fn):
     print(f'\n{"="*60}')
     print(f'Regenerating: {name}')
     out_path = os.path.join(SESSION_DIR, f'{name}.json')
 
     for seed in seeds:
-        bot_args = bot_arg_fn(seed)
         print(f'  Trying seed {seed} with {os.path.basename(bot_script)}...', end='', flush=True)
-        keys, stderr = run_bot(bot_script, bot_args, timeout=300)
-
-        if keys is None:
-            print(f' FAIL: {stderr[:100]}')
-            continue
-
-        if not success_fn(stderr):
-            if len(keys) < 10:
-                print(f' too few keys ({len(keys)}), skipping')
-                continue
-            if 'Game over' in stderr and len(keys) < 200:
-                print(f' died too early ({len(keys)} keys), trying next seed')
-                continue
-            print(f' incomplete ({len(keys)} keys)', end='')
-            if len(keys) < 30:
-                print(' — too short, skipping')
-                continue
-            print()
-        else:
-            print(f' OK ({len(keys)} keys)', end='', flush=True)
-
-        print(f' — recording...', end='', flush=True)
-        ok, err = record_session(seed, keys, out_path)
-        if not ok:
-            print(f' RECORD FAILED: {err[:80]}')
-            continue
-
-        print(' verifying...', end='', flush=True)
-        passed, result = verify_session(out_path)
-        if passed:
-            print(f' PASS ✓ (seed={seed})')
+        if try_seed(bot_script, seed, bot_arg_fn, success_fn, out_path, _say):
             return True, seed
-        else:
-            print(f' PARITY FAIL — trying next seed')
-            try:
-                r = json.loads(result.strip())
-                if r.get('screen_pct', 0) == 100:
-                    print(f'  (100% screen parity, keeping)')
-                    return True, seed
-            except:
-                pass
 
     print(f'  ALL SEEDS FAILED for {name}')
     return False, None
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Pipelined mode (--jobs N > 1)
+#
+# Every seed trial (bot -> record -> verify) is a task on one pool of N
+# workers, so one seed's recording and replay overlap other seeds' bot
+# runs, and sessions are regenerated side by side.  Each session keeps up
+# to --speculate trials in flight; they are queued round-robin, so every
+# session's first seed is started before anyone's speculative second.
+#
+# The result matches the serial run: a session keeps the earliest seed in
+# its list that passes.  When seed i passes, trials after i are cancelled
+# (queued ones dropped, running bots/replays killed) and the session
+# finishes once every seed before i has failed.  Trials record into a
+# scratch directory beside SESSION_DIR (same filesystem, so the kept one
+# is moved into place with a rename, and no partial recording is ever
+# seen among the sessions).
+# ──────────────────────────────────────────────────────────────────────────────
+
+class _SessionRegen:
+    def __init__(self, index, name, bot_script, seeds, bot_arg_fn, success_fn, scratch):
+        self.index = index
+        self.name = name
+        self.bot_script = bot_script
+        self.seeds = seeds
+        self.bot_arg_fn = bot_arg_fn
+        self.success_fn = success_fn
+        self.scratch = scratch
+        self.next = 0          # next seed index to start
+        self.trials = {}       # seed index -> Trial
+        self.outcomes = {}     # seed index -> True (keeper) / False
+        self.best = None       # lowest seed index that passed
+        self.done = False
+
+    def candidate_path(self, i):
+        return os.path.join(self.scratch, f'{self.index}.{i}', f'{self.name}.json')
+
+    def can_start(self):
+        return self.best is None and self.next < len(self.seeds)
+
+    def running(self):
+        return [i for i in self.trials if i not in self.outcomes]
+
+    def settled(self):
+        if self.best is not None:
+            return all(i in self.outcomes for i in range(self.best))
+        return self.next == len(self.seeds) and not self.running()
+
+def _run_trial(regen, i, trial):
+    lines = []
+    try:
+        kept = try_seed(regen.bot_script, regen.seeds[i], regen.bot_arg_fn,
+                        regen.success_fn, regen.candidate_path(i), lines.append, trial)
+    except TrialCancelled:
+        return None, ''
+    return kept, ''.join(lines)
+
+def regen_parallel(sessions, jobs, speculate):
+    """Regenerate sessions on a pool of `jobs` workers; returns [(name, ok, seed)]."""
+    scratch = tempfile.mkdtemp(prefix='.regen-', dir=os.path.dirname(SESSION_DIR))
+    regens = [_SessionRegen(k, *entry, scratch) for k, entry in enumerate(sessions)]
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    pending = {}
+
+    def start(regen):
+        i = regen.next
+        regen.next += 1
+        os.makedirs(os.path.dirname(regen.candidate_path(i)), exist_ok=True)
+        trial = regen.trials[i] = Trial(regen.seeds[i])
+        pending[pool.submit(_run_trial, regen, i, trial)] = (regen, i)
+
+    def cancel_after(regen, best):
+        for i, trial in regen.trials.items():
+            if i > best:
+                trial.cancel()
+        for fut, (other, i) in pending.items():
+            if other is regen and i > best:
+                fut.cancel()
+
+    print(f'Pipelined regeneration: {len(regens)} sessions, {jobs} workers, '
+          f'up to {speculate} seeds in flight per session')
+    try:
+        for _ in range(speculate):
+            for regen in regens:
+                if regen.can_start():
+                    start(regen)
+        while pending:
+            done, _ = wait(list(pending), return_when=FIRST_COMPLETED)
+            for fut in done:
+                regen, i = pending.pop(fut)
+                seed = regen.seeds[i]
+                if fut.cancelled():
+                    kept, log = None, ''
+                else:
+                    try:
+                        kept, log = fut.result()
+                    except Exception as err:
+                        kept, log = False, f' ERROR: {err}\n'
+                if kept is None:
+                    regen.outcomes[i] = False
+                else:
+                    regen.outcomes[i] = kept
+                    print(f'  {regen.name}: seed {seed} with '
+                          f'{os.path.basename(regen.bot_script)}...{log}', end='', flush=True)
+                if kept and (regen.best is None or i < regen.best):
+                    regen.best = i
+                    cancel_after(regen, i)
+                elif regen.can_start():
+                    start(regen)
+                if not regen.done and regen.settled():
+                    regen.done = True
+                    if regen.best is not None:
+                        os.replace(regen.candidate_path(regen.best),
+                                   os.path.join(SESSION_DIR, f'{regen.name}.json'))
+                        print(f'  {regen.name}: kept seed {regen.seeds[regen.best]}', flush=True)
+                    else:
+                        print(f'  ALL SEEDS FAILED for {regen.name}', flush=True)
+    finally:
+        for regen in regens:
+            for trial in regen.trials.values():
+                trial.cancel()
+        pool.shutdown(cancel_futures=True)
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    return [(r.name, r.best is not None, r.seeds[r.best] if r.best is not None else None)
+            for r in regens]
+
 # ──────────────────────────────────────────────────────────────────────────────
 
 def main():
+    parser = argparse.ArgumentParser(description='Regenerate Hack 1982 sessions')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                        help='Parallel seed trials (1 = serial, one seed at a time)')
+    parser.add_argument('--speculate', type=int, default=2,
+                        help='Seeds in flight per session in pipelined mode')
+    args = parser.parse_args()
+
     print('=== Hack 1982 Session Regeneration ===')
     print(f'Root: {ROOT}')
     print(f'Sessions: {SESSION_DIR}')
@@ -469,10 +672,16 @@ def main():
             print(f'  Deleted: {name}.json')
 
     # Run all sessions
-    results = []
-    for name, bot, seeds, arg_fn, success_fn in SESSIONS:
-        ok, seed = regen_session(name, bot, seeds, arg_fn, success_fn)
-        results.append((name, ok, seed))
+    start = time.time()
+    if args.jobs > 1:
+        results = regen_parallel(SESSIONS, args.jobs, max(1, args.speculate))
+    else:
+        results = []
+        for name, bot, seeds, arg_fn, success_fn in SESSIONS:
+            ok, seed = regen_session(name, bot, seeds, arg_fn, success_fn)
+            results.append((name, ok, seed))
+    close_harnesses()
+    elapsed = time.time() - start
 
     # Summary
     print(f'\n{"="*60}')
@@ -480,7 +689,7 @@ def main():
     print(f'{"="*60}')
     passed = sum(1 for _, ok, _ in results if ok)
     failed = [(n, s) for n, ok, s in results if not ok]
-    print(f'{passed}/{len(results)} sessions regenerated successfully')
+    print(f'{passed}/{len(results)} sessions regenerated successfully in {elapsed:.0f}s')
     if failed:
         print(f'Failed: {[n for n, _ in failed]}')
 
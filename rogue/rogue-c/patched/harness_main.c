@@ -8,6 +8,7 @@
  *   - main()           — parses args, sets up harness, calls game_main()
  *   - harness_exit()   — captures final state and emits JSON
  *   - readchar_harness() — keystroke injection + screen capture
+ *   - batch_main()     — --batch: one session per stdin job (see below)
  *
  * The game's main() is renamed to game_main() via -include harness_rename.h.
  * All game source files are compiled with -include rogue_patch.h which
@@ -19,6 +20,13 @@
 #include <stdlib.h>
 #include <string.h>
 #include <stdarg.h>
+#include <errno.h>
+#include <signal.h>
+#include <time.h>
+#include <unistd.h>
+#include <fcntl.h>
+#include <poll.h>
+#include <sys/wait.h>
 
 /* ===== Shared with rng_log.c ===== */
 #include "harness_events.h"
@@ -40,6 +48,7 @@ static const char *harness_keys = NULL;
 static int harness_key_pos = 0;
 static int harness_key_count = 0;
 static const char *harness_outfile = NULL;
+static FILE *harness_outfp = NULL;  /* batch mode: the pipe back to the parent */
 static unsigned int g_harness_seed = 42;  /* our forced seed for JSON output */
 
 /* ===== Step capture ===== */
@@ -198,6 +207,17 @@ static void capture_step(char key)
     harness_event_count = 0;
 }
 
+/* Emit the session JSON to the batch pipe, --out file or stdout. */
+static void write_session(void)
+{
+    FILE *out = harness_outfp;
+    if (!out) out = harness_outfile ? fopen(harness_outfile, "w") : stdout;
+    if (!out) out = stdout;
+    emit_session_json(out, g_harness_seed);
+    if (out != stdout) fclose(out);
+    else fflush(out);  /* harness_exit() leaves via _exit() */
+}
+
 /* ===== harness_next_key ===== */
 /*
  * Called by readchar() in io.c (via #ifdef HARNESS) and by getchar() calls
@@ -212,10 +232,7 @@ int harness_next_key(void)
     if (harness_key_pos >= harness_key_count) {
         /* No more keys — capture final state and exit */
         capture_step('\0');
-        FILE *out = harness_outfile ? fopen(harness_outfile, "w") : stdout;
-        if (!out) out = stdout;
-        emit_session_json(out, g_harness_seed);
-        if (harness_outfile && out != stdout) fclose(out);
+        write_session();
         exit(0);
     }
 
@@ -232,10 +249,7 @@ void harness_exit(int code)
     (void)code;
     /* Capture whatever state we have */
     capture_step('\0');
-    FILE *out = harness_outfile ? fopen(harness_outfile, "w") : stdout;
-    if (!out) out = stdout;
-    emit_session_json(out, g_harness_seed);
-    if (harness_outfile && out != stdout) fclose(out);
+    write_session();
     _exit(0);  /* skip atexit handlers that may crash on game teardown */
 }
 
@@ -261,12 +275,323 @@ int md_readchar(WINDOW *win)
 /* game_main is the renamed main() from main.c */
 extern void game_main(int argc, char **argv, char **envp);
 
+/* Run one game; does not return (the game ends in harness_exit()). */
+static void run_game(unsigned int seed_val, const char *keys, const char *restore_file,
+                     const char *home)
+{
+    harness_keys = keys;
+    harness_key_count = (int)strlen(keys);
+    harness_key_pos = 0;
+
+    g_harness_seed = seed_val;
+
+    /* Set ROGUEOPTS and USER env to avoid interactive prompts */
+    setenv("ROGUEOPTS", "name=rogue,fruit=papaya", 1);
+    setenv("USER", "rogue", 1);
+    /* The game saves to $HOME/rogue.save; give each job its own HOME so
+     * concurrent recordings do not share a save file. */
+    setenv("HOME", home ? home : "/tmp", 1);
+
+    if (!restore_file) {
+        /* New game: set forced seed */
+        harness_set_forced_seed(seed_val);
+        /* Provide SEED env var so wizard mode seed works if needed */
+        char seedbuf[32];
+        snprintf(seedbuf, sizeof(seedbuf), "%u", seed_val);
+        setenv("SEED", seedbuf, 1);
+
+        char *game_argv[2] = { "rogue_harness", NULL };
+        game_main(1, game_argv, NULL);
+    } else {
+        /* Restore from save file: pass save file as argv[1] to trigger restore() */
+        /* Do NOT set forced seed — restore() loads the RNG state from the save */
+        char *game_argv[3] = { "rogue_harness", (char *)restore_file, NULL };
+        game_main(2, game_argv, NULL);
+    }
+
+    /* Should not reach here */
+    harness_exit(0);
+}
+
+/* ===== Batch mode ===== */
+/*
+ * rogue_harness --batch [--timeout SECS] reads one job per stdin line,
+ *   {"id": 7, "seed": 42, "keys": "hhjjQy", "wizard": false, "restore": null,
+ *    "home": "/tmp/job7"}
+ * and answers each with one line on stdout, in order:
+ *   {"id": 7, "ok": true, "session": {...session JSON...}}
+ *   {"id": 7, "ok": false, "error": "timed out after 60s"}
+ * "id" is echoed verbatim (a number or string); other scalar fields are
+ * ignored.  HARNESS_* variables and --wizard do not apply to jobs.
+ *
+ * Each job runs in a fork()ed child of this process, which never starts a
+ * game itself, so every job begins from the same pristine static state a
+ * fresh exec would have -- without re-running the loader, and without a
+ * reset function that would have to know every game global.  A job that
+ * crashes or hangs (past --timeout, default 60s) only fails its own
+ * record.  The game's own alarm()/SIGALRM use is left alone: the parent
+ * enforces the timeout.
+ */
+typedef struct {
+    char id[64];
+    unsigned int seed;
+    char *keys;
+    char *restore;
+    char *home;
+    int wizard;
+} BatchJob;
+
+static const char *bj_ws(const char *p)
+{
+    while (*p == ' ' || *p == '\t' || *p == '\r' || *p == '\n') p++;
+    return p;
+}
+
+/* Decode the JSON string at p (just after its opening quote) into a
+ * malloc'd byte string; \u escapes must be < 0x100 (keys are bytes). */
+static const char *bj_string(const char *p, char **out)
+{
+    char *buf = malloc(strlen(p) + 1);
+    char *o = buf;
+    while (*p && *p != '"') {
+        if (*p != '\\') { *o++ = *p++; continue; }
+        p++;
+        switch (*p) {
+        case '"': case '\\': case '/': *o++ = *p; break;
+        case 'b': *o++ = '\b'; break;
+        case 'f': *o++ = '\f'; break;
+        case 'n': *o++ = '\n'; break;
+        case 'r': *o++ = '\r'; break;
+        case 't': *o++ = '\t'; break;
+        case 'u': {
+            char hex[5];
+            char *end;
+            unsigned long v;
+            memcpy(hex, p + 1, 4);
+            hex[4] = '\0';
+            v = strtoul(hex, &end, 16);
+            if (strlen(p + 1) < 4 || end != hex + 4 || v > 0xff) { free(buf); return NULL; }
+            *o++ = (char)v;
+            p += 4;
+            break;
+        }
+        default: free(buf); return NULL;
+        }
+        p++;
+    }
+    if (*p != '"') { free(buf); return NULL; }
+    *o = '\0';
+    *out = buf;
+    return p + 1;
+}
+
+/* Skip a scalar JSON value (string, number, true/false/null). */
+static const char *bj_skip(const char *p)
+{
+    if (*p == '"') {
+        for (p++; *p && *p != '"'; p++)
+            if (*p == '\\' && p[1]) p++;
+        return *p ? p + 1 : NULL;
+    }
+    if (!*p || !strchr("-0123456789tfn", *p)) return NULL;
+    while (*p && !strchr(",} \t\r\n", *p)) p++;
+    return p;
+}
+
+/* Parse one job line; returns an error message or NULL. */
+static const char *bj_parse(const char *p, BatchJob *job)
+{
+    memset(job, 0, sizeof(*job));
+    strcpy(job->id, "null");
+    job->seed = 42;
+    p = bj_ws(p);
+    if (*p++ != '{') return "job is not a JSON object";
+    for (;;) {
+        char *key = NULL;
+        const char *v;
+        p = bj_ws(p);
+        if (*p == '}') break;
+        if (*p != '"' || !(p = bj_string(p + 1, &key))) return "bad field name";
+        p = bj_ws(p);
+        if (*p++ != ':') { free(key); return "expected ':'"; }
+        v = bj_ws(p);
+        if (strcmp(key, "id") == 0) {
+            p = bj_skip(v);
+            if (!p || (size_t)(p - v) >= sizeof(job->id)) { free(key); return "bad id"; }
+            memcpy(job->id, v, p - v);
+            job->id[p - v] = '\0';
+        } else if (strcmp(key, "seed") == 0) {
+            char *end;
+            job->seed = (unsigned int)strtol(v, &end, 10);
+            if (end == v) { free(key); return "bad seed"; }
+            p = end;
+        } else if (strcmp(key, "keys") == 0 || strcmp(key, "restore") == 0
+                   || strcmp(key, "home") == 0) {
+            int is_keys = key[0] == 'k';
+            char **field = is_keys ? &job->keys
+                         : key[0] == 'r' ? &job->restore : &job->home;
+            free(*field);
+            *field = NULL;
+            if (!is_keys && strncmp(v, "null", 4) == 0) {
+                p = v + 4;
+            } else if (*v != '"' || !(p = bj_string(v + 1, field))) {
+                free(key);
+                return is_keys ? "bad keys"
+                     : field == &job->restore ? "bad restore" : "bad home";
+            }
+        } else if (strcmp(key, "wizard") == 0) {
+            if (strncmp(v, "true", 4) == 0) { job->wizard = 1; p = v + 4; }
+            else if (strncmp(v, "false", 5) == 0) { job->wizard = 0; p = v + 5; }
+            else { free(key); return "bad wizard"; }
+        } else if (!(p = bj_skip(v))) {
+            free(key);
+            return "bad value";
+        }
+        free(key);
+        p = bj_ws(p);
+        if (*p == ',') { p++; continue; }
+        if (*p == '}') break;
+        return "expected ',' or '}'";
+    }
+    if (!job->keys) job->keys = strdup("");
+    return NULL;
+}
+
+static void bj_error(const char *id, const char *msg)
+{
+    printf("{\"id\": %s, \"ok\": false, \"error\": ", id);
+    json_escape_str(stdout, msg);
+    fputs("}\n", stdout);
+}
+
+/* Run one job in a child; the session JSON comes back through a pipe and
+ * is written out on one line.  The game's own stdout goes to stderr so it
+ * cannot corrupt the stream. */
+static void batch_run_job(const BatchJob *job, unsigned int timeout)
+{
+    int fds[2];
+    pid_t pid;
+    char *out = NULL;
+    size_t len = 0, cap = 0;
+    ssize_t n;
+    int status;
+    int timed_out = 0;
+    time_t deadline = time(NULL) + timeout;
+
+    fflush(stdout);
+    if (pipe(fds) != 0) { bj_error(job->id, "pipe failed"); return; }
+    pid = fork();
+    if (pid < 0) {
+        close(fds[0]);
+        close(fds[1]);
+        bj_error(job->id, "fork failed");
+        return;
+    }
+    if (pid == 0) {
+        close(fds[0]);
+        dup2(STDERR_FILENO, STDOUT_FILENO);
+        /* stdin shares its file offset with the parent.  When it is a regular
+         * file, exit()'s stdio cleanup would seek it back over the jobs the
+         * parent has buffered, and the parent would run them again. */
+        {
+            int devnull = open("/dev/null", O_RDONLY);
+            if (devnull >= 0) {
+                dup2(devnull, STDIN_FILENO);
+                close(devnull);
+            }
+        }
+        harness_outfp = fdopen(fds[1], "w");
+        harness_outfile = NULL;
+        signal(SIGPIPE, SIG_DFL);
+        wizard = job->wizard;
+        run_game(job->seed, job->keys, job->restore, job->home);
+        _exit(1);
+    }
+    close(fds[1]);
+    for (;;) {
+        if (timeout) {
+            struct pollfd pfd;
+            long left = (long)(deadline - time(NULL));
+            if (left <= 0) {
+                kill(pid, SIGKILL);
+                timed_out = 1;
+                break;
+            }
+            pfd.fd = fds[0];
+            pfd.events = POLLIN;
+            if (poll(&pfd, 1, (int)(left * 1000)) <= 0) continue;
+        }
+        if (cap - len < 65536) {
+            cap = cap ? cap * 2 : 1 << 20;
+            out = realloc(out, cap);
+        }
+        n = read(fds[0], out + len, cap - len);
+        if (n > 0) { len += (size_t)n; continue; }
+        if (n < 0 && errno == EINTR) continue;
+        break;
+    }
+    close(fds[0]);
+    while (waitpid(pid, &status, 0) < 0 && errno == EINTR)
+        ;
+    if (timed_out) {
+        char msg[64];
+        snprintf(msg, sizeof(msg), "timed out after %us", timeout);
+        bj_error(job->id, msg);
+    } else if (WIFSIGNALED(status)) {
+        char msg[64];
+        snprintf(msg, sizeof(msg), "killed by signal %d", WTERMSIG(status));
+        bj_error(job->id, msg);
+    } else if (WEXITSTATUS(status) != 0) {
+        char msg[64];
+        snprintf(msg, sizeof(msg), "exit status %d", WEXITSTATUS(status));
+        bj_error(job->id, msg);
+    } else if (len == 0 || out[0] != '{') {
+        bj_error(job->id, "no session output");
+    } else {
+        /* The session JSON escapes control characters inside strings, so
+         * raw newlines (and the indentation after them) are layout only. */
+        size_t i;
+        printf("{\"id\": %s, \"ok\": true, \"session\": ", job->id);
+        for (i = 0; i < len; i++) {
+            if (out[i] != '\n') { putchar(out[i]); continue; }
+            while (i + 1 < len && out[i + 1] == ' ') i++;
+        }
+        fputs("}\n", stdout);
+    }
+    free(out);
+}
+
+static int batch_main(unsigned int timeout)
+{
+    char *line = NULL;
+    size_t cap = 0;
+    BatchJob job;
+    const char *err;
+
+    signal(SIGPIPE, SIG_IGN);
+    while (getline(&line, &cap, stdin) > 0) {
+        if (*bj_ws(line) == '\0') continue;
+        err = bj_parse(line, &job);
+        if (err) bj_error(job.id, err);
+        else batch_run_job(&job, timeout);
+        free(job.keys);
+        free(job.restore);
+        free(job.home);
+        fflush(stdout);
+    }
+    free(line);
+    return 0;
+}
+
 int main(int argc, char **argv)
 {
     unsigned int seed_val = 42;
     const char *keys = "";
     const char *outfile = NULL;
     const char *restore_file = NULL;
+    const char *home = NULL;
+    unsigned int timeout = 60;
+    int batch = 0;
     int i;
 
     /* Check env vars (as specified in design) */
@@ -275,13 +600,15 @@ int main(int argc, char **argv)
         char *h_keys = getenv("HARNESS_KEYS");
         char *h_out  = getenv("HARNESS_OUT");
         char *h_rest = getenv("HARNESS_RESTORE");
+        char *h_home = getenv("HARNESS_HOME");
         if (h_seed) seed_val = (unsigned int)atoi(h_seed);
         if (h_keys) keys = h_keys;
         if (h_out)  outfile = h_out;
         if (h_rest) restore_file = h_rest;
+        if (h_home) home = h_home;
     }
 
-    /* Also support command-line args: --seed N --keys "..." --out file --restore file */
+    /* Also support command-line args: --seed N --keys "..." --out file --restore file --home dir */
     for (i = 1; i < argc; i++) {
         if (strcmp(argv[i], "--seed") == 0 && i + 1 < argc)
             seed_val = (unsigned int)atoi(argv[++i]);
@@ -291,40 +618,20 @@ int main(int argc, char **argv)
             outfile = argv[++i];
         else if (strcmp(argv[i], "--restore") == 0 && i + 1 < argc)
             restore_file = argv[++i];
+        else if (strcmp(argv[i], "--home") == 0 && i + 1 < argc)
+            home = argv[++i];
         else if (strcmp(argv[i], "--wizard") == 0)
             wizard = 1;
+        else if (strcmp(argv[i], "--batch") == 0)
+            batch = 1;
+        else if (strcmp(argv[i], "--timeout") == 0 && i + 1 < argc)
+            timeout = (unsigned int)atoi(argv[++i]);
     }
 
-    harness_keys = keys;
-    harness_key_count = (int)strlen(keys);
-    harness_key_pos = 0;
-    harness_outfile = outfile;
-
-    g_harness_seed = seed_val;
+    if (batch)
+        return batch_main(timeout);
 
-    /* Set ROGUEOPTS and USER env to avoid interactive prompts */
-    setenv("ROGUEOPTS", "name=rogue,fruit=papaya", 1);
-    setenv("USER", "rogue", 1);
-    setenv("HOME", "/tmp", 1);
-
-    if (!restore_file) {
-        /* New game: set forced seed */
-        harness_set_forced_seed(seed_val);
-        /* Provide SEED env var so wizard mode seed works if needed */
-        char seedbuf[32];
-        snprintf(seedbuf, sizeof(seedbuf), "%u", seed_val);
-        setenv("SEED", seedbuf, 1);
-
-        char *game_argv[2] = { "rogue_harness", NULL };
-        game_main(1, game_argv, NULL);
-    } else {
-        /* Restore from save file: pass save file as argv[1] to trigger restore() */
-        /* Do NOT set forced seed — restore() loads the RNG state from the save */
-        char *game_argv[3] = { "rogue_harness", (char *)restore_file, NULL };
-        game_main(2, game_argv, NULL);
-    }
-
-    /* Should not reach here */
-    harness_exit(0);
+    harness_outfile = outfile;
+    run_game(seed_val, keys, restore_file, home);
     return 0;
 }
@@ -12,45 +12,25 @@ Sessions target:
 Each session is compared against the C harness for screen parity.
 """
 
-import subprocess
 import os
 import sys
 import json
 import argparse
 
+from run_session import HarnessError, run_sessions
+
 HERE     = os.path.dirname(os.path.abspath(__file__))
 HARNESS  = os.path.join(HERE, "rogue_harness")
-RUNNER   = os.path.join(HERE, "run_session.py")
 
 SESSIONS_DIR = os.path.normpath(os.path.join(HERE, "../../test/sessions"))
 
 
-def run_session(name, seed, keys, outfile, wizard=False, timeout=60):
-    """Run C harness, optionally inject wizard=true, save JSON."""
-    tmp = outfile + ".tmp"
-    cmd = [sys.executable, RUNNER,
-           "--seed", str(seed),
-           "--keys", keys,
-           "--out", tmp]
-    if wizard:
-        cmd.append("--wizard")
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
-    except subprocess.TimeoutExpired:
-        print(f"  TIMEOUT: {name}", flush=True)
-        return False
-
-    if not os.path.exists(tmp):
-        print(f"  FAILED (no output): {name}", flush=True)
-        if result.stderr:
-            print("  stderr:", result.stderr.decode(errors="replace")[:300])
+def save_session(name, data, outfile, wizard=False):
+    """Save one session JSON, with wizard=true added for wizard games."""
+    if isinstance(data, HarnessError):
+        print(f"  FAILED: {name} ({data})", flush=True)
         return False
 
-    with open(tmp) as f:
-        data = json.load(f)
-    os.unlink(tmp)
-
     if wizard:
         data["wizard"] = True
 
@@ -177,12 +157,15 @@ RING_EXTRA_SESSIONS = [
 ]
 
 
-def make_sessions(category_name, sessions):
+def make_sessions(category_name, sessions, workers=None):
     """sessions: list of (name, seed, wizard, keys)"""
     print(f"=== {category_name} ===")
-    for (name, seed, wizard, keys) in sessions:
+    jobs = [{"seed": seed, "keys": keys, "wizard": wizard}
+            for (name, seed, wizard, keys) in sessions]
+    results = run_sessions(jobs, HARNESS, workers=workers, timeout=60)
+    for (name, seed, wizard, keys), data in zip(sessions, results):
         fname = os.path.join(SESSIONS_DIR, f"cov_{name}.json")
-        run_session(name, seed, keys, fname, wizard=wizard)
+        save_session(name, data, fname, wizard=wizard)
 
 
 def main():
@@ -190,6 +173,8 @@ def main():
     p.add_argument("--category",
                    choices=["command", "call", "death", "wizard", "rings", "all"],
                    default="all")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="Batch harness processes (default: CPUs)")
     args = p.parse_args()
 
     os.makedirs(SESSIONS_DIR, exist_ok=True)
@@ -199,11 +184,11 @@ def main():
         sys.exit(1)
 
     cat = args.category
-    if cat in ("command", "all"): make_sessions("Command.js coverage", COMMAND_SESSIONS)
-    if cat in ("call",    "all"): make_sessions("call_item coverage",   CALL_ITEM_SESSIONS)
-    if cat in ("death",   "all"): make_sessions("rip.js coverage",      DEATH_SESSIONS)
-    if cat in ("wizard",  "all"): make_sessions("wizard.js coverage",   WIZARD_CMD_SESSIONS)
-    if cat in ("rings",   "all"): make_sessions("rings.js extra",       RING_EXTRA_SESSIONS)
+    if cat in ("command", "all"): make_sessions("Command.js coverage", COMMAND_SESSIONS, args.jobs)
+    if cat in ("call",    "all"): make_sessions("call_item coverage",   CALL_ITEM_SESSIONS, args.jobs)
+    if cat in ("death",   "all"): make_sessions("rip.js coverage",      DEATH_SESSIONS, args.jobs)
+    if cat in ("wizard",  "all"): make_sessions("wizard.js coverage",   WIZARD_CMD_SESSIONS, args.jobs)
+    if cat in ("rings",   "all"): make_sessions("rings.js extra",       RING_EXTRA_SESSIONS, args.jobs)
 
     print("Done.")
 
@@ -26,14 +26,15 @@ Keys:
   Q y      = quit
 
 Sequences are designed to explore broadly, find stairs, and descend.
+All sessions are played through the harness's batch mode (run_session.py).
 """
 
-import subprocess
 import os
 import sys
-import json
 import argparse
 
+from run_session import HarnessError, format_session, run_sessions
+
 HARNESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rogue_harness")
 SESSIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)),
                              "../../test/sessions")
@@ -171,22 +172,6 @@ SESSIONS = [
 ]
 
 
-def run_session(seed, keys, out_path, timeout=300):
-    env = os.environ.copy()
-    env["HARNESS_SEED"] = str(seed)
-    env["HARNESS_KEYS"] = keys
-    env["HARNESS_OUT"] = out_path
-    try:
-        result = subprocess.run([HARNESS], env=env, capture_output=True, timeout=timeout)
-    except subprocess.TimeoutExpired:
-        return None, "timeout"
-    if not os.path.exists(out_path):
-        return None, result.stderr.decode(errors="replace") or "harness failed (no output)"
-    with open(out_path) as f:
-        data = json.load(f)
-    return data, None
-
-
 def max_level(data):
     best = 1
     for step in data.get("steps", []):
@@ -202,15 +187,27 @@ def max_level(data):
 
 
 def main():
+    p = argparse.ArgumentParser(description="Generate long multi-level Rogue sessions")
+    p.add_argument("--jobs", type=int, default=None,
+                   help="Batch harness processes (default: CPUs)")
+    args = p.parse_args()
+
     os.makedirs(SESSIONS_DIR, exist_ok=True)
 
-    for seed, keys in SESSIONS:
-        out = os.path.join(SESSIONS_DIR, f"seed{seed}.json")
+    if not os.path.exists(HARNESS):
+        print(f"ERROR: harness not found at {HARNESS}", file=sys.stderr)
+        sys.exit(1)
+
+    jobs = [{"seed": seed, "keys": keys} for seed, keys in SESSIONS]
+    results = run_sessions(jobs, HARNESS, workers=args.jobs, timeout=300)
+    for (seed, keys), data in zip(SESSIONS, results):
         print(f"Generating seed{seed} ({len(keys)} keys)...", end=" ", flush=True)
-        data, err = run_session(seed, keys, out)
-        if err:
-            print(f"ERROR: {err}")
+        if isinstance(data, HarnessError):
+            print(f"ERROR: {data}")
             continue
+        out = os.path.join(SESSIONS_DIR, f"seed{seed}.json")
+        with open(out, "w") as f:
+            f.write(format_session(data))
         steps = len(data.get("steps", []))
         lv = max_level(data)
         print(f"{steps} steps, max level {lv}")
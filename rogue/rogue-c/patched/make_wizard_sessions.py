@@ -24,47 +24,27 @@ Sessions are saved to rogue/test/sessions/ with names wizard_<category>_<N>_<nam
 Each session JSON has "wizard": true so replay_test.mjs enables g.wizard=true.
 """
 
-import subprocess
 import os
 import sys
 import json
 import argparse
 
+from run_session import HarnessError, run_sessions
+
 HERE    = os.path.dirname(os.path.abspath(__file__))
 HARNESS = os.path.join(HERE, "rogue_harness")
-RUNNER  = os.path.join(HERE, "run_session.py")
 
 SESSIONS_DIR = os.path.normpath(os.path.join(HERE, "../../test/sessions"))
 
 SEED = 42
 
 
-def run_session(name, seed, keys, outfile, wizard=True, timeout=30):
-    """Run the C harness and save session JSON with wizard=true added."""
-    tmp = outfile + ".tmp"
-    cmd = [sys.executable, RUNNER,
-           "--seed", str(seed),
-           "--keys", keys,
-           "--out", tmp]
-    if wizard:
-        cmd.append("--wizard")
-
-    try:
-        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
-    except subprocess.TimeoutExpired:
-        print(f"  TIMEOUT: {name}", flush=True)
-        return False
-
-    if not os.path.exists(tmp):
-        print(f"  FAILED (no output): {name}", flush=True)
-        if result.stderr:
-            print("  stderr:", result.stderr.decode(errors="replace")[:200])
+def save_session(name, data, outfile, wizard=True):
+    """Save one session JSON, with wizard=true added for wizard games."""
+    if isinstance(data, HarnessError):
+        print(f"  FAILED: {name} ({data})", flush=True)
         return False
 
-    with open(tmp) as f:
-        data = json.load(f)
-    os.unlink(tmp)
-
     if wizard:
         data["wizard"] = True
 
@@ -210,11 +190,13 @@ STICK_SESSIONS = [
 ]
 
 
-def make_sessions(category_name, sessions_list, prefix, seed):
+def make_sessions(category_name, sessions_list, prefix, seed, workers=None):
     print(f"=== {category_name} ===")
-    for (which, name, keys) in sessions_list:
+    jobs = [{"seed": seed, "keys": keys, "wizard": True} for (which, name, keys) in sessions_list]
+    results = run_sessions(jobs, HARNESS, workers=workers, timeout=30)
+    for (which, name, keys), data in zip(sessions_list, results):
         fname = os.path.join(SESSIONS_DIR, f"wizard_{prefix}_{which:02d}_{name}.json")
-        run_session(f"{prefix}_{which:02d}_{name}", seed, keys, fname)
+        save_session(f"{prefix}_{which:02d}_{name}", data, fname)
 
 
 def main():
@@ -223,6 +205,8 @@ def main():
                    choices=["potions","scrolls","weapons","armor","rings","sticks","all"],
                    default="all")
     p.add_argument("--seed", type=int, default=SEED)
+    p.add_argument("--jobs", type=int, default=None,
+                   help="Batch harness processes (default: CPUs)")
     args = p.parse_args()
 
     seed = args.seed
@@ -234,12 +218,12 @@ def main():
         sys.exit(1)
 
     cat = args.category
-    if cat in ("potions", "all"):  make_sessions("Potions", POTION_SESSIONS, "potion", seed)
-    if cat in ("scrolls", "all"):  make_sessions("Scrolls", SCROLL_SESSIONS, "scroll", seed)
-    if cat in ("weapons", "all"):  make_sessions("Weapons", WEAPON_SESSIONS, "weapon", seed)
-    if cat in ("armor",   "all"):  make_sessions("Armor",   ARMOR_SESSIONS,  "armor",  seed)
-    if cat in ("rings",   "all"):  make_sessions("Rings",   RING_SESSIONS,   "ring",   seed)
-    if cat in ("sticks",  "all"):  make_sessions("Sticks",  STICK_SESSIONS,  "stick",  seed)
+    if cat in ("potions", "all"):  make_sessions("Potions", POTION_SESSIONS, "potion", seed, args.jobs)
+    if cat in ("scrolls", "all"):  make_sessions("Scrolls", SCROLL_SESSIONS, "scroll", seed, args.jobs)
+    if cat in ("weapons", "all"):  make_sessions("Weapons", WEAPON_SESSIONS, "weapon", seed, args.jobs)
+    if cat in ("armor",   "all"):  make_sessions("Armor",   ARMOR_SESSIONS,  "armor",  seed, args.jobs)
+    if cat in ("rings",   "all"):  make_sessions("Rings",   RING_SESSIONS,   "ring",   seed, args.jobs)
+    if cat in ("sticks",  "all"):  make_sessions("Sticks",  STICK_SESSIONS,  "stick",  seed, args.jobs)
 
     print("Done.")
 
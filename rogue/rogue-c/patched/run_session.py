@@ -7,9 +7,19 @@ Usage (single game):
 
 Usage (multigame — records save/restore across multiple games):
     python3 run_session.py --multigame input.json --out output.json
+    python3 run_session.py --multigame a.json b.json --out outdir/ --jobs 4
+
+Usage (batch — one result record per job line):
+    python3 run_session.py --batch jobs.jsonl --jobs 4 --out results.jsonl
 
 Runs rogue_harness with the given seed and keystroke sequence,
 producing a JSON session file.
+
+Batch mode: `rogue_harness --batch` plays one job per stdin line and
+answers each with one JSON line on stdout (see harness_main.c).
+HarnessBatch drives one such process; run_sessions() spreads many jobs
+over several of them, so bulk generation pays no per-session process
+start or temp-file round trip.
 """
 
 import subprocess
@@ -17,10 +27,20 @@ import os
 import sys
 import argparse
 import json
+import shutil
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+HARNESS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rogue_harness")
 
 
-def run_harness(harness, seed, keys, outfile, wizard=False, restore_file=None, timeout=30.0):
+class HarnessError(RuntimeError):
+    """A batch job failed (bad job, crash, timeout or harness exit)."""
+
+
+def run_harness(harness, seed, keys, outfile, wizard=False, restore_file=None, timeout=30.0,
+                home=None):
     """Run the harness binary once and return the JSON output."""
     env = os.environ.copy()
     env["HARNESS_SEED"] = str(seed)
@@ -28,6 +48,8 @@ def run_harness(harness, seed, keys, outfile, wizard=False, restore_file=None, t
     env["HARNESS_OUT"] = outfile
     if restore_file:
         env["HARNESS_RESTORE"] = restore_file
+    if home:
+        env["HARNESS_HOME"] = home
 
     cmd = [harness]
     if wizard:
@@ -53,6 +75,160 @@ def run_harness(harness, seed, keys, outfile, wizard=False, restore_file=None, t
         return None
 
 
+class HarnessBatch:
+    """One `rogue_harness --batch` process; run() plays a job and returns its session."""
+
+    def __init__(self, harness=HARNESS, timeout=30.0):
+        self.harness = harness
+        self.proc = subprocess.Popen(
+            [harness, "--batch", "--timeout", str(max(1, int(timeout)))],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            bufsize=1,
+        )
+        self._next_id = 0
+
+    def run(self, seed, keys, wizard=False, restore=None, home=None, **fields):
+        self._next_id += 1
+        job = {"id": self._next_id, "seed": seed, "keys": keys,
+               "wizard": bool(wizard), "restore": restore, "home": home, **fields}
+        try:
+            self.proc.stdin.write(json.dumps(job) + "\n")
+            self.proc.stdin.flush()
+            line = self.proc.stdout.readline()
+        except (BrokenPipeError, OSError) as err:
+            raise HarnessError(f"{self.harness} --batch exited: {err}") from err
+        if not line:
+            raise HarnessError(f"{self.harness} --batch exited (rebuild it: make)")
+        try:
+            record = json.loads(line)
+        except ValueError:
+            raise HarnessError(f"{self.harness} does not speak --batch (rebuild it: make)") from None
+        if record.get("id") != job["id"]:
+            raise HarnessError(f"batch reply for job {record.get('id')}, expected {job['id']}")
+        if not record.get("ok"):
+            raise HarnessError(f"seed {seed}: {record.get('error')}")
+        return record["session"]
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            self.proc.wait()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_sessions(jobs, harness=HARNESS, workers=None, timeout=30.0):
+    """Play job dicts ({"seed", "keys", "wizard"}) on `workers` batch processes.
+
+    Yields one result per job, in job order: the session dict, or the
+    HarnessError that job raised.
+    """
+    local = threading.local()
+    batches = []
+
+    def play(job):
+        batch = getattr(local, "batch", None)
+        if batch is None:
+            batch = local.batch = HarnessBatch(harness, timeout)
+            batches.append(batch)
+        try:
+            return batch.run(**job)
+        except HarnessError as err:
+            if batch.proc.poll() is not None:
+                local.batch = None
+            return err
+
+    pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+    try:
+        yield from pool.map(play, jobs)
+    finally:
+        pool.shutdown(cancel_futures=True)
+        for batch in batches:
+            batch.close()
+
+
+def _c_string(text):
+    """A JSON string escaped as harness_main.c's json_escape_str() does."""
+    out = []
+    for ch in text:
+        if ch == '"':
+            out.append('\\"')
+        elif ch == '\\':
+            out.append('\\\\')
+        elif ch == '\n':
+            out.append('\\n')
+        elif ch == '\r':
+            out.append('\\r')
+        elif ord(ch) < 0x20 or ord(ch) > 0x7e:
+            out.append(f"\\u{ord(ch):04x}")
+        else:
+            out.append(ch)
+    return '"' + "".join(out) + '"'
+
+
+def format_session(data):
+    """Serialize a session in the harness's --out layout (emit_session_json).
+
+    Batch replies arrive as parsed JSON; this writes them back byte for
+    byte as a direct harness run would have, so checked-in sessions keep
+    their layout whichever way they were recorded.
+    """
+    lines = ["{", f'  "seed": {data["seed"]},']
+    if data.get("wizard"):
+        lines.append('  "wizard": true,')
+    lines.append('  "steps": [')
+    steps = data.get("steps", [])
+    for i, step in enumerate(steps):
+        key = step["key"]
+        # Keys are escaped by hand in the harness: any non-printable key,
+        # newline included, is written as \uXXXX.
+        key_json = _c_string(key) if " " <= key <= "~" else f'"\\u{ord(key):04x}"'
+        rng = ",".join(_c_string(v) if isinstance(v, str) else str(v) for v in step["rng"])
+        lines.append("    {")
+        lines.append(f'      "key": {key_json},')
+        lines.append(f'      "cursor": [{step["cursor"][0]},{step["cursor"][1]}],')
+        lines.append(f'      "rng": [{rng}],')
+        lines.append('      "screen": [')
+        rows = step["screen"]
+        for r, row in enumerate(rows):
+            lines.append("        " + _c_string(row) + ("," if r < len(rows) - 1 else ""))
+        screen_end = "      ]"
+        if step.get("standout"):
+            ranges = ",".join(f"[{r},{start},{end}]" for r, start, end in step["standout"])
+            screen_end += f',\n      "standout": [{ranges}]'
+        lines.append(screen_end)
+        lines.append("    }" + ("," if i < len(steps) - 1 else ""))
+    lines.append("  ]")
+    lines.append("}")
+    return "\n".join(lines) + "\n"
+
+
+def run_batch_file(jobs_path, out, harness, workers, timeout):
+    """--batch: jobs JSONL in, one result record per job out (in order)."""
+    with open(jobs_path) as f:
+        jobs = [json.loads(line) for line in f if line.strip()]
+    failed = 0
+    plays = [{k: v for k, v in job.items() if k != "id"} for job in jobs]
+    for job, result in zip(jobs, run_sessions(plays, harness, workers, timeout)):
+        if isinstance(result, HarnessError):
+            record = {"id": job.get("id"), "ok": False, "error": str(result)}
+            failed += 1
+        else:
+            record = {"id": job.get("id"), "ok": True, "session": result}
+        out.write(json.dumps(record) + "\n")
+    return failed
+
+
 def run_single(args, harness):
     """Run a single-game session."""
     data = run_harness(harness, args.seed, args.keys, args.out,
@@ -65,54 +241,54 @@ def run_single(args, harness):
     print(f"OK: seed={seed_out} steps={n_steps}")
 
 
-def run_multigame(args, harness):
-    """Run a multigame session: multiple games sharing save state."""
-    with open(args.multigame) as f:
+def record_multigame(session_path, out_path, harness=HARNESS, timeout=30.0):
+    """Record one multigame session: its games share one save file.
+
+    The save chain runs in a scratch HOME of its own (the game saves to
+    $HOME/rogue.save), so several recordings can run at once.  Returns
+    (ok, progress lines).
+    """
+    with open(session_path) as f:
         session = json.load(f)
 
     games = session.get("games", [])
     if not games:
-        print("ERROR: no games in multigame session", file=sys.stderr)
-        sys.exit(1)
-
-    # Save file location — game writes to $HOME/rogue.save
-    save_file = "/tmp/rogue.save"
-    # Clean up any stale save
-    if os.path.exists(save_file):
-        os.remove(save_file)
+        return False, [f"ERROR: no games in multigame session {session_path}"]
 
+    lines = []
     all_game_data = []
     seed = session.get("seed", games[0].get("seed", 42))
     wizard = session.get("wizard", False)
 
-    for gi, game in enumerate(games):
-        game_seed = game.get("seed", seed)
-        game_wizard = game.get("wizard", wizard)
-        game_keys = "".join(s.get("key", "") for s in game.get("steps", []))
-        is_restore = gi > 0 or game.get("restore", False)
+    home = tempfile.mkdtemp(prefix="rogue-home-")
+    save_file = os.path.join(home, "rogue.save")
+    try:
+        # One batch process plays the games in order; each restore job
+        # reads the save the previous game left behind.
+        with HarnessBatch(harness, timeout) as batch:
+            for gi, game in enumerate(games):
+                game_seed = game.get("seed", seed)
+                game_wizard = game.get("wizard", wizard)
+                game_keys = "".join(s.get("key", "") for s in game.get("steps", []))
+                is_restore = gi > 0 or game.get("restore", False)
 
-        # Temp output for this game
-        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tf:
-            game_outfile = tf.name
+                try:
+                    data = batch.run(
+                        game_seed, game_keys,
+                        wizard=game_wizard,
+                        restore=save_file if is_restore else None,
+                        home=home,
+                    )
+                except HarnessError as err:
+                    lines.append(f"ERROR: game {gi} failed: {err}")
+                    return False, lines
 
-        try:
-            data = run_harness(
-                harness, game_seed, game_keys, game_outfile,
-                wizard=game_wizard,
-                restore_file=save_file if is_restore else None,
-                timeout=args.timeout,
-            )
-            if data is None:
-                print(f"ERROR: game {gi} failed", file=sys.stderr)
-                sys.exit(1)
-
-            all_game_data.append(data)
-            n_steps = len(data.get("steps", []))
-            print(f"Game {gi}: seed={game_seed} steps={n_steps}"
-                  f"{' (restored)' if is_restore else ''}")
-        finally:
-            if os.path.exists(game_outfile):
-                os.remove(game_outfile)
+                all_game_data.append(data)
+                n_steps = len(data.get("steps", []))
+                lines.append(f"Game {gi}: seed={game_seed} steps={n_steps}"
+                             f"{' (restored)' if is_restore else ''}")
+    finally:
+        shutil.rmtree(home, ignore_errors=True)
 
     # Build combined output
     output = {
@@ -130,11 +306,49 @@ def run_multigame(args, harness):
             entry["restore"] = True
         output["games"].append(entry)
 
-    with open(args.out, "w") as f:
+    with open(out_path, "w") as f:
         json.dump(output, f)
 
     total = sum(len(g.get("steps", [])) for g in output["games"])
-    print(f"OK: {len(games)} games, {total} total steps → {args.out}")
+    lines.append(f"OK: {len(games)} games, {total} total steps → {out_path}")
+    return True, lines
+
+
+def run_multigame(args, harness):
+    """Record multigame sessions; several inputs are recorded in a process pool.
+
+    With one input, --out is the output file; with several it is a
+    directory that gets one file per input, named like the input, so
+    inputs must have distinct basenames.
+    """
+    inputs = args.multigame
+    if len(inputs) == 1:
+        outputs = [args.out]
+    else:
+        names = [os.path.basename(path) for path in inputs]
+        clashes = sorted({name for name in names if names.count(name) > 1})
+        if clashes:
+            print(f"ERROR: multigame inputs would share output files in {args.out}: "
+                  f"{', '.join(clashes)}", file=sys.stderr)
+            sys.exit(1)
+        os.makedirs(args.out, exist_ok=True)
+        outputs = [os.path.join(args.out, os.path.basename(path)) for path in inputs]
+
+    if len(inputs) == 1:
+        results = [record_multigame(inputs[0], outputs[0], harness, args.timeout)]
+    else:
+        with ProcessPoolExecutor(max_workers=args.jobs or os.cpu_count() or 1) as pool:
+            results = list(pool.map(record_multigame, inputs, outputs,
+                                    [harness] * len(inputs), [args.timeout] * len(inputs)))
+    failed = 0
+    for path, (ok, lines) in zip(inputs, results):
+        if len(inputs) > 1:
+            print(f"== {path}")
+        for line in lines:
+            print(line, file=sys.stdout if ok else sys.stderr)
+        failed += not ok
+    if failed:
+        sys.exit(1)
 
 
 def main():
@@ -143,19 +357,33 @@ def main():
     )
     p.add_argument("--seed", type=int, help="RNG seed")
     p.add_argument("--keys", type=str, help="Keystroke sequence")
-    p.add_argument("--out", type=str, required=True, help="Output JSON file path")
+    p.add_argument("--out", type=str, required=True,
+                   help="Output JSON file path (--batch: result JSONL path, - for stdout; "
+                        "several --multigame inputs: output directory)")
     p.add_argument("--timeout", type=float, default=30.0, help="Timeout in seconds")
     p.add_argument("--wizard", action="store_true", help="Enable wizard mode")
-    p.add_argument("--multigame", type=str, help="Multigame session JSON input file")
+    p.add_argument("--multigame", type=str, nargs="+",
+                   help="Multigame session JSON input file(s); several are recorded in parallel")
+    p.add_argument("--batch", type=str, metavar="JOBS_JSONL",
+                   help='Run {"id", "seed", "keys", "wizard"} jobs, one result line each')
+    p.add_argument("--jobs", type=int, default=None,
+                   help="Batch harness processes / multigame workers (default: CPUs)")
     args = p.parse_args()
 
-    harness = os.path.join(os.path.dirname(os.path.abspath(__file__)), "rogue_harness")
+    harness = HARNESS
     if not os.path.exists(harness):
         print(f"ERROR: harness binary not found at {harness}", file=sys.stderr)
         print("Run 'make' in the patched directory first.", file=sys.stderr)
         sys.exit(1)
 
-    if args.multigame:
+    if args.batch:
+        if args.out == "-":
+            failed = run_batch_file(args.batch, sys.stdout, harness, args.jobs, args.timeout)
+        else:
+            with open(args.out, "w") as out:
+                failed = run_batch_file(args.batch, out, harness, args.jobs, args.timeout)
+        sys.exit(1 if failed else 0)
+    elif args.multigame:
         run_multigame(args, harness)
     else:
         if args.seed is None or args.keys is None:
@@ -16,6 +16,9 @@ PROJECT_ROOT = Path(__file__).parent.parent
 MAPS_DIR = PROJECT_ROOT / 'test' / 'comparison' / 'maps'
 LEVELTRACE_DIR = PROJECT_ROOT / 'leveltrace'
 
+sys.path.insert(0, str(PROJECT_ROOT / 'test' / 'comparison' / 'c-harness'))
+from session_stream import SessionStream
+
 def extract_leveltraces():
     """Extract individual levels from grouped trace files."""
     LEVELTRACE_DIR.mkdir(exist_ok=True)
@@ -25,15 +28,24 @@ def extract_leveltraces():
 
     extracted_count = 0
     level_inventory = {}
+    skipped = []
 
     for session_file in session_files:
         print(f"Processing {session_file.name}...")
 
-        with open(session_file) as f:
-            session = json.load(f)
+        # Only the top-level keys are needed; the step lines are skipped.
+        with SessionStream(session_file) as stream:
+            session = stream.header(('seed', 'group', 'levels'))
 
         seed = session['seed']
+        # Per-step map sessions carry no grouped 'levels' list; only the
+        # older grouped traces (which always name their group) extract.
+        if 'levels' not in session:
+            print("  No grouped levels; skipped")
+            skipped.append(session_file.name)
+            continue
         group = session['group']
+        print(f"  Group {group}: {len(session['levels'])} level(s)")
 
         # Extract each level from the session
         for level_data in session['levels']:
@@ -74,6 +86,7 @@ def extract_leveltraces():
 
     print(f"\n=== Extraction Summary ===")
     print(f"Total levels extracted: {extracted_count}")
+    print(f"Sessions skipped (no grouped levels): {len(skipped)}")
     print(f"Unique level names: {len(level_inventory)}")
     print(f"\nLevel inventory (seeds per level):")
     for level_name in sorted(level_inventory.keys()):
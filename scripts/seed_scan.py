@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+seed_scan.py — scan game seeds for a condition, in parallel, straight from the C harnesses.
+
+Usage:
+  python3 scripts/seed_scan.py --game hack --where 'near(E, 1)'
+  python3 scripts/seed_scan.py --game hack --keys 'jjjjhhjjjjl>h' \\
+      --where 'near("ERN", 4) and not screen("You die")' --limit 5
+  python3 scripts/seed_scan.py --game rogue --where 'row(0, "Hungry") or rng(2000)'
+  python3 scripts/seed_scan.py --game nethack --keys ':' --where 'typ(17, 1)' --jobs 4
+
+Each seed is one harness run inside a pool worker; no Python interpreter
+or temp JSON file per seed:
+  hack     hack/hack-c/patched/hack_harness --seed N --keys K  (JSON on stdout)
+  rogue    rogue/rogue-c/patched/rogue_harness --seed N --keys K  (JSON on stdout)
+  nethack  test/comparison/c-harness/run_session.py's recorder, called in
+           the worker with a private install sandbox (tmux-driven, so
+           seconds per seed rather than milliseconds)
+
+Conditions (--where) are predicates over the run's final screen, its RNG
+trace and (NetHack) its last typGrid, combined with and / or / not and
+parentheses:
+  near(LETTERS, DIST=4)  a LETTERS glyph within DIST (Chebyshev) of '@'
+  screen(REGEX)          the final screen (rows joined by newlines) matches
+  row(N, REGEX)          final screen row N matches
+  rng(MIN, MAX=inf)      the run made MIN..MAX RNG calls
+  event(REGEX)           an RNG-trace ^event matches
+  typ(TYP, MIN=1)        at least MIN typGrid cells of terrain TYP (0-61)
+Arguments are numbers, "quoted strings" or bare words (near(E, 2)).
+
+Seeds are handed out in order and results are printed in seed order as
+they arrive; the scan stops as soon as --limit seeds have matched, so the
+matches are the same as a serial scan's.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import math
+import multiprocessing
+import os
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+HACK_HARNESS = os.path.join(PROJECT_ROOT, 'hack', 'hack-c', 'patched', 'hack_harness')
+ROGUE_HARNESS = os.path.join(PROJECT_ROOT, 'rogue', 'rogue-c', 'patched', 'rogue_harness')
+NETHACK_HARNESS_DIR = os.path.join(PROJECT_ROOT, 'test', 'comparison', 'c-harness')
+GAMES = ('hack', 'rogue', 'nethack')
+
+
+# ---------------------------------------------------------------------------
+# Runs
+# ---------------------------------------------------------------------------
+
+class Run:
+    """What a predicate sees of one seed: final screen, cursor, RNG trace, typGrid."""
+
+    __slots__ = ('seed', 'screen', 'cursor', 'rng', 'events', 'typ_grid')
+
+    def __init__(self, seed, screen, cursor=None, rng=(), events=(), typ_grid=None):
+        self.seed = seed
+        self.screen = screen
+        self.cursor = cursor
+        self.rng = rng
+        self.events = events
+        self.typ_grid = typ_grid
+
+    def player(self):
+        """Position (x, y) of '@' on the final screen, or None."""
+        for r, row in enumerate(self.screen):
+            c = row.find('@')
+            if c >= 0:
+                return (c, r)
+        return None
+
+
+def _split_trace(steps):
+    rng = []
+    events = []
+    for step in steps:
+        for entry in step.get('rng') or ():
+            if isinstance(entry, str) and entry.startswith('^'):
+                events.append(entry[1:])
+            else:
+                rng.append(entry)
+    return rng, events
+
+
+def _typ_from_char(ch):
+    if ch.isdigit():
+        return int(ch)
+    if 'a' <= ch <= 'z':
+        return ord(ch) - ord('a') + 10
+    if 'A' <= ch <= 'Z':
+        return ord(ch) - ord('A') + 36
+    return -1
+
+
+def decode_typgrid(grid_str, row_width=80):
+    """Rows of terrain numbers from run_session.py's typGrid RLE."""
+    rows = []
+    for row_str in grid_str.split('|'):
+        row = []
+        for seg in row_str.split(',') if row_str else ():
+            count, _, ch = seg.rpartition(':')
+            row.extend([_typ_from_char(ch)] * (int(count) if count else 1))
+        row.extend([0] * (row_width - len(row)))
+        rows.append(row)
+    return rows
+
+
+def run_from_session(seed, data, screen_lines=None):
+    """Run from a harness session JSON ({"steps": [...]})."""
+    steps = data.get('steps') or []
+    if not steps:
+        return None
+    last = steps[-1]
+    screen = screen_lines(last['screen']) if screen_lines else last['screen']
+    rng, events = _split_trace(steps)
+    grid = next((s['typGrid'] for s in reversed(steps) if s.get('typGrid')), None)
+    return Run(seed, screen, last.get('cursor'), rng, events,
+               decode_typgrid(grid) if grid else None)
+
+
+def _run_binary(cmd, seed, timeout):
+    try:
+        result = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    except (subprocess.TimeoutExpired, OSError):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+    try:
+        return run_from_session(seed, json.loads(result.stdout))
+    except ValueError:
+        return None
+
+
+class HackEngine:
+    def __init__(self, harness=None, timeout=10):
+        self.harness = harness or HACK_HARNESS
+        self.timeout = timeout
+
+    def run(self, seed, keys):
+        return _run_binary([self.harness, '--seed', str(seed), '--keys', keys], seed, self.timeout)
+
+
+class RogueEngine:
+    def __init__(self, harness=None, timeout=10, wizard=False):
+        self.harness = harness or ROGUE_HARNESS
+        self.timeout = timeout
+        self.wizard = wizard
+
+    def run(self, seed, keys):
+        cmd = [self.harness, '--seed', str(seed), '--keys', keys]
+        if self.wizard:
+            cmd.append('--wizard')
+        return _run_binary(cmd, seed, self.timeout)
+
+
+class NetHackEngine:
+    """The tmux recorder from run_session.py, in this process.
+
+    Each worker records into its own install sandbox (as run_session.py
+    --parallel does) and overwrites one scratch session file, both in a
+    private directory under scratch_root that close() removes.
+    """
+
+    def __init__(self, scratch_root=None):
+        if NETHACK_HARNESS_DIR not in sys.path:
+            sys.path.insert(0, NETHACK_HARNESS_DIR)
+        import run_session
+        from screen_delta import load_session
+        self.rs = run_session
+        self.load_session = load_session
+        self.scratch = tempfile.mkdtemp(prefix='seed-scan-', dir=scratch_root)
+        run_session.use_install_sandbox(
+            *run_session.make_install_sandbox(os.path.join(self.scratch, 'sandbox')))
+        self.out = os.path.join(self.scratch, 'session.json')
+
+    def run(self, seed, keys):
+        # run_session() writes the session file and returns nothing; clear
+        # the previous seed's file so a failed run cannot be read back.
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.out)
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                self.rs.run_session(seed, self.out, keys)
+            data = self.load_session(self.out)
+        except (Exception, SystemExit):
+            return None
+        return run_from_session(seed, data, self.rs.screen_to_plain_lines)
+
+    def close(self):
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+
+def check_harness(game, harness=None):
+    """Raise FileNotFoundError (with a build hint) if the game's harness is missing."""
+    if game == 'nethack':
+        return
+    path = harness or (HACK_HARNESS if game == 'hack' else ROGUE_HARNESS)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f'Harness not found: {path} (build it first: cd {os.path.dirname(path)} && make)')
+
+
+def make_engine(game, harness=None, timeout=10, scratch_root=None):
+    if game == 'hack':
+        return HackEngine(harness, timeout)
+    if game == 'rogue':
+        return RogueEngine(harness, timeout)
+    if game == 'nethack':
+        return NetHackEngine(scratch_root)
+    raise ValueError(f'unknown game {game!r}')
+
+
+# ---------------------------------------------------------------------------
+# Predicates
+# ---------------------------------------------------------------------------
+#
+# A predicate is a callable Run -> list of hits (dicts); an empty list is
+# "no match".  Hits are what gets reported, e.g. each monster near '@'.
+
+def near(letters, dist=4):
+    letters = set(str(letters))
+
+    def pred(run):
+        player = run.player()
+        if not player:
+            return []
+        px, py = player
+        hits = []
+        for r, row in enumerate(run.screen):
+            for c, ch in enumerate(row):
+                if ch in letters:
+                    d = max(abs(c - px), abs(r - py))
+                    if d <= dist:
+                        hits.append({'mlet': ch, 'x': c, 'y': r, 'dist': d})
+        return hits
+    return pred
+
+
+def screen(regex):
+    pattern = re.compile(str(regex))
+
+    def pred(run):
+        m = pattern.search('\n'.join(run.screen))
+        return [{'screen': m.group(0)}] if m else []
+    return pred
+
+
+def row(n, regex):
+    pattern = re.compile(str(regex))
+
+    def pred(run):
+        if not 0 <= n < len(run.screen):
+            return []
+        m = pattern.search(run.screen[n])
+        return [{'row': n, 'text': m.group(0)}] if m else []
+    return pred
+
+
+def rng(lo, hi=math.inf):
+    def pred(run):
+        n = len(run.rng)
+        return [{'rng_calls': n}] if lo <= n <= hi else []
+    return pred
+
+
+def event(regex):
+    pattern = re.compile(str(regex))
+
+    def pred(run):
+        return [{'event': e} for e in run.events if pattern.search(e)][:1]
+    return pred
+
+
+def typ(value, minimum=1):
+    value = int(value)
+
+    def pred(run):
+        if run.typ_grid is None:
+            return []
+        n = sum(row.count(value) for row in run.typ_grid)
+        return [{'typ': value, 'cells': n}] if n >= minimum else []
+    return pred
+
+
+def all_of(*preds):
+    def pred(run):
+        hits = []
+        for p in preds:
+            h = p(run)
+            if not h:
+                return []
+            hits.extend(h)
+        return hits
+    return pred
+
+
+def any_of(*preds):
+    def pred(run):
+        hits = []
+        for p in preds:
+            hits.extend(p(run))
+        return hits
+    return pred
+
+
+def negate(p):
+    def pred(run):
+        return [] if p(run) else [{}]
+    return pred
+
+
+PREDICATES = {
+    'near': near,
+    'screen': screen,
+    'row': row,
+    'rng': rng,
+    'event': event,
+    'typ': typ,
+}
+
+_TOKEN_RE = re.compile(r'''\s*(?:(?P<punct>[(),])|(?P<str>"(?:[^"\\]|\\.)*"|'[^']*')|(?P<num>-?\d+)|(?P<word>[^\s(),"']+))''')
+
+
+def _tokenize(text):
+    tokens = []
+    pos = 0
+    text = text.rstrip()
+    while pos < len(text):
+        m = _TOKEN_RE.match(text, pos)
+        if not m:
+            raise ValueError(f'cannot parse condition at: {text[pos:]!r}')
+        pos = m.end()
+        kind = m.lastgroup
+        value = m.group(kind)
+        if kind == 'str':
+            value = json.loads(value) if value[0] == '"' else value[1:-1]
+        elif kind == 'num':
+            value = int(value)
+        tokens.append((kind, value))
+    return tokens
+
+
+def parse_condition(text):
+    """Compile a --where expression into a predicate."""
+    tokens = _tokenize(text)
+    pos = 0
+
+    def peek(kind=None, value=None):
+        if pos >= len(tokens):
+            return False
+        k, v = tokens[pos]
+        return (kind is None or k == kind) and (value is None or v == value)
+
+    def take(kind=None, value=None):
+        nonlocal pos
+        if not peek(kind, value):
+            found = tokens[pos][1] if pos < len(tokens) else 'end of condition'
+            raise ValueError(f'expected {value!r} in condition, found {found!r}' if value
+                             else f'expected a {kind} in condition, found {found!r}')
+        pos += 1
+        return tokens[pos - 1][1]
+
+    def parse_or():
+        terms = [parse_and()]
+        while peek('word', 'or'):
+            take()
+            terms.append(parse_and())
+        return terms[0] if len(terms) == 1 else any_of(*terms)
+
+    def parse_and():
+        terms = [parse_not()]
+        while peek('word', 'and'):
+            take()
+            terms.append(parse_not())
+        return terms[0] if len(terms) == 1 else all_of(*terms)
+
+    def parse_not():
+        if peek('word', 'not'):
+            take()
+            return negate(parse_not())
+        if peek('punct', '('):
+            take()
+            inner = parse_or()
+            take('punct', ')')
+            return inner
+        name = take('word')
+        if name not in PREDICATES:
+            raise ValueError(f'unknown predicate {name!r} (known: {", ".join(PREDICATES)})')
+        take('punct', '(')
+        args = []
+        while not peek('punct', ')'):
+            args.append(take())
+            if not peek('punct', ')'):
+                take('punct', ',')
+        take('punct', ')')
+        return PREDICATES[name](*args)
+
+    result = parse_or()
+    if pos != len(tokens):
+        raise ValueError(f'unexpected {tokens[pos][1]!r} in condition')
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Scanning
+# ---------------------------------------------------------------------------
+
+_worker = {}
+
+
+def _init_worker(game, harness, timeout, keys, condition, scratch_root=None):
+    _worker['engine'] = make_engine(game, harness, timeout, scratch_root)
+    _worker['keys'] = keys
+    _worker['pred'] = parse_condition(condition)
+
+
+def _scan_one(seed):
+    run = _worker['engine'].run(seed, _worker['keys'])
+    if run is None:
+        return seed, None
+    return seed, _worker['pred'](run)
+
+
+def scan(game, keys, condition, seeds, jobs=1, limit=None, harness=None, timeout=10):
+    """Yield (seed, hits) for matching seeds in seed order, up to `limit` of them.
+
+    hits is the predicate's hit list; seeds whose run failed are skipped.
+    """
+    parse_condition(condition)  # fail fast on a bad expression
+    check_harness(game, harness)
+    # NetHack workers keep sandboxes and session files under one root,
+    # removed here even when the pool's workers are terminated.
+    scratch_root = tempfile.mkdtemp(prefix='seed-scan-') if game == 'nethack' else None
+    initargs = (game, harness, timeout, keys, condition, scratch_root)
+    found = 0
+    if jobs <= 1:
+        _init_worker(*initargs)
+        results = map(_scan_one, seeds)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(jobs, initializer=_init_worker, initargs=initargs)
+        results = pool.imap(_scan_one, seeds, chunksize=4 if game == 'nethack' else 32)
+    try:
+        for seed, hits in results:
+            if hits:
+                yield seed, hits
+                found += 1
+                if limit and found >= limit:
+                    break
+    finally:
+        if pool is not None:
+            pool.terminate()
+            pool.join()
+        if scratch_root is not None:
+            shutil.rmtree(scratch_root, ignore_errors=True)
+
+
+def format_hit(seed, hit):
+    if 'mlet' in hit:
+        return f"seed={seed:6d}  mlet={hit['mlet']}  pos=({hit['x']:2d},{hit['y']:2d})  dist={hit['dist']}"
+    return '  '.join([f'seed={seed:6d}'] + [f'{k}={v}' for k, v in hit.items()])
+
+
+def main():
+    p = argparse.ArgumentParser(description='Scan seeds for a screen/RNG/typGrid condition')
+    p.add_argument('--game', choices=GAMES, default='hack')
+    p.add_argument('--where', required=True, help='Condition, e.g. \'near(E, 1) and not screen("You die")\'')
+    p.add_argument('--keys', default='h', help='Keys to play before checking (default: one step)')
+    p.add_argument('--start', type=int, default=1)
+    p.add_argument('--end', type=int, default=50000)
+    p.add_argument('--limit', type=int, default=10, help='Stop after this many matching seeds (0 = all)')
+    p.add_argument('--jobs', type=int, default=0, help='Worker processes (0 = one per CPU)')
+    p.add_argument('--harness', default=None, help='Harness binary (hack/rogue)')
+    p.add_argument('--timeout', type=float, default=10, help='Per-seed harness timeout (s)')
+    p.add_argument('--json', action='store_true', help='Print one JSON object per matching seed')
+    args = p.parse_args()
+
+    try:
+        parse_condition(args.where)
+        check_harness(args.game, args.harness)
+    except (ValueError, FileNotFoundError) as e:
+        p.error(str(e))
+    jobs = args.jobs or os.cpu_count() or 1
+    found = 0
+    for seed, hits in scan(args.game, args.keys, args.where, range(args.start, args.end + 1),
+                           jobs=jobs, limit=args.limit, harness=args.harness, timeout=args.timeout):
+        found += 1
+        if args.json:
+            print(json.dumps({'seed': seed, 'hits': hits}), flush=True)
+        else:
+            for hit in [h for h in hits if h] or [{}]:
+                print(format_hit(seed, hit), flush=True)
+    if found == 0:
+        print('No seeds found.')
+
+
+if __name__ == '__main__':
+    main()
@@ -8,10 +8,11 @@ Usage:
 
 import os
 import sys
-import json
 import glob
 import re
 
+from session_stream import SessionStream
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SESSIONS_DIR = os.path.normpath(os.path.join(SCRIPT_DIR, '..', 'sessions'))
 
@@ -76,18 +77,24 @@ LEVEL_INDICATOR = re.compile(r'(Dlvl|Mines|Sokoban|Quest|Astral|Fort|Vlad|Air|Ea
 
 def analyze_session(session_path):
     """Analyze a session for events."""
-    with open(session_path) as f:
-        session_data = json.load(f)
+    with SessionStream(session_path) as session:
+        header = session.header(('seed', 'options'))
+        total_steps = len(session)
+        stats = _analyze_steps(session.steps(('key', 'msg', 'screen')), header,
+                               os.path.basename(session_path), total_steps)
+    return stats
+
 
-    steps = session_data.get('steps', [])
-    seed = session_data.get('seed', 0)
-    options = session_data.get('options', {})
+def _analyze_steps(steps, header, name, total_steps):
+    """Tally events over an iterator of (projected) steps."""
+    seed = header.get('seed', 0)
+    options = header.get('options', {})
 
     stats = {
-        'session': os.path.basename(session_path),
+        'session': name,
         'seed': seed,
         'role': options.get('role', 'Unknown'),
-        'total_steps': len(steps),
+        'total_steps': total_steps,
         'total_messages': 0,
         'descents': 0,
         'ascents': 0,
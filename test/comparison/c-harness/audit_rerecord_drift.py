@@ -12,13 +12,15 @@ Designed for iterative checks while rerecord is still running.
 from __future__ import annotations
 
 import argparse
-import json
 import os
 import re
 import subprocess
 from dataclasses import dataclass
+from itertools import zip_longest
 from typing import Iterable
 
+from session_stream import SessionStream
+
 
 ANSI_RE = re.compile(r"\x1b\[[0-9;]*[A-Za-z]")
 GFX_RE = re.compile(r"[\x0e\x0f]")
@@ -40,11 +42,6 @@ class DriftRow:
     rng_new: int
 
 
-def load_json(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
 def normalize_text(raw: str) -> str:
     text = ANSI_RE.sub("", raw)
     text = GFX_RE.sub("", text)
@@ -79,22 +76,29 @@ def parse_level_id(text: str) -> str | None:
     return None
 
 
-def key_stream(steps: list[dict]) -> str:
-    return "".join(str(s.get("key", "")) for s in steps)
-
-
-def total_rng(steps: list[dict]) -> int:
-    return sum(len(s.get("rng", [])) for s in steps if isinstance(s.get("rng", []), list))
-
-
-def prng_diff(old: dict, new: dict) -> bool:
-    old_start = old.get("startup", {}).get("rng", [])
-    new_start = new.get("startup", {}).get("rng", [])
-    if old_start != new_start:
-        return True
-    old_steps = [s.get("rng", []) for s in old.get("steps", [])]
-    new_steps = [s.get("rng", []) for s in new.get("steps", [])]
-    return old_steps != new_steps
+def drift_row(name: str, old: SessionStream, new: SessionStream) -> DriftRow:
+    """Compare key streams and RNG logs, one step pair at a time."""
+    row = DriftRow(name=name, prng_changed=False, step_old=0, step_new=0,
+                   key_changed=False, rng_old=0, rng_new=0)
+    old_start = old.header(("startup",)).get("startup", {}).get("rng", [])
+    new_start = new.header(("startup",)).get("startup", {}).get("rng", [])
+    row.prng_changed = old_start != new_start
+    old_keys: list[str] = []
+    new_keys: list[str] = []
+    fields = ("key", "rng")
+    for a, b in zip_longest(old.steps(fields), new.steps(fields)):
+        if a is not None:
+            old_keys.append(str(a.get("key", "")))
+            row.rng_old += len(a["rng"]) if isinstance(a.get("rng"), list) else 0
+        if b is not None:
+            new_keys.append(str(b.get("key", "")))
+            row.rng_new += len(b["rng"]) if isinstance(b.get("rng"), list) else 0
+        if a is None or b is None or a.get("rng", []) != b.get("rng", []):
+            row.prng_changed = True
+    row.step_old = len(old_keys)
+    row.step_new = len(new_keys)
+    row.key_changed = "".join(old_keys) != "".join(new_keys)
+    return row
 
 
 def changed_sessions(sessions_dir: str) -> Iterable[str]:
@@ -108,17 +112,25 @@ def changed_sessions(sessions_dir: str) -> Iterable[str]:
             yield path
 
 
-def gtlt_outcomes(steps: list[dict]) -> list[tuple[int, str, str]]:
+def gtlt_outcomes(session: SessionStream) -> list[tuple[int, str, str]]:
     down_msgs = ("you descend", "go down", "downstairs", "stairs down")
     up_msgs = ("you ascend", "go up", "upstairs", "stairs up")
     blocked_msgs = ("cannot", "nothing happens", "no stairs", "not here")
 
+    # Only the few steps around '>'/'<' are decoded, by seeking to them.
+    keys = [str(s.get("key", "")) for s in session.steps(("key",))]
+    texts: dict[int, str] = {}
+
+    def text_at(j: int) -> str:
+        if j not in texts:
+            texts[j] = step_text(session.step(j, ("screen", "events", "topLine")))
+        return texts[j]
+
     outcomes: list[tuple[int, str, str]] = []
-    for i, step in enumerate(steps):
-        key = str(step.get("key", ""))
+    for i, key in enumerate(keys):
         if key not in (">", "<"):
             continue
-        window = "\n".join(step_text(steps[j]) for j in range(i, min(i + 5, len(steps))))
+        window = "\n".join(text_at(j) for j in range(i, min(i + 5, len(keys))))
         if key == ">" and any(msg in window for msg in down_msgs):
             outcomes.append((i + 1, key, "ok"))
         elif key == "<" and any(msg in window for msg in up_msgs):
@@ -127,10 +139,10 @@ def gtlt_outcomes(steps: list[dict]) -> list[tuple[int, str, str]]:
             outcomes.append((i + 1, key, "fail"))
         else:
             # Fallback to level-id change detection (Dlvl:x or Branch:y).
-            before = parse_level_id(step_text(steps[i - 1])) if i > 0 else None
+            before = parse_level_id(text_at(i - 1)) if i > 0 else None
             after = None
-            for j in range(i, min(i + 6, len(steps))):
-                after = parse_level_id(step_text(steps[j]))
+            for j in range(i, min(i + 6, len(keys))):
+                after = parse_level_id(text_at(j))
                 if after and before and after != before:
                     break
             if before and after and before != after:
@@ -165,23 +177,9 @@ def main() -> None:
         base = os.path.join(args.baseline_dir, name)
         if not os.path.exists(cur) or not os.path.exists(base):
             continue
-        old = load_json(base)
-        new = load_json(cur)
-
-        old_steps = old.get("steps", [])
-        new_steps = new.get("steps", [])
-        row = DriftRow(
-            name=name,
-            prng_changed=prng_diff(old, new),
-            step_old=len(old_steps),
-            step_new=len(new_steps),
-            key_changed=(key_stream(old_steps) != key_stream(new_steps)),
-            rng_old=total_rng(old_steps),
-            rng_new=total_rng(new_steps),
-        )
-        drift_rows.append(row)
-
-        outcomes = gtlt_outcomes(new_steps)
+        with SessionStream(base) as old, SessionStream(cur) as new:
+            drift_rows.append(drift_row(name, old, new))
+            outcomes = gtlt_outcomes(new)
         if outcomes:
             bad = []
             for _, _, status in outcomes:
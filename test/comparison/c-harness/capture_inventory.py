@@ -47,7 +47,7 @@ CHARACTER = {
 # Reuse helpers
 parse_rng_lines = _session.parse_rng_lines
 compact_session_json = _session.compact_session_json
-read_rng_log = _session.read_rng_log
+RngLogTail = _session.RngLogTail
 tmux_send = _session.tmux_send
 tmux_send_special = _session.tmux_send_special
 capture_screen_compressed = _session.capture_screen_compressed
@@ -87,6 +87,7 @@ def setup_home():
 
 def wait_for_game_ready(session, rng_log_file):
     """Navigate startup prompts until the game is ready."""
+    rng_counter = RngLogTail(rng_log_file)
     for attempt in range(60):
         try:
             content = subprocess.run(
@@ -96,7 +97,7 @@ def wait_for_game_ready(session, rng_log_file):
         except subprocess.CalledProcessError:
             break
 
-        rng_count, _ = read_rng_log(rng_log_file)
+        rng_count, _ = rng_counter.read()
 
         if '--More--' in content:
             print(f'  [startup-{attempt}] rng={rng_count} --More--')
@@ -215,7 +216,8 @@ def run_session(seed, output_json, move_str):
 
         # Capture startup state
         startup_screen = capture_screen_compressed(session_name)
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
+        rng_log = RngLogTail(rng_log_file)
+        startup_rng_count, startup_rng_lines = rng_log.read()
         print(f'Startup: {startup_rng_count} RNG calls')
 
         startup_rng_entries = parse_rng_lines(startup_rng_lines)
@@ -249,8 +251,7 @@ def run_session(seed, output_json, move_str):
             # For inventory, the display stays up until dismissed
             # Capture what's on screen before dismissing
             screen = capture_screen_compressed(session_name)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
+            rng_count, delta_lines = rng_log.read()
             rng_entries = parse_rng_lines(delta_lines)
 
             # Detect depth from status line
@@ -3,33 +3,50 @@
 
 Usage:
   python3 capture_step_snapshot.py <session_json> <step_index> <output_json>
+  python3 capture_step_snapshot.py <session_json> 37,120,900 'out/step{step}.json'
+  python3 capture_step_snapshot.py <session_json> --serve SOCKET
+  python3 capture_step_snapshot.py <session_json> <step_index> <output_json> --server SOCKET
 
 step_index is 0-based over gameplay steps (session.steps excluding startup).
 Example: step_index 37 replays 38 gameplay steps, then captures env-triggered
 checkpoint emitted at the canonical runstep boundary (no injected tty commands).
+
+Several steps (a comma list, or --snapshot-every) are captured from one game
+that forks snapshots as it goes (SnapshotReplay; needs patches 039 and 040).
+--serve keeps such a game alive for repeated --server captures of the same
+session, so a probe before the live game's position resumes the nearest
+earlier snapshot instead of replaying from turn 1.
 """
 
 import argparse
+import bisect
+import errno
 import json
 import os
 import re
 import shutil
+import signal
 import subprocess
 import tempfile
 import time
+from multiprocessing.connection import Client, Listener
 
 from run_session import (
     CHARACTER,
     INSTALL_DIR,
     NETHACK_BINARY,
     RESULTS_DIR,
+    InputWaitSync,
+    RngLogTail,
     clear_more_prompts,
     fixed_datetime_env,
     get_clear_more_stats,
     read_checkpoint_entries,
     read_rng_log,
     parse_rng_lines,
+    read_screen_text,
     setup_home,
+    step_sync_env,
     no_delay_env,
     diag_events_env,
     test_move_event_env,
@@ -246,13 +263,13 @@ def max_auto_index(checkpoints, pattern):
 def wait_for_target_runstep_rng(rng_log_file, target_runstep_index, timeout_s=120.0):
     """Wait until C RNG/event stream has at least target runstep index."""
     deadline = time.time() + timeout_s
-    last_lines = []
+    rng_log = RngLogTail(rng_log_file)
+    lines = []
+    runstep_idx = -1
     while time.time() < deadline:
-        _, lines = read_rng_log(rng_log_file)
-        last_lines = lines
-        entries = parse_rng_lines(lines)
-        runstep_idx = -1
-        for e in entries:
+        _, new_lines = rng_log.read()
+        lines.extend(new_lines)
+        for e in parse_rng_lines(new_lines):
             text = str(e or "")
             m = _RUNSTEP_PATH_RE.match(text)
             if not m:
@@ -263,7 +280,7 @@ def wait_for_target_runstep_rng(rng_log_file, target_runstep_index, timeout_s=12
             if runstep_idx >= target_runstep_index:
                 return lines
         time.sleep(0.05)
-    return last_lines
+    return lines
 
 
 def checkpoint_phase_for_runstep_index(rng_lines, target_runstep_index):
@@ -305,6 +322,13 @@ def session_uses_tutorial(session):
     return False
 
 
+def write_payload(payload, output_path):
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+        f.write("\n")
+
+
 def run_capture(session_path, step_index, output_path, phase_tag=None, keys_override=None):
     session = load_session(session_path)
     # If session has null chargen options (name=null etc.), the recording
@@ -477,26 +501,391 @@ def run_capture(session_path, step_index, output_path, phase_tag=None, keys_over
             "clearMore": get_clear_more_stats(),
         }
 
-        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
-        with open(output_path, "w", encoding="utf-8") as f:
-            json.dump(payload, f, indent=2)
-            f.write("\n")
+        write_payload(payload, output_path)
     finally:
         subprocess.run(["tmux", "kill-session", "-t", session_name], capture_output=True)
         shutil.rmtree(tmpdir, ignore_errors=True)
 
 
+SNAPSHOT_EVERY = 50
+# Every fresh_cmd boundary dumps auto_step_<n>; captures pick theirs by tag.
+ALL_STEPS_SPEC = "0-2147483647"
+
+
+class SnapshotReplay:
+    """Serve many step captures of one session from a single C game.
+
+    The binary (patch 040-input-fork-snapshots) forks a frozen copy of
+    itself at every `every`-th input wait.  A capture at or past the live
+    game's position just sends the missing keys; an earlier one kills the
+    live game, resumes the nearest snapshot at or before the target and
+    replays only the tail.  Positions are counted in input waits (patch
+    039-input-wait-sync), one per key character sent.
+
+    Payloads carry the same fields as run_capture(); screens come from the
+    NOMUX shadow buffer rather than the tmux pane.
+    """
+
+    def __init__(self, session_path, keys_override=None, every=SNAPSHOT_EVERY):
+        self.session_path = os.path.abspath(session_path)
+        self.session = load_session(session_path)
+        opts = self.session.get("options") or {}
+        has_preset_chargen = isinstance(opts.get("name"), str) and opts["name"]
+        self.keys_override = keys_override
+        self.chargen_in_keys = keys_override is None and not has_preset_chargen
+        self.keys = keys_override if keys_override is not None else extract_keys(self.session)
+        self.seed = int(self.session.get("seed", 1))
+        self.char = build_character(self.session)
+        self.every = max(1, int(every))
+        # offsets[j] = key characters consumed before keys[j].
+        self.offsets = [0]
+        for key in self.keys:
+            self.offsets.append(self.offsets[-1] + len(key))
+        self.tmpdir = None
+        self.session_name = None
+        self.sync = None
+
+    def start(self):
+        setup_home(self.char, chargen_in_keys=self.chargen_in_keys)
+        self.tmpdir = tempfile.mkdtemp(prefix="webhack-step-snapshot-")
+        self.fork_dir = os.path.join(self.tmpdir, "snapshots")
+        os.makedirs(self.fork_dir)
+        self.rng_log_file = os.path.join(self.tmpdir, "rnglog.txt")
+        self.checkpoint_file = os.path.join(self.tmpdir, "checkpoints.jsonl")
+        self.session_name = f"webhack-step-snapshot-{self.seed}-{os.getpid()}"
+        self.sync = InputWaitSync(os.path.join(self.tmpdir, "input_sync.fifo"),
+                                  screen_file=os.path.join(self.tmpdir, "nomux_screen.txt"))
+        self._rng = RngLogTail(self.rng_log_file)
+        self._ckpt = RngLogTail(self.checkpoint_file)
+        self.rng_count = 0
+        self.checkpoints = []
+        self.position = 0
+        self.stalled = False
+        self.resumes = 0
+        # input wait -> (rng_count, len(checkpoints)) for snapshot waits.
+        self._marks = {}
+
+        monmove_debug = os.environ.get("NETHACK_MONMOVE_DEBUG")
+        monmove_debug_env = f"NETHACK_MONMOVE_DEBUG={monmove_debug} " if monmove_debug else ""
+        key_steps_env = os.environ.get("NETHACK_DUMPSNAP_KEY_STEPS")
+        key_steps_clause = f"NETHACK_DUMPSNAP_KEY_STEPS={key_steps_env} " if key_steps_env else ""
+        name_arg = "''" if self.chargen_in_keys else self.char["name"]
+        wiz_flag = " -D" if (self.session.get("options") or {}).get("wizard", True) else ""
+        cmd = (
+            f"NETHACKDIR={INSTALL_DIR} "
+            f"{fixed_datetime_env()}"
+            f"{diag_events_env()}"
+            f"{no_delay_env()}"
+            f"{test_move_event_env()}"
+            f"{runstep_event_env()}"
+            f"{monmove_debug_env}"
+            f"{step_sync_env(self.sync)}"
+            f"NETHACK_FORK_DIR={self.fork_dir} "
+            f"NETHACK_FORK_EVERY={self.every} "
+            f"NETHACK_SEED={self.seed} "
+            f"NETHACK_RNGLOG={self.rng_log_file} "
+            f"NETHACK_DUMPSNAP={self.checkpoint_file} "
+            f"NETHACK_DUMPSNAP_STEPS={ALL_STEPS_SPEC} "
+            f"{key_steps_clause}"
+            f"NETHACK_DUMPSNAP_INPUT_EVERY=1 "
+            f"HOME={RESULTS_DIR} "
+            f"TERM=xterm-256color "
+            f"{NETHACK_BINARY} -u {name_arg}"
+            f"{wiz_flag}; "
+            # Resumed games share this pane's tty; keep it open for them.
+            f"sleep 2147483647"
+        )
+        subprocess.run(
+            ["tmux", "new-session", "-d", "-s", self.session_name, "-x", "80", "-y", "24", cmd],
+            check=True,
+        )
+        if not self.sync.wait(0):
+            raise RuntimeError(
+                "no input-wait marker from the C binary; "
+                "rebuild with setup.sh (patches 039 and 040)"
+            )
+        if not self.chargen_in_keys:
+            tutorial = session_uses_tutorial(self.session) if self.keys_override is None else False
+            wait_for_game_ready(self.session_name, self.rng_log_file,
+                                tutorial_enabled=tutorial, sync=self.sync)
+            clear_more_prompts(self.session_name, sync=self.sync)
+
+        self._catch_up()
+        self.base = self.sync.seq
+        self.baseline_count = len(self.checkpoints)
+        self.startup_auto_step = max_auto_index(self.checkpoints, _AUTO_STEP_RE)
+        self.baseline_auto_inp = max_auto_index(self.checkpoints, _AUTO_INP_RE)
+        self.live_pid = self._index("live")[-1][1]
+        self._mark()
+        return self
+
+    def close(self):
+        if self.session_name is None:
+            return
+        try:
+            for n, _pid in self._index("snap"):
+                self._send_ctl(n, "quit", timeout_s=0.5)
+            self._kill_live()
+            self.sync.close()
+        finally:
+            subprocess.run(["tmux", "kill-session", "-t", self.session_name], capture_output=True)
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+            self.session_name = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _index(self, what):
+        """Return [(input wait, pid)] for `what` ("snap" or "live") lines."""
+        found = []
+        try:
+            with open(os.path.join(self.fork_dir, "index"), "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) == 3 and parts[0] == what:
+                        found.append((int(parts[1]), int(parts[2])))
+        except FileNotFoundError:
+            pass
+        return found
+
+    def _send_ctl(self, n, command, timeout_s=5.0):
+        """Write a command line to snapshot n's control FIFO."""
+        path = os.path.join(self.fork_dir, f"snap-{n}.ctl")
+        deadline = time.monotonic() + timeout_s
+        while True:
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_NONBLOCK)
+                break
+            except OSError as e:
+                # ENXIO: the snapshot is between two reads of its FIFO.
+                if e.errno != errno.ENXIO or time.monotonic() >= deadline:
+                    return False
+                time.sleep(0.01)
+        try:
+            os.write(fd, f"{command}\n".encode())
+        finally:
+            os.close(fd)
+        return True
+
+    def _kill_live(self, timeout_s=5.0):
+        if self.live_pid is None:
+            return
+        try:
+            os.kill(self.live_pid, signal.SIGKILL)
+            deadline = time.monotonic() + timeout_s
+            while time.monotonic() < deadline:
+                os.kill(self.live_pid, 0)
+                time.sleep(0.01)
+        except ProcessLookupError:
+            pass
+        self.live_pid = None
+
+    def _catch_up(self):
+        _, lines = self._rng.read()
+        self.rng_count += len(lines)
+        _, lines = self._ckpt.read()
+        for line in lines:
+            try:
+                self.checkpoints.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+
+    def _mark(self):
+        if self.sync.seq % self.every == 0:
+            self._marks[self.sync.seq] = (self.rng_count, len(self.checkpoints))
+
+    def _advance(self, target):
+        while self.position < target:
+            key_index = bisect.bisect_right(self.offsets, self.position) - 1
+            ch = self.keys[key_index][self.position - self.offsets[key_index]]
+            seq = self.sync.seq
+            send_char(self.session_name, ch)
+            self.position += 1
+            if not self.sync.wait(seq):
+                # Game exited or hung; later captures resume a snapshot.
+                self.stalled = True
+                self._catch_up()
+                return
+            self._catch_up()
+            self._mark()
+
+    def _resume(self, target):
+        """Rewind to the newest snapshot at or before `target` key chars."""
+        usable = [n for n, _pid in self._index("snap")
+                  if n in self._marks and 0 <= n - self.base <= target]
+        if not usable:
+            return None
+        n = max(usable)
+        self._kill_live()
+        # Drop what the killed timeline wrote past the snapshot.
+        self._catch_up()
+        self.sync.drain()
+        self.sync.seq = 0
+        self.sync.expect_writer()
+        if not self._send_ctl(n, "resume") or not self.sync.wait(n - 1) or self.sync.seq != n:
+            raise RuntimeError(f"snapshot at input wait {n} did not resume")
+        self._catch_up()
+        self.rng_count, kept = self._marks[n]
+        del self.checkpoints[kept:]
+        self.position = n - self.base
+        self.stalled = False
+        self.live_pid = self._index("live")[-1][1]
+        self.resumes += 1
+        return n
+
+    def capture(self, step_index, phase_tag=None):
+        """Replay through gameplay step `step_index`; return a run_capture() payload."""
+        replayed_steps = min(step_index + 1, len(self.keys))
+        replayed_chars = self.offsets[replayed_steps]
+        resumed_from = None
+        if self.stalled or self.position > replayed_chars:
+            resumed_from = self._resume(replayed_chars)
+            if resumed_from is None:
+                self.close()
+                self.start()
+        tail_start = self.position
+        self._advance(replayed_chars)
+        pre_snapshot_screen = read_screen_text(self.session_name, self.sync)
+
+        # run_capture() asks the binary for auto_step_<step_index> only, so
+        # its baseline sees that phase only if startup already reached it.
+        baseline_auto_step = step_index if self.startup_auto_step >= step_index else -1
+        expected_auto_step = baseline_auto_step + replayed_steps
+        expected_auto_inp = self.baseline_auto_inp + replayed_chars
+        tag = phase_tag or f"auto_step_{expected_auto_step}"
+        # Every step is dumped here, so match the whole index (auto_step_1
+        # must not pick up auto_step_12).
+        prefix = tag if phase_tag else f"{tag}_"
+        matched = find_checkpoint_by_phase_prefix(self.checkpoints, prefix)
+        deadline = time.monotonic() + 1.0
+        while matched is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+            self._catch_up()
+            matched = find_checkpoint_by_phase_prefix(self.checkpoints, prefix)
+        if matched:
+            tag = str(matched.get("phase") or tag)
+        chosen = matched if matched is not None else (self.checkpoints[-1] if self.checkpoints else None)
+
+        return {
+            "session": self.session_path,
+            "seed": self.seed,
+            "requestedStepIndex": step_index,
+            "replayedSteps": replayed_steps,
+            "phaseTag": tag,
+            "baselineAutoStep": baseline_auto_step,
+            "baselineAutoInp": self.baseline_auto_inp,
+            "baselineCheckpointCount": self.baseline_count,
+            "expectedAutoStep": expected_auto_step,
+            "expectedAutoInp": expected_auto_inp,
+            "targetAutoStep": int(expected_auto_step),
+            "targetAutoInp": int(expected_auto_inp),
+            "targetAutoInpByStep": int(step_index),
+            "replayedChars": replayed_chars,
+            "matchedPhaseFromStream": None,
+            "rngCallCount": self.rng_count,
+            "checkpointCount": len(self.checkpoints),
+            "checkpointMatchedPhase": bool(matched),
+            "checkpoint": chosen,
+            "checkpointPhasesTail": [str((cp or {}).get("phase") or "") for cp in self.checkpoints[-8:]],
+            "preSnapshotScreen": pre_snapshot_screen,
+            "screen": read_screen_text(self.session_name, self.sync),
+            "clearMore": get_clear_more_stats(),
+            "resumedFromInputWait": resumed_from,
+            "tailReplayChars": self.position - tail_start,
+        }
+
+
+def run_captures(session_path, requests, keys_override=None, every=SNAPSHOT_EVERY):
+    """Capture [(step_index, output_path, phase_tag)] from one snapshotting game.
+
+    Requests run in step order, so the live game only ever moves forward.
+    """
+    with SnapshotReplay(session_path, keys_override, every) as replay:
+        for step_index, output_path, phase_tag in sorted(requests, key=lambda r: r[0]):
+            write_payload(replay.capture(step_index, phase_tag), output_path)
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(socket_path, session_path, keys_override=None, every=SNAPSHOT_EVERY):
+    """Answer capture requests for one session until killed.
+
+    Each connection sends {"session", "step", "output", "phase"} dicts and
+    a None sentinel; each is answered with {"ok": bool, "output"|"error"}.
+    """
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with SnapshotReplay(session_path, keys_override, every) as replay:
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        listener = Listener(socket_path, family="AF_UNIX")
+        print(f"step snapshot server for {replay.session_path} on {socket_path}", flush=True)
+        try:
+            while True:
+                conn = listener.accept()
+                try:
+                    while True:
+                        request = conn.recv()
+                        if request is None:
+                            break
+                        conn.send(_serve_request(replay, request))
+                except EOFError:
+                    pass
+                finally:
+                    conn.close()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+
+
+def _serve_request(replay, request):
+    try:
+        if os.path.abspath(request["session"]) != replay.session_path:
+            raise ValueError(f"server replays {replay.session_path}, not {request['session']}")
+        payload = replay.capture(int(request["step"]), request.get("phase"))
+        write_payload(payload, request["output"])
+    except Exception as e:
+        return {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return {"ok": True, "output": os.path.abspath(request["output"])}
+
+
+def request_captures(socket_path, requests):
+    """Send requests to a running server; yield its replies in order."""
+    conn = Client(socket_path, family="AF_UNIX")
+    try:
+        for request in requests:
+            conn.send(request)
+            yield conn.recv()
+        conn.send(None)
+    finally:
+        conn.close()
+
+
 def main():
-    parser = argparse.ArgumentParser(description=__doc__)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument("session_json", help="Path to *.session.json")
-    parser.add_argument("step_index", type=int, help="0-based gameplay step index")
-    parser.add_argument("output_json", help="Output file path for captured snapshot JSON")
+    parser.add_argument("step_index", nargs="?",
+                        help="0-based gameplay step index, or a comma list of them")
+    parser.add_argument("output_json", nargs="?",
+                        help="Output file path for captured snapshot JSON ('{step}' is replaced per step)")
     parser.add_argument("--phase", default=None, help="Optional phase tag prefix for auto-checkpoint matching")
     parser.add_argument(
         "--keys-json",
         default=None,
         help="Optional JSON file containing an explicit replay key array to use instead of extracting from session steps",
     )
+    parser.add_argument("--snapshot-every", type=int, default=None,
+                        help=f"Capture through a snapshotting game forking every N input waits "
+                             f"(default {SNAPSHOT_EVERY}; implied by a comma list, --serve)")
+    parser.add_argument("--serve", metavar="SOCKET", default=None,
+                        help="Keep a snapshotting game for this session and answer --server requests")
+    parser.add_argument("--server", metavar="SOCKET", default=None,
+                        help="Ask a --serve process for this capture instead of launching a game")
     args = parser.parse_args()
     keys_override = None
     if args.keys_json:
@@ -508,9 +897,32 @@ def main():
             keys_override = loaded
         else:
             raise ValueError("--keys-json must be a JSON string or array of strings")
-
-    run_capture(args.session_json, args.step_index, args.output_json, args.phase, keys_override)
-
+    every = args.snapshot_every or SNAPSHOT_EVERY
+
+    if args.serve:
+        serve(args.serve, args.session_json, keys_override, every)
+        return
+    if args.step_index is None or args.output_json is None:
+        parser.error("step_index and output_json are required")
+    steps = [int(s) for s in args.step_index.split(",") if s.strip()]
+    if len(steps) > 1 and "{step}" not in args.output_json:
+        parser.error("output_json must contain '{step}' when capturing several steps")
+    requests = [(step, args.output_json.replace("{step}", str(step)), args.phase) for step in steps]
+
+    if args.server:
+        replies = request_captures(args.server, [
+            {"session": args.session_json, "step": step, "output": os.path.abspath(output), "phase": phase}
+            for step, output, phase in requests
+        ])
+        failed = [r["error"] for r in replies if not r.get("ok")]
+        for error in failed:
+            print(error)
+        raise SystemExit(1 if failed else 0)
+    if len(requests) > 1 or args.snapshot_every:
+        run_captures(args.session_json, requests, keys_override, every)
+        return
+    step, output, phase = requests[0]
+    run_capture(args.session_json, step, output, phase, keys_override)
 
 if __name__ == "__main__":
     main()
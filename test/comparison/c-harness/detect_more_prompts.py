@@ -18,6 +18,9 @@ import shutil
 import tempfile
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+from tmux_driver import TmuxError, tmux_capture, tmux_send, tmux_send_special
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
 RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
 SESSIONS_DIR = os.path.join(PROJECT_ROOT, 'test', 'comparison', 'sessions')
@@ -55,26 +58,6 @@ def fixed_datetime_env():
     return f'NETHACK_FIXED_DATETIME={dt} ' if dt else ''
 
 
-def tmux_send(session, keys, delay=0):
-    subprocess.run(['tmux', 'send-keys', '-t', session, '-l', keys], check=True)
-    if delay > 0:
-        time.sleep(delay)
-
-
-def tmux_send_special(session, key, delay=0):
-    subprocess.run(['tmux', 'send-keys', '-t', session, key], check=True)
-    if delay > 0:
-        time.sleep(delay)
-
-
-def tmux_capture(session):
-    result = subprocess.run(
-        ['tmux', 'capture-pane', '-t', session, '-p', '-S', '0', '-E', '30'],
-        capture_output=True, text=True, check=True
-    )
-    return result.stdout
-
-
 def setup_home(character):
     os.makedirs(RESULTS_DIR, exist_ok=True)
     nethackrc = os.path.join(RESULTS_DIR, '.nethackrc')
@@ -115,7 +98,7 @@ def wait_for_game_ready_no_auto(session, max_attempts=60):
     for attempt in range(max_attempts):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             break
 
         # Handle --More-- during startup (these are unavoidable)
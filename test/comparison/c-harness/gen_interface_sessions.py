@@ -26,7 +26,10 @@ import shutil
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
 SESSIONS_DIR = os.path.join(PROJECT_ROOT, 'test', 'comparison', 'sessions')
-NETHACK_BINARY = os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir', 'nethack')
+# Overridden per worker by rerecord.py --parallel (see run_session.make_install_sandbox)
+INSTALL_DIR = (os.environ.get('NETHACK_HARNESS_INSTALL_DIR')
+               or os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir'))
+NETHACK_BINARY = os.path.join(INSTALL_DIR, 'nethack')
 DEFAULT_FIXED_DATETIME = '20000110090000'
 
 # Import helpers from run_session.py
@@ -41,7 +44,7 @@ fixed_datetime_env = _session.fixed_datetime_env
 diag_events_env = _session.diag_events_env
 tmux_send = _session.tmux_send
 tmux_send_special = _session.tmux_send_special
-read_rng_log = _session.read_rng_log
+RngLogTail = _session.RngLogTail
 parse_rng_lines = _session.parse_rng_lines
 
 
@@ -376,7 +379,8 @@ def capture_tutorial_prompt_flow(seed=1):
         if not _wait_for_text(session, "Shall I pick character's race, role, gender and alignment for you?"):
             raise RuntimeError('Timed out waiting for autopick prompt')
 
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
+        rng_log = RngLogTail(rng_log_file)
+        startup_rng_count, startup_rng_lines = rng_log.read()
         steps.append({
             'key': None,
             'action': 'startup',
@@ -402,7 +406,6 @@ def capture_tutorial_prompt_flow(seed=1):
         # Continue with ~20 gameplay moves on tutorial map for interface replay coverage.
         for key in "lllljjjjhhhhkkkkllll":
             key_plan.append((key, 'tutorial-move'))
-        prev_rng_count = startup_rng_count
         for key, action in key_plan:
             if key == ' ':
                 tmux_send_special(session, 'Space', delay=0.25)
@@ -410,8 +413,7 @@ def capture_tutorial_prompt_flow(seed=1):
                 tmux_send(session, key, delay=0.25)
             time.sleep(0.03)
             screen = capture_screen(session)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
+            rng_count, delta_lines = rng_log.read()
             steps.append({
                 'key': key,
                 'action': action,
@@ -419,7 +421,6 @@ def capture_tutorial_prompt_flow(seed=1):
                 'screen': screen,
                 'cursor': capture_cursor(session),
             })
-            prev_rng_count = rng_count
     finally:
         kill_tmux_session(session)
         shutil.rmtree(tmpdir, ignore_errors=True)
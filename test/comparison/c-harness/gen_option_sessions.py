@@ -19,7 +19,8 @@ import importlib.util
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
 SESSIONS_DIR = os.path.join(PROJECT_ROOT, 'test', 'comparison', 'sessions')
-INSTALL_DIR = os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir')
+INSTALL_DIR = (os.environ.get('NETHACK_HARNESS_INSTALL_DIR')
+               or os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir'))
 NETHACK_BINARY = os.path.join(INSTALL_DIR, 'nethack')
 
 # Import record_c_session from run_session.py
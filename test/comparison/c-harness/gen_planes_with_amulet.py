@@ -25,7 +25,7 @@ from run_dumpmap import (
     NETHACK_BINARY, INSTALL_DIR, RESULTS_DIR,
     fixed_datetime_env,
 )
-from run_session import parse_rng_lines, get_rng_call_count
+from run_session import RngLogTail, parse_rng_lines
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
@@ -367,11 +367,12 @@ def main():
             # Now we're ON an elemental plane, capture all 5 planes from here
             # We start by teleporting to astral, then visit all planes including water
             current_plane = 'water'
+            rng_counter = RngLogTail(rnglog_file)
             for plane_name in planes:
                 print(f"  Teleporting to {plane_name}...")
 
                 # Track RNG call count before teleport
-                rng_call_start = get_rng_call_count(rnglog_file)
+                rng_call_start = rng_counter.call_count()
 
                 # Teleport to the plane (unless we're already on it)
                 if plane_name == current_plane:
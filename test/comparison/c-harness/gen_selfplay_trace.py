@@ -47,7 +47,7 @@ tmux_send = _session.tmux_send
 tmux_send_special = _session.tmux_send_special
 parse_rng_lines = _session.parse_rng_lines
 compact_session_json = _session.compact_session_json
-read_rng_log = _session.read_rng_log
+RngLogTail = _session.RngLogTail
 capture_screen_compressed = _session.capture_screen_compressed
 screen_to_plain_lines = _session.screen_to_plain_lines
 read_typ_grid = _session.read_typ_grid
@@ -101,14 +101,17 @@ def tmux_capture(session):
     return result.stdout
 
 
-def wait_for_game_ready_with_chargen(session, rng_log_file, role='Valkyrie'):
+def wait_for_game_ready_with_chargen(session, rng_log, role='Valkyrie'):
     """Navigate startup prompts AND character creation until game is ready.
 
+    rng_log is an RngLogTail positioned at the start of the log.
+
     Returns:
-        List of chargen steps (key, action, rng, screen)
+        (chargen steps, RNG line count, RNG lines consumed during chargen)
     """
     role_key = ROLE_KEYS.get(role, 'v')
     chargen_steps = []
+    chargen_rng_lines = []
     prev_rng_count = 0
 
     for attempt in range(80):
@@ -118,8 +121,6 @@ def wait_for_game_ready_with_chargen(session, rng_log_file, role='Valkyrie'):
             print(f'  [attempt {attempt}] tmux session died')
             break
 
-        rng_count, rng_lines = read_rng_log(rng_log_file)
-
         # Determine key to send based on screen content
         key = None
         action = None
@@ -166,8 +167,8 @@ def wait_for_game_ready_with_chargen(session, rng_log_file, role='Valkyrie'):
         # Wait for screen update, then capture state
         time.sleep(0.1)
         screen = capture_screen_compressed(session)
-        rng_count, rng_lines = read_rng_log(rng_log_file)
-        delta_lines = rng_lines[prev_rng_count:rng_count]
+        rng_count, delta_lines = rng_log.read()
+        chargen_rng_lines.extend(delta_lines)
         rng_entries = parse_rng_lines(delta_lines)
 
         step = {
@@ -182,7 +183,7 @@ def wait_for_game_ready_with_chargen(session, rng_log_file, role='Valkyrie'):
         print(f'  [{len(chargen_steps):02d}] key={key!r:3s} ({action:20s}) +{delta} RNG')
         prev_rng_count = rng_count
 
-    return chargen_steps, prev_rng_count
+    return chargen_steps, prev_rng_count, chargen_rng_lines
 
 
 def get_agent_move(session_name, screen_lines, turn):
@@ -237,14 +238,14 @@ def generate_trace(seed, max_turns=100, role='Valkyrie'):
         print(f'\n=== CHARACTER CREATION ===')
 
         # Navigate character creation and capture steps
-        chargen_steps, prev_rng_count = wait_for_game_ready_with_chargen(
-            session_name, rng_log_file, role
+        rng_log = RngLogTail(rng_log_file)
+        chargen_steps, prev_rng_count, chargen_rng_lines = wait_for_game_ready_with_chargen(
+            session_name, rng_log, role
         )
 
         # Capture startup state (after chargen)
         startup_screen = capture_screen_compressed(session_name)
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
-        startup_rng_entries = parse_rng_lines(startup_rng_lines[:prev_rng_count])
+        startup_rng_entries = parse_rng_lines(chargen_rng_lines)
 
         print(f'\nChargen complete: {len(chargen_steps)} steps, {prev_rng_count} RNG calls')
 
@@ -309,8 +310,7 @@ def generate_trace(seed, max_turns=100, role='Valkyrie'):
 
             # Capture state after move
             screen = capture_screen_compressed(session_name)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
+            rng_count, delta_lines = rng_log.read()
             rng_entries = parse_rng_lines(delta_lines)
 
             # Detect depth
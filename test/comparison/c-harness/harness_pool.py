@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Persistent pool of warm C-harness workers for bulk recording jobs.
+
+Usage:
+    python3 harness_pool.py serve [--workers N] [--socket PATH]
+    python3 harness_pool.py submit [--socket PATH] < jobs.jsonl
+
+Each worker process is set up once: it imports run_session.py, builds a
+private install sandbox (run_session.make_install_sandbox) and starts its
+own tmux server, kept alive by an idle session.  Every job reuses all of
+that, so the per-job overhead is a state reset rather than interpreter
+start-up, install cleanup and a fresh tmux server.
+
+A job is one JSON object:
+    {"kind": "record", "env": {...}, "nethackrc": "...", "keys": [...],
+     "output": "out.session.json", ...record_c_session options}
+    {"kind": "probe", "env": {...}, "nethackrc": "..."}
+    {"kind": "argv", "argv": ["env", "K=V", "python3", "run_session.py", ...]}
+"argv" jobs run a recorder script in the worker process (the command
+lists built by rerecord.py are accepted as-is).  An optional "id" is
+echoed back.  Each result is {"id": ..., "ok": bool, "result": ...} or
+{"id": ..., "ok": false, "error": "..."}.
+
+From Python:
+    with HarnessPool(workers=8) as pool:
+        for result in pool.run(jobs):
+            ...
+"""
+
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import runpy
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.connection import Client, Listener
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_SOCKET = os.path.join(tempfile.gettempdir(), f'nh-harness-pool-{os.getuid()}.sock')
+IDLE_SESSION = 'nh-pool-idle'
+
+# record_c_session() keyword options accepted in "record" jobs.
+_RECORD_OPTIONS = (
+    'key_delay_s', 'key_delay_overrides', 'final_capture_delay_s',
+    'regen_metadata', 'session_type', 'verbose',
+)
+
+# run_session module for this worker, set by _init_worker().
+_harness = None
+
+
+def _load_run_session():
+    spec = importlib.util.spec_from_file_location('run_session', os.path.join(SCRIPT_DIR, 'run_session.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _init_worker(pool_root):
+    """Pool initializer: sandbox, private tmux server, warm imports."""
+    global _harness
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    _harness = _load_run_session()
+    worker_root = os.path.join(pool_root, f'worker-{os.getpid()}')
+    _harness.use_install_sandbox(*_harness.make_install_sandbox(worker_root))
+    # TMUX_TMPDIR selects the server socket for every tmux call made by
+    # this worker and its children; the idle session keeps it running.
+    tmux_dir = os.path.join(worker_root, 'tmux')
+    os.makedirs(tmux_dir, exist_ok=True)
+    os.environ['TMUX_TMPDIR'] = tmux_dir
+    os.environ.pop('TMUX', None)
+    subprocess.run(['tmux', 'new-session', '-d', '-s', IDLE_SESSION, 'cat'], check=True)
+
+
+def _kill_tmux_servers(pool_root):
+    env = {k: v for k, v in os.environ.items() if k != 'TMUX'}
+    for tmux_dir in glob.glob(os.path.join(pool_root, 'worker-*', 'tmux')):
+        subprocess.run(['tmux', 'kill-server'], capture_output=True, check=False,
+                       env=dict(env, TMUX_TMPDIR=tmux_dir))
+
+
+def split_command(argv):
+    """Split ['env', 'K=V', ..., 'python3', 'script.py', ...] into parts.
+
+    Returns (env_overrides, script_path, script_args).
+    """
+    rest = list(argv)
+    env = {}
+    if rest and rest[0] == 'env':
+        rest.pop(0)
+        while rest and '=' in rest[0] and not rest[0].startswith('-'):
+            key, value = rest.pop(0).split('=', 1)
+            env[key] = value
+    if rest and os.path.basename(rest[0]).startswith('python'):
+        rest.pop(0)
+    if not rest or not rest[0].endswith('.py'):
+        raise ValueError(f'not a python recorder command: {argv!r}')
+    script = rest[0]
+    if not os.path.isabs(script):
+        script = os.path.join(SCRIPT_DIR, script)
+    return env, script, rest[1:]
+
+
+def _run_script(argv):
+    """Run a recorder script as __main__ in this process; return its exit code."""
+    env, script, args = split_command(argv)
+    saved_env = dict(os.environ)
+    saved_argv = sys.argv
+    saved_cwd = os.getcwd()
+    os.environ.update(env)
+    sys.argv = [script] + args
+    os.chdir(SCRIPT_DIR)
+    try:
+        runpy.run_path(script, run_name='__main__')
+        return 0
+    except SystemExit as e:
+        if e.code is None:
+            return 0
+        return e.code if isinstance(e.code, int) else 1
+    finally:
+        os.chdir(saved_cwd)
+        sys.argv = saved_argv
+        os.environ.clear()
+        os.environ.update(saved_env)
+
+
+def _run_job(job):
+    """Execute one job in a warm worker."""
+    kind = job.get('kind')
+    job_id = job.get('id')
+    try:
+        _harness.clear_install_runtime_state()
+        if kind == 'record':
+            options = {k: job[k] for k in _RECORD_OPTIONS if k in job}
+            data = _harness.record_c_session(
+                job.get('env', {}), job['nethackrc'], job['keys'], job['output'], **options)
+            result = {'output': os.path.abspath(job['output']), 'steps': len(data['steps'])}
+        elif kind == 'probe':
+            result = _harness.probe_startup_keys(
+                job.get('env', {}), job['nethackrc'], job.get('max_keys', 20))
+        elif kind == 'argv':
+            code = _run_script(job['argv'])
+            if code != 0:
+                return {'id': job_id, 'ok': False, 'error': f'exit {code}'}
+            result = code
+        elif kind == 'ping':
+            result = os.getpid()
+        else:
+            raise ValueError(f'unknown job kind: {kind!r}')
+    except (Exception, SystemExit) as e:
+        return {'id': job_id, 'ok': False, 'error': f'{type(e).__name__}: {e}'}
+    return {'id': job_id, 'ok': True, 'result': result}
+
+
+class HarnessPool:
+    """A fixed set of warm harness workers.  Use as a context manager."""
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 4
+        self._root = None
+        self._executor = None
+
+    def start(self):
+        self._root = tempfile.mkdtemp(prefix='nh-harness-pool-')
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(self._root,))
+        # One concurrent ping per worker forces every process to start (and
+        # pay its setup cost) now rather than on the first real jobs.
+        pings = [self._executor.submit(_run_job, {'kind': 'ping'}) for _ in range(self.workers)]
+        for future in pings:
+            future.result()
+        return self
+
+    def submit(self, job):
+        """Queue a job; returns a Future resolving to its result dict."""
+        return self._executor.submit(_run_job, job)
+
+    def run(self, jobs):
+        """Run jobs and yield result dicts in completion order."""
+        futures = {self.submit(job): job for job in jobs}
+        for future in as_completed(futures):
+            yield _job_result(future, futures[future])
+
+    def close(self):
+        try:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+        finally:
+            self._executor = None
+            if self._root is not None:
+                _kill_tmux_servers(self._root)
+                shutil.rmtree(self._root, ignore_errors=True)
+                self._root = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _job_result(future, job):
+    """Result dict for a finished job future, even if the worker died."""
+    try:
+        return future.result()
+    except Exception as e:
+        job_id = job.get('id') if isinstance(job, dict) else None
+        return {'id': job_id, 'ok': False, 'error': f'{type(e).__name__}: {e}'}
+
+
+def _serve_connection(pool, conn):
+    """Receive jobs until a None sentinel, then stream back every result.
+
+    Results are sent from this thread as jobs finish, and the None sentinel
+    only after the last of them, so a client reading until the sentinel
+    never misses a result or waits on a job that failed.
+    """
+    pending = {}
+    try:
+        while True:
+            job = conn.recv()
+            if job is None:
+                break
+            pending[pool.submit(job)] = job
+        for future in as_completed(pending):
+            conn.send(_job_result(future, pending[future]))
+        conn.send(None)
+    except (EOFError, OSError):
+        for future in pending:
+            future.cancel()
+    finally:
+        conn.close()
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def serve(socket_path, workers):
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    with HarnessPool(workers) as pool:
+        # Shut down cleanly (tmux servers, sandboxes) on kill as well as
+        # Ctrl-C; workers are already running and keep the default handler.
+        signal.signal(signal.SIGTERM, _raise_interrupt)
+        listener = Listener(socket_path, family='AF_UNIX')
+        print(f'harness pool: {pool.workers} worker(s) ready on {socket_path}', flush=True)
+        try:
+            while True:
+                conn = listener.accept()
+                threading.Thread(target=_serve_connection, args=(pool, conn), daemon=True).start()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+
+
+def submit(socket_path, jobs):
+    """Send jobs to a running pool; yield result dicts as they finish."""
+    conn = Client(socket_path, family='AF_UNIX')
+    try:
+        for job in jobs:
+            conn.send(job)
+        conn.send(None)
+        while True:
+            result = conn.recv()
+            if result is None:
+                break
+            yield result
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Warm C-harness worker pool')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help='Start the pool and accept jobs on a socket')
+    serve_parser.add_argument('--workers', type=int, default=None,
+                              help='Worker count (default: one per CPU core)')
+    serve_parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    submit_parser = sub.add_parser('submit', help='Send JSONL jobs from stdin to a running pool')
+    submit_parser.add_argument('--socket', default=DEFAULT_SOCKET)
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        serve(args.socket, args.workers)
+        return
+
+    jobs = [json.loads(line) for line in sys.stdin if line.strip()]
+    failures = 0
+    for result in submit(args.socket, jobs):
+        print(json.dumps(result), flush=True)
+        if not result.get('ok'):
+            failures += 1
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -24,8 +24,10 @@ import shutil
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
-RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
-INSTALL_DIR = os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir')
+# Overridden per worker by rerecord.py --parallel (see run_session.make_install_sandbox)
+RESULTS_DIR = os.environ.get('NETHACK_HARNESS_HOME') or os.path.join(SCRIPT_DIR, 'results')
+INSTALL_DIR = (os.environ.get('NETHACK_HARNESS_INSTALL_DIR')
+               or os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir'))
 NETHACK_BINARY = os.path.join(INSTALL_DIR, 'nethack')
 
 
@@ -58,7 +60,7 @@ capture_screen_compressed = _session.capture_screen_compressed
 screen_to_plain_lines = _session.screen_to_plain_lines
 clear_more_prompts = _session.clear_more_prompts
 wait_for_game_ready = _session.wait_for_game_ready
-read_rng_log = _session.read_rng_log
+RngLogTail = _session.RngLogTail
 parse_rng_lines = _session.parse_rng_lines
 quit_game = _session.quit_game
 compact_session_json = _session.compact_session_json
@@ -516,7 +518,8 @@ def run_from_keylog(
         startup_screen = capture_screen_v3(session_name)
         startup_screen_lines = screen_to_plain_lines(startup_screen)
         startup_cursor = capture_cursor(session_name)
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
+        rng_log = RngLogTail(rng_log_file)
+        startup_rng_count, startup_rng_lines = rng_log.read()
         startup_rng_entries = parse_rng_lines(startup_rng_lines)
         startup_actual_rng = sum(1 for e in startup_rng_entries if e[0] not in ('>', '<'))
         if not replay_startup_from_keylog:
@@ -578,7 +581,6 @@ def run_from_keylog(
                 session_data['regen'] = dict(session_data['regen'])
                 session_data['regen']['env'] = session_env
 
-        prev_rng_count = startup_rng_count
         prev_depth_recorded = None  # Record depth only when it changes
         warned_tutorial_dnum_lag = False
 
@@ -599,8 +601,7 @@ def run_from_keylog(
 
             screen = capture_screen_v3(session_name)
             screen_lines = screen_to_plain_lines(screen)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
+            rng_count, delta_lines = rng_log.read()
             rng_entries = parse_rng_lines(delta_lines)
 
             depth = detect_screen_depth(screen_lines)
@@ -641,7 +642,6 @@ def run_from_keylog(
                 }
 
             session_data['steps'].append(step)
-            prev_rng_count = rng_count
             if (i + 1) % 200 == 0:
                 print(f'  replayed {i + 1}/{len(events)} events')
 
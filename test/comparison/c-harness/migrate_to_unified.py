@@ -16,7 +16,6 @@ Usage:
 
 import sys
 import os
-import json
 import tempfile
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -28,6 +27,7 @@ from run_session import (
     record_c_session, probe_startup_keys, compact_session_json,
     parse_moves, _parse_name_from_nethackrc, _has_wizard_directive,
 )
+from session_stream import SessionStream
 
 
 def ensure_tutorial_in_nethackrc(nethackrc):
@@ -45,9 +45,9 @@ def ensure_tutorial_in_nethackrc(nethackrc):
 
 
 def extract_gameplay_keys(session):
-    """Extract the gameplay key sequence from a session's steps."""
+    """Extract the gameplay key sequence from a SessionStream's steps."""
     keys = []
-    for step in session.get('steps', []):
+    for step in session.steps(('key',)):
         if step.get('key') is not None:
             keys.append(step['key'])
     return keys
@@ -68,8 +68,13 @@ def extract_keys_from_regen(session):
 
 def analyze_session(session_path):
     """Analyze a session and determine migration plan."""
-    with open(session_path) as f:
-        session = json.load(f)
+    # Only the header, the key stream and step 0's screen are needed; the
+    # RNG logs and other screens are never decoded.
+    with SessionStream(session_path) as stream:
+        session = stream.header(('type', 'nethackrc', 'env', 'regen', 'seed', 'levels'))
+        step_keys = extract_gameplay_keys(stream)
+        step_count = len(stream)
+        step0_screen = stream.step(0, ('screen',)).get('screen', '') if step_count else ''
 
     name = os.path.basename(session_path)
     stype = session.get('type') or session.get('regen', {}).get('mode', 'unknown')
@@ -78,7 +83,6 @@ def analyze_session(session_path):
     regen = session.get('regen', {})
 
     # Determine existing keys
-    step_keys = extract_gameplay_keys(session)
     regen_keys = extract_keys_from_regen(session)
 
     # Check nethackrc state
@@ -98,8 +102,9 @@ def analyze_session(session_path):
         'has_tutorial': has_tutorial,
         'has_role': has_role,
         'has_wizard': has_wizard,
-        'steps': len(session.get('steps', [])),
+        'steps': step_count,
         'session': session,
+        'step0_screen': step0_screen,
     }
 
 
@@ -111,8 +116,7 @@ def migrate_session(info, dry_run=False, probe_only=False):
     nethackrc = info['nethackrc']
 
     # Skip already-migrated sessions (step 0 has lore or chargen text)
-    session = info['session']
-    step0_screen = (session.get('steps', [{}])[0].get('screen', '') or '').replace('\x1b', '')
+    step0_screen = (info['step0_screen'] or '').replace('\x1b', '')
     if 'It is written' in step0_screen or 'Shall I pick' in step0_screen:
         return None  # already unified
 
@@ -45,6 +45,10 @@ import re
 from collections import deque
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+import tmux_driver
+from tmux_driver import tmux_capture
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
 INSTALL_DIR = os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir')
 NETHACK_BINARY = os.path.join(INSTALL_DIR, 'nethack')
@@ -105,21 +109,11 @@ def setup():
 
 
 def tmux_send(session, keys, delay=0.15):
-    subprocess.run(['tmux', 'send-keys', '-t', session, '-l', keys], check=True)
-    time.sleep(delay)
+    tmux_driver.tmux_send(session, keys, delay)
 
 
 def tmux_send_special(session, key, delay=0.15):
-    subprocess.run(['tmux', 'send-keys', '-t', session, key], check=True)
-    time.sleep(delay)
-
-
-def tmux_capture(session):
-    r = subprocess.run(
-        ['tmux', 'capture-pane', '-t', session, '-p', '-S', '0', '-E', '30'],
-        capture_output=True, text=True, check=True
-    )
-    return r.stdout
+    tmux_driver.tmux_send_special(session, key, delay)
 
 
 def clear_prompts(session, max_iter=20):
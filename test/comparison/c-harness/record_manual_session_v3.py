@@ -148,7 +148,7 @@ def run_watcher(args):
 
     capture_screen_compressed = session_mod.capture_screen_compressed
     screen_to_plain_lines = session_mod.screen_to_plain_lines
-    read_rng_log = session_mod.read_rng_log
+    RngLogTail = session_mod.RngLogTail
     parse_rng_lines = session_mod.parse_rng_lines
     detect_depth = session_mod.detect_depth
     compact_session_json = session_mod.compact_session_json
@@ -190,10 +190,10 @@ def run_watcher(args):
             break
         time.sleep(0.05)
 
-    startup_rng_count = 0
+    rng_log = RngLogTail(rnglog)
     try:
         startup_screen = capture_screen_compressed(session_name)
-        startup_rng_count, startup_rng_lines = read_rng_log(rnglog)
+        _, startup_rng_lines = rng_log.read()
         session_data["steps"].append(
             {
                 "key": None,
@@ -207,7 +207,6 @@ def run_watcher(args):
 
     seen = set()
     keylog_moves_base = None
-    rng_count = startup_rng_count
     last_flush = 0.0
 
     while tmux_has_session(session_name):
@@ -236,9 +235,8 @@ def run_watcher(args):
             try:
                 screen = capture_screen_compressed(session_name)
                 lines = screen_to_plain_lines(screen)
-                cur_rng_count, cur_rng_lines = read_rng_log(rnglog)
-                delta = parse_rng_lines(cur_rng_lines[rng_count:cur_rng_count])
-                rng_count = cur_rng_count
+                _, delta_lines = rng_log.read()
+                delta = parse_rng_lines(delta_lines)
                 turn = max(0, int(e.get("moves", 0)) - int(keylog_moves_base or 0))
                 session_data["steps"].append(
                     {
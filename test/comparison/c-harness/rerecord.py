@@ -6,24 +6,34 @@ Usage:
     python3 rerecord.py --all
     python3 rerecord.py --type gameplay
     python3 rerecord.py --dry-run ...       # show commands without executing
-    python3 rerecord.py --parallel ...      # run up to N in parallel (default 4)
+    python3 rerecord.py --parallel ...      # one worker per CPU core
     python3 rerecord.py --parallel 8 ...    # run up to 8 in parallel
+    python3 rerecord.py --check-parallel ...  # record serially and in parallel, compare
 
 Reads the `regen` metadata from each session JSON and dispatches the
 appropriate recording command (run_session.py, gen_option_sessions.py,
 gen_interface_sessions.py, gen_discoveries_session.py, or
 keylog_to_session.py).
+
+Parallel runs use a warm worker pool (harness_pool.py).  Each worker records
+into a private copy of the C install tree with its own HOME, save dir, score
+files and tmux server (run_session.make_install_sandbox), so one worker's
+cleanup never deletes another's game state.
+--check-parallel re-records copies of the selected sessions both ways and
+fails unless every parallel recording is byte-identical to the serial one.
 """
 
 import argparse
+import filecmp
 import glob
 import json
 import os
 import re
 import shlex
+import shutil
 import subprocess
 import sys
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import tempfile
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
@@ -64,12 +74,12 @@ _ENV_KEY_RE = re.compile(r'^[A-Z_][A-Z0-9_]*$')
 _ALLOWED_REGEN_ENV_PREFIXES = ('NETHACK_', 'WEBHACK_')
 
 
-def clear_runtime_state():
+def clear_runtime_state(install_dir=INSTALL_DIR):
     """Clear runtime artifacts that can skew deterministic re-recording."""
-    if not os.path.isdir(INSTALL_DIR):
+    if not os.path.isdir(install_dir):
         return
 
-    save_dir = os.path.join(INSTALL_DIR, 'save')
+    save_dir = os.path.join(install_dir, 'save')
     if os.path.isdir(save_dir):
         for path in glob.glob(os.path.join(save_dir, '*')):
             try:
@@ -78,7 +88,7 @@ def clear_runtime_state():
                 pass
 
     explicit_runtime_files = {'record', 'xlogfile', 'logfile', 'paniclog'}
-    for path in glob.glob(os.path.join(INSTALL_DIR, '*')):
+    for path in glob.glob(os.path.join(install_dir, '*')):
         if not os.path.isfile(path):
             continue
         name = os.path.basename(path)
@@ -618,12 +628,70 @@ def shell_quote_cmd(cmd):
     return ' '.join(shlex.quote(arg) for arg in cmd)
 
 
-def _run_one(args_tuple):
-    """Worker for parallel execution."""
-    cmd, description = args_tuple
-    clear_runtime_state()
-    result = subprocess.run(cmd, cwd=SCRIPT_DIR)
-    return result.returncode == 0, description
+def run_parallel(commands, workers):
+    """Run (cmd, description) pairs on a pool of `workers` warm harness workers.
+
+    Each worker records in its own install sandbox with its own tmux server
+    (see harness_pool.py), so workers never touch each other's game files.
+    Returns (successes, failures) where failures lists descriptions.
+    """
+    from harness_pool import HarnessPool
+
+    successes = 0
+    failures = []
+    jobs = [{'kind': 'argv', 'argv': cmd, 'id': desc} for cmd, desc in commands]
+    with HarnessPool(workers) as pool:
+        for result in pool.run(jobs):
+            desc = result['id']
+            if result['ok']:
+                successes += 1
+                print(f'  OK: {desc}')
+            else:
+                failures.append(desc)
+                print(f'  FAILED ({result.get("error")}): {desc}')
+    return successes, failures
+
+
+def check_parallel(session_files, workers):
+    """Re-record copies of `session_files` serially and in parallel.
+
+    Returns a list of basenames whose parallel recording differs from (or
+    failed where) the serial one.  The serial pass uses the shared install,
+    exactly like a plain `rerecord.py` run.
+    """
+    work_root = tempfile.mkdtemp(prefix='nh-rerecord-check-')
+    try:
+        out_dirs = {}
+        for label in ('serial', 'parallel'):
+            out_dir = os.path.join(work_root, label)
+            os.makedirs(out_dir)
+            out_dirs[label] = out_dir
+            commands = []
+            for path in session_files:
+                copy_path = os.path.join(out_dir, os.path.basename(path))
+                shutil.copyfile(path, copy_path)
+                with open(copy_path) as f:
+                    data = json.load(f)
+                cmd, description = build_command(copy_path, data)
+                if cmd is not None:
+                    commands.append((cmd, f'{os.path.basename(path)}: {description}'))
+            print(f'\n=== {label} pass: {len(commands)} session(s) ===')
+            if label == 'serial':
+                for cmd, description in commands:
+                    run_command(cmd, description)
+            else:
+                run_parallel(commands, workers)
+
+        mismatches = []
+        for path in session_files:
+            name = os.path.basename(path)
+            serial_path = os.path.join(out_dirs['serial'], name)
+            parallel_path = os.path.join(out_dirs['parallel'], name)
+            if not filecmp.cmp(serial_path, parallel_path, shallow=False):
+                mismatches.append(name)
+        return mismatches
+    finally:
+        shutil.rmtree(work_root, ignore_errors=True)
 
 
 def main():
@@ -633,8 +701,10 @@ def main():
     parser.add_argument('--type', dest='filter_type', help='Only re-record sessions with this regen.mode')
     parser.add_argument('--dry-run', action='store_true', help='Show commands without executing')
     # --record-more-spaces removed: sessions should use exact keys
-    parser.add_argument('--parallel', nargs='?', const=4, type=int, default=None,
-                        help='Run up to N sessions in parallel (default 4)')
+    parser.add_argument('--parallel', nargs='?', const=os.cpu_count() or 4, type=int, default=None,
+                        help='Run up to N sessions in parallel (default: one per CPU core)')
+    parser.add_argument('--check-parallel', action='store_true',
+                        help='Record copies serially and in parallel; fail unless byte-identical')
     args = parser.parse_args()
 
     if not args.sessions and not args.all and not args.filter_type:
@@ -649,6 +719,7 @@ def main():
 
     # Build commands
     commands = []
+    selected = []
     skipped = 0
     warnings = []
     for path in session_files:
@@ -676,6 +747,7 @@ def main():
             continue
 
         commands.append((cmd, f'{os.path.basename(path)}: {description}'))
+        selected.append(path)
 
     # Print warnings
     if warnings:
@@ -688,23 +760,25 @@ def main():
         print('No sessions to re-record.')
         return
 
+    if args.check_parallel:
+        workers = args.parallel or os.cpu_count() or 4
+        checked = selected
+        print(f'Checking {len(checked)} session(s): serial vs {workers} parallel workers\n')
+        mismatches = check_parallel(checked, workers)
+        if mismatches:
+            print(f'\nParallel recordings differ from serial for {len(mismatches)} session(s):')
+            for name in mismatches:
+                print(f'  {name}')
+            sys.exit(1)
+        print(f'\nAll {len(checked)} parallel recording(s) byte-identical to serial')
+        return
+
     print(f'Re-recording {len(commands)} session(s)...\n')
 
     # Execute
     if args.parallel and not args.dry_run:
-        successes = 0
-        failures = []
         print(f'Running with up to {args.parallel} parallel workers\n')
-        with ProcessPoolExecutor(max_workers=args.parallel) as executor:
-            futures = {executor.submit(_run_one, (cmd, desc)): desc for cmd, desc in commands}
-            for future in as_completed(futures):
-                ok, desc = future.result()
-                if ok:
-                    successes += 1
-                    print(f'  OK: {desc}')
-                else:
-                    failures.append(desc)
-                    print(f'  FAILED: {desc}')
+        successes, failures = run_parallel(commands, args.parallel)
         print(f'\nDone: {successes} succeeded, {len(failures)} failed')
         if failures:
             print('Failed:')
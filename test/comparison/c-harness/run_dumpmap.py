@@ -26,6 +26,9 @@ import time
 import subprocess
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+import tmux_driver
 PROJECT_ROOT = os.path.abspath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
 RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
 DEFAULT_FIXED_DATETIME = '20000110090000'
@@ -56,21 +59,15 @@ def has_calendar_luck_warning(content):
 
 def tmux_send(session, keys, delay=0.1):
     """Send literal keys to a tmux session and wait."""
-    subprocess.run(['tmux', 'send-keys', '-t', session, '-l', keys], check=True)
-    time.sleep(delay)
+    tmux_driver.tmux_send(session, keys, delay)
 
 def tmux_send_special(session, key, delay=0.1):
     """Send a special key (Enter, Space, etc.) to a tmux session."""
-    subprocess.run(['tmux', 'send-keys', '-t', session, key], check=True)
-    time.sleep(delay)
+    tmux_driver.tmux_send_special(session, key, delay)
 
 def tmux_capture(session):
     """Capture the current tmux pane content."""
-    result = subprocess.run(
-        ['tmux', 'capture-pane', '-t', session, '-p'],
-        capture_output=True, text=True, check=True
-    )
-    return result.stdout
+    return tmux_driver.tmux_capture(session, start=None, end=None)
 
 def setup_home(role='Valkyrie', race='human', gender='female', align='neutral'):
     """Create HOME/.nethackrc for deterministic play.
@@ -111,7 +108,7 @@ def wait_for_game_ready(session, verbose):
     for attempt in range(40):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, tmux_driver.TmuxError):
             if verbose: print(f'[{attempt}] tmux session died')
             break
 
@@ -196,7 +193,7 @@ def wizard_level_teleport(session, target_depth, verbose):
     for attempt in range(20):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, tmux_driver.TmuxError):
             break
 
         if verbose: print(f'[teleport-{attempt}] checking for prompt...')
@@ -218,7 +215,7 @@ def wizard_level_teleport(session, target_depth, verbose):
     for attempt in range(30):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, tmux_driver.TmuxError):
             break
 
         if verbose: print(f'[teleport-wait-{attempt}] looking for {target_str}')
@@ -249,7 +246,7 @@ def execute_dumpmap(session):
     for _ in range(5):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, tmux_driver.TmuxError):
             break
         if '--More--' in content:
             tmux_send_special(session, 'Space', 0.1)
@@ -270,7 +267,7 @@ def quit_game(session):
     for _ in range(15):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, tmux_driver.TmuxError):
             break
         if 'Really quit' in content or 'really quit' in content:
             tmux_send(session, 'y', 0.1)
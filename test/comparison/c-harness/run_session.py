@@ -4,7 +4,7 @@
 Usage:
     # Gameplay session
     python3 run_session.py <seed> <output_json> [move_sequence]
-    python3 run_session.py --from-config
+    python3 run_session.py --from-config [--parallel [N]]
 
     # Special level session (via #wizloaddes)
     python3 run_session.py <seed> <output_json> --wizload <level_name> [move_sequence]
@@ -59,10 +59,20 @@ import tempfile
 import platform
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+from screen_delta import encode_screen_deltas, keyframe_every_from_env
+from tmux_driver import TmuxError, capture_cursor, capture_screen_and_cursor, tmux_send, tmux_send_special
+from tmux_driver import tmux_capture as _tmux_capture_pane
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
-RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
 SESSIONS_DIR = os.path.join(PROJECT_ROOT, 'test', 'comparison', 'sessions')
-INSTALL_DIR = os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir')
+SHARED_INSTALL_DIR = os.path.join(PROJECT_ROOT, 'nethack-c', 'install', 'games', 'lib', 'nethackdir')
+# Parallel recording points each worker at its own install sandbox and HOME
+# (see make_install_sandbox()); unset, everything uses the shared install.
+SANDBOX_INSTALL_ENV = 'NETHACK_HARNESS_INSTALL_DIR'
+SANDBOX_HOME_ENV = 'NETHACK_HARNESS_HOME'
+RESULTS_DIR = os.environ.get(SANDBOX_HOME_ENV) or os.path.join(SCRIPT_DIR, 'results')
+INSTALL_DIR = os.environ.get(SANDBOX_INSTALL_ENV) or SHARED_INSTALL_DIR
 NETHACK_BINARY = os.path.join(INSTALL_DIR, 'nethack')
 UNIX_SYSCONF_SOURCE = os.path.join(PROJECT_ROOT, 'nethack-c', 'patched', 'sys', 'unix', 'sysconf')
 LIBNH_SYSCONF_SOURCE = os.path.join(PROJECT_ROOT, 'nethack-c', 'patched', 'sys', 'libnh', 'sysconf')
@@ -320,6 +330,9 @@ _PASSTHROUGH_ENV_SKIP_KEYS = (
     'WEBHACK_RNGLOG_DISP',
     'NETHACK_COSMIC_DISPLAY_LOGS',
     'WEBHACK_COSMIC_DISPLAY_LOGS',
+    'NETHACK_STEP_SYNC',
+    'WEBHACK_STEP_SYNC',
+    'NETHACK_INPUT_SYNC',
 )
 
 
@@ -410,29 +423,14 @@ def has_calendar_luck_warning(content):
     )
 
 
-def tmux_send(session, keys, delay=0):
-    # tmux drops a standalone ';' token as a command separator (tmux issue #1849).
-    # Use paste-buffer to send any string containing semicolons reliably.
-    if ';' in keys:
-        subprocess.run(['tmux', 'load-buffer', '-'], input=keys.encode(), check=True)
-        subprocess.run(['tmux', 'paste-buffer', '-t', session, '-d'], check=True)
-    else:
-        subprocess.run(['tmux', 'send-keys', '-t', session, '-l', keys], check=True)
-    if delay > 0:
-        time.sleep(delay)
-
-def tmux_send_special(session, key, delay=0):
-    subprocess.run(['tmux', 'send-keys', '-t', session, key], check=True)
-    if delay > 0:
-        time.sleep(delay)
+# tmux_send / tmux_send_special / capture_cursor come from tmux_driver, which
+# keeps one control-mode connection per session instead of a tmux process
+# per call.
 
 def tmux_capture(session):
-    result = subprocess.run(
-        ['tmux', 'capture-pane', '-t', session, '-p', '-S', '0', '-E', '30'],
-        capture_output=True, text=True, check=True
-    )
-    _raise_on_dump_error(result.stdout)
-    return result.stdout
+    content = _tmux_capture_pane(session)
+    _raise_on_dump_error(content)
+    return content
 
 
 def _raise_on_dump_error(output_text):
@@ -447,10 +445,11 @@ def _raise_on_dump_error(output_text):
         )
 
 
-def ensure_install_sysconf():
+def ensure_install_sysconf(install_dir=None):
     """Ensure install sysconf exists and has harness-safe defaults."""
-    target = os.path.join(INSTALL_DIR, 'sysconf')
-    if not os.path.isdir(INSTALL_DIR):
+    install_dir = install_dir or INSTALL_DIR
+    target = os.path.join(install_dir, 'sysconf')
+    if not os.path.isdir(install_dir):
         return
 
     if not os.path.exists(target):
@@ -542,17 +541,114 @@ def setup_home(character=None, chargen_in_keys=False, nethackrc_contents=None):
     ensure_canonical_scorefiles()
 
 
-def ensure_canonical_scorefiles():
+def ensure_canonical_scorefiles(install_dir=None):
     """Create empty canonical score files expected by C end-of-game flow."""
     for score_file in ('record', 'xlogfile', 'logfile'):
-        score_path = os.path.join(INSTALL_DIR, score_file)
+        score_path = os.path.join(install_dir or INSTALL_DIR, score_file)
         os.makedirs(os.path.dirname(score_path), exist_ok=True)
         with open(score_path, 'a', encoding='utf-8'):
             pass
 
 
+_RUNTIME_STATE_FILES = {'record', 'xlogfile', 'logfile', 'paniclog', 'livelog'}
+
+
+def is_runtime_state_file(name):
+    """Return True for install-dir files a game run creates or appends to.
+
+    Covers score logs, bones, and per-player lock/level files; these are
+    what recorders delete between runs and what a sandbox must not share.
+    """
+    lower = name.lower()
+    if lower.endswith('.lua'):
+        return False
+    return (
+        lower in _RUNTIME_STATE_FILES
+        or lower.startswith('bon')
+        or lower.endswith('.0')
+        or 'wizard' in lower
+        or 'recorder' in lower
+        or 'agent' in lower
+    )
+
+
+def clear_install_runtime_state(install_dir=None):
+    """Delete save files and runtime state, then recreate empty score files."""
+    install_dir = install_dir or INSTALL_DIR
+    if not os.path.isdir(install_dir):
+        return
+    save_dir = os.path.join(install_dir, 'save')
+    for name in os.listdir(save_dir) if os.path.isdir(save_dir) else ():
+        try:
+            os.unlink(os.path.join(save_dir, name))
+        except (FileNotFoundError, IsADirectoryError):
+            pass
+    for name in os.listdir(install_dir):
+        path = os.path.join(install_dir, name)
+        if os.path.isfile(path) and is_runtime_state_file(name):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+    ensure_canonical_scorefiles(install_dir)
+
+
+def make_install_sandbox(root, source_dir=SHARED_INSTALL_DIR):
+    """Create a private copy of the C install tree under `root`.
+
+    Returns (install_dir, home_dir).  The game binary is symlinked (it is
+    never written); data files, sysconf and subdirectories are copied, and
+    runtime state (save files, bones, locks, score logs) starts empty, so
+    the cleanup done by setup_home() and friends only touches this copy.
+    Recordings made in a sandbox are identical to ones made in the shared
+    install after its runtime state has been cleared.
+    """
+    install_dir = os.path.join(root, 'nethackdir')
+    home_dir = os.path.join(root, 'home')
+    os.makedirs(install_dir, exist_ok=True)
+    os.makedirs(home_dir, exist_ok=True)
+    names = sorted(os.listdir(source_dir)) if os.path.isdir(source_dir) else []
+    for name in names:
+        src = os.path.join(source_dir, name)
+        dst = os.path.join(install_dir, name)
+        if os.path.lexists(dst):
+            continue
+        if name == 'nethack':
+            os.symlink(os.path.realpath(src), dst)
+        elif name == 'save':
+            os.makedirs(dst)
+        elif os.path.isdir(src):
+            shutil.copytree(src, dst, symlinks=True)
+        elif not is_runtime_state_file(name):
+            shutil.copy2(src, dst)
+    ensure_install_sysconf(install_dir)
+    ensure_canonical_scorefiles(install_dir)
+    return install_dir, home_dir
+
+
+def sandbox_env(install_dir, home_dir, base_env=None):
+    """Return an environment that points child recorders at a sandbox."""
+    env = dict(os.environ if base_env is None else base_env)
+    env[SANDBOX_INSTALL_ENV] = install_dir
+    env[SANDBOX_HOME_ENV] = home_dir
+    return env
+
+
+def use_install_sandbox(install_dir, home_dir):
+    """Point this process's recorders at a sandbox created by make_install_sandbox()."""
+    global INSTALL_DIR, RESULTS_DIR, NETHACK_BINARY
+    INSTALL_DIR = install_dir
+    RESULTS_DIR = home_dir
+    NETHACK_BINARY = os.path.join(install_dir, 'nethack')
+    os.environ.update(sandbox_env(install_dir, home_dir, base_env={}))
+
+
 def read_rng_log(rng_log_file):
-    """Read the RNG log file and return (count, lines)."""
+    """Read the RNG log file and return (count, lines).
+
+    Re-reads the whole file on every call; recorders that poll the log once
+    per key should use RngLogTail instead.
+    """
     try:
         with open(rng_log_file) as f:
             lines = f.readlines()
@@ -561,6 +657,104 @@ def read_rng_log(rng_log_file):
         return 0, []
 
 
+_RNG_CALL_NUM_RE = re.compile(rb'^\s*(\d+)\s+')
+
+
+class RngLogTail:
+    """Incremental follower for a growing NETHACK_RNGLOG file.
+
+    Remembers the byte offset already consumed, so each read() only touches
+    bytes appended since the previous one and per-step cost stays constant
+    however long the session runs.  A trailing partial line (the C side is
+    mid-write) is held back until its newline arrives.
+
+    Attributes:
+        count: number of complete lines consumed so far (same numbering as
+            len(read_rng_log(path)[1]) once the writer is idle).
+        last_call: last RNG call number seen (see call_count), or None.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.count = 0
+        self.last_call = None
+        self._partial = b''
+
+    def size(self):
+        """Return the current on-disk size of the log (0 if missing)."""
+        try:
+            return os.stat(self.path).st_size
+        except (FileNotFoundError, TypeError):
+            return 0
+
+    def read(self):
+        """Consume newly appended lines and return (count, new_lines)."""
+        size = self.size()
+        if size < self.offset:
+            # Log was truncated or replaced; start over.
+            self.offset = 0
+            self.count = 0
+            self.last_call = None
+            self._partial = b''
+        if size == self.offset:
+            return self.count, []
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read(size - self.offset)
+        except FileNotFoundError:
+            return self.count, []
+        self.offset += len(data)
+        data = self._partial + data
+        cut = data.rfind(b'\n') + 1
+        self._partial = data[cut:]
+        if not cut:
+            return self.count, []
+        raw_lines = data[:cut].splitlines(keepends=True)
+        for raw in reversed(raw_lines):
+            m = _RNG_CALL_NUM_RE.match(raw)
+            if m:
+                self.last_call = int(m.group(1))
+                break
+        self.count += len(raw_lines)
+        return self.count, [
+            raw.decode('utf-8', errors='replace') for raw in raw_lines
+        ]
+
+    def call_count(self):
+        """Catch up with the log and return the last RNG call number, or None."""
+        self.read()
+        return self.last_call
+
+    def wait_for_settle(self, poll_s=0.02, stable_polls=3, max_polls=100):
+        """Block until the log stops growing; return True if it settled.
+
+        Only stats the file while polling, so waiting after a level-gen key
+        costs nothing proportional to the size of the log.
+        """
+        prev = self.size()
+        stable = 0
+        for _ in range(max_polls):
+            time.sleep(poll_s)
+            cur = self.size()
+            if cur == prev:
+                stable += 1
+                if stable >= stable_polls:
+                    return True
+            else:
+                stable = 0
+                prev = cur
+        return False
+
+
+def rng_log_tail(rng_log):
+    """Return an RngLogTail for `rng_log` (a path or an existing tail)."""
+    if isinstance(rng_log, RngLogTail):
+        return rng_log
+    return RngLogTail(rng_log)
+
+
 def parse_rng_lines(lines):
     """Convert raw RNG log lines to compact format: 'fn(arg)=result @ source:line'
 
@@ -735,12 +929,13 @@ def capture_screen_ansi_lines(session):
     information.  Trailing default-attr spaces are trimmed by tmux but our
     normalizer pads them back to 80 cols with defaults.
     """
-    result = subprocess.run(
-        ['tmux', 'capture-pane', '-t', session, '-p', '-e', '-S', '0', '-E', '30'],
-        capture_output=True, text=True, check=True
-    )
-    _raise_on_dump_error(result.stdout)
-    lines = result.stdout.split('\n')
+    return _ansi_screen_lines(_tmux_capture_pane(session, escapes=True))
+
+
+def _ansi_screen_lines(content):
+    """24 lines of a `capture-pane -e` capture, with SGR resets normalized."""
+    _raise_on_dump_error(content)
+    lines = content.split('\n')
     lines = [
         line.replace('\x1b[0m\x1b[39m\x1b[49m', '\x1b[0m')
         for line in lines
@@ -771,22 +966,6 @@ def screen_to_plain_lines(screen, rows=24):
     return out
 
 
-def capture_cursor(session):
-    """Return [col, row, visible] cursor position and visibility (0-indexed).
-
-    visible is 1 when the cursor is shown (curs_set >=1), 0 when hidden
-    (curs_set(0)).  Uses tmux's #{cursor_flag} which tracks the terminal's
-    cursor-visible state set by curses curs_set() calls.
-    """
-    out = subprocess.run(
-        ['tmux', 'display-message', '-p', '-t', session,
-         '#{cursor_x},#{cursor_y},#{cursor_flag}'],
-        capture_output=True, text=True, check=True
-    ).stdout.strip()
-    col, row, visible = (int(v) for v in out.split(','))
-    return [col, row, visible]
-
-
 # ---------------------------------------------------------------------------
 # NOMUX: Direct screen capture from C shadow buffer (no tmux needed)
 # ---------------------------------------------------------------------------
@@ -833,6 +1012,206 @@ def capture_screen_compressed_nomux(nomux_file):
     return encode_screen_ansi_rle(lines), cursor
 
 
+# ---------------------------------------------------------------------------
+# Input-wait step synchronization (patch 039-input-wait-sync)
+# ---------------------------------------------------------------------------
+
+STEP_SYNC_TIMEOUT_S = 30.0
+
+
+def step_sync_enabled():
+    """Return True when NETHACK_STEP_SYNC=1 asks for marker-driven steps."""
+    return first_nonempty_env('NETHACK_STEP_SYNC', 'WEBHACK_STEP_SYNC') == '1'
+
+
+class InputWaitSync:
+    """Block until the patched C binary is waiting for input again.
+
+    The binary writes "<n>\\n" to the FIFO named by NETHACK_INPUT_SYNC each
+    time tty_nhgetch() is about to block, after the NOMUX screen file is
+    written.  A step is therefore complete exactly when a marker newer than
+    the one seen before sending the key arrives -- no fixed sleeps.
+
+    The FIFO is opened for reading before the game launches.  Until the
+    game connects, EOF just means "not yet"; after it has connected, EOF
+    means the game exited (e.g. the last key quit), so waits return early.
+
+    `seq` is the latest marker read, not the largest: a game resumed from
+    a fork snapshot (patch 040) counts on from the snapshot's input wait.
+    """
+
+    def __init__(self, fifo_path, screen_file=None):
+        self.path = fifo_path
+        self.screen_file = screen_file
+        self.seq = 0
+        self.connected = False
+        self._buf = b''
+        if not os.path.exists(fifo_path):
+            os.mkfifo(fifo_path)
+        self._fd = os.open(fifo_path, os.O_RDONLY | os.O_NONBLOCK)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def _drain(self):
+        """Read whatever is available; return False once the writer is gone."""
+        while True:
+            try:
+                chunk = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return True
+            if not chunk:
+                return not self.connected
+            self.connected = True
+            self._buf += chunk
+            *complete, self._buf = self._buf.split(b'\n')
+            for raw in complete:
+                if raw.strip().isdigit():
+                    self.seq = int(raw)
+
+    def drain(self):
+        """Consume markers already written; return the latest sequence number."""
+        self._drain()
+        return self.seq
+
+    def expect_writer(self):
+        """Treat EOF as "not connected yet" until a new game opens the FIFO.
+
+        For when the writer is replaced: a fork snapshot (patch 040) does not
+        hold the FIFO open, so after the live game is killed there is no
+        writer until the resumed game reopens it at its next input wait.
+        """
+        self.connected = False
+
+    def wait_keys(self, before_seq, count, timeout_s=STEP_SYNC_TIMEOUT_S):
+        """Wait until `count` keys sent after marker `before_seq` are consumed.
+
+        The game posts one marker per key it reads, so nothing sent (count
+        0) means nothing to wait for: return at once rather than time out.
+        """
+        if count <= 0:
+            return True
+        return self.wait(before_seq + count - 1, timeout_s=timeout_s)
+
+    def wait(self, after_seq=None, timeout_s=STEP_SYNC_TIMEOUT_S):
+        """Wait for a marker newer than `after_seq` (default: current seq).
+
+        Returns True when the game is waiting for input, False on timeout or
+        if the game exited first.
+        """
+        import select
+        target = self.seq if after_seq is None else after_seq
+        deadline = time.monotonic() + timeout_s
+        while True:
+            alive = self._drain()
+            if self.seq > target:
+                return True
+            if not alive:
+                return False
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if not self.connected:
+                # No writer yet: select() would report EOF immediately on
+                # some platforms, so poll at a short interval until launch.
+                time.sleep(min(0.005, remaining))
+                continue
+            select.select([self._fd], [], [], remaining)
+
+
+def open_step_sync(tmpdir, nomux_screen_file, cmd_env=None):
+    """Create an InputWaitSync under `tmpdir` when NETHACK_STEP_SYNC=1.
+
+    Adds NETHACK_INPUT_SYNC and NOMUX_SCREEN_FILE to `cmd_env` (if given):
+    synchronized steps read the screen from the NOMUX shadow buffer, which
+    is written before the marker, instead of racing tmux's pane refresh.
+    Returns None when step sync is off.
+    """
+    if not step_sync_enabled():
+        return None
+    sync = InputWaitSync(os.path.join(tmpdir, 'input_sync.fifo'),
+                         screen_file=nomux_screen_file)
+    if cmd_env is not None:
+        cmd_env['NETHACK_INPUT_SYNC'] = sync.path
+        cmd_env['NOMUX_SCREEN_FILE'] = nomux_screen_file
+    return sync
+
+
+def step_sync_env(sync):
+    """Return the shell env prefix that enables `sync` in the C binary."""
+    if sync is None:
+        return ''
+    return f'NETHACK_INPUT_SYNC={sync.path} NOMUX_SCREEN_FILE={sync.screen_file} '
+
+
+def await_first_input(sync, timeout_s=STEP_SYNC_TIMEOUT_S):
+    """Wait for the game's first input wait; return `sync` or None.
+
+    Falls back to timed capture (None) when no marker arrives, e.g. when the
+    binary was built without patch 039-input-wait-sync.
+    """
+    if sync is None:
+        return None
+    if sync.wait(0, timeout_s=timeout_s):
+        return sync
+    print('WARNING: no input-wait marker from the C binary '
+          '(rebuild with setup.sh for patch 039); using timed steps')
+    sync.close()
+    return None
+
+
+def press_key(session, keys, delay=0, sync=None, special=False):
+    """Send `keys` and return once the game is idle again.
+
+    With an InputWaitSync the call returns when the game blocks for the
+    next key (one marker per literal character sent); otherwise it sleeps
+    `delay` seconds as tmux_send()/tmux_send_special() do.  Synchronized,
+    an empty `keys` returns at once: no key means no marker to wait for.
+    """
+    if not keys and sync is not None:
+        return
+    seq = sync.seq if sync is not None else 0
+    if special:
+        tmux_send_special(session, keys)
+    else:
+        tmux_send(session, keys)
+    if sync is not None:
+        sync.wait_keys(seq, 1 if special else len(keys))
+    elif delay > 0:
+        time.sleep(delay)
+
+
+def read_screen_text(session, sync=None):
+    """Return the current screen as plain text for prompt detection.
+
+    Synchronized sessions read the NOMUX screen file, which is current as
+    of the last input-wait marker; otherwise capture the tmux pane.
+    """
+    if sync is not None and sync.screen_file:
+        lines, _ = capture_screen_nomux(sync.screen_file)
+        if lines is not None:
+            text = '\n'.join(screen_to_plain_lines('\n'.join(lines)))
+            _raise_on_dump_error(text)
+            return text
+    return tmux_capture(session)
+
+
+def capture_step_screen(session, nomux_file=None):
+    """Return (compressed screen, cursor) for a recorded step.
+
+    Reads the NOMUX shadow buffer when `nomux_file` is given, falling back
+    to the tmux pane if the file has not been written yet.
+    """
+    if nomux_file:
+        screen, cursor = capture_screen_compressed_nomux(nomux_file)
+        if screen is not None:
+            return screen, cursor
+    content, cursor = capture_screen_and_cursor(session, escapes=True)
+    return encode_screen_ansi_rle(_ansi_screen_lines(content)), cursor
+
+
 def read_typ_grid(dumpmap_file):
     """Read a dumpmap file and return 21x80 grid of ints."""
     if not os.path.exists(dumpmap_file):
@@ -868,11 +1247,12 @@ def read_checkpoint_entries(checkpoint_file, start_index=0):
     return entries, next_index
 
 
-def execute_wizload(session, level_name, steps, rng_log_file, verbose=False):
+def execute_wizload(session, level_name, steps, rng_counter, verbose=False):
     """Execute #wizloaddes to load a special level, recording steps.
 
     Returns (success, rng_call_start) tuple.
-    rng_call_start is the RNG call count just before level loading began.
+    rng_call_start is the RNG call count just before level loading began,
+    read through rng_counter (an RngLogTail kept for counting, or a path).
     """
     if verbose:
         print(f'  [wizloaddes] Loading {level_name}.lua')
@@ -912,13 +1292,13 @@ def execute_wizload(session, level_name, steps, rng_log_file, verbose=False):
     for _ in range(30):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             return False, None
         if '--More--' in content:
             tmux_send_special(session, 'Space', 0.2)
             continue
         if 'Load which des lua file?' in content:
-            rng_call_start = get_rng_call_count(rng_log_file)
+            rng_call_start = rng_log_tail(rng_counter).call_count()
             break
         time.sleep(0.02)
     else:
@@ -943,7 +1323,7 @@ def execute_wizload(session, level_name, steps, rng_log_file, verbose=False):
     for _ in range(60):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             return False, None
         if '--More--' in content:
             tmux_send_special(session, 'Space', 0.2)
@@ -958,19 +1338,6 @@ def execute_wizload(session, level_name, steps, rng_log_file, verbose=False):
     return False, None
 
 
-def get_rng_call_count(rng_log_file):
-    """Return the last RNG call number from an RNG log file, or None."""
-    if not rng_log_file or not os.path.exists(rng_log_file):
-        return None
-    last = None
-    with open(rng_log_file, 'r', encoding='utf-8', errors='ignore') as f:
-        for line in f:
-            m = re.match(r'^\s*(\d+)\s+', line)
-            if m:
-                last = int(m.group(1))
-    return last
-
-
 def execute_dumpmap(session, dumpmap_file):
     """Execute #dumpmap and read the resulting grid."""
     # Remove old dumpmap file
@@ -986,7 +1353,7 @@ def execute_dumpmap(session, dumpmap_file):
     for _ in range(5):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             break
         if '--More--' in content:
             tmux_send_special(session, 'Space', 0.1)
@@ -1001,8 +1368,10 @@ def execute_dumpmap(session, dumpmap_file):
 # Counter for tracking clear_more_prompts activity
 _clear_more_stats = {'cleared': 0, 'calls': 0}
 
-def clear_more_prompts(session, max_iterations=20):
+def clear_more_prompts(session, max_iterations=20, sync=None):
     global _clear_more_stats
+    if sync is not None:
+        return _clear_more_prompts_synced(session, max_iterations, sync)
     _clear_more_stats['calls'] += 1
     content = ''
     had_more = False
@@ -1010,7 +1379,7 @@ def clear_more_prompts(session, max_iterations=20):
         time.sleep(0.02)
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             break
         if '--More--' in content:
             _clear_more_stats['cleared'] += 1
@@ -1032,7 +1401,7 @@ def clear_more_prompts(session, max_iterations=20):
                 time.sleep(0.05)
                 try:
                     content = tmux_capture(session)
-                except subprocess.CalledProcessError:
+                except (subprocess.CalledProcessError, TmuxError):
                     break
                 if '--More--' in content:
                     _clear_more_stats['cleared'] += 1
@@ -1048,6 +1417,28 @@ def clear_more_prompts(session, max_iterations=20):
                 break
     return content
 
+def _clear_more_prompts_synced(session, max_iterations, sync):
+    """clear_more_prompts() driven by input-wait markers.
+
+    Each dismissal returns only once the game is blocked on input again,
+    so the screen read afterwards is final and no re-check polling is
+    needed to catch a --More-- that appears late.
+    """
+    _clear_more_stats['calls'] += 1
+    content = ''
+    for _ in range(max_iterations):
+        content = read_screen_text(session, sync)
+        if '--More--' in content:
+            _clear_more_stats['cleared'] += 1
+            press_key(session, 'Space', sync=sync, special=True)
+        elif 'Die?' in content:
+            # Wizard mode death: answer 'n' to resurrect
+            press_key(session, 'n', sync=sync)
+            print('  [WIZARD] Died and resurrected')
+        else:
+            break
+    return content
+
 def get_clear_more_stats():
     return _clear_more_stats.copy()
 
@@ -1056,24 +1447,29 @@ def reset_clear_more_stats():
     _clear_more_stats = {'cleared': 0, 'calls': 0}
 
 
-def wait_for_game_ready(session, rng_log_file, tutorial_enabled=False):
+def wait_for_game_ready(session, rng_log_file, tutorial_enabled=False, sync=None):
     """Navigate startup prompts until the game is ready.
 
     tutorial_enabled: True = press 'y', False = press 'n', None = leave the
     tutorial prompt unanswered (stop and let the caller handle it).
+    sync: optional InputWaitSync; prompts are then read from the NOMUX
+    screen and each answer completes when the game next waits for input.
     """
+    # Private tail: only the running count is reported here, so a caller's
+    # own RngLogTail must not have its startup lines consumed.
+    rng_counter = RngLogTail(getattr(rng_log_file, 'path', rng_log_file))
     for attempt in range(60):
         try:
-            content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+            content = read_screen_text(session, sync)
+        except (subprocess.CalledProcessError, TmuxError):
             print(f'[startup-{attempt}] tmux session died')
             break
 
-        rng_count, _ = read_rng_log(rng_log_file)
+        rng_count, _ = rng_counter.read()
 
         if '--More--' in content:
             print(f'  [startup-{attempt}] rng={rng_count} --More--')
-            tmux_send_special(session, 'Space', 0.1)
+            press_key(session, 'Space', 0.1, sync, special=True)
             continue
 
         if has_calendar_luck_warning(content) and harness_fixed_datetime():
@@ -1083,19 +1479,19 @@ def wait_for_game_ready(session, rng_log_file, tutorial_enabled=False):
             )
 
         if 'keep the save file' in content or 'keep save' in content.lower():
-            tmux_send(session, 'n', 0.1)
+            press_key(session, 'n', 0.1, sync)
             continue
 
         if 'Destroy old game?' in content or 'destroy old game' in content.lower():
-            tmux_send(session, 'y', 0.1)
+            press_key(session, 'y', 0.1, sync)
             continue
 
         if 'Shall I pick' in content:
-            tmux_send(session, 'y', 0.1)
+            press_key(session, 'y', 0.1, sync)
             continue
 
         if 'Is this ok?' in content:
-            tmux_send(session, 'y', 0.1)
+            press_key(session, 'y', 0.1, sync)
             continue
 
         if 'Do you want a tutorial?' in content:
@@ -1103,23 +1499,23 @@ def wait_for_game_ready(session, rng_log_file, tutorial_enabled=False):
                 # Leave the prompt for the keylog replay to handle
                 print(f'  [startup-{attempt}] rng={rng_count} tutorial prompt — deferring to keylog')
                 break
-            tmux_send(session, 'y' if tutorial_enabled else 'n', 0.1)
+            press_key(session, 'y' if tutorial_enabled else 'n', 0.1, sync)
             continue
 
         if 'pick a role' in content or 'Pick a role' in content:
-            tmux_send(session, 'v', 0.1)
+            press_key(session, 'v', 0.1, sync)
             continue
 
         if 'pick a race' in content or 'Pick a race' in content:
-            tmux_send(session, 'h', 0.1)
+            press_key(session, 'h', 0.1, sync)
             continue
 
         if 'pick a gender' in content or 'Pick a gender' in content:
-            tmux_send(session, 'f', 0.1)
+            press_key(session, 'f', 0.1, sync)
             continue
 
         if 'pick an alignment' in content or 'Pick an alignment' in content:
-            tmux_send(session, 'n', 0.1)
+            press_key(session, 'n', 0.1, sync)
             continue
 
         if 'Dlvl:' in content or 'St:' in content or 'HP:' in content:
@@ -1127,8 +1523,8 @@ def wait_for_game_ready(session, rng_log_file, tutorial_enabled=False):
             break
 
         if attempt > 2:
-            tmux_send_special(session, 'Space', 0.1)
-        else:
+            press_key(session, 'Space', 0.1, sync, special=True)
+        elif sync is None:
             time.sleep(0.02)
 
 
@@ -1272,7 +1668,7 @@ def quit_game(session):
     for _ in range(15):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             break
         if 'Really quit' in content or 'really quit' in content:
             tmux_send(session, 'y', 0.1)
@@ -1286,7 +1682,7 @@ def quit_game(session):
     time.sleep(0.02)
 
 
-def compact_session_json(session_data):
+def compact_session_json(session_data, screen_delta=None):
     """Serialize session to JSON with newlines but no indentation.
 
     Format:
@@ -1295,7 +1691,16 @@ def compact_session_json(session_data):
     - Arrays (like rng) stay compact
 
     Uses ensure_ascii=True for portability (escapes all non-ASCII as \\uXXXX).
+
+    screen_delta is the keyframe interval for delta-encoded step screens
+    (see screen_delta.py); None reads NETHACK_SCREEN_DELTA, 0 writes full
+    screens on every step.
     """
+    if screen_delta is None:
+        screen_delta = keyframe_every_from_env()
+    if screen_delta:
+        session_data = encode_screen_deltas(session_data, screen_delta)
+
     def strip_action_fields(value):
         if isinstance(value, dict):
             return {
@@ -1337,6 +1742,8 @@ def probe_startup_keys(env, nethackrc, max_keys=20):
 
     Sends spaces until the game map is visible (status line with Dlvl:/HP:).
     Returns the list of keys needed to get through startup --More-- prompts.
+    With NETHACK_STEP_SYNC=1 each prompt is read as soon as the game waits
+    for input instead of after fixed sleeps.
     """
     tmpdir = tempfile.mkdtemp(prefix='nh-probe-')
     rc_path = os.path.join(tmpdir, '.nethackrc')
@@ -1367,6 +1774,7 @@ def probe_startup_keys(env, nethackrc, max_keys=20):
         'TERM': 'xterm-256color',
         'NETHACK_NO_DELAY': '1',
     }
+    sync = open_step_sync(tmpdir, os.path.join(tmpdir, 'nomux_screen.txt'), cmd_env)
     cmd_env.update(env)
     env_str = ' '.join(f'{k}={v}' for k, v in cmd_env.items())
 
@@ -1385,37 +1793,40 @@ def probe_startup_keys(env, nethackrc, max_keys=20):
 
     startup_keys = []
     try:
-        time.sleep(1.0)
+        sync = await_first_input(sync)
+        if sync is None:
+            time.sleep(1.0)
         for _ in range(max_keys):
-            content = tmux_capture(session_name)
+            content = read_screen_text(session_name, sync)
             # Check if game map is visible (status line)
             if 'Dlvl:' in content or 'HP:' in content or 'St:' in content:
                 # Check there's no --More-- blocking
                 if '--More--' not in content:
                     break
             if '--More--' in content:
-                tmux_send_special(session_name, 'Space')
+                press_key(session_name, 'Space', 0.3, sync, special=True)
                 startup_keys.append(' ')
-                time.sleep(0.3)
             elif 'Do you want a tutorial' in content:
-                tmux_send(session_name, 'n')
+                press_key(session_name, 'n', 0.3, sync)
                 startup_keys.append('n')
-                time.sleep(0.3)
             elif 'Shall I pick' in content:
-                tmux_send(session_name, 'y')
+                press_key(session_name, 'y', 0.3, sync)
                 startup_keys.append('y')
-                time.sleep(0.3)
             elif 'Is this ok' in content:
-                tmux_send(session_name, 'y')
+                press_key(session_name, 'y', 0.3, sync)
                 startup_keys.append('y')
-                time.sleep(0.3)
             elif 'Destroy old game' in content:
-                tmux_send(session_name, 'y')
                 # Don't add to startup_keys — this is cleanup, not game startup
-                time.sleep(0.5)
+                press_key(session_name, 'y', 0.5, sync)
+            elif sync is not None:
+                # The game is already waiting for input; nothing more will
+                # be drawn without a key.
+                break
             else:
                 time.sleep(0.2)
     finally:
+        if sync is not None:
+            sync.close()
         subprocess.run(['tmux', 'kill-session', '-t', session_name],
                        capture_output=True, check=False)
         shutil.rmtree(tmpdir, ignore_errors=True)
@@ -1526,6 +1937,10 @@ def record_c_session(env, nethackrc, keys, output_path,
     then one step per key.  No auto-advance through chargen, no auto-clear of
     --More-- prompts.  The nethackrc determines game startup behavior; the key
     sequence is complete from game launch.
+
+    With NETHACK_STEP_SYNC=1 each step is captured as soon as the C binary
+    signals that it is waiting for input (see InputWaitSync); the delay
+    parameters are then ignored.
     """
     output_path = os.path.abspath(output_path)
     key_delay_overrides = key_delay_overrides or {}
@@ -1588,6 +2003,9 @@ def record_c_session(env, nethackrc, keys, output_path,
     }
     if use_nomux:
         cmd_env['NOMUX_SCREEN_FILE'] = nomux_screen_file
+    sync = open_step_sync(tmpdir, nomux_screen_file, cmd_env)
+    if sync is not None:
+        use_nomux = True
     # Add passthrough env vars from host
     cmd_env.update(_passthrough_env_vars())
     # Add caller's env vars (these take priority)
@@ -1627,31 +2045,27 @@ def record_c_session(env, nethackrc, keys, output_path,
 
     try:
         # --- 5. Wait for initial screen ---
-        time.sleep(1.0)
+        sync = await_first_input(sync)
+        if sync is None:
+            time.sleep(1.0)
         for _ in range(100):  # up to 2 more seconds
-            content = tmux_capture(session_name)
+            content = read_screen_text(session_name, sync)
             if content.strip():
                 # Handle stale game state prompts (not part of the session)
                 if 'keep the save file' in content.lower():
-                    tmux_send(session_name, 'n', 0.3)
+                    press_key(session_name, 'n', 0.3, sync)
                     continue
                 if 'Destroy old game' in content:
-                    tmux_send(session_name, 'y', 0.5)
+                    press_key(session_name, 'y', 0.5, sync)
                     continue
                 break
             time.sleep(0.02)
 
         # --- 6. Capture step 0 (initial screen, key=null) ---
-        if use_nomux:
-            screen, cursor = capture_screen_compressed_nomux(nomux_screen_file)
-            if screen is None:
-                # Fallback to tmux if NOMUX file not ready
-                screen = capture_screen_compressed(session_name)
-                cursor = capture_cursor(session_name)
-        else:
-            screen = capture_screen_compressed(session_name)
-            cursor = capture_cursor(session_name)
-        rng_count, rng_lines = read_rng_log(rng_log_file)
+        screen, cursor = capture_step_screen(
+            session_name, nomux_screen_file if use_nomux else None)
+        rng_log = RngLogTail(rng_log_file)
+        rng_count, rng_lines = rng_log.read()
         rng_entries = parse_rng_lines(rng_lines)
 
         session_data['steps'].append({
@@ -1683,20 +2097,6 @@ def record_c_session(env, nethackrc, keys, output_path,
                 saw_ctrl_v = False
             return result
 
-        def wait_for_rng_settle():
-            prev, _ = read_rng_log(rng_log_file)
-            stable = 0
-            for _ in range(100):
-                time.sleep(0.02)
-                cur, _ = read_rng_log(rng_log_file)
-                if cur == prev:
-                    stable += 1
-                    if stable >= 3:
-                        return
-                else:
-                    stable = 0
-                    prev = cur
-
         # --- 8. Replay each key ---
         screen_lines_cache = screen_to_plain_lines(screen)
         prev_depth_recorded = detect_depth(screen_lines_cache)
@@ -1708,35 +2108,35 @@ def record_c_session(env, nethackrc, keys, output_path,
             # 'wizloaddes' from old format) are sent as a burst —
             # each character individually but with only one screen
             # capture at the end.
-            if len(ch) > 1:
-                for c in ch:
-                    _send_char(session_name, c)
-                    time.sleep(0.02)
-            else:
+            step_num = idx + 1
+            if sync is not None:
+                # One input-wait marker per character consumed; the step
+                # is complete when the game blocks after the last one.
+                sync_seq = sync.seq
                 _send_char(session_name, ch)
+                sync.wait_keys(sync_seq, len(ch))
+            else:
+                if len(ch) > 1:
+                    for c in ch:
+                        _send_char(session_name, c)
+                        time.sleep(0.02)
+                else:
+                    _send_char(session_name, ch)
 
-            step_num = idx + 1
-            step_delay = key_delay_overrides.get(step_num, key_delay_s)
-            time.sleep(max(0.0, step_delay))
+                step_delay = key_delay_overrides.get(step_num, key_delay_s)
+                time.sleep(max(0.0, step_delay))
 
-            if triggers_level_gen:
-                wait_for_rng_settle()
+                if triggers_level_gen:
+                    rng_log.wait_for_settle()
 
-            if idx == len(keys) - 1 and final_capture_delay_s > 0.0:
-                time.sleep(final_capture_delay_s)
+                if idx == len(keys) - 1 and final_capture_delay_s > 0.0:
+                    time.sleep(final_capture_delay_s)
 
             # Capture state
-            if use_nomux:
-                screen, step_cursor = capture_screen_compressed_nomux(nomux_screen_file)
-                if screen is None:
-                    screen = capture_screen_compressed(session_name)
-                    step_cursor = capture_cursor(session_name)
-            else:
-                screen = capture_screen_compressed(session_name)
-                step_cursor = capture_cursor(session_name)
+            screen, step_cursor = capture_step_screen(
+                session_name, nomux_screen_file if use_nomux else None)
             screen_lines_cache = screen_to_plain_lines(screen)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
+            rng_count, delta_lines = rng_log.read()
             step_rng = parse_rng_lines(delta_lines)
 
             depth = detect_depth(screen_lines_cache)
@@ -1786,6 +2186,8 @@ def record_c_session(env, nethackrc, keys, output_path,
             pass  # quit_game may fail if game is stuck; cleanup handles it
 
     finally:
+        if sync is not None:
+            sync.close()
         subprocess.run(['tmux', 'kill-session', '-t', session_name],
                        capture_output=True, check=False)
         shutil.rmtree(tmpdir, ignore_errors=True)
@@ -1871,7 +2273,8 @@ def run_wizload_session(seed, output_json, level_name, move_str='', verbose=Fals
         time.sleep(0.02)
 
         # Capture startup state
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
+        rng_log = RngLogTail(rng_log_file)
+        startup_rng_count, startup_rng_lines = rng_log.read()
         print(f'Startup: {startup_rng_count} RNG calls')
 
         startup_screen_compressed = capture_screen_compressed(session_name)
@@ -1920,8 +2323,11 @@ def run_wizload_session(seed, output_json, level_name, move_str='', verbose=Fals
         # Execute wizload, collecting steps
         steps = session_data['steps']
         checkpoint_cursor = 0
+        # A tail of its own for the call count: rng_log must keep every
+        # line for the steps.
+        rng_counter = RngLogTail(rng_log_file)
         ok, rng_call_start = execute_wizload(
-            session_name, level_name, steps, rng_log_file, verbose
+            session_name, level_name, steps, rng_counter, verbose
         )
 
         if not ok:
@@ -1951,8 +2357,7 @@ def run_wizload_session(seed, output_json, level_name, move_str='', verbose=Fals
             print(f'Checkpoints: {len(checkpoints)} captured')
 
         # Read RNG log from wizload start
-        final_rng_count, final_rng_lines = read_rng_log(rng_log_file)
-        delta_lines = final_rng_lines[startup_rng_count:final_rng_count]
+        final_rng_count, delta_lines = rng_log.read()
         rng_entries = parse_rng_lines(delta_lines)
 
         # Add final step with level data
@@ -2010,9 +2415,8 @@ def run_wizload_session(seed, output_json, level_name, move_str='', verbose=Fals
 
                 screen_compressed = capture_screen_compressed(session_name)
                 screen_lines = screen_to_plain_lines(screen_compressed)
-                rng_count, rng_lines = read_rng_log(rng_log_file)
+                rng_count, delta_lines = rng_log.read()
                 step_cursor = capture_cursor(session_name)
-                delta_lines = rng_lines[prev_rng_count:rng_count]
                 rng_entries = parse_rng_lines(delta_lines)
                 depth = detect_depth(screen_lines)
                 delta = rng_count - prev_rng_count
@@ -2133,7 +2537,8 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
 
         # Capture initial startup state (first step with no key)
         startup_screen = capture_screen_compressed(session_name)
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
+        rng_log = RngLogTail(rng_log_file)
+        startup_rng_count, startup_rng_lines = rng_log.read()
         startup_cursor = capture_cursor(session_name)
         startup_rng_entries = parse_rng_lines(startup_rng_lines)
 
@@ -2144,7 +2549,8 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
             'screen': startup_screen,
             'cursor': startup_cursor,
         }]
-        prev_rng_count = startup_rng_count
+        # Lines consumed from the tail but not yet attributed to a step.
+        pending_rng_lines = []
 
         # Track actual selections for session metadata
         selected = {'role': None, 'race': None, 'gender': None, 'align': None}
@@ -2156,14 +2562,14 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
             time.sleep(0.02)
             try:
                 content = tmux_capture(session_name)
-            except subprocess.CalledProcessError:
+            except (subprocess.CalledProcessError, TmuxError):
                 break
 
             screen = capture_screen_compressed(session_name)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
+            rng_count, new_lines = rng_log.read()
             cursor = capture_cursor(session_name)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
-            rng_entries = parse_rng_lines(delta_lines)
+            pending_rng_lines.extend(new_lines)
+            rng_entries = parse_rng_lines(pending_rng_lines)
 
             if '--More--' in content:
                 steps.append({
@@ -2174,7 +2580,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                     'cursor': cursor,
                 })
                 tmux_send_special(session_name, 'Space', 0.1)
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 continue
 
             if 'Shall I pick' in content:
@@ -2186,7 +2592,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                     'cursor': cursor,
                 })
                 tmux_send(session_name, 'n', 0.1)
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 continue
 
             if 'Pick a role' in content or 'pick a role' in content:
@@ -2201,7 +2607,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                 })
                 tmux_send(session_name, key, 0.1)
                 selection_idx += 1
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 continue
 
             if 'Pick a race' in content or 'pick a race' in content:
@@ -2216,7 +2622,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                 })
                 tmux_send(session_name, key, 0.1)
                 selection_idx += 1
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 continue
 
             if 'Pick a gender' in content or 'pick a gender' in content:
@@ -2231,7 +2637,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                 })
                 tmux_send(session_name, key, 0.1)
                 selection_idx += 1
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 continue
 
             if 'Pick an alignment' in content or 'pick an alignment' in content:
@@ -2246,7 +2652,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                 })
                 tmux_send(session_name, key, 0.1)
                 selection_idx += 1
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 continue
 
             if 'Is this ok?' in content:
@@ -2263,7 +2669,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                 tmux_send(session_name, key, 0.1)
                 if selection_idx < len(selections):
                     selection_idx += 1
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 continue
 
             if (not tutorial_prompt_handled) and ('Do you want a tutorial?' in content):
@@ -2276,7 +2682,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                     'cursor': cursor,
                 })
                 tmux_send(session_name, tkey, 0.1)
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 tutorial_prompt_handled = True
                 continue
 
@@ -2289,7 +2695,7 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
                     'screen': screen,
                     'cursor': cursor,
                 })
-                prev_rng_count = rng_count
+                pending_rng_lines = []
                 print(f'  Game ready after {len(steps)} steps, {rng_count} RNG calls')
                 break
 
@@ -2298,10 +2704,9 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
         tmux_send(session_name, 'i', 0.2)
         time.sleep(0.02)
         screen = capture_screen_compressed(session_name)
-        rng_count, rng_lines = read_rng_log(rng_log_file)
+        rng_count, new_lines = rng_log.read()
         cursor = capture_cursor(session_name)
-        delta_lines = rng_lines[prev_rng_count:rng_count]
-        rng_entries = parse_rng_lines(delta_lines)
+        rng_entries = parse_rng_lines(pending_rng_lines + new_lines)
         steps.append({
             'key': 'i',
             'action': 'inventory',
@@ -2309,14 +2714,13 @@ def run_chargen_session(seed, output_json, selections, tutorial_response='n', ve
             'screen': screen,
             'cursor': cursor,
         })
-        prev_rng_count = rng_count
         print(f'  Inventory captured')
 
         # Dismiss inventory menu
         for _ in range(10):
             try:
                 content = tmux_capture(session_name)
-            except subprocess.CalledProcessError:
+            except (subprocess.CalledProcessError, TmuxError):
                 break
             if '--More--' in content or '(end)' in content:
                 tmux_send_special(session_name, 'Space', 0.1)
@@ -2433,7 +2837,8 @@ def run_interface_session(seed, output_json, keys, verbose=False, auto_clear_mor
         time.sleep(0.02)
 
         # Capture startup state
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
+        rng_log = RngLogTail(rng_log_file)
+        startup_rng_count, startup_rng_lines = rng_log.read()
         print(f'Startup: {startup_rng_count} RNG calls')
 
         startup_screen = capture_screen_compressed(session_name)
@@ -2477,7 +2882,6 @@ def run_interface_session(seed, output_json, keys, verbose=False, auto_clear_mor
         print(f'\n=== INTERFACE ({len(keys)} keys) ===')
 
         # Send each key and capture screen
-        prev_rng_count = startup_rng_count
         for i, key in enumerate(keys):
             # Handle special key encodings
             if key == '^' and i + 1 < len(keys):
@@ -2507,9 +2911,8 @@ def run_interface_session(seed, output_json, keys, verbose=False, auto_clear_mor
                 clear_more_prompts(session_name)
 
             screen = capture_screen_compressed(session_name)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
+            rng_count, delta_lines = rng_log.read()
             cursor = capture_cursor(session_name)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
             rng_entries = parse_rng_lines(delta_lines)
 
             step = {
@@ -2520,7 +2923,6 @@ def run_interface_session(seed, output_json, keys, verbose=False, auto_clear_mor
                 'cursor': cursor,
             }
             session_data['steps'].append(step)
-            prev_rng_count = rng_count
 
             print(f'  [{i+1:03d}] {repr(key):5s} ({action:20s}) +{len(rng_entries):4d} RNG')
 
@@ -2571,6 +2973,12 @@ def run_session_entry(entry, sessions_dir):
     return f'seed{seed}{suffix}'
 
 
+def _init_sandbox_worker(sandbox_root):
+    """Pool initializer: record this worker's sessions in a private install."""
+    use_install_sandbox(*make_install_sandbox(
+        os.path.join(sandbox_root, f'worker-{os.getpid()}')))
+
+
 def main():
     if '--from-config' in sys.argv:
         from concurrent.futures import ProcessPoolExecutor, as_completed
@@ -2580,21 +2988,33 @@ def main():
         sessions_dir = os.path.join(PROJECT_ROOT, 'test', 'comparison', 'sessions')
         entries = config['session_seeds']['sessions']
 
-        # Check for --parallel flag
+        # Check for --parallel [N] flag (default: one worker per CPU core)
         parallel = '--parallel' in sys.argv
-        max_workers = 4 if parallel else 1
+        max_workers = os.cpu_count() or 4
+        if parallel:
+            idx = sys.argv.index('--parallel')
+            if idx + 1 < len(sys.argv) and sys.argv[idx + 1].isdigit():
+                max_workers = int(sys.argv[idx + 1])
 
         if parallel:
             print(f'Running {len(entries)} sessions in parallel with {max_workers} workers')
-            with ProcessPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(run_session_entry, entry, sessions_dir): entry for entry in entries}
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        print(f'=== Completed: {result} ===')
-                    except Exception as e:
-                        entry = futures[future]
-                        print(f'=== Failed: seed{entry["seed"]} - {e} ===')
+            # Each worker gets its own install tree and HOME, so setup_home()
+            # cleanup in one worker cannot delete another worker's game files.
+            sandbox_root = tempfile.mkdtemp(prefix='webhack-sandbox-')
+            try:
+                with ProcessPoolExecutor(max_workers=max_workers,
+                                         initializer=_init_sandbox_worker,
+                                         initargs=(sandbox_root,)) as executor:
+                    futures = {executor.submit(run_session_entry, entry, sessions_dir): entry for entry in entries}
+                    for future in as_completed(futures):
+                        try:
+                            result = future.result()
+                            print(f'=== Completed: {result} ===')
+                        except Exception as e:
+                            entry = futures[future]
+                            print(f'=== Failed: seed{entry["seed"]} - {e} ===')
+            finally:
+                shutil.rmtree(sandbox_root, ignore_errors=True)
         else:
             for entry in entries:
                 run_session_entry(entry, sessions_dir)
@@ -2795,6 +3215,8 @@ def run_session(seed, output_json, move_str, raw_moves=False, record_more_spaces
     mapdump_dir = os.path.join(tmpdir, 'mapdumps')
     repaint_debug_file = os.path.join(tmpdir, 'repaint-debug.log')
     os.makedirs(mapdump_dir, exist_ok=True)
+    sync = open_step_sync(tmpdir, os.path.join(tmpdir, 'nomux_screen.txt'))
+    sync_screen_file = sync.screen_file if sync is not None else None
 
     session_name = f'webhack-session-{seed}-{os.getpid()}'
 
@@ -2802,6 +3224,7 @@ def run_session(seed, output_json, move_str, raw_moves=False, record_more_spaces
         wiz_flag = ' -D' if wizard_mode else ''
         cmd = (
             f'NETHACKDIR={INSTALL_DIR} '
+            f'{step_sync_env(sync)}'
             f'{fixed_datetime_env()}'
             f'{diag_events_env()}'
             f'{no_delay_env()}'
@@ -2827,31 +3250,37 @@ def run_session(seed, output_json, move_str, raw_moves=False, record_more_spaces
             check=True
         )
 
-        time.sleep(1.0)
+        sync = await_first_input(sync)
+        if sync is None:
+            time.sleep(1.0)
+            sync_screen_file = None
 
         print(f'=== Capturing session: seed={seed}, role={char["role"]}, moves="{move_str}" ===')
         print(f'=== STARTUP (startup_mode={startup_mode}) ===')
         if startup_mode == 'from-keylog':
             # move_str contains full key sequence from game launch including chargen.
             # Do not auto-advance prompts — the key sequence handles everything.
-            time.sleep(0.5)
+            if sync is None:
+                time.sleep(0.5)
         else:
-            wait_for_game_ready(session_name, rng_log_file)
-            time.sleep(0.02)
+            wait_for_game_ready(session_name, rng_log_file, sync=sync)
+            if sync is None:
+                time.sleep(0.02)
             # Defensive remediation: if tutorial prompt is still visible, dismiss it.
-            startup_screen_compressed = capture_screen_compressed(session_name)
-            if 'Do you want a tutorial?' in startup_screen_compressed:
+            if 'Do you want a tutorial?' in read_screen_text(session_name, sync):
                 print('WARNING: tutorial prompt leaked into gameplay startup; answering "n" and recapturing startup.')
-                tmux_send(session_name, 'n', 0.1)
-                wait_for_game_ready(session_name, rng_log_file)
-                time.sleep(0.02)
+                press_key(session_name, 'n', 0.1, sync)
+                wait_for_game_ready(session_name, rng_log_file, sync=sync)
+                if sync is None:
+                    time.sleep(0.02)
 
         # Capture startup state
-        startup_rng_count, startup_rng_lines = read_rng_log(rng_log_file)
+        rng_log = RngLogTail(rng_log_file)
+        startup_rng_count, startup_rng_lines = rng_log.read()
         print(f'Startup: {startup_rng_count} RNG calls')
 
-        startup_screen_compressed = capture_screen_compressed(session_name)
-        startup_cursor = capture_cursor(session_name)
+        startup_screen_compressed, startup_cursor = capture_step_screen(
+            session_name, sync_screen_file)
 
         # Build session object (unified format v3)
         startup_rng_entries = parse_rng_lines(startup_rng_lines)
@@ -2947,26 +3376,6 @@ def run_session(seed, output_json, move_str, raw_moves=False, record_more_spaces
                 saw_ctrl_v = False
             return result
 
-        def _wait_for_rng_settle():
-            """Poll the RNG log until the count stops growing.
-
-            After a key that triggers level generation, the C binary may
-            still be computing.  Poll every 20ms; once the count is stable
-            for 50ms we know it has finished.
-            """
-            prev_count, _ = read_rng_log(rng_log_file)
-            stable_ticks = 0
-            for _ in range(100):   # up to 2s
-                time.sleep(0.02)
-                cur_count, _ = read_rng_log(rng_log_file)
-                if cur_count == prev_count:
-                    stable_ticks += 1
-                    if stable_ticks >= 3:   # stable for ~60ms
-                        return
-                else:
-                    stable_ticks = 0
-                    prev_count = cur_count
-
         print(f'\n=== MOVES ({len(replay_keys)} steps, key_delay={key_delay_s:.3f}s) ===')
         if key_delay_overrides:
             print(f'Per-turn key delay overrides: {len(key_delay_overrides)} steps')
@@ -2979,27 +3388,33 @@ def run_session(seed, output_json, move_str, raw_moves=False, record_more_spaces
             triggers_level_gen = _is_level_gen_key(ch)
 
             # Send the character
-            send_char(ch)
-            # Tunable for capture-timing experiments.
             step_num = idx + 1
             step_delay = key_delay_overrides.get(step_num, key_delay_s)
-            time.sleep(max(0.0, step_delay))
+            if sync is not None:
+                # Step is done once the game blocks for the next key.
+                sync_seq = sync.seq
+                send_char(ch)
+                sync.wait(sync_seq)
+            else:
+                send_char(ch)
+                # Tunable for capture-timing experiments.
+                time.sleep(max(0.0, step_delay))
 
-            # After level-gen keys (>, <, Enter-after-Ctrl-V), wait for
-            # the C binary to finish computing before capturing the screen.
-            if triggers_level_gen:
-                _wait_for_rng_settle()
+                # After level-gen keys (>, <, Enter-after-Ctrl-V), wait for
+                # the C binary to finish computing before capturing the screen:
+                # the RNG log size must hold still for ~60ms (up to 2s).
+                if triggers_level_gen:
+                    rng_log.wait_for_settle()
 
-            # Optional final-frame settle for the very last captured step.
-            if idx == len(replay_keys) - 1 and final_capture_delay_s > 0.0:
-                time.sleep(final_capture_delay_s)
+                # Optional final-frame settle for the very last captured step.
+                if idx == len(replay_keys) - 1 and final_capture_delay_s > 0.0:
+                    time.sleep(final_capture_delay_s)
 
             # Capture state after this step
-            screen_compressed = capture_screen_compressed(session_name)
+            screen_compressed, step_cursor = capture_step_screen(
+                session_name, sync_screen_file)
             screen_lines = screen_to_plain_lines(screen_compressed)
-            rng_count, rng_lines = read_rng_log(rng_log_file)
-            step_cursor = capture_cursor(session_name)
-            delta_lines = rng_lines[prev_rng_count:rng_count]
+            rng_count, delta_lines = rng_log.read()
             rng_entries = parse_rng_lines(delta_lines)
 
             # Detect current level from status line
@@ -3080,6 +3495,8 @@ def run_session(seed, output_json, move_str, raw_moves=False, record_more_spaces
         report_repaint_debug_log(repaint_debug_file, output_json)
 
     finally:
+        if sync is not None:
+            sync.close()
         subprocess.run(['tmux', 'kill-session', '-t', session_name], capture_output=True)
         shutil.rmtree(tmpdir, ignore_errors=True)
 
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Delta encoding for per-step session screens.
+
+Consecutive step screens usually differ in a few cells, yet every step
+stores the whole ANSI-RLE screen (encode_screen_ansi_rle).  A
+delta-encoded session keeps the full "screen" on keyframe steps only --
+step 0 and every `keyframe_every`-th step after it -- and gives other
+steps a "screenDelta" against the previous step's screen instead:
+
+    "screenDelta": [row_count, [row, start, length, "text"], ...]
+
+Each run replaces `length` characters at `start` of the stored line text
+`row` with "text"; row_count trims or extends the line list.  Runs index
+the stored text (escape sequences included) rather than terminal cells,
+so reconstruction is exact without an ANSI parser.  The session records
+the scheme as top-level "screenDelta": {"keyframeEvery": N}.
+
+Encoding is off unless NETHACK_SCREEN_DELTA=N is set for the recorder
+(compact_session_json).  Readers call expand_screen_deltas() after
+json.load(); it is a no-op on ordinary sessions.
+
+Usage:
+    python3 screen_delta.py encode [--keyframe-every N] <session.json>...
+    python3 screen_delta.py decode <session.json>...
+"""
+
+import argparse
+import json
+import os
+import sys
+
+SCREEN_DELTA_ENV = 'NETHACK_SCREEN_DELTA'
+DEFAULT_KEYFRAME_EVERY = 50
+
+
+def keyframe_every_from_env():
+    """Return N from NETHACK_SCREEN_DELTA (0 = delta encoding off)."""
+    raw = os.environ.get(SCREEN_DELTA_ENV, '').strip()
+    if not raw:
+        return 0
+    if raw.lower() in ('1', 'true', 'yes', 'on'):
+        return DEFAULT_KEYFRAME_EVERY
+    try:
+        return max(0, int(raw))
+    except ValueError:
+        return 0
+
+
+def screen_delta(before, after):
+    """Return the screenDelta list turning screen `before` into `after`."""
+    old = before.split('\n')
+    new = after.split('\n')
+    delta = [len(new)]
+    for row, line in enumerate(new):
+        prev = old[row] if row < len(old) else ''
+        if line == prev:
+            continue
+        limit = min(len(line), len(prev))
+        start = 0
+        while start < limit and line[start] == prev[start]:
+            start += 1
+        end = 0
+        while end < limit - start and line[-1 - end] == prev[-1 - end]:
+            end += 1
+        delta.append([row, start, len(prev) - start - end, line[start:len(line) - end]])
+    return delta
+
+
+def apply_screen_delta(before, delta):
+    """Rebuild a screen string from the previous screen and a screenDelta."""
+    lines = before.split('\n')
+    count = delta[0]
+    del lines[count:]
+    lines.extend([''] * (count - len(lines)))
+    for row, start, length, text in delta[1:]:
+        line = lines[row]
+        lines[row] = line[:start] + text + line[start + length:]
+    return '\n'.join(lines)
+
+
+def _rename_key(step, old, new, value):
+    """Copy of `step` with key `old` renamed to `new` (same position)."""
+    return {(new if k == old else k): (value if k == old else v) for k, v in step.items()}
+
+
+def encode_screen_deltas(session_data, keyframe_every=DEFAULT_KEYFRAME_EVERY):
+    """Return a copy of session_data with non-keyframe screens delta-encoded.
+
+    Steps whose screen (or the previous one) is not a string stay as they
+    are and restart the chain.  Already-encoded sessions are returned
+    unchanged.
+    """
+    steps = session_data.get('steps')
+    if (keyframe_every <= 0 or not isinstance(steps, list)
+            or 'screenDelta' in session_data):
+        return session_data
+    out_steps = []
+    prev_screen = None
+    for i, step in enumerate(steps):
+        screen = step.get('screen') if isinstance(step, dict) else None
+        if not isinstance(screen, str):
+            out_steps.append(step)
+            prev_screen = None
+            continue
+        if prev_screen is not None and i % keyframe_every != 0:
+            step = _rename_key(step, 'screen', 'screenDelta', screen_delta(prev_screen, screen))
+        out_steps.append(step)
+        prev_screen = screen
+
+    out = {}
+    for key, value in session_data.items():
+        out[key] = out_steps if key == 'steps' else value
+        if key == 'steps':
+            out['screenDelta'] = {'keyframeEvery': keyframe_every}
+    return out
+
+
+def expand_screen_deltas(session_data):
+    """Restore full "screen" strings in place; return session_data.
+
+    Safe to call on any session: without the top-level marker it returns
+    immediately.
+    """
+    if not isinstance(session_data, dict) or 'screenDelta' not in session_data:
+        return session_data
+    steps = session_data.get('steps')
+    prev_screen = None
+    for i, step in enumerate(steps if isinstance(steps, list) else []):
+        if not isinstance(step, dict):
+            prev_screen = None
+            continue
+        if 'screenDelta' in step:
+            if prev_screen is None:
+                raise ValueError(f'step {i}: screenDelta without a preceding screen')
+            screen = apply_screen_delta(prev_screen, step['screenDelta'])
+            restored = _rename_key(step, 'screenDelta', 'screen', screen)
+            step.clear()
+            step.update(restored)
+        screen = step.get('screen')
+        prev_screen = screen if isinstance(screen, str) else None
+    del session_data['screenDelta']
+    return session_data
+
+
+def load_session(path):
+    """json.load a session file and expand any screen deltas."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return expand_screen_deltas(json.load(f))
+
+
+def main():
+    # Imported here: run_session imports this module for its writer.
+    from run_session import compact_session_json
+
+    parser = argparse.ArgumentParser(description='Delta-encode or expand session screens in place')
+    sub = parser.add_subparsers(dest='command', required=True)
+    encode = sub.add_parser('encode')
+    encode.add_argument('--keyframe-every', type=int, default=DEFAULT_KEYFRAME_EVERY)
+    encode.add_argument('paths', nargs='+')
+    decode = sub.add_parser('decode')
+    decode.add_argument('paths', nargs='+')
+    args = parser.parse_args()
+
+    failures = 0
+    for path in args.paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            original = f.read()
+        data = json.loads(original)
+        if args.command == 'encode':
+            out = encode_screen_deltas(data, args.keyframe_every)
+            # Refuse to write anything that does not expand back exactly.
+            check = expand_screen_deltas(json.loads(json.dumps(out)))
+            if check != data:
+                print(f'ERROR {path}: delta round trip mismatch')
+                failures += 1
+                continue
+        else:
+            out = expand_screen_deltas(data)
+        text = compact_session_json(out, screen_delta=0)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        print(f'{path}: {len(original.encode("utf-8"))} -> {len(text.encode("utf-8"))} bytes')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,749 @@
+#!/usr/bin/env python3
+"""Binary columnar container for session recordings (*.session.bin).
+
+A .session.bin file holds exactly the data of a *.session.json file and
+converts back to the same bytes.  Compared with the JSON it interns RNG
+entries and their call sites, packs RNG calls into integer columns, stores
+each step's screen as a line delta against the previous step, run-length
+codes integer grids (legacy list-of-rows typGrids; current sessions
+already store typGrids as RLE strings) and keeps a step index so single
+steps can be read without decoding the rest.
+
+Usage:
+    python3 session_binary.py pack <session.json>...     # writes .session.bin
+    python3 session_binary.py unpack <session.bin>...    # writes .session.json
+    python3 session_binary.py check <session.json>...    # round trip + sizes
+
+From Python:
+    session = load_session(path)              # .json or .bin, same dict
+    with SessionBinaryReader(path) as reader: # random access to steps
+        step = reader.step(120)
+
+File layout (integers are LEB128 varints unless noted):
+    "NHSB", u8 format version, u8 JSON layout
+    section: interned strings (RNG function names and call sites)
+    section: distinct RNG entries, numbered in three groups -- raw lines
+        (events, >/<), one-argument calls with a call site, other calls --
+        the calls as fn/args/result/site columns
+    section: top-level object as JSON, "steps" left null
+    section per chunk of CHUNK_STEPS steps: the steps as JSON with "rng"
+        and screens nulled out, an RNG entry id column, and screens (the
+        chunk's first step in full, later ones as changed lines)
+    index: chunk count, steps per chunk, step count, chunk offsets
+    trailer: u64 little-endian offset of the index
+A section is a varint byte length followed by zlib data.  The JSON parts
+go through the C json decoder and the id columns load with array.frombytes,
+but a full decode is still pure Python and is slower than json.load of the
+JSON it replaces (for the 123 sessions in sessions/: about 580 ms against
+about 230 ms; `check` reports both).  The gains are size (49.7 MB of JSON
+packs into 3.5 MB) and random access: metadata and single steps never
+decode the rest of the file.
+"""
+
+import argparse
+import array
+import json
+import os
+import re
+import struct
+import sys
+import tempfile
+import time
+import zlib
+
+MAGIC = b'NHSB'
+FORMAT_VERSION = 1
+CHUNK_STEPS = 32
+
+# JSON layouts the converter reproduces byte for byte.
+LAYOUT_LINES = 0    # compact_session_json(): one line per top-level key/step
+LAYOUT_COMPACT = 1  # json.dumps(separators=(',', ':')), no trailing newline
+LAYOUTS = (LAYOUT_LINES, LAYOUT_COMPACT)
+
+# Step keys stored in columns instead of the step JSON, with their flag bits.
+_F_RNG = 1
+_SCREEN_FLAGS = {'screen': 2, 'screenAnsi': 4}
+
+# Screen column records (JSON): a string is a full screen, a list is a
+# text delta [line_count, index, line, ...]; {"lines": [...]} and
+# {"delta": [...]} are the same for screens stored as lists of lines.
+
+# Placeholder object standing in for a run-length coded integer grid.
+_GRID_KEY = '\x00grid'
+
+_RNG_CALL_RE = re.compile(r'^([A-Za-z_]\w*)\((-?\d+(?:,-?\d+)*)\)=(-?\d+)(?: @ (.+))?$')
+_INT64 = 1 << 63
+
+
+def session_json_text(session, layout=LAYOUT_LINES):
+    """Serialize `session` in one of the JSON layouts found in sessions/."""
+    if layout == LAYOUT_COMPACT:
+        return json.dumps(session, separators=(',', ':'))
+    if layout != LAYOUT_LINES:
+        raise ValueError(f'unknown session JSON layout {layout!r}')
+    lines = ['{']
+    keys = list(session.keys())
+    for i, key in enumerate(keys):
+        comma = ',' if i < len(keys) - 1 else ''
+        value = session[key]
+        if key == 'steps':
+            lines.append(f'"{key}":[')
+            for j, step in enumerate(value):
+                step_comma = ',' if j < len(value) - 1 else ''
+                lines.append(json.dumps(step, ensure_ascii=True) + step_comma)
+            lines.append(']' + comma)
+        else:
+            lines.append(f'"{key}":{json.dumps(value, ensure_ascii=True)}{comma}')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def detect_layout(text, session=None):
+    """Return the layout that reproduces `text` exactly, or None."""
+    if session is None:
+        session = json.loads(text)
+    for layout in LAYOUTS:
+        if session_json_text(session, layout) == text:
+            return layout
+    return None
+
+
+# --- primitive coding ------------------------------------------------------
+
+def _put_varint(out, n):
+    while n > 0x7f:
+        out.append((n & 0x7f) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _put_sint(out, n):
+    _put_varint(out, (n << 1) if n >= 0 else ((-n << 1) - 1))
+
+
+def _put_bytes(out, data):
+    _put_varint(out, len(data))
+    out += data
+
+
+def _put_json(out, value):
+    _put_bytes(out, json.dumps(value, separators=(',', ':')).encode('ascii'))
+
+
+def _put_array(out, typecode, values):
+    """A column of fixed-width little-endian numbers."""
+    words = array.array(typecode, values)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    _put_bytes(out, words.tobytes())
+
+
+def _put_ids(out, ids):
+    """Entry ids: 16-bit words when they fit, else 32-bit."""
+    wide = bool(ids) and max(ids) > 0xffff
+    out.append(4 if wide else 2)
+    _put_array(out, 'I' if wide else 'H', ids)
+
+
+def _put_section(out, payload):
+    _put_bytes(out, zlib.compress(bytes(payload), 9))
+
+
+class _Buf:
+    """Read cursor over bytes."""
+
+    __slots__ = ('data', 'pos')
+
+    def __init__(self, data, pos=0):
+        self.data = data
+        self.pos = pos
+
+    def byte(self):
+        b = self.data[self.pos]
+        self.pos += 1
+        return b
+
+    def varint(self):
+        n = shift = 0
+        while True:
+            b = self.data[self.pos]
+            self.pos += 1
+            n |= (b & 0x7f) << shift
+            if b < 0x80:
+                return n
+            shift += 7
+
+    def sint(self):
+        n = self.varint()
+        return (n >> 1) if not n & 1 else -((n + 1) >> 1)
+
+    def bytes(self):
+        size = self.varint()
+        start = self.pos
+        self.pos += size
+        return self.data[start:self.pos]
+
+    def json(self):
+        return json.loads(self.bytes())
+
+    def array(self, typecode):
+        words = array.array(typecode)
+        words.frombytes(self.bytes())
+        if sys.byteorder == 'big':
+            words.byteswap()
+        return words
+
+    def ids(self):
+        return self.array('I' if self.byte() == 4 else 'H')
+
+    def section(self):
+        return _Buf(zlib.decompress(self.bytes()))
+
+
+# --- encoder ---------------------------------------------------------------
+
+def _is_int_grid(v):
+    if len(v) < 2 or not all(isinstance(row, list) for row in v):
+        return False
+    width = len(v[0])
+    return width > 0 and all(
+        len(row) == width and all(type(cell) is int for cell in row) for row in v)
+
+
+def _split_call(entry):
+    """Return (fn, args, result, site) if `entry` is a plain RNG call line."""
+    m = _RNG_CALL_RE.match(entry)
+    if not m:
+        return None
+    fn, arg_text, result, site = m.groups()
+    args = [int(a) for a in arg_text.split(',')]
+    result = int(result)
+    if any(abs(n) >= _INT64 for n in args + [result]):
+        return None
+    # Only lines the decoder rebuilds character for character.
+    if _format_call(fn, args, result, site) != entry:
+        return None
+    return fn, args, result, site
+
+
+def _format_call(fn, args, result, site):
+    text = f'{fn}({",".join(str(a) for a in args)})={result}'
+    return text if site is None else f'{text} @ {site}'
+
+
+def _screen_record(screen, before):
+    """Return the screen column record for `screen`, or None if not a screen."""
+    if isinstance(screen, str):
+        lines = screen.split('\n')
+        old = before.split('\n') if isinstance(before, str) else None
+    elif isinstance(screen, list) and all(isinstance(s, str) for s in screen):
+        lines = screen
+        old = before if isinstance(before, list) and all(isinstance(s, str) for s in before) else None
+    else:
+        return None
+    delta = None
+    if old is not None:
+        delta = [len(lines)]
+        for i, line in enumerate(lines):
+            if i >= len(old) or old[i] != line:
+                delta += (i, line)
+        if len(delta) // 2 >= len(lines):
+            delta = None
+    if isinstance(screen, str):
+        return screen if delta is None else delta
+    return {'lines': screen} if delta is None else {'delta': delta}
+
+
+def _apply_screen_record(record, before):
+    if isinstance(record, str):
+        return record
+    if isinstance(record, dict):
+        if 'lines' in record:
+            return record['lines']
+        lines = list(before)
+        delta = record['delta']
+    else:
+        lines = before.split('\n')
+        delta = record
+    count = delta[0]
+    del lines[count:]
+    lines.extend([''] * (count - len(lines)))
+    for k in range(1, len(delta), 2):
+        lines[delta[k]] = delta[k + 1]
+    return '\n'.join(lines) if isinstance(record, list) else lines
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings = []
+        self._string_ids = {}
+        self.entries = []
+        self._entry_ids = {}
+
+    def intern(self, s):
+        sid = self._string_ids.get(s)
+        if sid is None:
+            sid = self._string_ids[s] = len(self.strings)
+            self.strings.append(s)
+        return sid
+
+    def entry_id(self, entry):
+        return self._entry_ids[entry]
+
+    def collect_entries(self, steps):
+        """Assign entry ids grouped by shape, so the decoder can concatenate."""
+        distinct = {}
+        for step in steps:
+            rng = step.get('rng') if isinstance(step, dict) else None
+            if isinstance(rng, list):
+                for entry in rng:
+                    if isinstance(entry, str) and entry not in distinct:
+                        distinct[entry] = _split_call(entry)
+        raws = [e for e, call in distinct.items() if call is None]
+        one = [e for e, call in distinct.items()
+               if call is not None and len(call[1]) == 1 and call[3] is not None]
+        other = [e for e, call in distinct.items()
+                 if call is not None and not (len(call[1]) == 1 and call[3] is not None)]
+        self.entries = raws + one + other
+        self._entry_ids = {e: i for i, e in enumerate(self.entries)}
+        self._calls = distinct
+        self._shape_counts = (len(raws), len(one), len(other))
+
+    def strip_grids(self, v, grids):
+        """Copy `v` with integer grids replaced by {_GRID_KEY: n} placeholders."""
+        if isinstance(v, dict):
+            return {k: self.strip_grids(x, grids) for k, x in v.items()}
+        if isinstance(v, list):
+            if _is_int_grid(v):
+                grids.append(v)
+                return {_GRID_KEY: len(grids) - 1}
+            return [self.strip_grids(x, grids) for x in v]
+        return v
+
+    def chunk(self, steps):
+        """Encode a run of steps; screens after the first are deltas."""
+        flags = bytearray()
+        skeleton = []
+        rng_counts = []
+        rng_ids = []
+        screens = []
+        grids = []
+        prev = None
+        for step in steps:
+            if not isinstance(step, dict):
+                flags.append(0)
+                skeleton.append(self.strip_grids(step, grids))
+                prev = None
+                continue
+            bits = 0
+            shell = {}
+            for key, v in step.items():
+                if key == 'rng' and isinstance(v, list) and all(isinstance(e, str) for e in v):
+                    bits |= _F_RNG
+                    rng_counts.append(len(v))
+                    rng_ids.extend(self.entry_id(e) for e in v)
+                    shell[key] = None
+                elif key in _SCREEN_FLAGS and isinstance(v, (str, list)):
+                    shell[key] = None
+                else:
+                    shell[key] = self.strip_grids(v, grids)
+            # Screens go in _SCREEN_FLAGS order whatever the step's key order.
+            for key, bit in _SCREEN_FLAGS.items():
+                if key in step and shell[key] is None and step[key] is not None:
+                    record = _screen_record(step[key], prev.get(key) if prev else None)
+                    if record is not None:
+                        bits |= bit
+                        screens.append(record)
+                    else:
+                        shell[key] = self.strip_grids(step[key], grids)
+            flags.append(bits)
+            skeleton.append(shell)
+            prev = step
+        out = bytearray()
+        _put_bytes(out, flags)
+        _put_json(out, skeleton)
+        _put_array(out, 'I', rng_counts)
+        _put_ids(out, rng_ids)
+        _put_json(out, screens)
+        _put_grids(out, grids)
+        return out
+
+    def string_table(self):
+        out = bytearray()
+        _put_json(out, self.strings)
+        return out
+
+    def entry_table(self):
+        """Column-pack the distinct RNG entries: raw lines, then calls by shape."""
+        n_raw, n_one, _ = self._shape_counts
+        raws = self.entries[:n_raw]
+        one = ([], [], [], [])            # fn, arg, result, site
+        other = ([], [], [], [], [])      # fn, arity, args, result, site + 1
+        for entry in self.entries[n_raw:n_raw + n_one]:
+            fn, args, result, site = self._calls[entry]
+            for column, n in zip(one, (self.intern(fn), args[0], result, self.intern(site))):
+                column.append(n)
+        for entry in self.entries[n_raw + n_one:]:
+            fn, args, result, site = self._calls[entry]
+            other[0].append(self.intern(fn))
+            other[1].append(len(args))
+            other[2].extend(args)
+            other[3].append(result)
+            other[4].append(0 if site is None else self.intern(site) + 1)
+        out = bytearray()
+        _put_json(out, raws)
+        for typecode, column in zip('IqqI', one):
+            _put_array(out, typecode, column)
+        for typecode, column in zip('IBqqI', other):
+            _put_array(out, typecode, column)
+        return out
+
+
+def _put_grids(out, grids):
+    _put_varint(out, len(grids))
+    for rows in grids:
+        _put_varint(out, len(rows))
+        _put_varint(out, len(rows[0]))
+        flat = [cell for row in rows for cell in row]
+        start = 0
+        while start < len(flat):
+            end = start + 1
+            while end < len(flat) and flat[end] == flat[start]:
+                end += 1
+            _put_varint(out, end - start)
+            _put_sint(out, flat[start])
+            start = end
+
+
+def encode_session(session, layout=LAYOUT_LINES):
+    """Return the .session.bin bytes for a session dict."""
+    enc = _Encoder()
+    steps = session.get('steps')
+    has_steps = isinstance(steps, list)
+    grids = []
+    header = {k: (None if k == 'steps' and has_steps else enc.strip_grids(v, grids))
+              for k, v in session.items()}
+    enc.collect_entries(steps if has_steps else [])
+    chunks = [enc.chunk(steps[start:start + CHUNK_STEPS])
+              for start in range(0, len(steps) if has_steps else 0, CHUNK_STEPS)]
+    header_out = bytearray()
+    header_out.append(1 if has_steps else 0)
+    _put_json(header_out, header)
+    _put_grids(header_out, grids)
+
+    # Tables last: encoding the steps is what fills them.
+    entries = enc.entry_table()
+    out = bytearray(MAGIC)
+    out.append(FORMAT_VERSION)
+    out.append(layout)
+    _put_section(out, enc.string_table())
+    _put_section(out, entries)
+    _put_section(out, header_out)
+    offsets = []
+    for chunk in chunks:
+        offsets.append(len(out))
+        _put_section(out, chunk)
+    index_offset = len(out)
+    _put_varint(out, len(offsets))
+    _put_varint(out, CHUNK_STEPS)
+    _put_varint(out, len(steps) if has_steps else 0)
+    for offset in offsets:
+        _put_varint(out, offset)
+    out += struct.pack('<Q', index_offset)
+    return bytes(out)
+
+
+def write_session_binary(session, path, layout=LAYOUT_LINES):
+    data = encode_session(session, layout)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+# --- decoder ---------------------------------------------------------------
+
+def _read_grids(buf):
+    grids = []
+    for _ in range(buf.varint()):
+        rows = buf.varint()
+        cols = buf.varint()
+        flat = []
+        while len(flat) < rows * cols:
+            run = buf.varint()
+            flat.extend([buf.sint()] * run)
+        grids.append([flat[r * cols:(r + 1) * cols] for r in range(rows)])
+    return grids
+
+
+def _restore_grids(v, grids):
+    if isinstance(v, dict):
+        if len(v) == 1 and _GRID_KEY in v:
+            return grids[v[_GRID_KEY]]
+        return {k: _restore_grids(x, grids) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_restore_grids(x, grids) for x in v]
+    return v
+
+
+class SessionBinaryReader:
+    """Random access to a .session.bin file.
+
+    `metadata` is the top-level object without "steps"; step(i) decodes
+    only the chunk holding step i.  Use as a context manager or close().
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = f.read()
+        data = self._data
+        if data[:4] != MAGIC:
+            raise ValueError(f'{path}: not a session binary file')
+        if data[4] != FORMAT_VERSION:
+            raise ValueError(f'{path}: unsupported session binary version {data[4]}')
+        self.layout = data[5]
+        buf = _Buf(data, 6)
+        self._strings = buf.section().json()
+        # The entry table is only decoded once a step is read.
+        self._entries_at = buf.pos
+        buf.bytes()
+        self._entry_list = None
+        header = buf.section()
+        self._has_steps = bool(header.byte())
+        self._header = header.json()
+        grids = _read_grids(header)
+        if grids:
+            self._header = _restore_grids(self._header, grids)
+        self.metadata = {k: v for k, v in self._header.items()
+                         if not (k == 'steps' and self._has_steps)}
+        (index_offset,) = struct.unpack_from('<Q', data, len(data) - 8)
+        index = _Buf(data, index_offset)
+        count = index.varint()
+        self.chunk_steps = index.varint()
+        self.step_count = index.varint()
+        self._offsets = [index.varint() for _ in range(count)]
+        self._chunk_cache = {}
+
+    def close(self):
+        self._data = None
+        self._chunk_cache.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.step_count
+
+    @property
+    def _entries(self):
+        if self._entry_list is None:
+            self._entry_list = self._read_entries(_Buf(self._data, self._entries_at).section())
+        return self._entry_list
+
+    def _read_entries(self, buf):
+        strings = self._strings
+        entries = buf.json()
+        fns, args, results, sites = (buf.array(t) for t in 'IqqI')
+        name = strings.__getitem__
+        entries += map('{}({})={} @ {}'.format, map(name, fns), args, results, map(name, sites))
+        fns, arities, args, results, sites = (buf.array(t) for t in 'IBqqI')
+        arg = 0
+        for fn, arity, result, site in zip(fns, arities, results, sites):
+            entries.append(_format_call(strings[fn], args[arg:arg + arity], result,
+                                        strings[site - 1] if site else None))
+            arg += arity
+        return entries
+
+    def _chunk(self, n):
+        steps = self._chunk_cache.get(n)
+        if steps is not None:
+            return steps
+        buf = _Buf(self._data, self._offsets[n]).section()
+        flags = buf.bytes()
+        steps = buf.json()
+        counts = buf.array('I')
+        ids = buf.ids()
+        screens = iter(buf.json())
+        grids = _read_grids(buf)
+        if grids:
+            steps = _restore_grids(steps, grids)
+        entries = self._entries if ids else None
+        pos = 0
+        count_index = 0
+        prev = None
+        for step, bits in zip(steps, flags):
+            if bits & _F_RNG:
+                end = pos + counts[count_index]
+                count_index += 1
+                step['rng'] = [entries[i] for i in ids[pos:end]]
+                pos = end
+            for key, bit in _SCREEN_FLAGS.items():
+                if bits & bit:
+                    step[key] = _apply_screen_record(next(screens), prev.get(key) if prev else None)
+            prev = step if isinstance(step, dict) else None
+        # Keep one chunk: sequential step() calls stay cheap.
+        self._chunk_cache = {n: steps}
+        return steps
+
+    def step(self, i):
+        """Return step i (negative indexes count from the end)."""
+        if i < 0:
+            i += self.step_count
+        if not 0 <= i < self.step_count:
+            raise IndexError(f'step {i} out of range')
+        return self._chunk(i // self.chunk_steps)[i % self.chunk_steps]
+
+    def steps(self):
+        """Yield every step in order."""
+        for n in range(len(self._offsets)):
+            yield from self._chunk(n)
+
+    def session(self):
+        """Return the whole session dict, identical to the JSON's."""
+        out = dict(self._header)
+        if self._has_steps:
+            out['steps'] = [step for n in range(len(self._offsets)) for step in self._chunk(n)]
+        return out
+
+
+def read_session_binary(path):
+    with SessionBinaryReader(path) as reader:
+        return reader.session()
+
+
+def is_session_binary(path):
+    with open(path, 'rb') as f:
+        return f.read(4) == MAGIC
+
+
+def load_session(path):
+    """Load a session from .session.json or .session.bin."""
+    if is_session_binary(path):
+        return read_session_binary(path)
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def binary_path_for(json_path):
+    base = json_path[:-5] if json_path.endswith('.json') else json_path
+    return base + '.bin'
+
+
+def json_path_for(bin_path):
+    base = bin_path[:-4] if bin_path.endswith('.bin') else bin_path
+    return base + '.json'
+
+
+# --- command line ----------------------------------------------------------
+
+def pack_file(json_path, out_path=None):
+    """Convert one JSON session; verify it reproduces the JSON bytes."""
+    with open(json_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    session = json.loads(text)
+    layout = detect_layout(text, session)
+    if layout is None:
+        raise ValueError(f'{json_path}: JSON layout not reproducible; not packed')
+    data = encode_session(session, layout)
+    out_path = out_path or binary_path_for(json_path)
+    with open(out_path, 'wb') as f:
+        f.write(data)
+    with SessionBinaryReader(out_path) as reader:
+        if session_json_text(reader.session(), reader.layout) != text:
+            raise ValueError(f'{json_path}: round trip mismatch')
+    return out_path, len(text.encode('utf-8')), len(data)
+
+
+def unpack_file(bin_path, out_path=None):
+    with SessionBinaryReader(bin_path) as reader:
+        text = session_json_text(reader.session(), reader.layout)
+    out_path = out_path or json_path_for(bin_path)
+    with open(out_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    return out_path
+
+
+def check_file(json_path):
+    """Round-trip one JSON session; return a stats dict.
+
+    Only a temporary file is written; nothing lands next to `json_path`.
+    """
+    with open(json_path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    t0 = time.perf_counter()
+    session = json.loads(text)
+    json_s = time.perf_counter() - t0
+    layout = detect_layout(text, session)
+    if layout is None:
+        return {'path': json_path, 'ok': False, 'error': 'layout not reproducible'}
+    data = encode_session(session, layout)
+    # Scratch copy in the temp dir: the sessions dir may be read-only or shared.
+    fd, tmp = tempfile.mkstemp(suffix='.session.bin')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        t0 = time.perf_counter()
+        with SessionBinaryReader(tmp) as reader:
+            open_s = time.perf_counter() - t0
+            decoded = reader.session()
+            bin_s = time.perf_counter() - t0
+            ok = session_json_text(decoded, reader.layout) == text
+    finally:
+        os.unlink(tmp)
+    return {'path': json_path, 'ok': ok, 'jsonBytes': len(text.encode('utf-8')),
+            'binBytes': len(data), 'jsonLoadS': json_s, 'binLoadS': bin_s, 'binOpenS': open_s}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert sessions to/from .session.bin')
+    sub = parser.add_subparsers(dest='command', required=True)
+    pack = sub.add_parser('pack', help='Write .session.bin next to each JSON session')
+    pack.add_argument('paths', nargs='+')
+    pack.add_argument('--remove-json', action='store_true', help='Delete each JSON after a verified pack')
+    unpack = sub.add_parser('unpack', help='Write .session.json next to each binary session')
+    unpack.add_argument('paths', nargs='+')
+    check = sub.add_parser('check', help='Verify round trips and report size and load time')
+    check.add_argument('paths', nargs='+')
+    args = parser.parse_args()
+
+    failures = 0
+    if args.command == 'pack':
+        for path in args.paths:
+            try:
+                out_path, json_bytes, bin_bytes = pack_file(path)
+            except ValueError as e:
+                print(f'ERROR {e}')
+                failures += 1
+                continue
+            if args.remove_json:
+                os.unlink(path)
+            print(f'{out_path}: {json_bytes} -> {bin_bytes} bytes')
+    elif args.command == 'unpack':
+        for path in args.paths:
+            print(unpack_file(path))
+    else:
+        totals = {'jsonBytes': 0, 'binBytes': 0, 'jsonLoadS': 0.0, 'binLoadS': 0.0, 'binOpenS': 0.0}
+        for path in args.paths:
+            stats = check_file(path)
+            if not stats['ok']:
+                print(f'FAIL {path}: {stats.get("error", "round trip mismatch")}')
+                failures += 1
+                continue
+            for key in totals:
+                totals[key] += stats[key]
+        checked = len(args.paths) - failures
+        if checked:
+            print(f'{checked} session(s) round-trip exactly')
+            print(f'  size: {totals["jsonBytes"]} -> {totals["binBytes"]} bytes '
+                  f'({totals["jsonBytes"] / max(1, totals["binBytes"]):.1f}x)')
+            print(f'  full load: json {totals["jsonLoadS"] * 1000:.0f} ms, '
+                  f'bin {totals["binLoadS"] * 1000:.0f} ms; '
+                  f'bin open (metadata + index) {totals["binOpenS"] * 1000:.0f} ms')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,306 @@
+#!/usr/bin/env python3
+"""Streaming reader for session JSON files.
+
+compact_session_json() writes one top-level key per line and one step
+per line between '"steps":[' and ']'.  SessionStream uses that layout to
+avoid json.load of the whole file:
+
+    with SessionStream(path) as session:
+        seed = session.header(('seed',))['seed']
+        for step in session.steps(('key', 'rngCount')):
+            ...
+        last = session.step(len(session) - 1, ('screen',))
+
+- steps() yields one step at a time, so memory stays flat however long
+  the session is.
+- fields projects each step (and header()) onto the named keys.  Each
+  line is scanned member by member and stops once every requested key
+  is found, so asking for 'key' never touches the rng log or screen.
+  The derived field 'rngCount' is the length of the step's rng array.
+- step(n) seeks straight to step n through a byte-offset index, which is
+  built on first use by scanning line ends without parsing any JSON.
+
+Delta-encoded screens (screen_delta.py) are expanded whenever 'screen'
+is requested; a seek replays at most one keyframe interval of deltas.
+
+Files in any other layout, such as single-line JSON, are read with
+json.load once and served from memory through the same API.
+
+Usage:
+    python3 session_stream.py <session.json> [--fields key,rngCount] [--step N]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from json.decoder import scanstring
+
+from screen_delta import apply_screen_delta, expand_screen_deltas
+
+LAYOUT_LINES = 'lines'
+LAYOUT_JSON = 'json'
+RNG_COUNT = 'rngCount'
+
+_STEPS_LINE = b'"steps":['
+_WS = ' \t\r\n'
+_WS_RE = re.compile(r'[ \t\r\n]*')
+_decoder = json.JSONDecoder()
+
+
+def _skip_ws(text, pos):
+    # separators are ', ' / ': ' or bare; most calls need no regex at all
+    if pos < len(text) and text[pos] in _WS:
+        return _WS_RE.match(text, pos).end()
+    return pos
+
+
+def _skip_value(text, pos):
+    """Return the end of the JSON value at pos, building as little as possible."""
+    if text[pos] == '"':
+        return scanstring(text, pos + 1)[1]
+    return _decoder.raw_decode(text, pos)[1]
+
+
+def project_members(text, fields, pos=0):
+    """Decode only the named members of the JSON object starting at pos.
+
+    fields is a set of key names (plus 'rngCount'); None decodes the whole
+    object.  Scanning stops as soon as every requested key is found.
+    """
+    if fields is None:
+        return _decoder.raw_decode(text, pos)[0]
+    out = {}
+    wanted = len(fields)
+    pos = _skip_ws(text, pos) + 1  # '{'
+    while True:
+        pos = _skip_ws(text, pos)
+        if pos >= len(text) or text[pos] == '}':
+            return out
+        key, pos = scanstring(text, pos + 1)
+        pos = _skip_ws(text, _skip_ws(text, pos) + 1)  # ':'
+        if key in fields:
+            out[key], pos = _decoder.raw_decode(text, pos)
+            if key == 'rng' and RNG_COUNT in fields and isinstance(out[key], list):
+                out[RNG_COUNT] = len(out[key])
+        elif key == 'rng' and RNG_COUNT in fields:
+            value, pos = _decoder.raw_decode(text, pos)
+            out[RNG_COUNT] = len(value) if isinstance(value, list) else 0
+        else:
+            pos = _skip_value(text, pos)
+        if len(out) == wanted:
+            return out
+        pos = _skip_ws(text, pos)
+        if pos < len(text) and text[pos] == ',':
+            pos += 1
+
+
+def _project(step, fields):
+    """Project an already-decoded step onto fields (in-memory layout)."""
+    if fields is None or not isinstance(step, dict):
+        return step
+    out = {k: step[k] for k in fields if k in step}
+    if RNG_COUNT in fields and isinstance(step.get('rng'), list):
+        out[RNG_COUNT] = len(step['rng'])
+    return out
+
+
+def _step_fields(fields):
+    """Fields to decode per line; a screen needs its delta too."""
+    if fields is None or 'screen' not in fields:
+        return fields
+    return fields | {'screenDelta'}
+
+
+class SessionStream:
+    """Lazy, seekable view of one session file.  Use as a context manager."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._head = []           # pre-steps header lines (decoded text)
+        self._steps_offset = None
+        self._offsets = None      # byte offset of each step line
+        self._tail_offset = None  # byte offset of the line after ']'
+        self._data = None         # whole session, LAYOUT_JSON only
+        first = self._file.readline()
+        if first.strip() == b'{':
+            while True:
+                line = self._file.readline()
+                if not line or line.rstrip() == b'}':
+                    break
+                if line.startswith(_STEPS_LINE):
+                    self._steps_offset = self._file.tell()
+                    break
+                self._head.append(line.decode('utf-8'))
+        if self._steps_offset is None:
+            self._file.seek(0)
+            self._data = expand_screen_deltas(json.load(self._file))
+            self._head = []
+
+    @property
+    def layout(self):
+        return LAYOUT_JSON if self._data is not None else LAYOUT_LINES
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _build_index(self):
+        if self._offsets is not None:
+            return
+        offsets = []
+        self._file.seek(self._steps_offset)
+        pos = self._steps_offset
+        for line in self._file:
+            if line.startswith(b']'):
+                self._tail_offset = pos + len(line)
+                break
+            offsets.append(pos)
+            pos += len(line)
+        self._offsets = offsets
+
+    def __len__(self):
+        if self._data is not None:
+            steps = self._data.get('steps')
+            return len(steps) if isinstance(steps, list) else 0
+        self._build_index()
+        return len(self._offsets)
+
+    def header(self, fields=None):
+        """Top-level keys other than "steps", optionally projected.
+
+        Keys written after the steps (regen, type, checkpoints, ...) are
+        found by seeking past the step lines via the offset index.
+        """
+        wanted = None if fields is None else set(fields)
+        if self._data is not None:
+            return {k: v for k, v in self._data.items()
+                    if k != 'steps' and (wanted is None or k in wanted)}
+        out = {}
+        for line in self._head:
+            out.update(project_members('{' + line.rstrip().rstrip(',') + '}', wanted))
+        if wanted is not None and wanted <= out.keys():
+            return out
+        self._build_index()
+        self._file.seek(self._tail_offset)
+        for line in self._file:
+            if line.rstrip() != b'}':
+                out.update(project_members('{' + line.decode('utf-8').rstrip().rstrip(',') + '}', wanted))
+        out.pop('screenDelta', None)
+        return out
+
+    def steps(self, fields=None, start=0):
+        """Yield steps from index `start` on, projected onto fields."""
+        if self._data is not None:
+            for step in (self._data.get('steps') or [])[start:]:
+                yield _project(step, fields)
+            return
+        if fields is not None:
+            fields = set(fields)
+        decode = _step_fields(fields)
+        want_screen = decode is None or 'screen' in decode
+        prev_screen = None
+        first = start
+        if start:
+            self._build_index()
+            if start >= len(self._offsets):
+                return
+            if want_screen:
+                first = self._keyframe_before(start)
+            pos = self._offsets[first]
+        else:
+            pos = self._steps_offset
+        with open(self.path, 'rb') as f:
+            f.seek(pos)
+            for index, line in enumerate(f, first):
+                if line.startswith(b']'):
+                    return
+                step = project_members(line.decode('utf-8'), decode)
+                if want_screen:
+                    prev_screen = self._expand(step, prev_screen, index)
+                if index >= start:
+                    if fields is not None:
+                        step = {k: v for k, v in step.items() if k in fields}
+                    yield step
+
+    def _keyframe_before(self, index):
+        """Index of the closest step at or before `index` with a full screen."""
+        while index > 0:
+            self._file.seek(self._offsets[index])
+            probe = project_members(self._file.readline().decode('utf-8'), {'screenDelta'})
+            if 'screenDelta' not in probe:
+                break
+            index -= 1
+        return max(index, 0)
+
+    @staticmethod
+    def _expand(step, prev_screen, index):
+        """Replace a screenDelta in step with its screen; return the screen."""
+        if 'screenDelta' in step:
+            if prev_screen is None:
+                raise ValueError(f'step {index}: screenDelta without a preceding screen')
+            step['screen'] = apply_screen_delta(prev_screen, step.pop('screenDelta'))
+        screen = step.get('screen')
+        return screen if isinstance(screen, str) else None
+
+    def step(self, index, fields=None):
+        """Return step `index` (negative counts from the end)."""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(f'step {index} out of range for {self.path}')
+        return next(self.steps(fields, start=index))
+
+    def session(self):
+        """Decode the whole session as json.load would (deltas expanded)."""
+        if self._data is not None:
+            return self._data
+        out = {}
+        self._build_index()
+        self._file.seek(self._tail_offset)
+        tail = [line.decode('utf-8') for line in self._file if line.rstrip() != b'}']
+        for line in self._head:
+            out.update(json.loads('{' + line.rstrip().rstrip(',') + '}'))
+        out['steps'] = list(self.steps())
+        for line in tail:
+            out.update(json.loads('{' + line.rstrip().rstrip(',') + '}'))
+        out.pop('screenDelta', None)
+        return out
+
+
+def open_session(path):
+    """Open a SessionStream (for symmetry with session_binary.load_session)."""
+    return SessionStream(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Stream steps from a session file as JSON lines')
+    parser.add_argument('session')
+    parser.add_argument('--fields', help='Comma-separated step fields (e.g. key,rngCount)')
+    parser.add_argument('--step', type=int, help='Print only this step (negative counts from the end)')
+    parser.add_argument('--header', action='store_true', help='Print the top-level keys instead of steps')
+    args = parser.parse_args()
+
+    fields = args.fields.split(',') if args.fields else None
+    if not os.path.exists(args.session):
+        parser.error(f'no such file: {args.session}')
+    with SessionStream(args.session) as session:
+        if args.header:
+            print(json.dumps(session.header(fields)))
+        elif args.step is not None:
+            print(json.dumps(session.step(args.step, fields)))
+        else:
+            for step in session.steps(fields):
+                print(json.dumps(step))
+    sys.stdout.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""Shared tmux driver: one control-mode connection per session.
+
+The harness scripts used to fork a `tmux` client for every send-keys,
+capture-pane and display-message -- three to five process spawns per
+recorded step.  This module keeps one `tmux -C attach-session` client per
+session instead and writes commands to its stdin:
+
+- commands are pipelined: several are written at once and their
+  %begin/%end replies are matched up in order;
+- tmux_step() sends a key and captures the screen and cursor in one round
+  trip (capture_screen_and_cursor() does the last two);
+- literal keys go through `send-keys -H` (hex bytes), so ';' and quotes
+  need no load-buffer/paste-buffer detour;
+- %output notifications are parsed, so wait_for_output() can wait for the
+  game to draw instead of sleeping a fixed time.
+
+The module-level helpers (tmux_send, tmux_send_special, tmux_capture,
+capture_cursor) keep the signatures and return values of the old
+subprocess helpers.  A connection whose session was killed is replaced
+on next use, so scripts that recycle session names need no changes.
+TMUX_DRIVER=subprocess restores the per-command subprocess path.
+"""
+
+import atexit
+import os
+import queue
+import re
+import subprocess
+import threading
+import time
+
+
+DRIVER_ENV = 'TMUX_DRIVER'
+CURSOR_FORMAT = '#{cursor_x},#{cursor_y},#{cursor_flag}'
+
+_BEGIN_RE = re.compile(r'^%begin (\d+) (\d+) (\d+)$')
+_OCTAL_RE = re.compile(rb'\\([0-7]{3})')
+
+_connections = {}
+_connections_lock = threading.Lock()
+
+
+class TmuxError(RuntimeError):
+    """A tmux command failed (%error reply)."""
+
+
+class TmuxDisconnected(TmuxError):
+    """The control client exited, e.g. because its session was killed."""
+
+
+def _use_subprocess():
+    return os.environ.get(DRIVER_ENV, '').strip().lower() == 'subprocess'
+
+
+def _quote(arg):
+    """Quote one argument for the tmux command parser."""
+    return "'" + str(arg).replace("'", "'\\''") + "'"
+
+
+def _decode_output(data):
+    """Undo control-mode escaping (\\ooo octal for bytes < 32 and '\\')."""
+    return _OCTAL_RE.sub(lambda m: bytes([int(m.group(1), 8)]), data)
+
+
+class TmuxControl:
+    """A `tmux -C` client attached to one session.
+
+    A reader thread splits the client's stdout into command replies
+    (queued in order) and notifications; %output only bumps
+    output_seq/last_output so waiting callers can see the pane change.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.proc = subprocess.Popen(
+            ['tmux', '-C', 'attach-session', '-t', session],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+        )
+        self.closed = False
+        self.output_seq = 0
+        self.output_bytes = 0
+        self.last_output = 0.0
+        self._replies = queue.Queue()
+        self._lock = threading.Lock()
+        self._output_cond = threading.Condition()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def _read_loop(self):
+        block = None
+        stdout = self.proc.stdout
+        try:
+            for raw in iter(stdout.readline, b''):
+                line = raw.rstrip(b'\n')
+                if block is not None:
+                    text = line.decode('utf-8', errors='replace')
+                    tag, _, rest = text.partition(' ')
+                    if tag in ('%end', '%error') and rest == block['id']:
+                        # flags=1: a reply to one of our commands; the reply
+                        # to the attach itself (flags=0) is dropped.
+                        if block['ours']:
+                            self._replies.put((tag == '%end', block['lines']))
+                        block = None
+                    else:
+                        block['lines'].append(text)
+                    continue
+                if line.startswith(b'%begin '):
+                    text = line.decode('utf-8', errors='replace')
+                    m = _BEGIN_RE.match(text)
+                    if m:
+                        block = {'id': text[len('%begin '):], 'ours': m.group(3) == '1', 'lines': []}
+                    continue
+                if line.startswith(b'%output '):
+                    _, _, payload = line.split(b' ', 2) if line.count(b' ') >= 2 else (b'', b'', b'')
+                    with self._output_cond:
+                        self.output_seq += 1
+                        self.output_bytes += len(_decode_output(payload))
+                        self.last_output = time.monotonic()
+                        self._output_cond.notify_all()
+                    continue
+                if line.startswith(b'%exit'):
+                    break
+        finally:
+            self.closed = True
+            self._replies.put(None)
+            with self._output_cond:
+                self._output_cond.notify_all()
+
+    def command(self, *commands):
+        """Run tmux commands in one write; return each one's output lines."""
+        with self._lock:
+            if self.closed:
+                raise TmuxDisconnected(f'tmux control client for {self.session} has exited')
+            try:
+                self.proc.stdin.write(''.join(c + '\n' for c in commands).encode('utf-8'))
+            except (BrokenPipeError, OSError) as err:
+                self.closed = True
+                raise TmuxDisconnected(str(err)) from err
+            results = []
+            errors = []
+            for cmd in commands:
+                reply = self._replies.get()
+                if reply is None:
+                    raise TmuxDisconnected(f'tmux control client for {self.session} has exited')
+                ok, lines = reply
+                if not ok:
+                    errors.append(f'{cmd}: {" ".join(lines)}')
+                results.append(lines)
+            if errors:
+                raise TmuxError('; '.join(errors))
+            return results
+
+    # Command builders, so several can share one command() round trip.
+
+    def send_keys_cmd(self, keys):
+        data = keys.encode('utf-8')
+        return f'send-keys -t {_quote(self.session)} -H ' + ' '.join(f'{b:02x}' for b in data)
+
+    def send_special_cmd(self, key):
+        return f'send-keys -t {_quote(self.session)} {_quote(key)}'
+
+    def capture_cmd(self, start='0', end='30', escapes=False):
+        cmd = f'capture-pane -t {_quote(self.session)} -p'
+        if escapes:
+            cmd += ' -e'
+        if start is not None:
+            cmd += f' -S {start}'
+        if end is not None:
+            cmd += f' -E {end}'
+        return cmd
+
+    def cursor_cmd(self):
+        return f'display-message -p -t {_quote(self.session)} {_quote(CURSOR_FORMAT)}'
+
+    def send_keys(self, keys):
+        if keys:
+            self.command(self.send_keys_cmd(keys))
+
+    def send_special(self, key):
+        self.command(self.send_special_cmd(key))
+
+    def capture(self, start='0', end='30', escapes=False):
+        lines = self.command(self.capture_cmd(start, end, escapes))[0]
+        return ''.join(line + '\n' for line in lines)
+
+    def cursor(self):
+        return _parse_cursor(self.command(self.cursor_cmd())[0][0])
+
+    def wait_for_output(self, after_seq, quiet=0.02, timeout=1.0):
+        """Wait until output newer than after_seq has been quiet for `quiet` s.
+
+        Returns False if nothing was drawn within `timeout`.
+        """
+        deadline = time.monotonic() + timeout
+        with self._output_cond:
+            while True:
+                now = time.monotonic()
+                if self.output_seq > after_seq and now - self.last_output >= quiet:
+                    return True
+                if now >= deadline or self.closed:
+                    return self.output_seq > after_seq
+                if self.output_seq > after_seq:
+                    wait = quiet - (now - self.last_output)
+                else:
+                    wait = deadline - now
+                self._output_cond.wait(max(0.0, min(wait, deadline - now)))
+
+    def close(self):
+        if self.proc.poll() is None:
+            try:
+                self.proc.stdin.close()
+            except OSError:
+                pass
+            try:
+                self.proc.wait(timeout=2)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.closed = True
+
+
+def _parse_cursor(text):
+    col, row, visible = (int(v) for v in text.strip().split(','))
+    return [col, row, visible]
+
+
+def connection(session):
+    """The live control-mode connection for `session`, (re)attaching if needed."""
+    with _connections_lock:
+        conn = _connections.get(session)
+        if conn is None or conn.closed:
+            conn = _connections[session] = TmuxControl(session)
+        return conn
+
+
+def _run(session, fn):
+    """fn(conn), retried once on a fresh client if the old one had exited."""
+    try:
+        return fn(connection(session))
+    except TmuxDisconnected:
+        return fn(connection(session))
+
+
+def close_session(session):
+    """Detach the control client of `session` (before kill-session, say)."""
+    with _connections_lock:
+        conn = _connections.pop(session, None)
+    if conn is not None:
+        conn.close()
+
+
+def close_all():
+    for session in list(_connections):
+        close_session(session)
+
+
+atexit.register(close_all)
+
+
+def tmux_send(session, keys, delay=0):
+    if _use_subprocess():
+        # tmux drops a standalone ';' token as a command separator (tmux issue #1849).
+        if ';' in keys:
+            subprocess.run(['tmux', 'load-buffer', '-'], input=keys.encode(), check=True)
+            subprocess.run(['tmux', 'paste-buffer', '-t', session, '-d'], check=True)
+        else:
+            subprocess.run(['tmux', 'send-keys', '-t', session, '-l', keys], check=True)
+    else:
+        _run(session, lambda conn: conn.send_keys(keys))
+    if delay > 0:
+        time.sleep(delay)
+
+
+def tmux_send_special(session, key, delay=0):
+    if _use_subprocess():
+        subprocess.run(['tmux', 'send-keys', '-t', session, key], check=True)
+    else:
+        _run(session, lambda conn: conn.send_special(key))
+    if delay > 0:
+        time.sleep(delay)
+
+
+def tmux_capture(session, start='0', end='30', escapes=False):
+    """capture-pane -p output (rows start..end, -e if escapes) as one string."""
+    if _use_subprocess():
+        cmd = ['tmux', 'capture-pane', '-t', session, '-p']
+        if escapes:
+            cmd.append('-e')
+        if start is not None:
+            cmd += ['-S', str(start)]
+        if end is not None:
+            cmd += ['-E', str(end)]
+        return subprocess.run(cmd, capture_output=True, text=True, check=True).stdout
+    return _run(session, lambda conn: conn.capture(start, end, escapes))
+
+
+def capture_cursor(session):
+    """Return [col, row, visible] cursor position and visibility (0-indexed)."""
+    if _use_subprocess():
+        out = subprocess.run(
+            ['tmux', 'display-message', '-p', '-t', session, CURSOR_FORMAT],
+            capture_output=True, text=True, check=True
+        ).stdout
+        return _parse_cursor(out)
+    return _run(session, lambda conn: conn.cursor())
+
+
+def capture_screen_and_cursor(session, escapes=False):
+    """(capture-pane text, cursor) in one round trip."""
+    if _use_subprocess():
+        return tmux_capture(session, escapes=escapes), capture_cursor(session)
+
+    def read(conn):
+        screen, cursor = conn.command(conn.capture_cmd(escapes=escapes), conn.cursor_cmd())
+        return ''.join(line + '\n' for line in screen), _parse_cursor(cursor[0])
+
+    return _run(session, read)
+
+
+def tmux_step(session, keys, special=False, delay=0, settle=None, escapes=False):
+    """Send one key, then return (capture-pane text, cursor).
+
+    With no delay/settle the send, capture and cursor query go out in a
+    single round trip.  `delay` sleeps between send and capture as
+    tmux_send() does; `settle` instead waits (up to `delay` or 1s) until
+    the pane has drawn and then been quiet for `settle` seconds.
+    """
+    if _use_subprocess():
+        if special:
+            tmux_send_special(session, keys, 0 if settle else delay)
+        else:
+            tmux_send(session, keys, 0 if settle else delay)
+        if settle:
+            time.sleep(settle)
+        return tmux_capture(session, escapes=escapes), capture_cursor(session)
+
+    def step(conn):
+        send = conn.send_special_cmd(keys) if special else conn.send_keys_cmd(keys)
+        reads = [conn.capture_cmd(escapes=escapes), conn.cursor_cmd()]
+        if not delay and not settle:
+            _, screen, cursor = conn.command(send, *reads)
+        else:
+            seq = conn.output_seq
+            conn.command(send)
+            if settle:
+                conn.wait_for_output(seq, quiet=settle, timeout=delay or 1.0)
+            else:
+                time.sleep(delay)
+            screen, cursor = conn.command(*reads)
+        return ''.join(line + '\n' for line in screen), _parse_cursor(cursor[0])
+
+    return _run(session, step)
@@ -25,6 +25,9 @@ import tempfile
 import importlib.util
 
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+if SCRIPT_DIR not in sys.path:
+    sys.path.insert(0, SCRIPT_DIR)
+from tmux_driver import TmuxError, tmux_capture, tmux_send, tmux_send_special
 PROJECT_ROOT = os.path.normpath(os.path.join(SCRIPT_DIR, '..', '..', '..'))
 SESSIONS_DIR = os.path.join(PROJECT_ROOT, 'test', 'comparison', 'sessions')
 RESULTS_DIR = os.path.join(SCRIPT_DIR, 'results')
@@ -37,6 +40,7 @@ _spec = importlib.util.spec_from_file_location('run_session', RUN_SESSION_PATH)
 _session = importlib.util.module_from_spec(_spec)
 _spec.loader.exec_module(_session)
 capture_screen_compressed = _session.capture_screen_compressed
+expand_screen_deltas = _session.expand_screen_deltas
 screen_to_plain_lines = _session.screen_to_plain_lines
 
 
@@ -50,26 +54,6 @@ def fixed_datetime_env():
     return f'NETHACK_FIXED_DATETIME={dt} ' if dt else ''
 
 
-def tmux_send(session, keys, delay=0):
-    subprocess.run(['tmux', 'send-keys', '-t', session, '-l', keys], check=True)
-    if delay > 0:
-        time.sleep(delay)
-
-
-def tmux_send_special(session, key, delay=0):
-    subprocess.run(['tmux', 'send-keys', '-t', session, key], check=True)
-    if delay > 0:
-        time.sleep(delay)
-
-
-def tmux_capture(session):
-    result = subprocess.run(
-        ['tmux', 'capture-pane', '-t', session, '-p', '-S', '0', '-E', '30'],
-        capture_output=True, text=True, check=True
-    )
-    return result.stdout
-
-
 def capture_screen_lines(session):
     """Capture screen via canonical ANSI payload and decode plain lines."""
     return screen_to_plain_lines(capture_screen_compressed(session))
@@ -123,7 +107,7 @@ def clear_more_prompts(session, max_iterations=10):
         time.sleep(0.02)
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             break
         if '--More--' in content:
             tmux_send_special(session, 'Space', 0.1)
@@ -139,7 +123,7 @@ def wait_for_game_ready(session):
     for attempt in range(60):
         try:
             content = tmux_capture(session)
-        except subprocess.CalledProcessError:
+        except (subprocess.CalledProcessError, TmuxError):
             break
 
         if '--More--' in content:
@@ -254,7 +238,7 @@ def validate_session(session_path, verbose=False):
         - divergences: list of {step, expected, actual}
     """
     with open(session_path) as f:
-        session_data = json.load(f)
+        session_data = expand_screen_deltas(json.load(f))
 
     seed = session_data.get('seed', 0)
     options = session_data.get('options', {})
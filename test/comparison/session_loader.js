@@ -89,6 +89,37 @@ export function getSessionScreenAnsiLines(screenHolder) {
     return [];
 }
 
+// Delta-encoded screens (c-harness/screen_delta.py): keyframe steps keep
+// `screen`, the others carry `screenDelta` = [rowCount, [row, start, length,
+// text], ...] against the previous step's stored screen text.
+export function expandScreenDeltas(raw) {
+    if (!raw?.screenDelta || !Array.isArray(raw.steps)) return raw;
+    let prev = null;
+    raw.steps.forEach((step, index) => {
+        if (!step || typeof step !== 'object') {
+            prev = null;
+            return;
+        }
+        if (Array.isArray(step.screenDelta)) {
+            if (prev === null) {
+                throw new Error(`step ${index}: screenDelta without a preceding screen`);
+            }
+            const [rowCount, ...runs] = step.screenDelta;
+            const lines = prev.split('\n').slice(0, rowCount);
+            while (lines.length < rowCount) lines.push('');
+            for (const [row, start, length, text] of runs) {
+                const line = lines[row];
+                lines[row] = line.slice(0, start) + text + line.slice(start + length);
+            }
+            step.screen = lines.join('\n');
+            delete step.screenDelta;
+        }
+        prev = typeof step.screen === 'string' ? step.screen : null;
+    });
+    delete raw.screenDelta;
+    return raw;
+}
+
 function deriveType(raw, fileName) {
     if (typeof raw?.type === 'string' && raw.type.length > 0) {
         return raw.type;
@@ -298,6 +329,7 @@ function normalizeLevels(levels) {
 }
 
 export function normalizeSession(raw, meta = {}) {
+    expandScreenDeltas(raw);
     const file = meta.file || raw?.file || 'unknown.session.json';
     const dir = meta.dir || raw?.dir || '';
     const version = Number.isInteger(raw?.version) ? raw.version : 1;
@@ -0,0 +1,55 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// hack_harness / rogue_harness --batch with jobs read from a regular file:
+// each forked job shares the file offset of stdin, so a child that moved it
+// on exit would make the parent replay jobs (or loop forever).
+const HARNESSES = {
+    hack: path.join('hack', 'hack-c', 'patched', 'hack_harness'),
+    rogue: path.join('rogue', 'rogue-c', 'patched', 'rogue_harness'),
+};
+const JOBS = [
+    { id: 1, seed: 5, keys: 'hh' },
+    { id: 'second', seed: 6, keys: 'jjl' },
+];
+
+for (const [game, harness] of Object.entries(HARNESSES)) {
+    test(`${game} --batch runs each job of a jobs file once`, (t) => {
+        if (!fs.existsSync(harness)) {
+            t.skip(`${harness} not built (cd ${path.dirname(harness)} && make)`);
+            return;
+        }
+        const tmp = fs.mkdtempSync(path.join(os.tmpdir(), `${game}-batch-stdin-`));
+        try {
+            const jobsFile = path.join(tmp, 'jobs.jsonl');
+            fs.writeFileSync(jobsFile, JOBS.map((job) => JSON.stringify(job)).join('\n') + '\n');
+            const fd = fs.openSync(jobsFile, 'r');
+            let r;
+            try {
+                r = spawnSync(harness, ['--batch', '--timeout', '30'], {
+                    stdio: [fd, 'pipe', 'pipe'], encoding: 'utf8', timeout: 60000,
+                    maxBuffer: 256 * 1024 * 1024,
+                });
+            } finally {
+                fs.closeSync(fd);
+            }
+            assert.equal(r.error, undefined, 'harness did not finish');
+            assert.equal(r.status, 0, r.stderr);
+            const replies = r.stdout.trim().split('\n').map((line) => JSON.parse(line));
+            assert.deepEqual(replies.map((reply) => [reply.id, reply.ok]), [[1, true], ['second', true]]);
+            JOBS.forEach((job, i) => {
+                const single = spawnSync(harness, ['--seed', String(job.seed), '--keys', job.keys], {
+                    encoding: 'utf8', timeout: 30000, maxBuffer: 256 * 1024 * 1024,
+                });
+                assert.equal(single.status, 0, single.stderr);
+                assert.deepEqual(replies[i].session, JSON.parse(single.stdout));
+            });
+        } finally {
+            fs.rmSync(tmp, { recursive: true, force: true });
+        }
+    });
+}
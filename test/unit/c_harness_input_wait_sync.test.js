@@ -0,0 +1,104 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// InputWaitSync (run_session.py, patch 039-input-wait-sync) driven by a
+// fake game writing markers into its FIFO.
+const PRELUDE = `
+import atexit, json, os, shutil, sys, tempfile, threading, time
+sys.path.insert(0, 'test/comparison/c-harness')
+import run_session as rs
+tmp = tempfile.mkdtemp(prefix='input-wait-sync-')
+atexit.register(shutil.rmtree, tmp, True)
+sync = rs.InputWaitSync(os.path.join(tmp, 'input_sync.fifo'))
+`;
+
+function runPython(body) {
+    const r = spawnSync('python3', ['-c', PRELUDE + body], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('wait_keys returns once one marker per key has arrived', () => {
+    const out = runPython(`
+writer = os.open(sync.path, os.O_WRONLY)
+os.write(writer, b'1\\n')
+assert sync.wait(0, timeout_s=2)
+def game():
+    time.sleep(0.05)
+    os.write(writer, b'2\\n')
+    time.sleep(0.05)
+    os.write(writer, b'3\\n')
+threading.Thread(target=game).start()
+t = time.monotonic()
+ok = sync.wait_keys(1, 2, timeout_s=5)
+print(json.dumps({'ok': ok, 'seq': sync.seq, 'elapsed': time.monotonic() - t}))
+`);
+    assert.equal(out.ok, true);
+    assert.equal(out.seq, 3);
+    assert.ok(out.elapsed < 2, `waited ${out.elapsed}s`);
+});
+
+test('sending no keys does not wait for a marker', () => {
+    const out = runPython(`
+writer = os.open(sync.path, os.O_WRONLY)
+os.write(writer, b'1\\n')
+assert sync.wait(0, timeout_s=2)
+t = time.monotonic()
+ok = sync.wait_keys(sync.seq, 0, timeout_s=5)
+# press_key() must not touch tmux or the FIFO for an empty key string.
+rs.press_key('no-such-session', '', sync=sync)
+print(json.dumps({'ok': ok, 'elapsed': time.monotonic() - t}))
+`);
+    assert.equal(out.ok, true);
+    assert.ok(out.elapsed < 0.5, `waited ${out.elapsed}s`);
+});
+
+test('wait returns early when the game exits', () => {
+    const out = runPython(`
+writer = os.open(sync.path, os.O_WRONLY)
+os.write(writer, b'1\\n')
+assert sync.wait(0, timeout_s=2)
+os.close(writer)
+t = time.monotonic()
+ok = sync.wait(timeout_s=5)
+print(json.dumps({'ok': ok, 'elapsed': time.monotonic() - t}))
+`);
+    assert.equal(out.ok, false);
+    assert.ok(out.elapsed < 2, `waited ${out.elapsed}s`);
+});
+
+test('a resumed snapshot reconnects after the live game is killed', () => {
+    // Patch 040: snapshots close the FIFO, so killing the live game leaves
+    // no writer until the resumed game reopens it at its next input wait.
+    const out = runPython(`
+live = os.open(sync.path, os.O_WRONLY)
+os.write(live, b'1\\n2\\n3\\n')
+assert sync.wait(0, timeout_s=2)
+os.close(live)
+sync.drain()
+sync.seq = 0
+sync.expect_writer()
+def resumed():
+    time.sleep(0.1)
+    fd = os.open(sync.path, os.O_WRONLY)
+    os.write(fd, b'2\\n')
+    os.close(fd)
+threading.Thread(target=resumed).start()
+ok = sync.wait(1, timeout_s=5)
+print(json.dumps({'ok': ok, 'seq': sync.seq}))
+`);
+    assert.deepEqual(out, { ok: true, seq: 2 });
+});
+
+test('without a sync an empty key string still waits the delay', () => {
+    const out = runPython(`
+sent = []
+rs.tmux_send = lambda session, keys, delay=0: sent.append(keys)
+t = time.monotonic()
+rs.press_key('no-such-session', '', delay=0.3)
+print(json.dumps({'sent': sent, 'elapsed': time.monotonic() - t}))
+`);
+    assert.deepEqual(out.sent, ['']);
+    assert.ok(out.elapsed >= 0.3, `waited ${out.elapsed}s`);
+});
@@ -0,0 +1,66 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// Stress check for rerecord.run_parallel(): many fake recorders on a few
+// warm pool workers (harness_pool.py), each clearing and rewriting the same
+// save file, score log and rc file.  With a shared install one job's
+// cleanup deletes another's files mid-run; with per-worker sandboxes none
+// may fail.
+const JOBS = 24;
+const WORKERS = 4;
+
+const FAKE_RECORDER = `
+import os, sys, time
+tag = sys.argv[1]
+install = os.environ['NETHACK_HARNESS_INSTALL_DIR']
+home = os.environ['NETHACK_HARNESS_HOME']
+paths = [os.path.join(install, 'save', '1000Wizard.gz'),
+         os.path.join(install, 'record'),
+         os.path.join(home, '.nethackrc')]
+os.makedirs(os.path.join(install, 'save'), exist_ok=True)
+if os.listdir(os.path.join(install, 'save')):
+    sys.exit('save dir not cleared')
+if os.path.exists(paths[1]) and os.path.getsize(paths[1]):
+    sys.exit('record not cleared')
+for round in range(5):
+    for path in paths:
+        with open(path, 'a') as f:
+            f.write(tag + '\\n')
+    time.sleep(0.01)
+    for path in paths:
+        with open(path) as f:
+            if f.read() != (tag + '\\n') * (round + 1):
+                sys.exit(f'{path} touched by another job')
+os.unlink(paths[2])
+`;
+
+const hasTmux = spawnSync('tmux', ['-V']).status === 0;
+
+test('parallel workers never see each other\'s runtime state', (t) => {
+    if (!hasTmux) {
+        t.skip('tmux not installed');
+        return;
+    }
+    const script = `
+import json, os, shutil, sys, tempfile
+sys.path.insert(0, 'test/comparison/c-harness')
+import rerecord
+tmp = tempfile.mkdtemp(prefix='install-sandbox-stress-')
+try:
+    recorder = os.path.join(tmp, 'recorder.py')
+    with open(recorder, 'w') as f:
+        f.write(${JSON.stringify(FAKE_RECORDER)})
+    commands = [([sys.executable, recorder, f'job{i}'], f'job{i}')
+                for i in range(${JOBS})]
+    ok, failed = rerecord.run_parallel(commands, ${WORKERS})
+    print(json.dumps({'ok': ok, 'failed': sorted(failed)}))
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', timeout: 120000 });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.deepEqual(out.failed, []);
+    assert.equal(out.ok, JOBS);
+});
@@ -0,0 +1,55 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// harness_pool.py serve/submit over a real socket: every result, including
+// failed and malformed jobs, must arrive before the end-of-results sentinel.
+const hasTmux = spawnSync('tmux', ['-V']).status === 0;
+
+test('pool server streams every result before the sentinel', (t) => {
+    if (!hasTmux) {
+        t.skip('tmux not installed');
+        return;
+    }
+    const script = `
+import json, os, shutil, subprocess, sys, tempfile
+sys.path.insert(0, 'test/comparison/c-harness')
+import harness_pool
+tmp = tempfile.mkdtemp(prefix='harness-pool-test-')
+sock = os.path.join(tmp, 'pool.sock')
+server = subprocess.Popen(
+    [sys.executable, 'test/comparison/c-harness/harness_pool.py', 'serve',
+     '--workers', '2', '--socket', sock],
+    stdout=subprocess.PIPE, text=True)
+try:
+    assert 'ready' in server.stdout.readline()
+    jobs = []
+    for i in range(6):
+        path = os.path.join(tmp, f'job{i}.py')
+        with open(path, 'w') as f:
+            f.write(f'import sys, time\\ntime.sleep({(6 - i) * 0.03})\\n'
+                    + ('sys.exit(3)\\n' if i == 2 else ''))
+        jobs.append({'kind': 'argv', 'argv': ['python3', path], 'id': f'job{i}'})
+    jobs.append({'kind': 'nonesuch', 'id': 'bad-kind'})
+    jobs.append(['not', 'a', 'job'])
+    results = list(harness_pool.submit(sock, jobs))
+    print(json.dumps(sorted([str(r['id']), r['ok']] for r in results)))
+finally:
+    server.terminate()
+    server.wait(timeout=30)
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', timeout: 120000 });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const results = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.deepEqual(results, [
+        ['None', false],
+        ['bad-kind', false],
+        ['job0', true],
+        ['job1', true],
+        ['job2', false],
+        ['job3', true],
+        ['job4', true],
+        ['job5', true],
+    ]);
+});
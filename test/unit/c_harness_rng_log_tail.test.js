@@ -0,0 +1,90 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// RngLogTail (run_session.py) following an RNG log as the C side appends
+// to it, including a line caught mid-write and a truncated log.
+test('RngLogTail returns each complete line once and matches a full read', () => {
+    const script = `
+import json, os, sys, tempfile
+sys.path.insert(0, 'test/comparison/c-harness')
+import run_session as rs
+fd, path = tempfile.mkstemp(prefix='rnglog-tail-')
+os.close(fd)
+try:
+    tail = rs.RngLogTail(path)
+    steps = []
+    def append(text):
+        with open(path, 'a') as f:
+            f.write(text)
+        count, lines = tail.read()
+        steps.append([count, [l.rstrip('\\n') for l in lines], tail.last_call])
+    append('1 rn2(12) = 2 @ mon.c:1145\\n2 rnd(4)')
+    append(' = 3 @ hack.c:10\\n>dog_move\\n')
+    append('')
+    append('3 rn2(2) = 0 @ dog.c:7\\n')
+    full = rs.read_rng_log(path)[0]
+    with open(path, 'w') as f:
+        f.write('1 rn2(5) = 1 @ u_init.c:3\\n')
+    count, lines = tail.read()
+    print(json.dumps({'steps': steps, 'full': full,
+                      'after_truncate': [count, len(lines), tail.last_call],
+                      'missing': rs.RngLogTail(path + '.none').read()}))
+finally:
+    os.unlink(path)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.deepEqual(out.steps, [
+        [1, ['1 rn2(12) = 2 @ mon.c:1145'], 1],
+        [3, ['2 rnd(4) = 3 @ hack.c:10', '>dog_move'], 2],
+        [3, [], 2],
+        [4, ['3 rn2(2) = 0 @ dog.c:7'], 3],
+    ]);
+    assert.equal(out.full, 4);
+    assert.deepEqual(out.after_truncate, [1, 1, 1]);
+    assert.deepEqual(out.missing, [0, []]);
+});
+
+test('call_count on a kept tail only reads what was appended', () => {
+    const script = `
+import builtins, json, os, sys, tempfile
+sys.path.insert(0, 'test/comparison/c-harness')
+import run_session as rs
+bytes_read = []
+class CountingFile:
+    def __init__(self, f):
+        self.f = f
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.f.close()
+    def seek(self, pos):
+        self.f.seek(pos)
+    def read(self, n):
+        data = self.f.read(n)
+        bytes_read.append(len(data))
+        return data
+rs.open = lambda *a, **k: CountingFile(builtins.open(*a, **k))
+fd, path = tempfile.mkstemp(prefix='rnglog-count-')
+os.close(fd)
+try:
+    counter = rs.RngLogTail(path)
+    counts = []
+    for chunk in ('1 rn2(12) = 2 @ mon.c:1145\\n2 rnd(4) = 3 @ hack.c:10\\n', '>dog_move\\n',
+                  '3 rn2(2) = 0 @ dog.c:7\\n'):
+        with open(path, 'a') as f:
+            f.write(chunk)
+        counts.append(counter.call_count())
+    print(json.dumps({'counts': counts, 'read': sum(bytes_read), 'size': os.path.getsize(path)}))
+finally:
+    os.unlink(path)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.deepEqual(out.counts, [2, 2, 3]);
+    // Each byte of the log is read once, not once per call.
+    assert.equal(out.read, out.size);
+});
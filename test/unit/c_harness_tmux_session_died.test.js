@@ -0,0 +1,56 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// A tmux session that dies mid-recording must take the scripts' "session
+// died" path under both tmux drivers: the control-mode driver raises
+// TmuxError where the subprocess driver raises CalledProcessError.
+const hasTmux = spawnSync('tmux', ['-V']).status === 0;
+
+const SCRIPT = `
+import io, json, subprocess, sys, time
+from contextlib import redirect_stdout
+sys.path.insert(0, 'test/comparison/c-harness')
+import run_dumpmap
+import run_session as rs
+subprocess.run(['tmux', 'new-session', '-d', '-s', 'dies', '-x', '80', '-y', '24', 'sleep 0.3'], check=True)
+try:
+    alive = 'dies' in subprocess.run(['tmux', 'list-sessions'], capture_output=True, text=True).stdout
+    rs.tmux_capture('dies')
+    while subprocess.run(['tmux', 'has-session', '-t', 'dies'], capture_output=True).returncode == 0:
+        time.sleep(0.05)
+    log = io.StringIO()
+    with redirect_stdout(log):
+        cleared = rs.clear_more_prompts('dies')
+        run_dumpmap.wait_for_game_ready('dies', True)
+finally:
+    subprocess.run(['tmux', 'kill-server'], capture_output=True)
+print(json.dumps({'alive': alive, 'cleared': cleared, 'log': log.getvalue()}))
+`;
+
+for (const driver of ['control', 'subprocess']) {
+    test(`a dead session ends the prompt loops (${driver} driver)`, (t) => {
+        if (!hasTmux) {
+            t.skip('tmux not installed');
+            return;
+        }
+        const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'tmux-session-died-'));
+        try {
+            const r = spawnSync('python3', ['-c', SCRIPT], {
+                encoding: 'utf8',
+                timeout: 60000,
+                env: { ...process.env, TMUX: '', TMUX_TMPDIR: tmp, TMUX_DRIVER: driver === 'subprocess' ? 'subprocess' : '' },
+            });
+            assert.equal(r.status, 0, r.stderr || r.stdout);
+            const out = JSON.parse(r.stdout.trim().split('\n').pop());
+            assert.equal(out.alive, true);
+            assert.equal(out.cleared, '');
+            assert.equal(out.log, '[0] tmux session died\n');
+        } finally {
+            fs.rmSync(tmp, { recursive: true, force: true });
+        }
+    });
+}
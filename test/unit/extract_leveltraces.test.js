@@ -0,0 +1,45 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// scripts/extract_leveltraces.py over a scratch maps dir: a grouped trace
+// is split per level, a per-step session is skipped and counted.
+test('grouped traces extract per level; others are counted as skipped', () => {
+    const script = `
+import json, os, shutil, sys, tempfile
+from pathlib import Path
+sys.path.insert(0, 'scripts')
+import extract_leveltraces as ex
+tmp = Path(tempfile.mkdtemp(prefix='leveltrace-test-'))
+try:
+    ex.MAPS_DIR = tmp / 'maps'
+    ex.LEVELTRACE_DIR = tmp / 'leveltrace'
+    ex.MAPS_DIR.mkdir()
+    grouped = {'seed': 7, 'group': 'sokoban', 'levels': [
+        {'levelName': 'soko1', 'branch': 'Sokoban', 'branchLevel': 1, 'typGrid': [[1, 2]]},
+        {'levelName': 'soko2', 'branch': 'Sokoban', 'typGrid': [[3]]},
+    ]}
+    (ex.MAPS_DIR / 'seed7_special_sokoban.session.json').write_text(json.dumps(grouped))
+    (ex.MAPS_DIR / 'seed7_special_oracle.session.json').write_text(
+        '{\\n"seed": 7,\\n"steps": [\\n{"key": "x"}\\n]\\n}\\n')
+    inventory = ex.extract_leveltraces()
+    soko1 = json.loads((ex.LEVELTRACE_DIR / 'soko1_seed7.json').read_text())
+    print(json.dumps({'inventory': inventory, 'soko1': soko1,
+                      'files': sorted(os.listdir(ex.LEVELTRACE_DIR))}))
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const lines = r.stdout.trim().split('\n');
+    const out = JSON.parse(lines.pop());
+    assert.deepEqual(out.inventory, { soko1: [7], soko2: [7] });
+    assert.deepEqual(out.files, ['soko1_seed7.json', 'soko2_seed7.json']);
+    assert.deepEqual(out.soko1, {
+        version: 2, seed: 7, type: 'special', source: 'c', levelName: 'soko1',
+        branch: 'Sokoban', typGrid: [[1, 2]], branchLevel: 1,
+    });
+    assert.ok(lines.includes('Total levels extracted: 2'));
+    assert.ok(lines.includes('Sessions skipped (no grouped levels): 1'));
+    assert.ok(lines.includes('  Group sokoban: 2 level(s)'));
+});
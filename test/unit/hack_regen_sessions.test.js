@@ -0,0 +1,108 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// hack/test/regen_sessions.py regen_parallel() with try_seed() stubbed: a
+// session keeps the earliest passing seed of its list, later trials are
+// cancelled (their running processes killed), and only the kept candidate
+// reaches the sessions directory.
+function runPython(body) {
+    const script = `
+import glob, json, os, shutil, sys, tempfile, threading, time
+sys.path.insert(0, 'hack/test')
+import regen_sessions as rg
+tmp = tempfile.mkdtemp(prefix='hack-regen-')
+try:
+    rg.SESSION_DIR = os.path.join(tmp, 'sessions')
+    os.makedirs(rg.SESSION_DIR)
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', timeout: 120000 });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('regen_parallel keeps the earliest passing seed and cancels later trials', () => {
+    const out = runPython(`
+# seed -> (seconds, passes); None runs a child that only a cancel can stop.
+PLAN = {1: (0.6, False), 2: (0.05, True), 3: (None, True), 4: (0, True),
+        10: (0.6, True), 11: (0.05, True),
+        20: (0.05, False), 21: (0.1, False)}
+log = []
+lock = threading.Lock()
+def fake_try_seed(bot_script, seed, bot_arg_fn, success_fn, out_path, say, trial=None):
+    with lock:
+        log.append(('start', seed, os.path.dirname(os.path.dirname(out_path))))
+    seconds, passes = PLAN[seed]
+    try:
+        if seconds is None:
+            trial.run([sys.executable, '-c', 'import time; time.sleep(60)'], 120, None)
+        else:
+            trial.run([sys.executable, '-c', f'import time; time.sleep({seconds})'], 120, None)
+    except rg.TrialCancelled:
+        with lock:
+            log.append(('cancelled', seed, None))
+        raise
+    with open(out_path, 'w') as f:
+        f.write(f'seed {seed}')
+    say(' PASS' if passes else ' FAIL')
+    return passes
+rg.try_seed = fake_try_seed
+sessions = [
+    ('A', 'bot.mjs', [1, 2, 3, 4], None, None),
+    ('B', 'bot.mjs', [10, 11], None, None),
+    ('C', 'bot.mjs', [20, 21], None, None),
+]
+t = time.monotonic()
+results = rg.regen_parallel(sessions, jobs=6, speculate=3)
+elapsed = time.monotonic() - t
+files = {}
+for path in sorted(glob.glob(os.path.join(rg.SESSION_DIR, '*'))):
+    with open(path) as f:
+        files[os.path.basename(path)] = f.read()
+print(json.dumps({
+    'results': results, 'files': files, 'elapsed': elapsed,
+    'started': sorted(seed for kind, seed, _ in log if kind == 'start'),
+    'cancelled': sorted(seed for kind, seed, _ in log if kind == 'cancelled'),
+    'scratch_parents': sorted({parent for kind, _, parent in log if kind == 'start'}),
+    'tmp': os.path.realpath(tmp),
+    'left': sorted(os.listdir(tmp)),
+}))
+`);
+    assert.deepEqual(out.results, [['A', true, 2], ['B', true, 10], ['C', false, null]]);
+    assert.deepEqual(out.files, { 'A.json': 'seed 2', 'B.json': 'seed 10' });
+    assert.deepEqual(out.started, [1, 2, 3, 10, 11, 20, 21]);
+    assert.deepEqual(out.cancelled, [3]);
+    assert.ok(out.elapsed < 20, `took ${out.elapsed}s; seed 3 was not killed`);
+    // Scratch candidates live beside the sessions dir, never inside it.
+    assert.equal(out.scratch_parents.length, 1);
+    assert.match(out.scratch_parents[0], /\/\.regen-[^/]+$/);
+    assert.equal(out.scratch_parents[0].startsWith(`${out.tmp}/sessions`), false);
+    assert.deepEqual(out.left, ['sessions']);
+});
+
+test('settled() waits for every seed before the best and for running trials', () => {
+    const out = runPython(`
+regen = rg._SessionRegen(0, 'A', 'bot.mjs', [1, 2, 3, 4], None, None, tmp)
+states = []
+regen.next = 3
+regen.trials = {0: None, 1: None, 2: None}
+regen.outcomes = {1: True}
+regen.best = 1
+states.append(regen.settled())   # seed 1 still running
+regen.outcomes[0] = False
+states.append(regen.settled())   # seed 3 may still run; it no longer matters
+states.append(regen.can_start())
+none = rg._SessionRegen(1, 'B', 'bot.mjs', [5, 6], None, None, tmp)
+none.next = 2
+none.trials = {0: None, 1: None}
+none.outcomes = {0: False}
+states.append(none.settled())    # seed 6 still running, nothing kept
+none.outcomes[1] = False
+states.append(none.settled())
+print(json.dumps(states))
+`);
+    assert.deepEqual(out, [false, true, false, false, true]);
+});
@@ -0,0 +1,141 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// rogue run_session.py multigame recording against a fake --batch harness
+// that keeps its save file in the job's "home", as rogue_harness does.
+const FAKE_HARNESS = `
+import json, os, sys
+log = os.environ['FAKE_HARNESS_LOG']
+for line in sys.stdin:
+    job = json.loads(line)
+    home = job.get('home')
+    with open(log, 'a') as f:
+        f.write(json.dumps({'home': home, 'restore': job.get('restore')}) + '\\n')
+    state = ''
+    if job.get('restore'):
+        if not os.path.exists(job['restore']):
+            print(json.dumps({'id': job['id'], 'ok': False, 'error': 'no save file'}), flush=True)
+            continue
+        with open(job['restore']) as f:
+            state = f.read()
+    state += job['keys']
+    with open(os.path.join(home or '/nonexistent', 'rogue.save'), 'w') as f:
+        f.write(state)
+    steps = [{'key': k, 'cursor': [0, 0], 'rng': [], 'screen': [state]} for k in job['keys']]
+    print(json.dumps({'id': job['id'], 'ok': True, 'session': {'seed': job['seed'], 'steps': steps}}), flush=True)
+`;
+
+function runPython(body) {
+    const script = `
+import argparse, contextlib, io, json, os, shutil, stat, sys, tempfile
+sys.path.insert(0, 'rogue/rogue-c/patched')
+import run_session as rs
+tmp = tempfile.mkdtemp(prefix='rogue-multigame-')
+try:
+    harness = os.path.join(tmp, 'fake_harness')
+    with open(harness, 'w') as f:
+        f.write('#!' + sys.executable + '\\n' + ${JSON.stringify(FAKE_HARNESS)})
+    os.chmod(harness, os.stat(harness).st_mode | stat.S_IXUSR)
+    os.environ['FAKE_HARNESS_LOG'] = os.path.join(tmp, 'jobs.log')
+    def jobs_log():
+        with open(os.environ['FAKE_HARNESS_LOG']) as f:
+            return [json.loads(line) for line in f]
+    def write_input(rel, seed, games):
+        path = os.path.join(tmp, rel)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({'seed': seed, 'games': [{'steps': [{'key': k} for k in keys]} for keys in games]}, f)
+        return path
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', timeout: 60000 });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('each job carries its home and a save chain stays inside it', () => {
+    const out = runPython(`
+with rs.HarnessBatch(harness, timeout=10) as batch:
+    home = os.path.join(tmp, 'home-a')
+    os.makedirs(home)
+    first = batch.run(5, 'ab', home=home)
+    restored = batch.run(5, 'c', restore=os.path.join(home, 'rogue.save'), home=home)
+    try:
+        batch.run(5, 'd', restore=os.path.join(tmp, 'home-b', 'rogue.save'), home=home)
+        missing = None
+    except rs.HarnessError as err:
+        missing = str(err)
+ok, lines = rs.record_multigame(write_input('in/chain.json', 9, ['xy', 'z', 'w']),
+                                os.path.join(tmp, 'chain-out.json'), harness, 10)
+with open(os.path.join(tmp, 'chain-out.json')) as f:
+    recorded = json.load(f)
+log = jobs_log()
+print(json.dumps({
+    'first': first['steps'][-1]['screen'], 'restored': restored['steps'][-1]['screen'],
+    'missing': missing, 'ok': ok, 'lines': lines,
+    'screens': [g['steps'][-1]['screen'][0] for g in recorded['games']],
+    'restore_flags': [g.get('restore', False) for g in recorded['games']],
+    'homes': [entry['home'] for entry in log],
+    'home_left': os.path.exists(log[-1]['home']),
+}))
+`);
+    assert.deepEqual(out.first, ['ab']);
+    assert.deepEqual(out.restored, ['abc']);
+    assert.equal(out.missing, 'seed 5: no save file');
+    assert.equal(out.ok, true, out.lines.join('\n'));
+    assert.deepEqual(out.screens, ['xy', 'xyz', 'xyzw']);
+    assert.deepEqual(out.restore_flags, [false, true, true]);
+    const chainHomes = out.homes.slice(3);
+    assert.equal(new Set(chainHomes).size, 1, 'one scratch HOME per recording');
+    assert.ok(!chainHomes[0].includes('home-a'));
+    assert.equal(out.home_left, false, 'scratch HOME removed');
+});
+
+test('--multigame records several inputs into an output directory', () => {
+    const out = runPython(`
+inputs = [write_input('a/one.json', 1, ['ab', 'c']),
+          write_input('b/two.json', 2, ['d']),
+          write_input('b/three.json', 3, ['ef', 'g', 'h'])]
+outdir = os.path.join(tmp, 'out')
+rs.run_multigame(argparse.Namespace(multigame=inputs, out=outdir, jobs=2, timeout=10), harness)
+recorded = {}
+for name in sorted(os.listdir(outdir)):
+    with open(os.path.join(outdir, name)) as f:
+        data = json.load(f)
+    recorded[name] = [data['seed'], [g['steps'][-1]['screen'][0] for g in data['games']]]
+homes = {entry['home'] for entry in jobs_log()}
+print(json.dumps({'recorded': recorded, 'homes': len(homes),
+                  'homes_left': [h for h in homes if os.path.exists(h)]}))
+`);
+    assert.deepEqual(out.recorded, {
+        'one.json': [1, ['ab', 'abc']],
+        'three.json': [3, ['ef', 'efg', 'efgh']],
+        'two.json': [2, ['d']],
+    });
+    assert.equal(out.homes, 3);
+    assert.deepEqual(out.homes_left, []);
+});
+
+test('--multigame rejects inputs that would write the same output file', () => {
+    const out = runPython(`
+inputs = [write_input('a/run.json', 1, ['a']), write_input('b/run.json', 2, ['b']),
+          write_input('b/other.json', 3, ['c'])]
+outdir = os.path.join(tmp, 'out')
+err = io.StringIO()
+with contextlib.redirect_stderr(err):
+    try:
+        rs.run_multigame(argparse.Namespace(multigame=inputs, out=outdir, jobs=2, timeout=10), harness)
+        code = 0
+    except SystemExit as e:
+        code = e.code
+print(json.dumps({'code': code, 'error': err.getvalue(), 'out_exists': os.path.exists(outdir),
+                  'ran': os.path.exists(os.environ['FAKE_HARNESS_LOG'])}))
+`);
+    assert.equal(out.code, 1);
+    assert.match(out.error, /share output files .*: run\.json\n$/);
+    assert.equal(out.out_exists, false);
+    assert.equal(out.ran, false);
+});
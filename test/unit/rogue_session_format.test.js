@@ -0,0 +1,64 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// rogue run_session.format_session(): batch replies (parsed JSON) written
+// back in the harness's own --out layout, as make_long_sessions.py does.
+test('format_session reproduces harness-written sessions byte for byte', () => {
+    const r = spawnSync('python3', ['-c', `
+import glob, json, os, sys
+sys.path.insert(0, 'rogue/rogue-c/patched')
+from run_session import format_session
+checked = []
+mismatched = []
+for path in sorted(glob.glob(os.path.join('rogue', 'test', 'sessions', '*.json'))):
+    with open(path) as f:
+        text = f.read()
+    data = json.loads(text)
+    steps = data.get('steps') or [{}]
+    if not all({'key', 'cursor', 'rng', 'screen'} <= set(step) for step in steps):
+        continue  # multigame and other non-harness layouts
+    checked.append(os.path.basename(path))
+    # A batch reply is the same session on one line.
+    reply = json.loads(json.dumps({'id': 1, 'ok': True, 'session': data}, separators=(',', ':')))
+    if format_session(reply['session']) != text:
+        mismatched.append(os.path.basename(path))
+special = format_session({'seed': 3, 'wizard': True, 'steps': [
+    {'key': '\\n', 'cursor': [1, 2], 'rng': ['^e"v', 4], 'screen': ['a\\\\b\\x7f', ''], 'standout': [[0, 1, 3]]},
+    {'key': '"', 'cursor': [0, 0], 'rng': [], 'screen': ['\\t']},
+]})
+print(json.dumps({'checked': checked, 'mismatched': mismatched, 'special': special}))
+`], { encoding: 'utf8', maxBuffer: 64 * 1024 * 1024 });
+    assert.equal(r.status, 0, r.stderr);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.ok(out.checked.length > 100, `only ${out.checked.length} sessions checked`);
+    assert.ok(out.checked.some((name) => /^seed\d+\.json$/.test(name)), 'make_long_sessions output checked');
+    assert.deepEqual(out.mismatched, []);
+    assert.equal(out.special, [
+        '{',
+        '  "seed": 3,',
+        '  "wizard": true,',
+        '  "steps": [',
+        '    {',
+        '      "key": "\\u000a",',
+        '      "cursor": [1,2],',
+        '      "rng": ["^e\\"v",4],',
+        '      "screen": [',
+        '        "a\\\\b\\u007f",',
+        '        ""',
+        '      ],',
+        '      "standout": [[0,1,3]]',
+        '    },',
+        '    {',
+        '      "key": "\\"",',
+        '      "cursor": [0,0],',
+        '      "rng": [],',
+        '      "screen": [',
+        '        "\\u0009"',
+        '      ]',
+        '    }',
+        '  ]',
+        '}',
+        '',
+    ].join('\n'));
+});
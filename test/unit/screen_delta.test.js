@@ -0,0 +1,43 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+import { readFileSync } from 'node:fs';
+import { join } from 'node:path';
+
+import { expandScreenDeltas } from '../comparison/session_loader.js';
+
+// screen_delta.py encodes, Python and the JS session loader both expand;
+// every step must come back with its original screen text.
+const SESSION = join('test', 'comparison', 'sessions', 'seed100_chargen_knight.session.json');
+
+function encodeWithPython(keyframeEvery) {
+    const script = `
+import json, sys
+sys.path.insert(0, 'test/comparison/c-harness')
+import screen_delta as sd
+with open(sys.argv[1]) as f:
+    session = json.load(f)
+encoded = sd.encode_screen_deltas(session, ${keyframeEvery})
+expanded = sd.expand_screen_deltas(json.loads(json.dumps(encoded)))
+assert expanded == session, 'python round trip'
+print(json.dumps(encoded))
+`;
+    const r = spawnSync('python3', ['-c', script, SESSION], { encoding: 'utf8', maxBuffer: 1 << 28 });
+    assert.equal(r.status, 0, r.stderr);
+    return JSON.parse(r.stdout);
+}
+
+test('delta-encoded screens expand to the recorded ones in JS', () => {
+    const original = JSON.parse(readFileSync(SESSION, 'utf8'));
+    const encoded = encodeWithPython(4);
+    const deltas = encoded.steps.filter((step) => Array.isArray(step.screenDelta));
+    const keyframes = encoded.steps.filter((step) => typeof step.screen === 'string');
+    assert.ok(deltas.length > 0, 'some steps delta-encoded');
+    assert.ok(keyframes.length >= Math.ceil(original.steps.length / 4), 'keyframes kept');
+    assert.deepEqual(expandScreenDeltas(encoded), original);
+});
+
+test('a delta with no screen before it is rejected', () => {
+    const raw = { screenDelta: 4, steps: [{ screenDelta: [1, [0, 0, 0, 'x']] }] };
+    assert.throws(() => expandScreenDeltas(raw), /without a preceding screen/);
+});
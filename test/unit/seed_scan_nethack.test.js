@@ -0,0 +1,115 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// seed_scan.py's NetHack engine: run_session() writes the session file and
+// returns None, so the engine must read the file back, and every scratch
+// sandbox it makes must be gone once the scan ends.
+const PRELUDE = `
+import glob, json, os, shutil, sys, tempfile
+sys.path.insert(0, 'scripts')
+sys.path.insert(0, 'test/comparison/c-harness')
+import run_session as rs
+import seed_scan
+tmp = tempfile.mkdtemp(prefix='seed-scan-test-')
+tempfile.tempdir = tmp
+def leftovers():
+    return sorted(os.path.relpath(p, tmp) for p in glob.glob(os.path.join(tmp, '*')))
+`;
+
+function runPython(body) {
+    const script = `${PRELUDE}
+try:
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    tempfile.tempdir = None
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', timeout: 120000 });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+// Stand-in recorder with run_session()'s contract: it writes a
+// (delta-encoded) session to output_json and returns None.
+const FAKE_RECORDER = `
+calls = []
+def fake_run_session(seed, output_json, move_str, **kwargs):
+    calls.append([seed, move_str])
+    if seed == 13:
+        sys.exit(1)
+    rows = ['Welcome to NetHack!', '', '     ------', '     |..@.d', '     ------']
+    steps = [{'key': None, 'rng': ['rn2(5)=1'], 'screen': '\\n'.join(rows)}]
+    rows[3] = '     |.@..d'
+    steps.append({'key': move_str, 'rng': ['rn2(3)=0', '^dog_move'], 'screen': '\\n'.join(rows),
+                  'cursor': [7, 3, 1], 'typGrid': '5:0,3:25|'})
+    with open(output_json, 'w') as f:
+        f.write(rs.compact_session_json({'seed': seed, 'steps': steps}, screen_delta=1))
+rs.run_session = fake_run_session
+`;
+
+test('the engine reads back the session run_session() wrote', () => {
+    const out = runPython(`${FAKE_RECORDER}
+engine = seed_scan.NetHackEngine()
+run = engine.run(7, 'h')
+failed = engine.run(13, 'h')
+made = leftovers()
+engine.close()
+print(json.dumps({
+    'calls': calls, 'failed': failed, 'made': made, 'left': leftovers(),
+    'screen': run.screen[3], 'cursor': run.cursor, 'player': run.player(),
+    'rng': run.rng, 'events': run.events, 'typ': run.typ_grid[0][:9],
+    'near': seed_scan.parse_condition('near(d, 3) and typ(25, 3)')(run),
+}))
+`);
+    assert.deepEqual(out.calls, [[7, 'h'], [13, 'h']]);
+    assert.equal(out.failed, null, 'a failed run must not read the last seed\'s file');
+    assert.equal(out.made.length, 1);
+    assert.deepEqual(out.left, []);
+    assert.equal(out.screen, '     |.@..d');
+    assert.deepEqual(out.player, [7, 3]);
+    assert.deepEqual(out.rng, ['rn2(5)=1', 'rn2(3)=0']);
+    assert.deepEqual(out.events, ['dog_move']);
+    assert.deepEqual(out.typ, [0, 0, 0, 0, 0, 25, 25, 25, 0]);
+    assert.deepEqual(out.near, [{ mlet: 'd', x: 10, y: 3, dist: 3 }, { typ: 25, cells: 3 }]);
+});
+
+test('scan() finds NetHack seeds and removes its scratch root', () => {
+    const out = runPython(`${FAKE_RECORDER}
+serial = list(seed_scan.scan('nethack', 'l', 'near(d, 3)', [12, 13, 14], jobs=1))
+serial_left = leftovers()
+# Forked pool workers inherit the stub; --limit terminates them mid-scan.
+pooled = list(seed_scan.scan('nethack', 'l', 'near(d, 3)', range(12, 40), jobs=2, limit=2))
+print(json.dumps({'serial': [seed for seed, _ in serial], 'pooled': [seed for seed, _ in pooled],
+                  'left': [serial_left, leftovers()]}))
+`);
+    assert.deepEqual(out.serial, [12, 14]);
+    assert.deepEqual(out.pooled, [12, 14]);
+    assert.deepEqual(out.left, [[], []]);
+});
+
+const hasTmux = spawnSync('tmux', ['-V']).status === 0;
+const nethackBinary = path.join('nethack-c', 'install', 'games', 'lib', 'nethackdir', 'nethack');
+
+test('one real NetHack seed through the engine', (t) => {
+    if (!hasTmux || !fs.existsSync(nethackBinary)) {
+        t.skip('needs tmux and the C NetHack install (test/comparison/c-harness/setup.sh)');
+        return;
+    }
+    const out = runPython(`
+engine = seed_scan.NetHackEngine()
+try:
+    run = engine.run(1, ':')
+finally:
+    engine.close()
+print(json.dumps({'ok': run is not None, 'player': run and run.player(), 'rng': len(run.rng) if run else 0,
+                  'typ': run is not None and run.typ_grid is not None, 'left': leftovers()}))
+`);
+    assert.equal(out.ok, true);
+    assert.ok(out.player, 'no @ on the final screen');
+    assert.ok(out.rng > 0);
+    assert.equal(out.typ, true);
+    assert.deepEqual(out.left, []);
+});
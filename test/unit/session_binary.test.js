@@ -0,0 +1,81 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// session_binary.py: .session.bin must reproduce the checked-in JSON byte
+// for byte and serve single steps without decoding the rest.
+function runPython(body) {
+    const script = `
+import copy, json, os, shutil, sys, tempfile
+sys.path.insert(0, 'test/comparison/c-harness')
+import session_binary as sb
+SESSIONS = 'test/comparison/sessions'
+tmp = tempfile.mkdtemp(prefix='session-binary-test-')
+try:
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('pack and unpack reproduce checked-in sessions byte for byte', () => {
+    const out = runPython(`
+results = {}
+for name in ('interface_startup.session.json', 'seed201_fight_prefix_gameplay.session.json'):
+    src = os.path.join(SESSIONS, name)
+    bin_path, json_bytes, bin_bytes = sb.pack_file(src, os.path.join(tmp, name + '.bin'))
+    back = sb.unpack_file(bin_path, os.path.join(tmp, name))
+    with open(src, 'rb') as a, open(back, 'rb') as b:
+        results[name] = [a.read() == b.read(), bin_bytes < json_bytes,
+                         sb.is_session_binary(bin_path), sb.is_session_binary(src)]
+print(json.dumps(results))
+`);
+    for (const [name, flags] of Object.entries(out)) {
+        assert.deepEqual(flags, [true, true, true, false], name);
+    }
+});
+
+test('random step access across chunks and legacy grids', () => {
+    const out = runPython(`
+with open(os.path.join(SESSIONS, 'seed201_fight_prefix_gameplay.session.json')) as f:
+    session = json.load(f)
+steps = session['steps']
+session['steps'] = [copy.deepcopy(steps[i % len(steps)]) for i in range(sb.CHUNK_STEPS * 2 + 5)]
+session['steps'][40]['typGrid'] = [[i * j % 7 for i in range(80)] for j in range(21)]
+path = os.path.join(tmp, 'long.session.bin')
+sb.write_session_binary(session, path)
+with sb.SessionBinaryReader(path) as reader:
+    picks = [0, sb.CHUNK_STEPS - 1, sb.CHUNK_STEPS, 40, len(session['steps']) - 1]
+    print(json.dumps({
+        'len': len(reader) == len(session['steps']),
+        'steps': [reader.step(i) == session['steps'][i] for i in picks],
+        'whole': sb.load_session(path) == session,
+    }))
+`);
+    assert.deepEqual(out, { len: true, steps: [true, true, true, true, true], whole: true });
+});
+
+test('check_file leaves the sessions directory untouched', () => {
+    const out = runPython(`
+src_dir = os.path.join(tmp, 'sessions')
+os.mkdir(src_dir)
+src = os.path.join(src_dir, 'interface_startup.session.json')
+shutil.copy(os.path.join(SESSIONS, 'interface_startup.session.json'), src)
+opened = []
+class Reader(sb.SessionBinaryReader):
+    def __init__(self, path):
+        opened.append(os.path.dirname(os.path.abspath(path)))
+        super().__init__(path)
+sb.SessionBinaryReader = Reader
+stats = sb.check_file(src)
+print(json.dumps({'ok': stats['ok'], 'smaller': stats['binBytes'] < stats['jsonBytes'],
+                  'scratch_in_src_dir': [d == os.path.abspath(src_dir) for d in opened],
+                  'left': sorted(os.listdir(src_dir))}))
+`);
+    assert.deepEqual(out, {
+        ok: true, smaller: true, scratch_in_src_dir: [false], left: ['interface_startup.session.json'],
+    });
+});
@@ -0,0 +1,59 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// SessionStream (session_stream.py) must agree with json.load for the
+// line layout, the single-line fallback and delta-encoded screens.
+test('streamed headers, projected steps and seeks match json.load', () => {
+    const script = `
+import json, os, shutil, sys, tempfile
+sys.path.insert(0, 'test/comparison/c-harness')
+import run_session as rs
+from session_stream import SessionStream
+src = os.path.join('test', 'comparison', 'sessions', 'seed100_chargen_knight.session.json')
+with open(src) as f:
+    session = json.load(f)
+tmp = tempfile.mkdtemp(prefix='session-stream-test-')
+variants = {
+    'lines': rs.compact_session_json(session, screen_delta=0),
+    'single': json.dumps(session),
+    'delta': rs.compact_session_json(session, screen_delta=3),
+}
+results = {}
+try:
+    for name, text in variants.items():
+        path = os.path.join(tmp, name + '.session.json')
+        with open(path, 'w') as f:
+            f.write(text)
+        steps = session['steps']
+        with SessionStream(path) as stream:
+            keys = [s.get('key') for s in stream.steps(('key',))]
+            counts = [s.get('rngCount') for s in stream.steps(('rngCount',))]
+            picks = [len(steps) - 1, 5, 0, 8]
+            results[name] = {
+                'layout': stream.layout,
+                'len': len(stream) == len(steps),
+                'header': stream.header(('seed', 'version')) == {
+                    k: session[k] for k in ('seed', 'version') if k in session},
+                'keys': keys == [s.get('key') for s in steps],
+                'rngCount': counts == [len(s.get('rng') or []) for s in steps],
+                'seek': [stream.step(i, ('screen',)).get('screen') == steps[i].get('screen')
+                         for i in picks],
+                'whole': stream.session() == session,
+            }
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+print(json.dumps(results))
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    for (const [name, result] of Object.entries(out)) {
+        const { layout, ...checks } = result;
+        assert.deepEqual(checks, {
+            len: true, header: true, keys: true, rngCount: true,
+            seek: [true, true, true, true], whole: true,
+        }, name);
+    }
+    assert.notEqual(out.lines.layout, out.single.layout);
+});
@@ -0,0 +1,86 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// Artifact store (tools/c_translator/artifact_store): reruns are served
+// from disk, an edited function body re-keys only that function, and the
+// maintenance CLI prunes and clears entries.
+function runPython(body) {
+    const script = `
+import json, os, shutil, subprocess, sys, tempfile
+sys.path.insert(0, 'tools/c_translator')
+from artifact_store import ArtifactStore, configure_artifact_store, get_artifact_store
+from backend import emit_helper_scaffold
+from source_context import clear_source_contexts, load_source_context
+tmp = tempfile.mkdtemp(prefix='translator-artifact-store-')
+try:
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    configure_artifact_store(None)
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], {
+        encoding: 'utf8',
+        env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' },
+    });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('cached emits match fresh ones and only edited functions re-emit', () => {
+    const out = runPython(`
+src = os.path.join(tmp, 'fixture.c')
+shutil.copyfile('test/fixtures/translator_helper_fixture.c', src)
+names = [fn['name'] for fn in load_source_context(src).nir_snapshot()['functions']]
+def emit_all():
+    clear_source_contexts()
+    payloads = {name: emit_helper_scaffold(src, name) for name in names}
+    return payloads, get_artifact_store().drain_stats().get('emit-helper')
+configure_artifact_store(None)
+fresh = {name: emit_helper_scaffold(src, name) for name in names}
+configure_artifact_store(os.path.join(tmp, 'cache'))
+first, first_stats = emit_all()
+second, second_stats = emit_all()
+with open(src) as f:
+    text = f.read()
+edited = names[-1]
+fn = next(f for f in load_source_context(src).nir_snapshot()['functions'] if f['name'] == edited)
+lines = text.split('\\n')
+end = fn['span']['body_end_line'] - 1
+lines[end] = '    /* edited */ ' + lines[end]
+with open(src, 'w') as f:
+    f.write('\\n'.join(lines))
+third, third_stats = emit_all()
+print(json.dumps({'count': len(names), 'same': first == fresh and second == fresh,
+                  'stats': [first_stats, second_stats, third_stats]}))
+`);
+    const n = out.count;
+    assert.ok(n >= 3);
+    assert.equal(out.same, true);
+    assert.deepEqual(out.stats, [
+        { hit: 0, miss: n },
+        { hit: n, miss: 0 },
+        { hit: n - 1, miss: 1 },
+    ]);
+});
+
+test('prune drops least recently used entries and clear empties the store', () => {
+    const out = runPython(`
+root = os.path.join(tmp, 'cache')
+store = ArtifactStore(root)
+keys = [store.key('emit-helper', n=i) for i in range(4)]
+for i, key in enumerate(keys):
+    store.put('emit-helper', key, {'payload': 'x' * 100, 'n': i})
+    path = store._path('emit-helper', key)
+    os.utime(path, (1000 + i, 1000 + i))
+size = os.path.getsize(store._path('emit-helper', keys[0]))
+pruned = store.prune(max_bytes=size * 2)
+left = sorted(store.get('emit-helper', key)['n'] for key in keys if store.get('emit-helper', key))
+cli = subprocess.run([sys.executable, 'tools/c_translator/artifact_cache.py',
+                      '--cache-dir', root, 'clear'], capture_output=True, text=True)
+print(json.dumps({'stable': store.key('emit-helper', n=0) == keys[0],
+                  'pruned': [pruned['removed'], pruned['kept']], 'left': left,
+                  'cli': cli.returncode, 'after': store.usage()}))
+`);
+    assert.deepEqual(out, { stable: true, pruned: [2, 2], left: [2, 3], cli: 0, after: {} });
+});
@@ -0,0 +1,85 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// Whole-program async inference (async_infer/program.py, async_index.py).
+function runPython(body) {
+    const script = `
+import json, os, random, shutil, subprocess, sys, tempfile
+sys.path.insert(0, 'tools/c_translator')
+from async_infer import build_async_summary, configure_async_index
+from async_infer.callgraph import propagate_requires_async
+from source_context import clear_source_contexts, load_source_context
+tmp = tempfile.mkdtemp(prefix='translator-async-index-')
+try:
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    configure_async_index(None)
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('SCC propagation matches a naive fixpoint on random call graphs', () => {
+    const out = runPython(`
+rng = random.Random(14)
+mismatches = 0
+for trial in range(200):
+    n = rng.randint(1, 30)
+    graph = {i: {rng.randrange(n + 3) for _ in range(rng.randint(0, 4))} for i in range(n)}
+    direct = {i for i in range(n) if rng.random() < 0.1}
+    expected = set(direct)
+    changed = True
+    while changed:
+        changed = False
+        for node, succs in graph.items():
+            if node not in expected and succs & expected:
+                expected.add(node)
+                changed = True
+    if propagate_requires_async(graph, direct) != expected:
+        mismatches += 1
+print(json.dumps(mismatches))
+`);
+    assert.equal(out, 0);
+});
+
+test('requires_async crosses files through the index and falls back when stale', () => {
+    const out = runPython(`
+files = {
+    'a.c': 'extern void nh_delay_output(void);\\nvoid wait_a(void)\\n{\\n    nh_delay_output();\\n}\\n',
+    'b.c': 'extern void wait_a(void);\\nvoid caller_b(void)\\n{\\n    wait_a();\\n}\\nvoid idle_b(void)\\n{\\n}\\n',
+    'c.c': 'static void wait_a(void)\\n{\\n}\\nvoid caller_c(void)\\n{\\n    wait_a();\\n}\\n',
+}
+paths = {}
+for name, text in files.items():
+    paths[name] = os.path.join(tmp, name)
+    with open(paths[name], 'w') as f:
+        f.write(text)
+index_path = os.path.join(tmp, 'async_index.json')
+cli = subprocess.run([sys.executable, 'tools/c_translator/async_index.py',
+                      '--src', os.path.join(tmp, '*.c'), '--out', index_path],
+                     capture_output=True, text=True)
+assert cli.returncode == 0, cli.stderr
+configure_async_index(index_path)
+def facts(name):
+    clear_source_contexts()
+    return {fn: entry['requires_async']
+            for fn, entry in load_source_context(paths[name]).async_functions().items()}
+indexed = {name: facts(name) for name in files}
+per_file_b = {fn['name']: fn['requires_async'] for fn in build_async_summary(paths['b.c'], None)['functions']}
+with open(paths['b.c'], 'a') as f:
+    f.write('void later_b(void)\\n{\\n}\\n')
+configure_async_index(index_path)
+stale_b = facts('b.c')
+print(json.dumps({'indexed': indexed, 'per_file_b': per_file_b, 'stale_b': stale_b}))
+`);
+    assert.deepEqual(out.indexed, {
+        'a.c': { wait_a: true },
+        'b.c': { caller_b: true, idle_b: false },
+        'c.c': { wait_a: false, caller_c: false },
+    });
+    assert.deepEqual(out.per_file_b, { caller_b: false, idle_b: false });
+    assert.deepEqual(out.stale_b, { caller_b: false, idle_b: false, later_b: false });
+});
@@ -0,0 +1,53 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// batch_emit.py --jobs N must write the same payloads and the same merged
+// summary (in --src order, failures included) as a serial run.
+const SOURCES = [
+    'test/fixtures/translator_async_fixture.c',
+    'test/fixtures/translator_missing_fixture.c',
+    'test/fixtures/translator_helper_fixture.c',
+    'test/fixtures/translator_qsort_fixture.c',
+];
+
+function batchEmit(jobs, extra = []) {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'translator-batch-emit-jobs-'));
+    const args = ['tools/c_translator/batch_emit.py'];
+    for (const src of SOURCES) args.push('--src', src);
+    args.push(
+        '--out-dir', path.join(dir, 'out'),
+        '--summary-out', path.join(dir, 'summary.json'),
+        '--no-exclude-sources', '--include-blocked',
+        '--jobs', String(jobs), ...extra,
+    );
+    const r = spawnSync('python3', args, { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const summary = fs.readFileSync(path.join(dir, 'summary.json'), 'utf8').split(dir).join('<dir>');
+    const outDir = path.join(dir, 'out');
+    const payloads = Object.fromEntries(
+        fs.readdirSync(outDir).sort().map((name) => [name, fs.readFileSync(path.join(outDir, name), 'utf8')]),
+    );
+    fs.rmSync(dir, { recursive: true, force: true });
+    return { summary: JSON.parse(summary), payloads };
+}
+
+test('parallel batch_emit matches a serial run', () => {
+    const serial = batchEmit(1);
+    const parallel = batchEmit(3);
+    assert.deepEqual(serial.summary.files.map((f) => f.source), SOURCES);
+    assert.equal(serial.summary.errors.length, 1);
+    assert.equal(serial.summary.errors[0].source, SOURCES[1]);
+    assert.ok(Object.keys(serial.payloads).length >= 10);
+    assert.deepEqual(parallel, serial);
+});
+
+test('--limit keeps the first functions in source order when parallel', () => {
+    const serial = batchEmit(1, ['--limit', '5']);
+    const parallel = batchEmit(2, ['--limit', '5']);
+    assert.equal(Object.keys(serial.payloads).length, 5);
+    assert.deepEqual(parallel, serial);
+});
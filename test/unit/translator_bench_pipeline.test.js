@@ -0,0 +1,66 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import crypto from 'node:crypto';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// bench_pipeline.py: the shipped corpus pins match the tree, and baselines
+// are written, compared and enforced by --check.  The guards against
+// comparing unlike runs are in translator_bench_pipeline_guards.test.js.
+function sha256(file) {
+    return crypto.createHash('sha256').update(fs.readFileSync(file)).digest('hex');
+}
+
+function bench(args) {
+    const r = spawnSync('python3', ['tools/c_translator/bench_pipeline.py', ...args], {
+        encoding: 'utf8', env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' },
+    });
+    assert.ok(r.status === 0 || r.status === 1, r.stderr || r.stdout);
+    return r;
+}
+
+test('the pinned corpus matches the checked-in sources', () => {
+    const corpus = JSON.parse(fs.readFileSync('tools/c_translator/bench_corpus.json', 'utf8'));
+    assert.ok(corpus.sources.length > 0);
+    for (const { path: src, sha256: pin } of corpus.sources) {
+        assert.equal(sha256(src), pin, `${src} changed; re-pin bench_corpus.json`);
+    }
+});
+
+test('baselines are written, compared and checked', () => {
+    const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'translator-bench-pipeline-'));
+    try {
+        const src = path.join(tmp, 'fixture.c');
+        fs.copyFileSync('test/fixtures/translator_helper_fixture.c', src);
+        const corpus = path.join(tmp, 'corpus.json');
+        fs.writeFileSync(corpus, JSON.stringify({ sources: [{ path: src, sha256: sha256(src) }] }));
+        const baseline = path.join(tmp, 'baseline.json');
+        const common = ['--corpus', corpus, '--baseline', baseline, '--modes', 'nir-snapshot,emit-helper', '--repeat', '2'];
+
+        const written = bench([...common, '--write-baseline']);
+        assert.equal(written.status, 0);
+        const base = JSON.parse(fs.readFileSync(baseline, 'utf8'));
+        assert.deepEqual(Object.keys(base.modes).sort(), ['emit-helper', 'nir-snapshot']);
+        assert.deepEqual(base.corpus_changed, []);
+        assert.ok(base.functions >= 3);
+        assert.equal(base.modes['emit-helper'].emitted, base.functions);
+        assert.equal(base.modes['nir-snapshot'].runs.length, 2);
+
+        const out = path.join(tmp, 'report.json');
+        const same = bench([...common, '--repeat', '1', '--check', '--tolerance', '0.99', '--out', out]);
+        assert.equal(same.status, 0, same.stdout);
+        const report = JSON.parse(fs.readFileSync(out, 'utf8'));
+        assert.deepEqual(Object.keys(report.comparison).sort(), ['emit-helper', 'nir-snapshot']);
+
+        // A baseline 100x faster than this machine is a regression under --check.
+        base.modes['emit-helper'].functions_per_sec *= 100;
+        fs.writeFileSync(baseline, JSON.stringify(base));
+        const slow = bench([...common, '--modes', 'emit-helper', '--repeat', '1', '--check']);
+        assert.equal(slow.status, 1);
+        assert.match(slow.stdout, /emit-helper .*REGRESSED/);
+    } finally {
+        fs.rmSync(tmp, { recursive: true, force: true });
+    }
+});
@@ -0,0 +1,54 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import crypto from 'node:crypto';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// bench_pipeline.py compares a run with its baseline (and --check can fail)
+// only when both come from the same frontend and the same pinned corpus.
+function sha256(file) {
+    return crypto.createHash('sha256').update(fs.readFileSync(file)).digest('hex');
+}
+
+function bench(args) {
+    const r = spawnSync('python3', ['tools/c_translator/bench_pipeline.py', ...args], {
+        encoding: 'utf8', env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' },
+    });
+    assert.ok(r.status === 0 || r.status === 1, r.stderr || r.stdout);
+    return r;
+}
+
+test('unlike runs are reported but never compared', () => {
+    const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'translator-bench-guards-'));
+    try {
+        const src = path.join(tmp, 'fixture.c');
+        fs.copyFileSync('test/fixtures/translator_helper_fixture.c', src);
+        const corpus = path.join(tmp, 'corpus.json');
+        fs.writeFileSync(corpus, JSON.stringify({ sources: [{ path: src, sha256: sha256(src) }] }));
+        const baseline = path.join(tmp, 'baseline.json');
+        const common = ['--corpus', corpus, '--baseline', baseline, '--modes', 'emit-helper', '--repeat', '1'];
+
+        assert.equal(bench([...common, '--write-baseline']).status, 0);
+        // 100x faster than this machine: any comparison would be a regression.
+        const base = JSON.parse(fs.readFileSync(baseline, 'utf8'));
+        base.modes['emit-helper'].functions_per_sec *= 100;
+
+        fs.writeFileSync(baseline, JSON.stringify({ ...base, frontend: 'something-else' }));
+        const otherFrontend = bench([...common, '--check']);
+        assert.equal(otherFrontend.status, 0);
+        assert.match(otherFrontend.stdout, /frontend; not comparing/);
+
+        fs.writeFileSync(baseline, JSON.stringify(base));
+        fs.appendFileSync(src, '\nint bench_extra(void) { return 1; }\n');
+        const out = path.join(tmp, 'report.json');
+        const changed = bench([...common, '--check', '--out', out]);
+        assert.equal(changed.status, 0);
+        assert.match(changed.stderr, /corpus files changed since pinning/);
+        assert.match(changed.stdout, /not comparing with the baseline/);
+        assert.equal(JSON.parse(fs.readFileSync(out, 'utf8')).comparison, undefined);
+    } finally {
+        fs.rmSync(tmp, { recursive: true, force: true });
+    }
+});
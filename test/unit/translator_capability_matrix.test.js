@@ -0,0 +1,50 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// capability_matrix.py --jobs merges rows in source order and --incremental
+// re-analyzes only edited files; both must reproduce the serial report.
+const SOURCES = ['lock.c', 'pray.c', 'dig.c'];
+
+function matrix(srcs, out, extra = []) {
+    const r = spawnSync('python3', [
+        'tools/c_translator/capability_matrix.py', '--no-exclude-sources', '--out', out,
+        ...srcs.flatMap((src) => ['--src', src]), ...extra,
+    ], { encoding: 'utf8', env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' } });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return { report: fs.readFileSync(out, 'utf8'), stdout: r.stdout };
+}
+
+test('parallel and incremental reports equal a serial run', () => {
+    const tmp = fs.mkdtempSync(path.join(os.tmpdir(), 'translator-capability-matrix-'));
+    try {
+        const srcs = SOURCES.map((name) => {
+            const dst = path.join(tmp, name);
+            fs.copyFileSync(path.join('nethack-c', 'src', name), dst);
+            return dst;
+        });
+        const serial = matrix(srcs, path.join(tmp, 'serial.json')).report;
+        assert.equal(JSON.parse(serial).files.length, SOURCES.length);
+
+        const inc = path.join(tmp, 'inc.json');
+        const cold = matrix(srcs, inc, ['--incremental', '--jobs', '2']);
+        assert.equal(cold.report, serial);
+        assert.match(cold.stdout, /incremental reused=0 analyzed=3/);
+        const warm = matrix(srcs, inc, ['--incremental']);
+        assert.equal(warm.report, serial);
+        assert.match(warm.stdout, /incremental reused=3 analyzed=0/);
+
+        // Add a function to lock.c: only that file is re-analyzed.
+        fs.appendFileSync(srcs[0], '\nstatic int\nextra_lock_fn(void)\n{\n    return 0;\n}\n');
+        const edited = matrix(srcs, inc, ['--incremental']);
+        assert.match(edited.stdout, /incremental reused=2 analyzed=1/);
+        const fresh = matrix(srcs, path.join(tmp, 'fresh.json'), ['--jobs', '3']).report;
+        assert.notEqual(fresh, serial);
+        assert.equal(edited.report, fresh);
+    } finally {
+        fs.rmSync(tmp, { recursive: true, force: true });
+    }
+});
@@ -0,0 +1,53 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// capability_matrix.py --jobs: a file that kills its worker gets an error
+// row while every other file is still analyzed, and it is left out of the
+// --incremental state so the next run retries it.
+test('a crashing file is reported without losing the others', () => {
+    const script = `
+import json, os, shutil, sys, tempfile
+sys.path.insert(0, 'tools/c_translator')
+import capability_matrix as cm
+real = cm.file_result
+def crashing(src, profile):
+    if os.path.basename(src) == 'lock.c':
+        os._exit(1)
+    return real(src, profile)
+cm.file_result = crashing
+tmp = tempfile.mkdtemp(prefix='translator-capability-crash-')
+try:
+    out = os.path.join(tmp, 'matrix.json')
+    sys.argv = ['capability_matrix.py', '--no-exclude-sources', '--out', out, '--jobs', '2',
+                '--incremental', '--src', 'nethack-c/src/lock.c', '--src', 'nethack-c/src/dig.c',
+                '--src', 'nethack-c/src/pray.c']
+    cm.main()
+    with open(out) as f:
+        report = json.load(f)
+    with open(os.path.join(tmp, 'matrix.incremental.json')) as f:
+        kept = sorted(os.path.basename(src) for src in json.load(f)['sources'])
+    print(json.dumps({
+        'errors': report.get('errors'),
+        'rows': sorted((os.path.basename(r['source']), r['function_count'] > 0, r.get('error'))
+                       for r in report['files']),
+        'kept': kept,
+    }))
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], {
+        encoding: 'utf8', timeout: 60000, env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' },
+    });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    assert.deepEqual(JSON.parse(r.stdout.trim().split('\n').pop()), {
+        errors: [{ source: 'nethack-c/src/lock.c', error: 'worker process crashed' }],
+        rows: [
+            ['dig.c', true, null],
+            ['lock.c', false, 'worker process crashed'],
+            ['pray.c', true, null],
+        ],
+        kept: ['dig.c', 'pray.c'],
+    });
+    assert.match(r.stdout, /1 file\(s\) crashed their worker: nethack-c\/src\/lock.c/);
+});
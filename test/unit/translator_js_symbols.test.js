@@ -0,0 +1,114 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// js_symbols.py: one scan per module, shared and persisted across tools.
+const MODULE = `import { a as alpha, b } from './x.js';
+import def, * as ns from './y.js';
+// function commented(a) {
+const s = "function inString(";
+const t = \`
+function inTemplate(\${s}) {
+\`;
+const re = /function inRegex\\(/;
+
+// Autotranslated from hack.c:120
+export async function moved(a) {
+    if (a) { return '}'; }
+}
+function local() {
+    function nested() {}
+}
+export class Thing {}
+let counter = 0;
+export { local as renamed };
+`;
+
+function runPython(body) {
+    const script = `
+import json, os, shutil, sys, tempfile, time
+sys.path.insert(0, 'tools/c_translator')
+from js_symbols import JsSymbolIndex, module_symbols, scan_module
+MODULE = json.loads(sys.stdin.read())
+tmp = tempfile.mkdtemp(prefix='translator-js-symbols-')
+try:
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', input: JSON.stringify(MODULE) });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('scan_module finds code symbols and skips comments, strings and regexes', () => {
+    const out = runPython(`
+entry = scan_module(MODULE)
+moved = next(fn for fn in entry['functions'] if fn['name'] == 'moved')
+print(json.dumps({
+    'functions': [[fn['name'], fn['exported'], fn['async'], fn['top_level']] for fn in entry['functions']],
+    'moved_text': MODULE[moved['start']:moved['end']],
+    'exports': entry['exports'], 'bindings': entry['bindings'], 'classes': entry['classes'],
+    'imports': entry['imports'], 'markers': entry['markers'],
+    'symbols': sorted(module_symbols(entry)),
+}))
+`);
+    assert.deepEqual(out.functions, [
+        ['moved', true, true, true],
+        ['local', false, false, true],
+        ['nested', false, false, false],
+    ]);
+    assert.equal(out.moved_text, "export async function moved(a) {\n    if (a) { return '}'; }\n}\n");
+    assert.deepEqual(out.exports, ['Thing', 'moved', 'renamed']);
+    assert.deepEqual(out.bindings, ['counter', 're', 's', 't']);
+    assert.deepEqual(out.classes, ['Thing']);
+    assert.deepEqual(out.imports, [
+        { local: 'alpha', imported: 'a', from: './x.js' },
+        { local: 'b', imported: 'b', from: './x.js' },
+        { local: 'def', imported: 'default', from: './y.js' },
+        { local: 'ns', imported: '*', from: './y.js' },
+    ]);
+    assert.deepEqual(out.markers, [
+        { marker: 'hack.c:120', line: 10, function: 'moved', function_line: 11 },
+    ]);
+    assert.ok(!out.symbols.includes('commented'));
+    assert.ok(!out.symbols.includes('inString'));
+    assert.ok(!out.symbols.includes('inTemplate'));
+    assert.ok(!out.symbols.includes('inRegex'));
+});
+
+test('a persisted index reuses, re-hashes or re-scans modules as they change', () => {
+    const out = runPython(`
+js = os.path.join(tmp, 'js')
+os.makedirs(js)
+for name, text in (('a.js', MODULE), ('b.js', 'export function moved() {}\\nexport const k = 1;\\n')):
+    with open(os.path.join(js, name), 'w') as f:
+        f.write(text)
+path = os.path.join(tmp, 'cache', 'js_symbols.json')
+def run(action=None):
+    index = JsSymbolIndex(js, path)
+    if action:
+        action()
+    exports = index.exports()
+    index.save()
+    return index.stats, exports['moved'] and [os.path.basename(p) for p in exports['moved']]
+first = run()
+second = run()
+a = os.path.join(js, 'a.js')
+def touch():
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+third = run(touch)
+def edit():
+    with open(a, 'a') as f:
+        f.write('export function added() {}\\n')
+fourth = run(edit)
+print(json.dumps([first, second, third, fourth]))
+`);
+    assert.deepEqual(out, [
+        [{ reused: 0, rehashed: 0, scanned: 2 }, ['a.js', 'b.js']],
+        [{ reused: 2, rehashed: 0, scanned: 0 }, ['a.js', 'b.js']],
+        [{ reused: 1, rehashed: 1, scanned: 0 }, ['a.js', 'b.js']],
+        [{ reused: 1, rehashed: 0, scanned: 1 }, ['a.js', 'b.js']],
+    ]);
+});
@@ -0,0 +1,55 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// js_syntax.JsSyntaxChecker: the long-lived Node service must give the
+// same verdicts and details as a fresh `node --check` per snippet, and the
+// python fallback must never reject what Node accepts.
+const SNIPPETS = [
+    'export function f(a) { return a + 1; }',
+    'export async function g() { await nh_delay_output(); }',
+    'export function h(s) { return s.replace(/[}{]/g, `x${s}`); }',
+    'export function broken( { return 1; }',
+    'export function trunc(a) { if (a) { return 2; }',
+    'const x = ;',
+    'export function q(a) { return a / 2 / 3; }',
+    'let s = "unterminated;\n',
+    '// only a comment',
+];
+// `node --check` costs a Node start per snippet, so only a sample of valid
+// and invalid snippets is checked both ways.
+const NODE_SAMPLE = [0, 3, 4, 7];
+
+test('service, per-snippet node and python checks agree', () => {
+    const script = `
+import json, sys
+sys.path.insert(0, 'tools/c_translator')
+from js_syntax import JsSyntaxChecker
+snippets = json.loads(sys.stdin.read())
+sample = [snippets[i] for i in ${JSON.stringify(NODE_SAMPLE)}]
+out = {}
+for mode in ('service', 'node', 'python'):
+    with JsSyntaxChecker(mode) as checker:
+        texts = sample if mode == 'node' else snippets
+        out[mode] = {'mode': checker.mode, 'many': [list(r) for r in checker.check_many(texts)]}
+        if mode == 'service':
+            out[mode]['one'] = [list(checker.check(s)) for s in sample]
+print(json.dumps(out))
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', input: JSON.stringify(SNIPPETS) });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.equal(out.service.mode, 'service', 'service did not fall back');
+    assert.deepEqual(NODE_SAMPLE.map((i) => out.service.many[i]), out.node.many);
+    assert.deepEqual(out.service.one, out.node.many);
+    assert.deepEqual(
+        out.service.many.map(([ok]) => ok),
+        [true, true, true, false, false, false, true, false, true],
+    );
+    for (const [i, [ok]] of out.service.many.entries()) {
+        if (ok) assert.equal(out.python.many[i][0], true, SNIPPETS[i]);
+    }
+    for (const [ok, detail] of out.service.many) {
+        if (!ok) assert.match(detail, /SyntaxError/);
+    }
+});
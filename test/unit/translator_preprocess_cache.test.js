@@ -0,0 +1,129 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// frontend/preprocess.py: cpp runs are reused until the source, a header in
+// its include closure or the cpp args change, and the run-length PpCrosswalk
+// answers the same as the per-line pairs it replaced.
+const hasCpp = spawnSync('cpp', ['--version']).status === 0;
+
+function runPython(body) {
+    const script = `
+import json, os, re, shutil, sys, tempfile
+sys.path.insert(0, 'tools/c_translator')
+from artifact_store import configure_artifact_store
+from frontend import preprocess as pp
+tmp = tempfile.mkdtemp(prefix='translator-preprocess-')
+try:
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    configure_artifact_store(None)
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], {
+        encoding: 'utf8',
+        env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' },
+    });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('cpp reruns only when the source, an included header or the args change', (t) => {
+    if (!hasCpp) {
+        t.skip('cpp not installed');
+        return;
+    }
+    const out = runPython(`
+def write(name, text):
+    with open(os.path.join(tmp, name), 'w') as f:
+        f.write(text)
+write('a.h', '#define A 1\\n')
+write('unused.h', '#define U 1\\n')
+write('src.c', '#include "a.h"\\n#define B (A + 1)\\nint f(void) { return B; }\\n')
+src = os.path.join(tmp, 'src.c')
+runs = []
+real_run_cpp = pp.run_cpp
+def counting_run_cpp(path, args):
+    runs.append(list(args))
+    return real_run_cpp(path, args)
+pp.run_cpp = counting_run_cpp
+configure_artifact_store(os.path.join(tmp, 'cache'))
+def fresh_process(args=('-std=c99',)):
+    # A new process has neither memo; only the on-disk store survives.
+    pp._memo.clear()
+    pp._include_digests.clear()
+    before = len(runs)
+    result = pp.preprocess(src, list(args))
+    return len(runs) - before, sorted(result['macro_names'] & {'A', 'B', 'C', 'U'})
+steps = {}
+steps['first'] = fresh_process()
+steps['rerun'] = fresh_process()
+pp.preprocess(src, ['-std=c99'])
+steps['memo_runs'] = len(runs)
+write('unused.h', '#define U 2\\n')
+steps['unrelated_header'] = fresh_process()
+write('a.h', '#define A 2\\n#define C 3\\n')
+steps['included_header'] = fresh_process()
+steps['std_ignored'] = fresh_process(['-std=gnu11'])
+steps['new_args'] = fresh_process(['-DEXTRA'])
+write('src.c', '#include "a.h"\\n#include "unused.h"\\nint f(void) { return A; }\\n')
+steps['source'] = fresh_process()
+print(json.dumps(steps))
+`);
+    assert.deepEqual(out, {
+        first: [1, ['A', 'B']],
+        rerun: [0, ['A', 'B']],
+        memo_runs: 1,
+        unrelated_header: [0, ['A', 'B']],
+        included_header: [1, ['A', 'B', 'C']],
+        std_ignored: [0, ['A', 'B', 'C']],
+        new_args: [1, ['A', 'B', 'C']],
+        source: [1, ['A', 'C', 'U']],
+    });
+});
+
+test('PpCrosswalk runs agree with per-line pairs on hack.c', (t) => {
+    if (!hasCpp) {
+        t.skip('cpp not installed');
+        return;
+    }
+    const out = runPython(`
+src = 'nethack-c/src/hack.c'
+with open('tools/c_translator/compile_profile.json') as f:
+    res = pp.run_cpp(src, json.load(f)['args'])
+assert res['available'], res
+text = res['stdout']
+# The pre-PpCrosswalk builder: one (pp_line, source_line) pair per line.
+pairs = []
+logical_file, logical_line = None, 0
+for i, line in enumerate(text.splitlines(), start=1):
+    m = pp.PP_LINE_RE.match(line) if line.startswith('#') else None
+    if m:
+        logical_line, logical_file = int(m.group(1)) - 1, m.group(2)
+        continue
+    logical_line += 1
+    if logical_file == src:
+        pairs.append((i, logical_line))
+cw = pp.build_pp_crosswalk(text, src)
+by_pp = dict(pairs)
+by_source = {}
+for p, s in pairs:
+    by_source.setdefault(s, []).append(p)
+total_pp = len(text.splitlines())
+lookups_ok = all(cw.source_line(p) == by_pp.get(p) for p in range(0, total_pp + 2))
+reverse_ok = all(cw.pp_lines(s) == by_source.get(s, []) for s in range(0, max(by_source) + 2))
+restored = pp.PpCrosswalk.from_json(json.loads(json.dumps(cw.to_json())))
+print(json.dumps({
+    'pairs': len(pairs), 'len': len(cw), 'runs': cw.run_count(),
+    'iter_ok': list(cw) == pairs, 'lookups_ok': lookups_ok, 'reverse_ok': reverse_ok,
+    'sample_ok': cw.sample(200) == [{'pp_line': p, 'source_line': s} for p, s in pairs[:200]],
+    'json_ok': list(restored) == pairs,
+}))
+`);
+    assert.ok(out.pairs > 1000, `only ${out.pairs} source lines`);
+    assert.equal(out.len, out.pairs);
+    assert.ok(out.runs * 10 < out.pairs, `${out.runs} runs for ${out.pairs} lines`);
+    for (const key of ['iter_ok', 'lookups_ok', 'reverse_ok', 'sample_ok', 'json_ok']) {
+        assert.equal(out[key], true, key);
+    }
+});
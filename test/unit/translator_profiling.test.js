@@ -0,0 +1,115 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// profiling.py stage accounting, and batch_emit.py --profile: the same
+// outputs as an unprofiled run plus one merged trace across workers.
+const SOURCES = [
+    'test/fixtures/translator_async_fixture.c',
+    'test/fixtures/translator_helper_fixture.c',
+];
+
+function runPython(body) {
+    const script = `
+import json, sys, time
+sys.path.insert(0, 'tools/c_translator')
+import profiling
+from profiling import configure_profiler, get_profiler, stage
+${body.trim()}
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('nested stages split self time and charge a function once', () => {
+    const out = runPython(`
+configure_profiler(False)
+disabled = stage('nir') is stage('cfg')
+prof = configure_profiler(True)
+with stage('emit_helper', source='a.c', function='f'):
+    time.sleep(0.02)
+    with stage('lower'):
+        time.sleep(0.03)
+        with stage('rewrite_macros', trace=False):
+            pass
+with stage('emit_helper', source='a.c', function='g'):
+    pass
+worker = profiling.Profiler()
+with worker.stage('lower', function='h', source='b.c'):
+    time.sleep(0.01)
+prof.merge(worker.drain())
+summary = prof.summary()
+stages = {s['stage']: s for s in summary['stages']}
+funcs = {f['function']: f for f in summary['slowest_functions']}
+print(json.dumps({
+    'disabled': disabled,
+    'calls': {name: s['calls'] for name, s in stages.items()},
+    'emit_self': stages['emit_helper']['self_wall_s'],
+    'emit_wall': stages['emit_helper']['wall_s'],
+    'lower_wall': stages['lower']['wall_s'],
+    'funcs': {name: [f['source'], f['calls']] for name, f in funcs.items()},
+    'f_wall': funcs['f']['wall_s'],
+    'events': sorted((e['name'], e['args'].get('function')) for e in prof.events),
+    'drained': worker.drain(),
+}))
+`);
+    assert.equal(out.disabled, true);
+    assert.deepEqual(out.calls, { emit_helper: 2, lower: 2, rewrite_macros: 1 });
+    // lower (with its 30ms sleep) is excluded from emit_helper's self time.
+    assert.ok(out.emit_self >= 0.02 && out.emit_self < out.emit_wall - 0.025, JSON.stringify(out));
+    assert.ok(out.lower_wall >= 0.04);
+    assert.deepEqual(out.funcs, { f: ['a.c', 1], g: ['a.c', 1], h: ['b.c', 1] });
+    assert.ok(out.f_wall >= 0.05 && out.f_wall < 0.5);
+    assert.deepEqual(out.events, [
+        ['emit_helper', 'f'], ['emit_helper', 'g'], ['lower', 'f'], ['lower', 'h'],
+    ]);
+    assert.deepEqual(out.drained, { stages: {}, functions: {}, events: [] });
+});
+
+function batchEmit(extra) {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'translator-profiling-'));
+    try {
+        const args = ['tools/c_translator/batch_emit.py'];
+        for (const src of SOURCES) args.push('--src', src);
+        args.push(
+            '--out-dir', path.join(dir, 'out'), '--summary-out', path.join(dir, 'summary.json'),
+            '--no-exclude-sources', '--include-blocked', '--jobs', '2', ...extra(dir),
+        );
+        const r = spawnSync('python3', args, {
+            encoding: 'utf8', env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' },
+        });
+        assert.equal(r.status, 0, r.stderr || r.stdout);
+        const outDir = path.join(dir, 'out');
+        const trace = path.join(dir, 'trace.json');
+        return {
+            summary: fs.readFileSync(path.join(dir, 'summary.json'), 'utf8').split(dir).join('<dir>'),
+            payloads: fs.readdirSync(outDir).sort().map((name) => fs.readFileSync(path.join(outDir, name), 'utf8')),
+            trace: fs.existsSync(trace) ? JSON.parse(fs.readFileSync(trace, 'utf8')) : null,
+            stdout: r.stdout,
+        };
+    } finally {
+        fs.rmSync(dir, { recursive: true, force: true });
+    }
+}
+
+test('batch_emit --profile keeps outputs and merges worker traces', () => {
+    const plain = batchEmit(() => []);
+    const profiled = batchEmit((dir) => ['--profile', path.join(dir, 'trace.json')]);
+    assert.equal(plain.trace, null);
+    assert.equal(profiled.summary, plain.summary);
+    assert.deepEqual(profiled.payloads, plain.payloads);
+    assert.match(profiled.stdout, /translator: profile \(self wall/);
+
+    const { traceEvents, otherData } = profiled.trace;
+    const stages = new Set(otherData.stages.map((s) => s.stage));
+    for (const name of ['capability', 'emit_helper', 'json_write']) assert.ok(stages.has(name), name);
+    // Emits only run in the workers, so these events came through merge().
+    const emits = traceEvents.filter((e) => e.name === 'emit_helper');
+    assert.equal(emits.length, plain.payloads.length);
+    assert.deepEqual([...new Set(emits.map((e) => e.args.source))].sort(), [...SOURCES].sort());
+    assert.equal(otherData.function_count, plain.payloads.length);
+});
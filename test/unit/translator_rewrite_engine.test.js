@@ -0,0 +1,80 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// backend/rewrite_engine.py: single-pass literal and macro rewriters.
+function runPython(body) {
+    const script = `
+import json, sys
+sys.path.insert(0, 'tools/c_translator')
+from backend.rewrite_engine import LiteralRewriter, MacroRewriter
+${body}
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('literal rewrites are leftmost-longest and never re-match their output', () => {
+    // "gm.gm." is a real C member chain (display.c); like the legacy rules
+    // it still collapses to a single "game.".
+    const out = runPython(`
+rw = LiteralRewriter([
+    {'c': 'u.', 'js': 'game.u.', 'requires_params': {'game'}},
+    {'c': 'u.uz', 'js': 'game.u.uz', 'requires_params': {'game'}},
+    {'c': 'svc.', 'js': 'game.svc.', 'requires_params': {'game'}},
+    {'c': 'svc.', 'js': 'ignored.', 'requires_params': {'other'}},
+    {'c': 'flags.', 'js': 'flags.', 'requires_params': {'flags'}},
+    {'c': 'gm.', 'js': 'game.', 'requires_params': {'game'}},
+])
+cases = ['u.uz.dlevel + u.ux', 'svc.context.run', 'x + y', 'flags.verbose && u.uhp',
+         'giptr->gm.gm.customcolor != 0']
+print(json.dumps([[text, *[sorted(p) if isinstance(p, set) else p for p in rw.rewrite(text)]]
+                  for text in cases]))
+`);
+    assert.deepEqual(out, [
+        ['u.uz.dlevel + u.ux', 'game.u.uz.dlevel + game.u.ux', ['game']],
+        ['svc.context.run', 'game.svc.context.run', ['game']],
+        ['x + y', 'x + y', []],
+        ['flags.verbose && u.uhp', 'flags.verbose && game.u.uhp', ['flags', 'game']],
+        ['giptr->gm.gm.customcolor != 0', 'giptr->game.customcolor != 0', ['game']],
+    ]);
+});
+
+test('macro rewrites expand nested macros inner-first on word boundaries', () => {
+    const out = runPython(`
+rw = MacroRewriter([
+    {'c': 'ACURR($1)', 'js': 'acurr($1)', 'requires_params': ['player']},
+    {'c': 'ABASE($1)', 'js': 'player.abase[$1]'},
+    {'c': 'MAX($1, $2)', 'js': 'Math.max($1, $2)'},
+    {'c': 'TRUE', 'js': 'true'},
+])
+cases = ['ACURR(ABASE(A_STR))', 'MAX( a , b ) + XMAX(c, d)', 'TRUE || TRUEISH', 'plain']
+print(json.dumps([[text, *[sorted(p) if isinstance(p, set) else p for p in rw.rewrite(text)]]
+                  for text in cases]))
+`);
+    assert.deepEqual(out, [
+        ['ACURR(ABASE(A_STR))', 'acurr(player.abase[A_STR])', ['player']],
+        ['MAX( a , b ) + XMAX(c, d)', 'Math.max(a, b) + XMAX(c, d)', []],
+        ['TRUE || TRUEISH', 'true || TRUEISH', []],
+        ['plain', 'plain', []],
+    ]);
+});
+
+test('compiled engines lower NetHack expressions exactly like the legacy rules', () => {
+    const r = spawnSync('python3', ['-c', `
+import json, sys
+sys.path.insert(0, 'tools/c_translator')
+import bench_lowering
+exprs = bench_lowering.harvest_expressions(['nethack-c/src/hack.c'], 1500)
+# The one statement in the tree whose lowering relies on the game.game. collapse.
+exprs.append('giptr->gm.gm.customcolor != 0')
+report = bench_lowering.run_benchmark(exprs, 1, timing=False)
+print(json.dumps({'count': len(exprs),
+                  'mismatches': {k: v['mismatches'] for k, v in report['stages'].items()}}))
+`], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.equal(out.count, 1501);
+    assert.deepEqual(out.mismatches, { literal_rewrite: 0, macro_rewrite: 0, lower_expr: 0 });
+});
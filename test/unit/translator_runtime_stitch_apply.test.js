@@ -0,0 +1,112 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import { spawnSync } from 'node:child_process';
+
+// runtime_stitch_apply.py plans every stitch of a module, splices them in
+// one pass, and its dry-run diff (in the summary, or --diff-out) reproduces
+// exactly what --write writes.
+const MODULE = `import { rn2 } from './rng.js';
+
+export function first(a, b) {
+    return a + b;
+}
+
+function middle(x) {
+    if (x) { return '}'; }
+    return 0;
+}
+
+export function wrongArity(a) {
+    return a;
+}
+
+export async function last() {
+    await rn2(2);
+}
+
+// Autotranslated from hack.c:10
+export function marked(x) {
+    return x;
+}
+`;
+
+const EMITTED = {
+    first: 'export function first(a, b) {\n    return b + a;\n}\n',
+    marked: 'export function marked(x) {\n    return -x;\n}\n',
+    middle: 'function middle(x) {\n    return x ? 1 : 0;\n}\n',
+    wrongArity: 'export function wrongArity(a, b) {\n    return a + b;\n}\n',
+    last: 'export async function last() {\n    await rn2(3);\n}\n',
+    missing: 'export function missing() {}\n',
+};
+
+function stitch(repo, extra) {
+    const r = spawnSync('python3', [
+        'tools/c_translator/runtime_stitch_apply.py',
+        '--safety', path.join(repo, 'safety.json'), '--repo-root', repo, ...extra,
+    ], { encoding: 'utf8', env: { ...process.env, C_TRANSLATOR_CACHE_DIR: '' } });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout);
+}
+
+test('stitches are planned per module and the diff matches the write', () => {
+    const repo = fs.mkdtempSync(path.join(os.tmpdir(), 'translator-stitch-apply-'));
+    try {
+        fs.mkdirSync(path.join(repo, 'js'));
+        fs.mkdirSync(path.join(repo, 'out'));
+        const modulePath = path.join(repo, 'js', 'mod.js');
+        fs.writeFileSync(modulePath, MODULE);
+        const safe = Object.entries(EMITTED).map(([fn, js]) => {
+            const outFile = path.join(repo, 'out', `${fn}.json`);
+            fs.writeFileSync(outFile, JSON.stringify({ js }));
+            return { js_module: 'js/mod.js', function: fn, out_file: outFile, source: 'hack.c' };
+        });
+        safe.push({ ...safe[0] });
+        fs.writeFileSync(path.join(repo, 'safety.json'), JSON.stringify({ safe }));
+
+        const diffPath = path.join(repo, 'stitch.diff');
+        const dry = stitch(repo, ['--diff-out', diffPath]);
+        assert.equal(fs.readFileSync(modulePath, 'utf8'), MODULE, 'dry run leaves the module alone');
+        assert.equal(dry.stitched, 3);
+        assert.equal(dry.skipped_marked, 1);
+        assert.equal(dry.skipped_missing, 1);
+        assert.equal(dry.skipped_overlap, 1);
+        assert.equal(dry.skipped_signature_mismatch, 1);
+        assert.deepEqual(dry.changes.map((c) => c.function), ['last', 'middle', 'first']);
+        assert.equal(dry.diff, undefined, 'the diff went to --diff-out');
+        const plain = stitch(repo, []);
+        assert.equal(plain.diff, fs.readFileSync(diffPath, 'utf8'));
+        assert.match(plain.diff, /^--- a\/js\/mod\.js\n/);
+
+        const written = stitch(repo, ['--write']);
+        assert.deepEqual(written.changes, dry.changes);
+        const after = fs.readFileSync(modulePath, 'utf8');
+        for (const fn of ['first', 'middle', 'last']) assert.ok(after.includes(EMITTED[fn]), fn);
+        assert.ok(after.includes('    return x;\n'), 'marked function kept');
+        assert.ok(after.includes('export function wrongArity(a) {'), 'mismatched signature kept');
+
+        fs.writeFileSync(modulePath, MODULE);
+        const applied = spawnSync('git', ['apply', '--unsafe-paths', '--directory', '.', diffPath], {
+            cwd: repo, encoding: 'utf8',
+        });
+        assert.equal(applied.status, 0, applied.stderr);
+        assert.equal(fs.readFileSync(modulePath, 'utf8'), after);
+    } finally {
+        fs.rmSync(repo, { recursive: true, force: true });
+    }
+});
+
+test('SplicePlan rejects overlapping edits', () => {
+    const r = spawnSync('python3', ['-c', `
+import json, sys
+sys.path.insert(0, 'tools/c_translator')
+from runtime_stitch_apply import SplicePlan
+plan = SplicePlan('abcdefghij')
+print(json.dumps([plan.add(6, 8, 'XY'), plan.add(0, 2, '-'), plan.add(7, 9, 'no'),
+                  plan.add(1, 3, 'no'), plan.add(2, 6, ''), len(plan), plan.apply()]))
+`], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr);
+    assert.deepEqual(JSON.parse(r.stdout), [true, true, false, false, true, 3, '-XYij']);
+});
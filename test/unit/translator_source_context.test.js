@@ -0,0 +1,62 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// SourceContext parses a translation unit once and slices per-function
+// views that match the standalone single-function builders.
+test('one shared source context serves every function of a file', () => {
+    const script = `
+import json, os, shutil, sys, tempfile
+sys.path.insert(0, 'tools/c_translator')
+import source_context.context as sc
+from source_context import clear_source_contexts, load_source_context
+from async_infer import build_async_summary
+from cfg import build_cfg_summary
+from nir import build_nir_snapshot
+
+calls = []
+real_build = sc.build_nir_snapshot
+def counting_build(*args, **kwargs):
+    calls.append(args[0])
+    return real_build(*args, **kwargs)
+sc.build_nir_snapshot = counting_build
+
+tmp = tempfile.mkdtemp(prefix='translator-source-context-')
+try:
+    src = os.path.join(tmp, 'fixture.c')
+    shutil.copyfile('test/fixtures/translator_async_fixture.c', src)
+    ctx = load_source_context(src)
+    names = [fn['name'] for fn in ctx.nir_snapshot()['functions']]
+    direct_async = {fn['name']: fn for fn in build_async_summary(src, None)['functions']}
+    slices = {
+        name: [
+            ctx.nir_snapshot(name) == build_nir_snapshot(src, name),
+            ctx.cfg_summary(name) == build_cfg_summary(src, name),
+            ctx.async_functions()[name] == direct_async[name],
+        ]
+        for name in names
+    }
+    same = load_source_context(src) is ctx
+    builds_before_edit = len(calls)
+    with open(src, 'a') as f:
+        f.write('\\nint added_later(void) { return 1; }\\n')
+    edited = load_source_context(src)
+    added = 'added_later' in [fn['name'] for fn in edited.nir_snapshot()['functions']]
+    clear_source_contexts()
+    print(json.dumps({'names': names, 'slices': slices, 'same': same,
+                      'builds': builds_before_edit, 'fresh': edited is not ctx, 'added': added}))
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8' });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    const out = JSON.parse(r.stdout.trim().split('\n').pop());
+    assert.ok(out.names.length >= 3);
+    for (const name of out.names) {
+        assert.deepEqual(out.slices[name], [true, true, true], name);
+    }
+    assert.equal(out.same, true);
+    assert.equal(out.builds, 1, 'NIR built once for the whole file');
+    assert.equal(out.fresh, true);
+    assert.equal(out.added, true);
+});
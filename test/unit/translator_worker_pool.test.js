@@ -0,0 +1,68 @@
+import test from 'node:test';
+import assert from 'node:assert/strict';
+import { spawnSync } from 'node:child_process';
+
+// worker_pool.ordered_map(): results stream in task order, and a task that
+// kills its worker is isolated without serializing the rest of the batch.
+function runPython(body) {
+    const script = `
+import json, os, shutil, sys, tempfile, time
+sys.path.insert(0, 'tools/c_translator')
+from worker_pool import ordered_map
+tmp = tempfile.mkdtemp(prefix='translator-worker-pool-')
+try:
+${body.trim().split('\n').map((line) => `    ${line}`).join('\n')}
+finally:
+    shutil.rmtree(tmp, ignore_errors=True)
+`;
+    const r = spawnSync('python3', ['-c', script], { encoding: 'utf8', timeout: 60000 });
+    assert.equal(r.status, 0, r.stderr || r.stdout);
+    return JSON.parse(r.stdout.trim().split('\n').pop());
+}
+
+test('results are yielded before later tasks finish', () => {
+    const out = runPython(`
+flag = os.path.join(tmp, 'first-result-seen')
+def work(i):
+    if i == 3:
+        # Only finishes once the caller has consumed result 0.
+        deadline = time.monotonic() + 5
+        while not os.path.exists(flag) and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return os.path.exists(flag)
+    return i * 10
+seen = []
+for result in ordered_map(work, [(i,) for i in range(4)], 2, lambda task: 'crashed'):
+    seen.append(result)
+    open(flag, 'w').close()
+print(json.dumps(seen))
+`);
+    assert.deepEqual(out, [0, 10, 20, true]);
+});
+
+test('a crashing task is isolated and the rest keep one shared pool', () => {
+    const out = runPython(`
+runs = os.path.join(tmp, 'runs')
+os.mkdir(runs)
+def work(i):
+    with open(os.path.join(runs, f'{i}-{os.getpid()}'), 'w'):
+        pass
+    if i == 1:
+        os._exit(3)
+    time.sleep(0.05)
+    return i
+results = list(ordered_map(work, [(i,) for i in range(12)], 2, lambda task: f'crashed {task[0]}'))
+names = os.listdir(runs)
+print(json.dumps({
+    'results': results,
+    'crash_runs': sum(name.startswith('1-') for name in names),
+    'pids': len({name.split('-')[1] for name in names}),
+}))
+`);
+    assert.deepEqual(out.results, [0, 'crashed 1', 2, 3, 4, 5, 6, 7, 8, 9, 10, 11]);
+    // Once in the first pool, once alone.
+    assert.equal(out.crash_runs, 2);
+    // First pool, isolated suspects and one rebuilt pool -- not one fresh
+    // process per remaining task.
+    assert.ok(out.pids <= 6, `${out.pids} worker processes`);
+});
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Inspect and prune the translator artifact store.
+
+The store is enabled for main.py, batch_emit.py and capability_matrix.py
+with --cache-dir DIR or $C_TRANSLATOR_CACHE_DIR.
+"""
+
+import argparse
+import json
+import os
+
+from artifact_store import CACHE_DIR_ENV, ArtifactStore
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Translator artifact store maintenance")
+    ap.add_argument(
+        "--cache-dir",
+        default=os.environ.get(CACHE_DIR_ENV),
+        help=f"Store directory (default: ${CACHE_DIR_ENV})",
+    )
+    sub = ap.add_subparsers(dest="command", required=True)
+    stats = sub.add_parser("stats", help="Entry counts and sizes per stage")
+    stats.add_argument("--json", action="store_true", help="Print JSON instead of a table")
+    prune = sub.add_parser("prune", help="Drop stale entries (least recently used first)")
+    prune.add_argument("--max-age-days", type=float, default=None, help="Drop entries unused for this long")
+    prune.add_argument("--max-size-mb", type=float, default=None, help="Then keep at most this much")
+    prune.add_argument("--stage", default=None, help="Only prune this stage (e.g. emit-helper)")
+    sub.add_parser("clear", help="Remove every entry")
+    args = ap.parse_args()
+
+    if not args.cache_dir:
+        ap.error(f"no store: pass --cache-dir or set ${CACHE_DIR_ENV}")
+    store = ArtifactStore(args.cache_dir)
+
+    if args.command == "stats":
+        usage = store.usage()
+        if args.json:
+            print(json.dumps(usage, indent=2, sort_keys=True))
+            return
+        total_entries = total_bytes = 0
+        for stage, rec in sorted(usage.items()):
+            print(f"{stage:<14} {rec['entries']:>8} entries {rec['bytes'] / 1e6:>10.2f} MB")
+            total_entries += rec["entries"]
+            total_bytes += rec["bytes"]
+        print(f"{'total':<14} {total_entries:>8} entries {total_bytes / 1e6:>10.2f} MB")
+        return
+
+    if args.command == "prune":
+        if args.max_age_days is None and args.max_size_mb is None:
+            ap.error("prune needs --max-age-days and/or --max-size-mb")
+        max_bytes = int(args.max_size_mb * 1e6) if args.max_size_mb is not None else None
+        result = store.prune(args.max_age_days, max_bytes, args.stage)
+    else:
+        result = store.prune(max_bytes=0)
+    print(
+        f"translator: removed {result['removed']} entries ({result['removed_bytes'] / 1e6:.2f} MB), "
+        f"kept {result['kept']} ({result['kept_bytes'] / 1e6:.2f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+from .store import (
+    CACHE_DIR_ENV,
+    ArtifactStore,
+    compile_profile_digest,
+    configure_artifact_store,
+    format_stats,
+    get_artifact_store,
+    merge_stats,
+    ruleset_digest,
+    tool_digest,
+)
+
+__all__ = [
+    "CACHE_DIR_ENV",
+    "ArtifactStore",
+    "compile_profile_digest",
+    "configure_artifact_store",
+    "format_stats",
+    "get_artifact_store",
+    "merge_stats",
+    "ruleset_digest",
+    "tool_digest",
+]
@@ -0,0 +1,216 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+
+CACHE_DIR_ENV = "C_TRANSLATOR_CACHE_DIR"
+STORE_VERSION = 1
+
+# Packages whose code shapes cached artifacts; editing any of them
+# invalidates every entry.  CLI scripts are deliberately left out.
+_TOOL_PACKAGES = ("nir", "cfg", "async_infer", "frontend", "backend", "source_context", "artifact_store")
+_TOOL_ROOT = Path(__file__).resolve().parent.parent
+
+_digest_cache = {}
+_store = None
+
+
+def _sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_digest(path):
+    p = Path(path)
+    if not p.exists():
+        return None
+    return _sha256_bytes(p.read_bytes())
+
+
+def tool_digest():
+    """Digest of the translator's analysis/emission code."""
+    if "tool" not in _digest_cache:
+        h = hashlib.sha256()
+        for pkg in _TOOL_PACKAGES:
+            for p in sorted((_TOOL_ROOT / pkg).glob("*.py")):
+                h.update(f"{pkg}/{p.name}\0".encode("utf-8"))
+                h.update(p.read_bytes())
+        _digest_cache["tool"] = h.hexdigest()
+    return _digest_cache["tool"]
+
+
+def ruleset_digest(*paths):
+    """{path: sha256 or None} for ruleset JSON files, hashed once per process."""
+    out = {}
+    for path in paths:
+        key = ("ruleset", str(path))
+        if key not in _digest_cache:
+            _digest_cache[key] = _file_digest(path)
+        out[str(path)] = _digest_cache[key]
+    return out
+
+
+def compile_profile_digest(compile_profile):
+    """Digest of a compile profile plus the headers in its -I directories.
+
+    Header contents shape the libclang AST, so any header edit under an
+    include directory invalidates AST-derived artifacts.
+    """
+    if compile_profile is None:
+        return None
+    canon = json.dumps(compile_profile, sort_keys=True)
+    key = ("profile", canon)
+    if key not in _digest_cache:
+        h = hashlib.sha256(canon.encode("utf-8"))
+        args = compile_profile.get("args", [])
+        for i, arg in enumerate(args):
+            inc = None
+            if arg.startswith("-I") and len(arg) > 2:
+                inc = arg[2:]
+            elif arg in ("-I", "-isystem") and i + 1 < len(args):
+                inc = args[i + 1]
+            if not inc or not Path(inc).is_dir():
+                continue
+            for header in sorted(Path(inc).glob("*.h")):
+                h.update(f"{header}\0".encode("utf-8"))
+                h.update(header.read_bytes())
+        _digest_cache[key] = h.hexdigest()
+    return _digest_cache[key]
+
+
+class ArtifactStore:
+    """Content-addressed on-disk cache for translator stage outputs.
+
+    Entries live at <root>/<stage>/<kk>/<key>.json, where key is the
+    SHA-256 of the canonical JSON of the key parts plus the store version
+    and tool digest.  Values are the stage's JSON payload.  Hits refresh
+    the entry's mtime so prune() can drop the least recently used ones.
+    """
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.stats = Counter()
+
+    def key(self, stage, **parts):
+        canon = json.dumps(
+            {"stage": stage, "version": STORE_VERSION, "tool": tool_digest(), **parts},
+            sort_keys=True,
+            default=sorted,
+        )
+        return _sha256_bytes(canon.encode("utf-8"))
+
+    def _path(self, stage, key):
+        return self.root / stage / key[:2] / f"{key}.json"
+
+    def get(self, stage, key):
+        path = self._path(stage, key)
+        try:
+            value = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.stats[(stage, "miss")] += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.stats[(stage, "hit")] += 1
+        return value
+
+    def put(self, stage, key, value):
+        path = self._path(stage, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent workers never see partial entries.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(value, f, separators=(",", ":"), sort_keys=True)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+            raise
+        return value
+
+    def drain_stats(self):
+        """Return and reset {stage: {"hit": n, "miss": n}} for this process."""
+        out = {}
+        for (stage, kind), count in sorted(self.stats.items()):
+            out.setdefault(stage, {"hit": 0, "miss": 0})[kind] = count
+        self.stats.clear()
+        return out
+
+    def entries(self):
+        """Yield (stage, path, size, mtime) for every stored entry."""
+        if not self.root.is_dir():
+            return
+        for stage_dir in sorted(p for p in self.root.iterdir() if p.is_dir()):
+            for path in stage_dir.glob("*/*.json"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                yield stage_dir.name, path, st.st_size, st.st_mtime
+
+    def usage(self):
+        """{stage: {"entries": n, "bytes": n}} for what is on disk."""
+        out = {}
+        for stage, _path, size, _mtime in self.entries():
+            rec = out.setdefault(stage, {"entries": 0, "bytes": 0})
+            rec["entries"] += 1
+            rec["bytes"] += size
+        return out
+
+    def prune(self, max_age_days=None, max_bytes=None, stage=None):
+        """Delete entries unused for max_age_days, then the oldest beyond max_bytes.
+
+        Returns {"removed": n, "removed_bytes": n, "kept": n, "kept_bytes": n}.
+        """
+        entries = [e for e in self.entries() if stage is None or e[0] == stage]
+        entries.sort(key=lambda e: e[3], reverse=True)  # newest first
+        cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+        kept = kept_bytes = removed = removed_bytes = 0
+        for _stage, path, size, mtime in entries:
+            too_old = cutoff is not None and mtime < cutoff
+            too_big = max_bytes is not None and kept_bytes + size > max_bytes
+            if too_old or too_big:
+                try:
+                    path.unlink()
+                    removed += 1
+                    removed_bytes += size
+                except OSError:
+                    pass
+                continue
+            kept += 1
+            kept_bytes += size
+        return {"removed": removed, "removed_bytes": removed_bytes, "kept": kept, "kept_bytes": kept_bytes}
+
+
+def configure_artifact_store(cache_dir=None):
+    """Set (or, with no dir and no $C_TRANSLATOR_CACHE_DIR, disable) the process store."""
+    global _store
+    cache_dir = cache_dir or os.environ.get(CACHE_DIR_ENV)
+    _store = ArtifactStore(cache_dir) if cache_dir else None
+    return _store
+
+
+def get_artifact_store():
+    return _store
+
+
+def format_stats(stats):
+    """One-line summary of drain_stats() output."""
+    hits = sum(v["hit"] for v in stats.values())
+    misses = sum(v["miss"] for v in stats.values())
+    detail = ", ".join(f"{stage} {v['hit']}/{v['hit'] + v['miss']}" for stage, v in sorted(stats.items()))
+    return f"cache hits={hits} misses={misses}" + (f" ({detail})" if detail else "")
+
+
+def merge_stats(total, stats):
+    for stage, counts in stats.items():
+        rec = total.setdefault(stage, {"hit": 0, "miss": 0})
+        rec["hit"] += counts.get("hit", 0)
+        rec["miss"] += counts.get("miss", 0)
+    return total
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Build the whole-program async index.
+
+Per-file async-summary only sees calls inside one translation unit; this
+builds one call graph over every --src file (default: nethack-c/src/*.c)
+and propagates requires_async across files.  Pass the written index to
+main.py, batch_emit.py or capability_matrix.py with --async-index; they
+fall back to per-file inference for sources it does not cover or that
+changed since the build.
+"""
+
+import argparse
+import glob
+import time
+
+from artifact_store import configure_artifact_store
+from async_infer import build_async_index, write_async_index
+from async_infer.builder import BOUNDARY_RULES_DEFAULT
+from source_context import load_source_context
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build the whole-program async index")
+    ap.add_argument("--src", action="append", help="C source glob (repeatable; default nethack-c/src/*.c)")
+    ap.add_argument("--boundary-rules", default=BOUNDARY_RULES_DEFAULT, help="Boundary rules JSON path")
+    ap.add_argument("--out", required=True, help="Index JSON output path")
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Artifact store directory for cached NIR (default: $C_TRANSLATOR_CACHE_DIR, else off)",
+    )
+    args = ap.parse_args()
+
+    configure_artifact_store(args.cache_dir)
+    sources = sorted({path for pattern in (args.src or ["nethack-c/src/*.c"]) for path in glob.glob(pattern)})
+    if not sources:
+        ap.error("no source files matched --src")
+
+    def nir_loader(path):
+        ctx = load_source_context(path, None, args.boundary_rules)
+        return ctx.text, ctx.nir_snapshot()
+
+    start = time.perf_counter()
+    index = build_async_index(sources, args.boundary_rules, nir_loader)
+    elapsed = time.perf_counter() - start
+    write_async_index(index, args.out)
+    print(f"translator: async index -> {args.out}")
+    print(
+        f"translator: sources={index['source_count']} functions={index['function_count']} "
+        f"requires_async={index['requires_async_count']} "
+        f"cross_file_only={index['cross_file_async_count']} ({elapsed:.2f}s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
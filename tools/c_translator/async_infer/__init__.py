@@ -1,3 +1,17 @@
 from .builder import build_async_summary
+from .program import (
+    AsyncIndex,
+    build_async_index,
+    configure_async_index,
+    get_async_index,
+    write_async_index,
+)
 
-__all__ = ["build_async_summary"]
+__all__ = [
+    "AsyncIndex",
+    "build_async_index",
+    "build_async_summary",
+    "configure_async_index",
+    "get_async_index",
+    "write_async_index",
+]
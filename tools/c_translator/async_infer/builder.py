@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 
 from nir import build_nir_snapshot
+from .callgraph import propagate_requires_async
 
 
 BOUNDARY_RULES_DEFAULT = "tools/c_translator/rulesets/boundary_calls.json"
@@ -20,8 +21,9 @@ def _load_boundary_rules(path):
     return out
 
 
-def build_async_summary(src_path, func_filter=None, boundary_rules_path=BOUNDARY_RULES_DEFAULT):
-    nir = build_nir_snapshot(src_path, func_filter)
+def build_async_summary(src_path, func_filter=None, boundary_rules_path=BOUNDARY_RULES_DEFAULT, *, nir=None):
+    if nir is None:
+        nir = build_nir_snapshot(src_path, func_filter)
     rules = _load_boundary_rules(boundary_rules_path)
 
     by_name = {fn["name"]: fn for fn in nir["functions"]}
@@ -54,18 +56,17 @@ def build_async_summary(src_path, func_filter=None, boundary_rules_path=BOUNDARY
             "awaited_boundary_callsites": [],
         }
 
-    changed = True
-    while changed:
-        changed = False
-        for fn_name, node in state.items():
-            if node["requires_async"]:
-                continue
-            async_callees = [c for c in node["callees"] if state.get(c, {}).get("requires_async")]
-            if async_callees:
-                node["requires_async"] = True
-                node["reasons"].append("async_callee")
-                node["awaited_boundary_callsites"] = sorted(async_callees)
-                changed = True
+    graph = {name: node["callees"] for name, node in state.items()}
+    direct_async = {name for name, node in state.items() if node["requires_async"]}
+    async_names = propagate_requires_async(graph, direct_async)
+    for fn_name in async_names:
+        state[fn_name]["requires_async"] = True
+    for fn_name in sorted(async_names):
+        node = state[fn_name]
+        async_callees = [c for c in node["callees"] if c in graph and state[c]["requires_async"]]
+        if async_callees:
+            node["reasons"].append("async_callee")
+            node["awaited_boundary_callsites"] = sorted(async_callees)
 
     functions = []
     async_count = 0
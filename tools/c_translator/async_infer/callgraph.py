@@ -0,0 +1,69 @@
+def strongly_connected_components(graph):
+    """Tarjan's SCCs of graph (node -> iterable of successor nodes).
+
+    Iterative, so deep call chains cannot hit the recursion limit.  SCCs
+    come out callees-first: every SCC reachable from another is emitted
+    before it.  Successors missing from graph are ignored.
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    sccs = []
+    counter = 0
+    for root in graph:
+        if root in index:
+            continue
+        work = [(root, iter(graph[root]))]
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, succs = work[-1]
+            advanced = False
+            for succ in succs:
+                if succ not in graph:
+                    continue
+                if succ not in index:
+                    index[succ] = low[succ] = counter
+                    counter += 1
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(graph[succ])))
+                    advanced = True
+                    break
+                if succ in on_stack:
+                    low[node] = min(low[node], index[succ])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                low[parent] = min(low[parent], low[node])
+            if low[node] == index[node]:
+                scc = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    scc.append(member)
+                    if member == node:
+                        break
+                sccs.append(scc)
+    return sccs
+
+
+def propagate_requires_async(graph, direct):
+    """Nodes of graph that (transitively) call a node in `direct`.
+
+    Linear in nodes + edges: the call graph is condensed to its SCCs and
+    walked callees-first once, instead of iterating to a fixpoint.
+    """
+    async_nodes = set()
+    for scc in strongly_connected_components(graph):
+        members = set(scc)
+        if any(node in direct for node in scc) or any(
+            succ in async_nodes for node in scc for succ in graph[node] if succ not in members
+        ):
+            async_nodes.update(scc)
+    return async_nodes
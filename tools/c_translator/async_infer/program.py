@@ -0,0 +1,238 @@
+import hashlib
+import json
+import os
+import re
+import sys
+import tempfile
+from pathlib import Path
+
+from nir import build_nir_snapshot
+
+from .builder import BOUNDARY_RULES_DEFAULT, _load_boundary_rules
+from .callgraph import propagate_requires_async
+
+
+ASYNC_INDEX_VERSION = 1
+STATIC_RE = re.compile(r"^\s*(?:static|staticfn|STATIC_OVL)\b")
+COMMENT_RE = re.compile(r"/\*.*?(?:\*/|$)|//.*$")
+
+_index = None
+
+
+def _norm(path):
+    return str(Path(path)).replace("\\", "/")
+
+
+def _has_external_linkage(lines, fn):
+    """True if fn looks like a real definition with external linkage.
+
+    The signature block runs from span.signature_line (NetHack puts the
+    storage class and return type there, "staticfn void") to the line
+    before the body.  A region whose name is not declared in that block
+    (a NIR misread, e.g. a word from a parameter comment) is kept
+    file-local so it cannot capture calls from other files.
+    """
+    span = fn["span"]
+    first = max(span["signature_line"] - 1, 0)
+    block = [COMMENT_RE.sub(" ", line) for line in lines[first : span["body_start_line"] - 1]]
+    declared = re.compile(r"\b" + re.escape(fn["name"]) + r"\s*\(")
+    for line in block:
+        if STATIC_RE.match(line):
+            return False
+        if declared.search(line):
+            return True
+    return False
+
+
+def _read_nir(src_path):
+    text = Path(src_path).read_text(encoding="utf-8", errors="replace")
+    return text, build_nir_snapshot(src_path, text=text)
+
+
+def build_async_index(src_paths, boundary_rules_path=BOUNDARY_RULES_DEFAULT, nir_loader=None):
+    """Whole-program async inference over several translation units.
+
+    One call graph spans every file: a call resolves to the caller's own
+    file first, else to the single non-static definition of that name in
+    another file (extern calls to functions outside src_paths, or to names
+    with several external definitions, stay unresolved).  Calls named in
+    the boundary rules are leaves: the rule, not the C body, decides
+    whether they make the caller async.  requires_async is propagated once
+    over the SCC condensation, so the cost is linear in functions + calls.
+
+    nir_loader(path) -> (text, nir) lets callers reuse cached NIR.
+    """
+    rules = _load_boundary_rules(boundary_rules_path)
+    load = nir_loader or _read_nir
+
+    nodes = {}       # (source, name) -> node
+    exported = {}    # name -> [(source, name)] with external linkage
+    sources = {}
+    for src in src_paths:
+        text, nir = load(src)
+        source = _norm(src)
+        sources[source] = {"sha256": nir["source_sha256"]}
+        lines = text.splitlines()
+        for fn in nir["functions"]:
+            key = (source, fn["name"])
+            node = nodes.get(key)
+            if node is None:
+                node = nodes[key] = {
+                    "name": fn["name"],
+                    "id": fn["id"],
+                    "span": fn["span"],
+                    "calls": set(),
+                    "static": True,
+                }
+                exported.setdefault(fn["name"], [])
+            node["calls"].update(fn["calls"])
+            if node["static"] and _has_external_linkage(lines, fn):
+                node["static"] = False
+                exported[fn["name"]].append(key)
+
+    graph = {}
+    direct = set()
+    for key, node in nodes.items():
+        source = key[0]
+        boundaries = {"awaited_boundary": set(), "nowait_boundary": set(), "sync_boundary": set()}
+        targets = set()
+        for call in node["calls"]:
+            rule = rules.get(call)
+            if rule:
+                # A boundary's contract is its rule, not its C body.
+                if rule.get("mode") in boundaries:
+                    boundaries[rule["mode"]].add(call)
+                continue
+            if (source, call) in nodes:
+                targets.add((source, call))
+            elif len(exported.get(call, ())) == 1:
+                # The linker allows one external definition per name; more
+                # than one means misread regions, so leave the call unresolved.
+                targets.update(exported[call])
+        graph[key] = targets
+        node["boundaries"] = boundaries
+        if boundaries["awaited_boundary"]:
+            direct.add(key)
+
+    async_keys = propagate_requires_async(graph, direct)
+
+    functions = {source: {} for source in sources}
+    cross_file_only = 0
+    for key, node in nodes.items():
+        source = key[0]
+        async_callees = sorted({callee[1] for callee in graph[key] if callee in async_keys})
+        reasons = []
+        if key in direct:
+            reasons.append("direct_awaited_boundary")
+        if async_callees:
+            reasons.append("async_callee")
+        local_async = any(callee in async_keys and callee[0] == source for callee in graph[key])
+        if key in async_keys and key not in direct and not local_async:
+            cross_file_only += 1
+        functions[source][node["name"]] = {
+            "id": node["id"],
+            "name": node["name"],
+            "span": node["span"],
+            "requires_async": key in async_keys,
+            "reasons": reasons,
+            "direct_awaited_boundaries": sorted(node["boundaries"]["awaited_boundary"]),
+            "direct_nowait_boundaries": sorted(node["boundaries"]["nowait_boundary"]),
+            "direct_sync_boundaries": sorted(node["boundaries"]["sync_boundary"]),
+            "awaited_boundary_callsites": async_callees,
+            "callees": sorted({callee[1] for callee in graph[key] if callee[0] == source}),
+            "external_callees": sorted(
+                {f"{callee[0]}:{callee[1]}" for callee in graph[key] if callee[0] != source}
+            ),
+        }
+    for source, entries in functions.items():
+        blob = json.dumps(entries, sort_keys=True).encode("utf-8")
+        sources[source]["digest"] = hashlib.sha256(blob).hexdigest()
+
+    return {
+        "async_index_version": ASYNC_INDEX_VERSION,
+        "boundary_rules_path": _norm(boundary_rules_path),
+        "boundary_rules_sha256": hashlib.sha256(Path(boundary_rules_path).read_bytes()).hexdigest(),
+        "source_count": len(sources),
+        "function_count": len(nodes),
+        "requires_async_count": len(async_keys),
+        "cross_file_async_count": cross_file_only,
+        "sources": sources,
+        "functions": functions,
+    }
+
+
+def write_async_index(index, path):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name + ".")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f, sort_keys=True)
+    os.replace(tmp, path)
+
+
+class AsyncIndex:
+    """A persisted build_async_index() result with O(1) per-file lookups."""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        data = json.loads(self.path.read_text(encoding="utf-8"))
+        if data.get("async_index_version") != ASYNC_INDEX_VERSION:
+            raise ValueError(f"{path}: unsupported async index version {data.get('async_index_version')}")
+        self.boundary_rules_sha256 = data.get("boundary_rules_sha256")
+        self.sources = data.get("sources", {})
+        self.functions = data.get("functions", {})
+        self._fresh = {}
+
+    def _check_fresh(self, boundary_rules_path):
+        """None if the index still matches the tree, else why it does not.
+
+        Propagation crosses files, so one edited source can change any
+        file's answers: every indexed source is re-hashed (once).
+        """
+        rules_key = str(boundary_rules_path)
+        if rules_key not in self._fresh:
+            reason = None
+            rules = Path(boundary_rules_path)
+            if not rules.exists() or hashlib.sha256(rules.read_bytes()).hexdigest() != self.boundary_rules_sha256:
+                reason = f"was built with other boundary rules than {boundary_rules_path}"
+            else:
+                changed = []
+                for source, meta in self.sources.items():
+                    p = Path(source)
+                    text = p.read_text(encoding="utf-8", errors="replace") if p.exists() else None
+                    if text is None or hashlib.sha256(text.encode("utf-8")).hexdigest() != meta.get("sha256"):
+                        changed.append(source)
+                if changed:
+                    reason = f"is stale ({len(changed)} sources changed, e.g. {changed[0]})"
+            if reason:
+                print(f"translator: async index {self.path} {reason}; using per-file inference",
+                      file=sys.stderr)
+            self._fresh[rules_key] = reason
+        return self._fresh[rules_key]
+
+    def entries_for(self, src_path, boundary_rules_path=BOUNDARY_RULES_DEFAULT):
+        """name -> async entry for src_path, or None if the index does not cover it.
+
+        Sources outside the index, or any edit to an indexed source or the
+        boundary rules since the build, mean None; callers then fall back
+        to per-file inference.
+        """
+        source = _norm(src_path)
+        if source not in self.sources or self._check_fresh(boundary_rules_path):
+            return None
+        return self.functions.get(source, {})
+
+    def source_digest(self, src_path):
+        meta = self.sources.get(_norm(src_path))
+        return meta.get("digest") if meta else None
+
+
+def configure_async_index(path=None):
+    """Load (or, with no path, drop) the process-wide async index."""
+    global _index
+    _index = AsyncIndex(path) if path else None
+    return _index
+
+
+def get_async_index():
+    return _index
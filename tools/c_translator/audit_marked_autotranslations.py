@@ -15,9 +15,7 @@ import re
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-
-MARKER_RE = re.compile(r"^\s*//\s*Autotranslated from ([A-Za-z0-9_.-]+\.c:\d+)\s*$")
-FN_RE = re.compile(r"^\s*export\s+(?:async\s+)?function\s+([A-Za-z_]\w*)\s*\(")
+from js_symbols import get_js_symbol_index
 
 
 def parse_args() -> argparse.Namespace:
@@ -29,6 +27,11 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--apply-summary", required=True, help="runtime_stitch_apply JSON path")
     p.add_argument("--examples-per-category", type=int, default=2, help="Example count per category")
     p.add_argument("--out", required=True, help="Output JSON path")
+    p.add_argument(
+        "--js-symbols",
+        default=None,
+        help="Persisted JS symbol index (default: $C_TRANSLATOR_CACHE_DIR/js_symbols.json, else not persisted)",
+    )
     return p.parse_args()
 
 
@@ -139,43 +142,34 @@ def normalize_js_for_compare(src: str) -> str:
     return re.sub(r"\s+", " ", " ".join(lines)).strip()
 
 
-def parse_marked_functions(repo_root: Path) -> Tuple[List[Dict], int, List[Dict]]:
+def parse_marked_functions(repo_root: Path, js_symbols: Optional[str] = None) -> Tuple[List[Dict], int, List[Dict]]:
     out: List[Dict] = []
     marker_total = 0
     unpaired: List[Dict] = []
-    for p in sorted((repo_root / "js").glob("*.js")):
-        lines = p.read_text(encoding="utf-8", errors="replace").splitlines()
-        for i, line in enumerate(lines):
-            m = MARKER_RE.match(line)
-            if not m:
-                continue
+    index = get_js_symbol_index(repo_root / "js", js_symbols)
+    for p, entry in index.root_modules():
+        js_module = p.relative_to(repo_root).as_posix()
+        for marker in entry["markers"]:
             marker_total += 1
-            fn_name = None
-            fn_line = None
-            for j in range(i + 1, min(i + 8, len(lines))):
-                fm = FN_RE.match(lines[j])
-                if fm:
-                    fn_name = fm.group(1)
-                    fn_line = j + 1
-                    break
-            if not fn_name:
+            if not marker["function"]:
                 unpaired.append(
                     {
-                        "js_module": p.relative_to(repo_root).as_posix(),
-                        "marker": m.group(1),
-                        "marker_line": i + 1,
+                        "js_module": js_module,
+                        "marker": marker["marker"],
+                        "marker_line": marker["line"],
                     }
                 )
                 continue
             out.append(
                 {
-                    "js_module": p.relative_to(repo_root).as_posix(),
-                    "function": fn_name,
-                    "marker": m.group(1),
-                    "marker_line": i + 1,
-                    "function_line": fn_line,
+                    "js_module": js_module,
+                    "function": marker["function"],
+                    "marker": marker["marker"],
+                    "marker_line": marker["line"],
+                    "function_line": marker["function_line"],
                 }
             )
+    index.save()
     return out, marker_total, unpaired
 
 
@@ -203,7 +197,7 @@ def main() -> None:
     args = parse_args()
     repo_root = Path(args.repo_root)
 
-    marked, marker_total, unpaired_markers = parse_marked_functions(repo_root)
+    marked, marker_total, unpaired_markers = parse_marked_functions(repo_root, args.js_symbols)
     marked_pairs = {(m["js_module"], m["function"]): m for m in marked}
 
     summary = load_json(args.summary)
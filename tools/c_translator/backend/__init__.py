@@ -1,3 +1,3 @@
-from .emitter import emit_capability_summary, emit_helper_scaffold
+from .emitter import capability_input_parts, emit_capability_summary, emit_helper_scaffold
 
-__all__ = ["emit_helper_scaffold", "emit_capability_summary"]
+__all__ = ["emit_helper_scaffold", "emit_capability_summary", "capability_input_parts"]
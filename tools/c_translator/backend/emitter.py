@@ -1,11 +1,10 @@
-import json
 import re
 from pathlib import Path
 
-from async_infer import build_async_summary
-from cfg import build_cfg_summary
-from frontend import all_function_ast_summaries, function_ast_summary
-from nir import build_nir_snapshot
+from artifact_store import compile_profile_digest, ruleset_digest
+from .rewrite_engine import LiteralRewriter, MacroRewriter, load_literal_rules, load_macro_rules
+from profiling import stage
+from source_context import load_source_context
 
 
 FUNC_SIG_LINE_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*\(([^)]*)\)\s*$")
@@ -32,6 +31,13 @@ DECL_FALLBACK_RE = re.compile(
 )
 PANIC_RE = re.compile(r'^panic\("([^"]+)"\)$')
 C_BLOCK_COMMENT_RE = re.compile(r"/\*.*?\*/")
+# Rulesets read while lowering function bodies (see _load_rewrite_rules
+# and _load_macro_rewrites); part of every cached emit key.
+EMIT_RULESET_PATHS = (
+    "tools/c_translator/rulesets/function_map.json",
+    "tools/c_translator/rulesets/state_paths.json",
+    "tools/c_translator/rulesets/macro_rewrites.json",
+)
 
 
 def _extract_param_names(signature_line):
@@ -79,18 +85,22 @@ def _normalize_runtime_param_order(params):
 def emit_helper_scaffold(src_path, func_name, compile_profile=None):
     if not func_name:
         raise ValueError("--func is required for emit-helper mode")
+    with stage("emit_helper", source=str(Path(src_path)).replace("\\", "/"), function=func_name):
+        return _emit_helper_scaffold(src_path, func_name, compile_profile)
+
 
+def _emit_helper_scaffold(src_path, func_name, compile_profile):
     path = Path(src_path)
-    text = path.read_text(encoding="utf-8", errors="replace")
-    lines = text.splitlines()
+    ctx = load_source_context(src_path, compile_profile)
+    lines = ctx.lines
 
-    nir = build_nir_snapshot(src_path, func_name)
+    nir = ctx.nir_snapshot(func_name)
     if nir["function_count"] != 1:
         raise ValueError(
             f"emit-helper requires exactly one function match, found {nir['function_count']} for {func_name}"
         )
     fn = nir["functions"][0]
-    cfg = build_cfg_summary(src_path, func_name)["functions"][0]["cfg"]
+    cfg = ctx.cfg_summary(func_name)["functions"][0]["cfg"]
     sig_line = lines[fn["span"]["signature_line"] - 1]
     params = _extract_param_names(sig_line)
     ast_summary = None
@@ -98,18 +108,25 @@ def emit_helper_scaffold(src_path, func_name, compile_profile=None):
     lower_diags = []
     required_params = set()
     rewrite_rules = _load_rewrite_rules()
-    async_info = _load_async_info(src_path, fn["name"])
+    async_info = _load_async_info(ctx, fn["name"])
     requires_async = async_info["requires_async"]
     awaitable_calls = async_info["awaitable_calls"]
+    cache_key = None
+    if ctx.store is not None:
+        cache_key = ctx.store.key("emit-helper", **_emit_key_parts(ctx, fn, async_info, compile_profile))
+        cached = ctx.store.get("emit-helper", cache_key)
+        if cached is not None:
+            return cached
     if compile_profile is not None:
-        ast_summary = function_ast_summary(src_path, compile_profile, fn["name"])
+        ast_summary = ctx.function_ast(fn["name"])
     if ast_summary and ast_summary.get("available"):
-        translated_lines, lower_diags, required_params = _translate_ast_compound(
-            ast_summary["compound"],
-            1,
-            rewrite_rules,
-            awaitable_calls,
-        )
+        with stage("lower", function=fn["name"]):
+            translated_lines, lower_diags, required_params = _translate_ast_compound(
+                ast_summary["compound"],
+                1,
+                rewrite_rules,
+                awaitable_calls,
+            )
         if translated_lines is not None:
             params = ast_summary.get("params") or params
             params = [_sanitize_ident(p) for p in params]
@@ -171,7 +188,7 @@ def emit_helper_scaffold(src_path, func_name, compile_profile=None):
             }
         )
 
-    return {
+    payload = {
         "emit_mode": "emit-helper",
         "source": str(path).replace("\\", "/"),
         "function": fn["name"],
@@ -191,30 +208,83 @@ def emit_helper_scaffold(src_path, func_name, compile_profile=None):
         },
         "diag": diags,
     }
+    # A missing libclang is an environment problem, not a result to keep.
+    if cache_key is not None and not (ast_summary and not ast_summary.get("available")):
+        ctx.store.put("emit-helper", cache_key, payload)
+    return payload
+
+
+def _emit_key_parts(ctx, fn, async_info, compile_profile):
+    """Artifact-store key parts for one function's emit-helper payload.
+
+    Covers the function's own text and span, everything outside function
+    bodies, its async facts, the compile profile (with headers) and the
+    lowering rulesets -- but not other functions' bodies, so editing one
+    function leaves the others' entries valid.
+    """
+    span = fn["span"]
+    signature = "\n".join(ctx.lines[span["signature_line"] - 1 : span["body_start_line"] - 1])
+    return {
+        "source": str(Path(ctx.src_path)).replace("\\", "/"),
+        "function": fn["name"],
+        "span": span,
+        "body_sha256": fn["body_sha256"],
+        "signature": signature,
+        "outside_bodies_sha256": ctx.outside_bodies_digest(),
+        "requires_async": async_info["requires_async"],
+        "awaitable_calls": sorted(async_info["awaitable_calls"]),
+        "profile": compile_profile_digest(compile_profile),
+        "rulesets": ruleset_digest(*EMIT_RULESET_PATHS, ctx.boundary_rules_path),
+    }
+
+
+def _capability_parts(ctx, compile_profile):
+    return {
+        **ctx.source_key_parts(),
+        **ctx.async_key_parts(),
+        "profile": compile_profile_digest(compile_profile),
+        "rulesets": ruleset_digest(*EMIT_RULESET_PATHS, ctx.boundary_rules_path),
+    }
+
+
+def capability_input_parts(src_path, compile_profile=None):
+    """Everything emit_capability_summary() output depends on, besides tool code.
+
+    Source path and hash, async-index digest (when the index covers the
+    file), compile profile + headers digest and ruleset digests.
+    """
+    return _capability_parts(load_source_context(src_path, compile_profile), compile_profile)
 
 
 def emit_capability_summary(src_path, compile_profile=None):
-    nir = build_nir_snapshot(src_path)
+    ctx = load_source_context(src_path, compile_profile)
+
+    def build():
+        with stage("capability", source=str(Path(src_path)).replace("\\", "/")):
+            return _build_capability_summary(ctx, src_path, compile_profile)
+
+    return ctx.cached(
+        "capability",
+        _capability_parts(ctx, compile_profile),
+        build,
+        keep=lambda summary: compile_profile is None or ctx.ast_summaries().get("available"),
+    )
+
+
+def _build_capability_summary(ctx, src_path, compile_profile):
+    nir = ctx.nir_snapshot()
     functions = []
     translated_count = 0
     blocked_count = 0
     diag_hist = {}
     rewrite_rules = _load_rewrite_rules()
 
-    async_summary = build_async_summary(src_path)
-    async_map = {}
-    for fn in async_summary.get("functions", []):
-        direct = set(fn.get("direct_awaited_boundaries", []))
-        async_callees = set(fn.get("awaited_boundary_callsites", []))
-        async_map[fn.get("name")] = {
-            "requires_async": bool(fn.get("requires_async")),
-            "awaitable_calls": direct | async_callees,
-        }
+    async_map = {name: _async_facts(fn) for name, fn in ctx.async_functions().items()}
 
     ast_index = {}
     ast_status = {"available": False, "reason": "compile profile unavailable"}
     if compile_profile is not None:
-        ast_status = all_function_ast_summaries(src_path, compile_profile)
+        ast_status = ctx.ast_summaries()
     if ast_status.get("available"):
         for fn in ast_status.get("functions", []):
             key = (fn.get("name"), fn.get("signature_line"))
@@ -229,12 +299,13 @@ def emit_capability_summary(src_path, compile_profile=None):
         translated = False
 
         if ast_fn:
-            translated_lines, lower_diags, _required_params = _translate_ast_compound(
-                ast_fn.get("compound"),
-                1,
-                rewrite_rules,
-                info["awaitable_calls"],
-            )
+            with stage("lower", function=name):
+                translated_lines, lower_diags, _required_params = _translate_ast_compound(
+                    ast_fn.get("compound"),
+                    1,
+                    rewrite_rules,
+                    info["awaitable_calls"],
+                )
             diags.extend(lower_diags)
             translated = translated_lines is not None
             if not translated:
@@ -1423,28 +1494,25 @@ def _extract_decl_name(lhs):
     return _sanitize_ident(names[-1])
 
 
-def _load_async_info(src_path, func_name):
-    try:
-        summary = build_async_summary(src_path)
-    except Exception:
-        return {"requires_async": False, "awaitable_calls": set()}
-
-    fn = None
-    for candidate in summary.get("functions", []):
-        if candidate.get("name") == func_name:
-            fn = candidate
-            break
-    if fn is None:
-        return {"requires_async": False, "awaitable_calls": set()}
+def _async_facts(fn):
     direct = set(fn.get("direct_awaited_boundaries", []))
     async_callees = set(fn.get("awaited_boundary_callsites", []))
-    awaitable = direct | async_callees
     return {
         "requires_async": bool(fn.get("requires_async")),
-        "awaitable_calls": awaitable,
+        "awaitable_calls": direct | async_callees,
     }
 
 
+def _load_async_info(ctx, func_name):
+    try:
+        fn = ctx.async_functions().get(func_name)
+    except Exception:
+        fn = None
+    if fn is None:
+        return {"requires_async": False, "awaitable_calls": set()}
+    return _async_facts(fn)
+
+
 def _extract_call_name(expr):
     m = re.match(r"^\s*([A-Za-z_]\w*)\s*\(", expr or "")
     if not m:
@@ -1452,100 +1520,33 @@ def _extract_call_name(expr):
     return m.group(1)
 
 
-def _load_rewrite_rules():
-    rules = []
-    base = Path("tools/c_translator/rulesets")
-    for fname in ("function_map.json", "state_paths.json"):
-        p = base / fname
-        if not p.exists():
-            continue
-        data = json.loads(p.read_text(encoding="utf-8"))
-        for rule in data.get("rewrites", []):
-            cexpr = rule.get("c")
-            jexpr = rule.get("js")
-            if isinstance(cexpr, str) and isinstance(jexpr, str):
-                rules.append(
-                    {
-                        "c": cexpr,
-                        "js": jexpr,
-                        "requires_params": set(rule.get("requires_params", [])),
-                    }
-                )
-    rules.sort(key=lambda r: len(r["c"]), reverse=True)
-    return rules
+_rewrite_engine_cache = None
+_compiled_macro_rewrites_cache = None
 
 
-def _apply_rewrite_rules(expr, rules):
-    out = expr
-    required = set()
-    for rule in rules:
-        if rule["c"] in out:
-            out = out.replace(rule["c"], rule["js"])
-            required.update(rule["requires_params"])
-    # Remove any cascaded game.game. artifacts that arise when one rewrite
-    # (e.g. "svc.context." -> "game.svc.context.") produces output that
-    # contains the search string of a later rule (e.g. "svc." -> "game.svc.").
-    prev = None
-    while prev != out:
-        prev = out
-        out = out.replace("game.game.", "game.")
-    return out, required
+def _load_rewrite_rules():
+    """Compiled literal rewriter for function_map/state_paths (built once)."""
+    global _rewrite_engine_cache
+    if _rewrite_engine_cache is None:
+        _rewrite_engine_cache = LiteralRewriter(load_literal_rules(EMIT_RULESET_PATHS[:2]))
+    return _rewrite_engine_cache
 
 
-_compiled_macro_rewrites_cache = None
+def _apply_rewrite_rules(expr, rules):
+    with stage("rewrite_literals", trace=False):
+        return rules.rewrite(expr)
 
 
 def _load_macro_rewrites():
     global _compiled_macro_rewrites_cache
-    if _compiled_macro_rewrites_cache is not None:
-        return _compiled_macro_rewrites_cache
-    p = Path("tools/c_translator/rulesets/macro_rewrites.json")
-    if not p.exists():
-        _compiled_macro_rewrites_cache = []
-        return _compiled_macro_rewrites_cache
-    data = json.loads(p.read_text(encoding="utf-8"))
-    compiled = []
-    for rule in data.get("rewrites", []):
-        c_pat = rule.get("c", "")
-        js_tpl = rule.get("js", "")
-        req = set(rule.get("requires_params", []))
-        # Count placeholders to determine arity
-        placeholders = re.findall(r"\$(\d+)", c_pat)
-        arity = max((int(n) for n in placeholders), default=0)
-        # Build regex from C pattern
-        if arity == 0:
-            # Simple word boundary match
-            regex = re.compile(r"\b" + re.escape(c_pat) + r"\b")
-        else:
-            # Extract name and build arg-capturing regex
-            m = re.match(r"(\w+)\s*\(", c_pat)
-            if not m:
-                continue
-            name = m.group(1)
-            arg_re = r"\s*([^(),]+?)\s*"
-            args = arg_re + (r"," + arg_re) * (arity - 1)
-            regex = re.compile(r"\b" + re.escape(name) + r"\s*\(" + args + r"\)")
-        compiled.append((regex, js_tpl, req))
-    _compiled_macro_rewrites_cache = compiled
-    return compiled
+    if _compiled_macro_rewrites_cache is None:
+        _compiled_macro_rewrites_cache = MacroRewriter(load_macro_rules(EMIT_RULESET_PATHS[2]))
+    return _compiled_macro_rewrites_cache
 
 
 def _apply_macro_rewrites(expr, compiled_macros):
-    out = expr
-    required = set()
-    for _iteration in range(10):
-        prev = out
-        for regex, js_tpl, req in compiled_macros:
-            def _replace(m, _tpl=js_tpl, _req=req):
-                required.update(_req)
-                result = _tpl
-                for i in range(len(m.groups())):
-                    result = result.replace(f"${i + 1}", m.group(i + 1).strip())
-                return result
-            out = regex.sub(_replace, out)
-        if out == prev:
-            break
-    return out, required
+    with stage("rewrite_macros", trace=False):
+        return compiled_macros.rewrite(expr)
 
 
 def _find_unresolved_tokens(lines):
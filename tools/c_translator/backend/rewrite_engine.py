@@ -0,0 +1,191 @@
+"""Compiled rewrite engines for the emitter's ruleset-driven lowering.
+
+LiteralRewriter replaces the literal C snippets of function_map.json and
+state_paths.json.  The patterns go into a trie (the goto function of an
+Aho-Corasick automaton) which is compiled to a single regex, so a whole
+expression is scanned once inside the C regex engine:
+
+- matches are leftmost-longest ("u.uz" wins over "u." at the same start);
+- scanning resumes after each replacement, so a rule's output is never
+  matched again (no "svc." -> "game.svc." -> "game.game.svc." cascades);
+- a "game.game." that two adjacent matches still produce (the C member
+  chain "gm.gm." in display.c) collapses to "game." as it always has.
+
+MacroRewriter finds all macro_rewrites.json names with one trie scan and
+re-scans only while something still changes, so nested macros
+(ACURR(ABASE(x))) expand inner-first as before.
+"""
+
+import json
+import re
+from pathlib import Path
+
+
+MAX_MACRO_PASSES = 10
+
+
+def _trie_regex(node):
+    """Regex source matching the strings of a trie, longest first.
+
+    node maps a character to its child; the key "" marks the end of a
+    pattern.  Children have distinct first characters, so the greedy
+    optional group at each end-marked node yields the longest match.
+    """
+    branches = [re.escape(ch) + _trie_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+    return body
+
+
+class LiteralRewriter:
+    """Single-pass, leftmost-longest literal rewriter."""
+
+    def __init__(self, rules):
+        # The first rule for a given C snippet wins, as it did when rules
+        # were applied one by one in file order.
+        self.rules = {}
+        for rule in rules:
+            self.rules.setdefault(rule["c"], (rule["js"], frozenset(rule["requires_params"])))
+        trie = {}
+        for pattern in self.rules:
+            node = trie
+            for ch in pattern:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self.regex = re.compile(_trie_regex(trie)) if self.rules else None
+
+    def __len__(self):
+        return len(self.rules)
+
+    def rewrite(self, text):
+        """Return (rewritten text, set of required runtime params)."""
+        required = set()
+        if self.regex is None:
+            return text, required
+
+        def replace(match):
+            js, req = self.rules[match.group(0)]
+            required.update(req)
+            return js
+
+        out = self.regex.sub(replace, text)
+        while "game.game." in out:
+            out = out.replace("game.game.", "game.")
+        return out, required
+
+
+class MacroRewriter:
+    """All macro patterns behind one combined name matcher.
+
+    A trie regex over the macro names finds every candidate in one scan;
+    only at those positions is the owning rule's own (anchored) pattern
+    tried.  Expressions without a macro name cost a single search.
+    """
+
+    def __init__(self, rules):
+        self.by_name = {}  # name -> [(regex, template parts, arity, requires)]
+        for rule in rules:
+            c_pat = rule.get("c", "")
+            placeholders = re.findall(r"\$(\d+)", c_pat)
+            arity = max((int(n) for n in placeholders), default=0)
+            if arity == 0:
+                name = c_pat
+                regex = re.compile(re.escape(c_pat) + r"\b")
+            else:
+                m = re.match(r"(\w+)\s*\(", c_pat)
+                if not m:
+                    continue
+                name = m.group(1)
+                arg_re = r"\s*([^(),]+?)\s*"
+                args = arg_re + (r"," + arg_re) * (arity - 1)
+                regex = re.compile(re.escape(name) + r"\s*\(" + args + r"\)")
+            parts = re.split(r"\$(\d+)", rule.get("js", ""))
+            self.by_name.setdefault(name, []).append(
+                (regex, parts, arity, frozenset(rule.get("requires_params", [])))
+            )
+        trie = {}
+        for name in self.by_name:
+            node = trie
+            for ch in name:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        # No leading \b: it would defeat the regex engine's first-character
+        # prefilter; the left word boundary is checked in _rewrite_pass.
+        self.names = re.compile("(?:" + _trie_regex(trie) + r")\b") if self.by_name else None
+
+    def __len__(self):
+        return sum(len(rules) for rules in self.by_name.values())
+
+    @staticmethod
+    def _expand(match, parts, arity):
+        out = [parts[0]]
+        for i in range(1, len(parts), 2):
+            n = int(parts[i])
+            out.append(match.group(n).strip() if 0 < n <= arity else "$" + parts[i])
+            out.append(parts[i + 1])
+        return "".join(out)
+
+    def _rewrite_pass(self, text, required):
+        out = []
+        last = 0
+        for hit in self.names.finditer(text):
+            pos = hit.start()
+            if pos < last or (pos and (text[pos - 1].isalnum() or text[pos - 1] == "_")):
+                continue
+            for regex, parts, arity, req in self.by_name[hit.group(0)]:
+                m = regex.match(text, pos)
+                if m:
+                    out.append(text[last:pos])
+                    out.append(self._expand(m, parts, arity))
+                    required.update(req)
+                    last = m.end()
+                    break
+        if not out:
+            return text
+        out.append(text[last:])
+        return "".join(out)
+
+    def rewrite(self, text):
+        """Return (rewritten text, set of required runtime params)."""
+        required = set()
+        if self.names is None:
+            return text, required
+        out = text
+        for _ in range(MAX_MACRO_PASSES):
+            prev = out
+            out = self._rewrite_pass(out, required)
+            if out == prev:
+                break
+        return out, required
+
+
+def load_literal_rules(paths):
+    """Read {"c", "js", "requires_params"} rules from the given JSON files."""
+    rules = []
+    for p in paths:
+        p = Path(p)
+        if not p.exists():
+            continue
+        data = json.loads(p.read_text(encoding="utf-8"))
+        for rule in data.get("rewrites", []):
+            cexpr = rule.get("c")
+            jexpr = rule.get("js")
+            if isinstance(cexpr, str) and isinstance(jexpr, str) and cexpr:
+                rules.append(
+                    {
+                        "c": cexpr,
+                        "js": jexpr,
+                        "requires_params": set(rule.get("requires_params", [])),
+                    }
+                )
+    return rules
+
+
+def load_macro_rules(path):
+    p = Path(path)
+    if not p.exists():
+        return []
+    return json.loads(p.read_text(encoding="utf-8")).get("rewrites", [])
@@ -2,16 +2,32 @@
 """Batch emit-helper runner for large-scale translation sweeps.
 
 Outputs per-function emit-helper JSON payloads plus a summary JSON.
+
+With --jobs N, source files are sharded across N worker processes (each
+with its own libclang index).  Workers return their results and the
+parent writes outputs and merges the summary in --src order, so the
+summary is identical to a serial run.  A file that fails, or crashes its
+worker, is recorded in "errors" and the batch carries on.
+
+--profile TRACE writes per-stage/per-function timings (workers included)
+as a Chrome trace and prints the slowest stages and functions;
+--cprofile PATH adds a cProfile of the parent process.
 """
 
 import argparse
 import fnmatch
 import json
+import os
 from pathlib import Path
 
+from artifact_store import configure_artifact_store, format_stats, get_artifact_store, merge_stats
+from async_infer import configure_async_index
 from backend import emit_capability_summary, emit_helper_scaffold
+from frontend.clang_frontend import reset_clang_index
 from frontend.compile_profile import load_compile_profile
-from nir import build_nir_snapshot
+from profiling import configure_profiler, cprofile_to, finish_profile, get_profiler, stage
+from source_context import clear_source_contexts, load_source_context
+from worker_pool import ordered_map
 
 
 def parse_args():
@@ -30,6 +46,12 @@ def parse_args():
         help="Emit functions even when capability-summary marks them blocked",
     )
     p.add_argument("--limit", type=int, default=0, help="Optional max function emits (0 = no limit)")
+    p.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes, one source file per task (0 = one per CPU; default 1 = serial)",
+    )
     p.add_argument(
         "--exclude-sources-file",
         default="tools/c_translator/rulesets/translation_scope_excluded_sources.json",
@@ -40,6 +62,24 @@ def parse_args():
         action="store_true",
         help="Disable source exclusions (useful for fixture-focused translator tests)",
     )
+    p.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Artifact store directory; unchanged functions are not re-emitted "
+        "(default: $C_TRANSLATOR_CACHE_DIR, else off)",
+    )
+    p.add_argument(
+        "--async-index",
+        default=None,
+        help="Whole-program async index from async_index.py (default: per-file async inference)",
+    )
+    p.add_argument(
+        "--profile",
+        default=None,
+        metavar="TRACE_JSON",
+        help="Time stages and functions; write a Chrome trace-event JSON here and print a summary",
+    )
+    p.add_argument("--cprofile", default=None, help="Also write cProfile stats of the parent process here")
     return p.parse_args()
 
 
@@ -85,113 +125,221 @@ def _source_excluded(src, exact, globs):
     return any(fnmatch.fnmatch(norm, patt) or fnmatch.fnmatch(base, patt) for patt in globs)
 
 
+def _diag_codes(payload):
+    return [d.get("code") for d in (payload.get("diag") or []) if d.get("code")]
+
+
+def emit_source(src, profile, include_blocked, limit):
+    """Emit every candidate function of one source file.
+
+    Returns {"cap": capability counts, "entries": [(function record,
+    payload JSON text or None, error or None), ...]} in candidate order, or
+    {"error": message} when the file itself cannot be analyzed.  Nothing is
+    written here; merge_source() decides what lands on disk.  `limit`
+    (None = unlimited) stops early once this file has that many emits.
+    """
+    with stage("source", source=str(Path(src)).replace("\\", "/")):
+        result = _emit_source(src, profile, include_blocked, limit)
+    result["cache_stats"] = _drain_cache_stats()
+    profiler = get_profiler()
+    if profiler is not None:
+        result["profile"] = profiler.drain()
+    return result
+
+
+def _emit_source(src, profile, include_blocked, limit):
+    try:
+        cap = emit_capability_summary(src, profile)
+    except Exception as exc:  # noqa: BLE001
+        return {"error": f"{type(exc).__name__}: {exc}"}
+
+    entries = []
+    emitted = 0
+    seen_names = set()
+    for fn in cap.get("functions", []):
+        if limit is not None and emitted >= limit:
+            break
+        func = fn.get("name")
+        if not func:
+            continue
+        if func in seen_names:
+            entries.append(({"name": func, "ok": False, "skipped_duplicate": True}, None, None))
+            continue
+        seen_names.add(func)
+        try:
+            n = load_source_context(src, profile).nir_snapshot(func).get("function_count", 0)
+        except Exception:
+            n = 0
+        if n != 1:
+            entries.append(
+                ({"name": func, "ok": False, "skipped_ambiguous": True, "match_count": n}, None, None)
+            )
+            continue
+        try:
+            payload = emit_helper_scaffold(src, func, profile)
+        except Exception as exc:  # noqa: BLE001
+            err = {"source": src, "function": func, "error": str(exc)}
+            entries.append(({"name": func, "ok": False, "error": str(exc)}, None, err))
+            continue
+
+        # Capability summary can under-report translatable functions for
+        # some signatures; gate on actual emit payload for accuracy.
+        if not include_blocked and not bool(payload.get("meta", {}).get("translated")):
+            entries.append(
+                (
+                    {"name": func, "ok": False, "skipped_blocked": True, "diag_codes": _diag_codes(payload)},
+                    None,
+                    None,
+                )
+            )
+            continue
+
+        record = {
+            "name": func,
+            "ok": True,
+            "translated": bool(payload.get("meta", {}).get("translated")),
+            "diag_codes": _diag_codes(payload),
+        }
+        with stage("json_encode", function=func):
+            text = json.dumps(payload, indent=2, sort_keys=True)
+        entries.append((record, text, None))
+        emitted += 1
+
+    return {
+        "cap": {
+            "function_count": cap.get("function_count", 0),
+            "translated_count": cap.get("translated_count", 0),
+            "blocked_count": cap.get("blocked_count", 0),
+        },
+        "entries": entries,
+    }
+
+
+def _drain_cache_stats():
+    store = get_artifact_store()
+    return store.drain_stats() if store is not None else {}
+
+
+def merge_source(src, result, out_dir, limit, emitted, errors):
+    """Write one file's outputs and build its summary record.
+
+    Applies the global --limit exactly as the serial loop always has.
+    Returns (file record, updated emitted count).
+    """
+    cap = result.get("cap", {})
+    file_rec = {
+        "source": src,
+        "function_count": cap.get("function_count", 0),
+        "translated_count": cap.get("translated_count", 0),
+        "blocked_count": cap.get("blocked_count", 0),
+        "emitted": 0,
+        "functions": [],
+    }
+    if "error" in result:
+        file_rec["error"] = result["error"]
+        errors.append({"source": src, "error": result["error"]})
+        return file_rec, emitted
+
+    with stage("json_write", source=str(Path(src)).replace("\\", "/")):
+        return _write_entries(src, result, out_dir, limit, emitted, errors, file_rec)
+
+
+def _write_entries(src, result, out_dir, limit, emitted, errors, file_rec):
+    basename = sanitize_name(Path(src).stem)
+    for record, text, err in result["entries"]:
+        if limit > 0 and emitted >= limit:
+            break
+        if err is not None:
+            errors.append(err)
+        if text is not None:
+            out_file = out_dir / f"{basename}__{sanitize_name(record['name'])}.json"
+            out_file.write_text(text, encoding="utf-8")
+            record = {**record, "out_file": str(out_file).replace("\\", "/")}
+            emitted += 1
+            file_rec["emitted"] += 1
+        file_rec["functions"].append(record)
+    return file_rec, emitted
+
+
+def _init_worker(cache_dir, async_index, profiling):
+    # Drop any libclang index inherited from the parent; each worker
+    # creates and reuses its own.
+    reset_clang_index()
+    clear_source_contexts()
+    configure_artifact_store(cache_dir)
+    configure_async_index(async_index)
+    configure_profiler(profiling)
+
+
+def _emit_parallel(sources, profile, include_blocked, limit, jobs, cache_dir, async_index, profiling=False):
+    """Yield emit_source() results in source order, using a process pool.
+
+    Results stream: each file is yielded once it and all earlier files are
+    done.  A file that crashes its worker is reported as an error; the rest
+    of the batch keeps its parallelism (see worker_pool.ordered_map).
+    """
+    return ordered_map(
+        emit_source,
+        [(src, profile, include_blocked, limit) for src in sources],
+        jobs,
+        lambda task: {"error": "worker process crashed"},
+        initializer=_init_worker,
+        initargs=(cache_dir, async_index, profiling),
+    )
+
+
 def main():
     args = parse_args()
+    profiler = configure_profiler(bool(args.profile))
+    with cprofile_to(args.cprofile):
+        _run(args)
+    if profiler is not None:
+        finish_profile(args.profile)
+
+
+def _run(args):
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
     summary_path = Path(args.summary_out)
     summary_path.parent.mkdir(parents=True, exist_ok=True)
 
     profile = load_compile_profile(args.compile_profile)
+    store = configure_artifact_store(args.cache_dir)
+    configure_async_index(args.async_index)
     excluded_exact, excluded_globs = (set(), [])
     if not args.no_exclude_sources:
         excluded_exact, excluded_globs = _load_source_exclusions(args.exclude_sources_file)
 
+    sources = [src for src in args.src if not _source_excluded(src, excluded_exact, excluded_globs)]
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    parallel = None
+    if jobs > 1 and len(sources) > 1:
+        parallel = _emit_parallel(
+            sources,
+            profile,
+            args.include_blocked,
+            args.limit or None,
+            min(jobs, len(sources)),
+            None if store is None else str(store.root),
+            args.async_index,
+            get_profiler() is not None,
+        )
+
     emitted = 0
     files = []
     errors = []
-
-    for src in args.src:
-        if _source_excluded(src, excluded_exact, excluded_globs):
-            continue
-        cap = emit_capability_summary(src, profile)
-        file_rec = {
-            "source": src,
-            "function_count": cap.get("function_count", 0),
-            "translated_count": cap.get("translated_count", 0),
-            "blocked_count": cap.get("blocked_count", 0),
-            "emitted": 0,
-            "functions": [],
-        }
+    cache_stats = {}
+    for src in sources:
+        if parallel is not None:
+            result = next(parallel)
+        else:
+            remaining = max(args.limit - emitted, 0) if args.limit > 0 else None
+            result = emit_source(src, profile, args.include_blocked, remaining)
+        file_rec, emitted = merge_source(src, result, out_dir, args.limit, emitted, errors)
         files.append(file_rec)
-
-        candidates = cap.get("functions", [])
-        seen_names = set()
-        for fn in candidates:
-            if args.limit > 0 and emitted >= args.limit:
-                break
-            func = fn.get("name")
-            if not func:
-                continue
-            if func in seen_names:
-                file_rec["functions"].append(
-                    {
-                        "name": func,
-                        "ok": False,
-                        "skipped_duplicate": True,
-                    }
-                )
-                continue
-            seen_names.add(func)
-            try:
-                n = build_nir_snapshot(src, func).get("function_count", 0)
-            except Exception:
-                n = 0
-            if n != 1:
-                file_rec["functions"].append(
-                    {
-                        "name": func,
-                        "ok": False,
-                        "skipped_ambiguous": True,
-                        "match_count": n,
-                    }
-                )
-                continue
-            try:
-                payload = emit_helper_scaffold(src, func, profile)
-            except Exception as exc:  # noqa: BLE001
-                err = {
-                    "source": src,
-                    "function": func,
-                    "error": str(exc),
-                }
-                errors.append(err)
-                file_rec["functions"].append(
-                    {
-                        "name": func,
-                        "ok": False,
-                        "error": str(exc),
-                    }
-                )
-                continue
-
-            # Capability summary can under-report translatable functions for
-            # some signatures; gate on actual emit payload for accuracy.
-            if not args.include_blocked and not bool(payload.get("meta", {}).get("translated")):
-                file_rec["functions"].append(
-                    {
-                        "name": func,
-                        "ok": False,
-                        "skipped_blocked": True,
-                        "diag_codes": [d.get("code") for d in (payload.get("diag") or []) if d.get("code")],
-                    }
-                )
-                continue
-
-            basename = sanitize_name(Path(src).stem)
-            out_file = out_dir / f"{basename}__{sanitize_name(func)}.json"
-            out_file.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
-            emitted += 1
-            file_rec["emitted"] += 1
-            file_rec["functions"].append(
-                {
-                    "name": func,
-                    "ok": True,
-                    "translated": bool(payload.get("meta", {}).get("translated")),
-                    "diag_codes": [d.get("code") for d in (payload.get("diag") or []) if d.get("code")],
-                    "out_file": str(out_file).replace("\\", "/"),
-                }
-            )
+        merge_stats(cache_stats, result.get("cache_stats", {}))
+        if "profile" in result:
+            get_profiler().merge(result["profile"])
 
     summary = {
         "sources": args.src,
@@ -207,9 +355,12 @@ def main():
         "files": files,
         "errors": errors,
     }
-    summary_path.write_text(json.dumps(summary, indent=2, sort_keys=True), encoding="utf-8")
+    with stage("json_write", source=str(summary_path)):
+        summary_path.write_text(json.dumps(summary, indent=2, sort_keys=True), encoding="utf-8")
     print(f"translator: batch-emitted {emitted} functions -> {out_dir}")
     print(f"translator: summary -> {summary_path}")
+    if store is not None:
+        print(f"translator: {format_stats(cache_stats)}")
     if errors:
         print(f"translator: encountered {len(errors)} errors")
 
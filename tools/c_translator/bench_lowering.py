@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Benchmark per-expression lowering cost of the emitter rewrite stages.
+
+Harvests C expressions/statements from function bodies in --src files and
+times, per expression:
+- the literal rewrite stage (function_map/state_paths),
+- the macro rewrite stage (macro_rewrites),
+- the whole _lower_expr(),
+each with the compiled engines (backend/rewrite_engine.py) and with the
+legacy rule-by-rule implementations kept below as the baseline.  It also
+counts expressions whose output differs between the two.
+
+Run from the repo root (rulesets are resolved relative to it):
+    python3 tools/c_translator/bench_lowering.py --src 'nethack-c/src/*.c'
+"""
+
+import argparse
+import glob
+import json
+import re
+import time
+from pathlib import Path
+
+from backend import emitter
+from nir.builder import build_nir_snapshot
+
+
+def legacy_load_rewrite_rules():
+    rules = []
+    for p in emitter.EMIT_RULESET_PATHS[:2]:
+        p = Path(p)
+        if not p.exists():
+            continue
+        data = json.loads(p.read_text(encoding="utf-8"))
+        for rule in data.get("rewrites", []):
+            cexpr = rule.get("c")
+            jexpr = rule.get("js")
+            if isinstance(cexpr, str) and isinstance(jexpr, str):
+                rules.append(
+                    {
+                        "c": cexpr,
+                        "js": jexpr,
+                        "requires_params": set(rule.get("requires_params", [])),
+                    }
+                )
+    rules.sort(key=lambda r: len(r["c"]), reverse=True)
+    return rules
+
+
+def legacy_apply_rewrite_rules(expr, rules):
+    out = expr
+    required = set()
+    for rule in rules:
+        if rule["c"] in out:
+            out = out.replace(rule["c"], rule["js"])
+            required.update(rule["requires_params"])
+    prev = None
+    while prev != out:
+        prev = out
+        out = out.replace("game.game.", "game.")
+    return out, required
+
+
+def legacy_load_macro_rewrites():
+    p = Path(emitter.EMIT_RULESET_PATHS[2])
+    if not p.exists():
+        return []
+    compiled = []
+    for rule in json.loads(p.read_text(encoding="utf-8")).get("rewrites", []):
+        c_pat = rule.get("c", "")
+        placeholders = re.findall(r"\$(\d+)", c_pat)
+        arity = max((int(n) for n in placeholders), default=0)
+        if arity == 0:
+            regex = re.compile(r"\b" + re.escape(c_pat) + r"\b")
+        else:
+            m = re.match(r"(\w+)\s*\(", c_pat)
+            if not m:
+                continue
+            arg_re = r"\s*([^(),]+?)\s*"
+            args = arg_re + (r"," + arg_re) * (arity - 1)
+            regex = re.compile(r"\b" + re.escape(m.group(1)) + r"\s*\(" + args + r"\)")
+        compiled.append((regex, rule.get("js", ""), set(rule.get("requires_params", []))))
+    return compiled
+
+
+def legacy_apply_macro_rewrites(expr, compiled_macros):
+    out = expr
+    required = set()
+    for _iteration in range(10):
+        prev = out
+        for regex, js_tpl, req in compiled_macros:
+            def _replace(m, _tpl=js_tpl, _req=req):
+                required.update(_req)
+                result = _tpl
+                for i in range(len(m.groups())):
+                    result = result.replace(f"${i + 1}", m.group(i + 1).strip())
+                return result
+            out = regex.sub(_replace, out)
+        if out == prev:
+            break
+    return out, required
+
+
+def harvest_expressions(paths, limit):
+    """Statement-sized C snippets from function bodies, whitespace-normalized."""
+    exprs = []
+    for path in paths:
+        text = Path(path).read_text(encoding="utf-8", errors="replace")
+        lines = text.splitlines()
+        for fn in build_nir_snapshot(path, text=text)["functions"]:
+            body = "\n".join(
+                ln for ln in lines[fn["span"]["body_start_line"] - 1 : fn["span"]["body_end_line"]]
+                if not ln.lstrip().startswith("#")
+            )
+            body = emitter.C_BLOCK_COMMENT_RE.sub(" ", body.replace("\n", " "))
+            for piece in re.split(r"[;{}]", body):
+                piece = emitter._normalize_space(piece)
+                if piece:
+                    exprs.append(piece)
+                    if limit and len(exprs) >= limit:
+                        return exprs
+    return exprs
+
+
+def _time_per_expr(fn, exprs, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for e in exprs:
+            fn(e)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / max(1, len(exprs)) * 1e6
+
+
+def _time_call(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6
+
+
+def run_benchmark(exprs, repeat, timing=True):
+    """Per-stage timings and legacy/engine output mismatches.
+
+    timing=False only compares outputs (the parity check in the unit tests).
+    """
+    old_rules = legacy_load_rewrite_rules()
+    old_macros = legacy_load_macro_rewrites()
+    new_rules = emitter._load_rewrite_rules()
+    new_macros = emitter._load_macro_rewrites()
+
+    def legacy_lower(e):
+        saved = emitter._apply_rewrite_rules, emitter._apply_macro_rewrites, emitter._load_macro_rewrites
+        emitter._apply_rewrite_rules = legacy_apply_rewrite_rules
+        emitter._apply_macro_rewrites = legacy_apply_macro_rewrites
+        emitter._load_macro_rewrites = lambda: old_macros
+        try:
+            return emitter._lower_expr(e, old_rules)
+        finally:
+            emitter._apply_rewrite_rules, emitter._apply_macro_rewrites, emitter._load_macro_rewrites = saved
+
+    stages = {
+        "literal_rewrite": (
+            lambda e: legacy_apply_rewrite_rules(e, old_rules),
+            lambda e: emitter._apply_rewrite_rules(e, new_rules),
+        ),
+        "macro_rewrite": (
+            lambda e: legacy_apply_macro_rewrites(e, old_macros),
+            lambda e: emitter._apply_macro_rewrites(e, new_macros),
+        ),
+        "lower_expr": (legacy_lower, lambda e: emitter._lower_expr(e, new_rules)),
+    }
+    report = {"expressions": len(exprs), "repeat": repeat, "stages": {}}
+    for name, (old_fn, new_fn) in stages.items():
+        mismatches = []
+        for e in exprs:
+            before, after = old_fn(e), new_fn(e)
+            if before != after:
+                mismatches.append({"c": e, "before": before[0], "after": after[0]})
+        row = {"mismatches": len(mismatches), "mismatch_examples": mismatches[:5]}
+        if timing:
+            before = _time_per_expr(old_fn, exprs, repeat)
+            after = _time_per_expr(new_fn, exprs, repeat)
+            row = {
+                "before_us": round(before, 3),
+                "after_us": round(after, 3),
+                "speedup": round(before / after, 2) if after else None,
+                **row,
+            }
+        report["stages"][name] = row
+    if not timing:
+        return report
+    # Per emit_helper_scaffold call the legacy loader re-read both rulesets.
+    report["rule_load_us"] = {
+        "before_per_call": round(_time_call(legacy_load_rewrite_rules, repeat), 1),
+        "after_per_call": round(_time_call(emitter._load_rewrite_rules, repeat), 3),
+    }
+    return report
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark emitter expression lowering")
+    p.add_argument("--src", action="append", default=None, help="C source glob (repeatable)")
+    p.add_argument("--limit", type=int, default=20000, help="cap on harvested expressions (0 = all)")
+    p.add_argument("--repeat", type=int, default=3, help="timing repeats (best is reported)")
+    p.add_argument("--out", help="optional JSON report path")
+    args = p.parse_args()
+
+    paths = sorted({f for pattern in (args.src or ["nethack-c/src/*.c"]) for f in glob.glob(pattern)})
+    if not paths:
+        p.error("no source files matched --src")
+    exprs = harvest_expressions(paths, args.limit)
+    report = run_benchmark(exprs, args.repeat)
+    print(f"translator: lowering benchmark over {len(exprs)} expressions from {len(paths)} files")
+    for name, row in report["stages"].items():
+        print(
+            f"  {name:16s} before={row['before_us']:8.3f}us after={row['after_us']:8.3f}us "
+            f"speedup={row['speedup']}x mismatches={row['mismatches']}"
+        )
+    loads = report["rule_load_us"]
+    print(f"  rule load        before={loads['before_per_call']}us/call after={loads['after_per_call']}us/call")
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"translator: lowering benchmark -> {out}")
+
+
+if __name__ == "__main__":
+    main()
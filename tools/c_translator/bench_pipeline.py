@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""Benchmark the translator pipeline modes over a pinned corpus.
+
+Each main.py mode (parse-summary, nir-snapshot, cfg-summary,
+async-summary, emit-helper, capability-summary) is run over the files
+listed in bench_corpus.json, once per repeat in a fresh process with the
+artifact store off, so every run is cold and peak RSS is that mode's own.
+emit-helper emits every unambiguous function, as batch_emit.py does.
+The best wall time of the repeats gives functions/sec and lines/sec.
+
+The corpus pins each file's SHA-256; a changed file is reported and the
+run is not compared, since its timings would not be like for like.  With
+--baseline (default bench_baseline.json next to this script, if present)
+each mode is compared against a stored report; --write-baseline stores
+this run instead.  Timings are machine-specific, so keep baselines local.
+
+Run from the repo root:
+    python3 tools/c_translator/bench_pipeline.py
+    python3 tools/c_translator/bench_pipeline.py --write-baseline
+    python3 tools/c_translator/bench_pipeline.py --modes emit-helper --check
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from artifact_store.store import CACHE_DIR_ENV
+
+
+HERE = Path(__file__).resolve().parent
+CORPUS_DEFAULT = HERE / "bench_corpus.json"
+BASELINE_DEFAULT = HERE / "bench_baseline.json"
+MODES = [
+    "parse-summary",
+    "nir-snapshot",
+    "cfg-summary",
+    "async-summary",
+    "emit-helper",
+    "capability-summary",
+]
+
+
+def _run_mode(mode, src, profile, boundary_rules):
+    """Run one mode over one file; returns the number of emits for emit-helper."""
+    from backend import emit_capability_summary, emit_helper_scaffold
+    from frontend import parse_summary
+    from source_context import load_source_context
+
+    if mode == "parse-summary":
+        parse_summary(src, profile)
+    elif mode == "nir-snapshot":
+        load_source_context(src, profile).nir_snapshot()
+    elif mode == "cfg-summary":
+        load_source_context(src, profile).cfg_summary()
+    elif mode == "async-summary":
+        load_source_context(src, profile, boundary_rules).async_summary()
+    elif mode == "capability-summary":
+        emit_capability_summary(src, profile)
+    elif mode == "emit-helper":
+        ctx = load_source_context(src, profile)
+        emitted = 0
+        for name in dict.fromkeys(fn["name"] for fn in ctx.nir_snapshot()["functions"]):
+            if ctx.nir_snapshot(name).get("function_count", 0) == 1:
+                emit_helper_scaffold(src, name, profile)
+                emitted += 1
+        return emitted
+    else:
+        raise ValueError(f"unknown mode {mode}")
+    return 0
+
+
+def run_worker(mode, sources, compile_profile, boundary_rules):
+    """One cold timing of `mode` over sources, in this process (--worker)."""
+    from artifact_store import configure_artifact_store
+    from frontend import load_compile_profile
+
+    configure_artifact_store(None)
+    profile = load_compile_profile(compile_profile)
+    # Imports and rule loading happen on first use; the first file pays
+    # for them, as a main.py run would.
+    start = time.perf_counter()
+    emitted = sum(_run_mode(mode, src, profile, boundary_rules) for src in sources)
+    seconds = time.perf_counter() - start
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        rss //= 1024  # bytes there, KiB on Linux
+    return {"seconds": seconds, "max_rss_kb": rss, "emitted": emitted}
+
+
+def load_corpus(path):
+    """Corpus sources plus the ones whose SHA-256 no longer matches the pin."""
+    data = json.loads(Path(path).read_text(encoding="utf-8"))
+    sources = []
+    changed = []
+    for entry in data["sources"]:
+        p = Path(entry["path"])
+        if not p.exists():
+            changed.append(entry["path"])
+            continue
+        if hashlib.sha256(p.read_bytes()).hexdigest() != entry["sha256"]:
+            changed.append(entry["path"])
+        sources.append(entry["path"])
+    return sources, changed
+
+
+def corpus_stats(sources):
+    from nir.builder import build_nir_snapshot
+
+    lines = 0
+    functions = 0
+    for src in sources:
+        text = Path(src).read_text(encoding="utf-8", errors="replace")
+        lines += len(text.splitlines())
+        functions += build_nir_snapshot(src, text=text)["function_count"]
+    return {"files": len(sources), "lines": lines, "functions": functions}
+
+
+def bench_mode(mode, sources, args, stats):
+    env = {k: v for k, v in os.environ.items() if k != CACHE_DIR_ENV}
+    cmd = [
+        sys.executable,
+        str(Path(__file__).resolve()),
+        "--worker",
+        mode,
+        "--compile-profile",
+        args.compile_profile,
+        "--boundary-rules",
+        args.boundary_rules,
+        *sources,
+    ]
+    runs = []
+    for _ in range(args.repeat):
+        proc = subprocess.run(cmd, check=True, capture_output=True, text=True, env=env)
+        runs.append(json.loads(proc.stdout.splitlines()[-1]))
+    best = min(r["seconds"] for r in runs)
+    return {
+        "seconds": round(best, 4),
+        "functions_per_sec": round(stats["functions"] / best, 1),
+        "lines_per_sec": round(stats["lines"] / best, 1),
+        "max_rss_kb": max(r["max_rss_kb"] for r in runs),
+        "emitted": runs[0]["emitted"],
+        "runs": [round(r["seconds"], 4) for r in runs],
+    }
+
+
+def compare(report, baseline, tolerance):
+    """Per-mode throughput/RSS ratios vs baseline; a mode regresses past tolerance."""
+    rows = {}
+    for mode, row in report["modes"].items():
+        base = baseline.get("modes", {}).get(mode)
+        if not base:
+            continue
+        speed = row["functions_per_sec"] / base["functions_per_sec"] if base["functions_per_sec"] else None
+        rss = row["max_rss_kb"] / base["max_rss_kb"] if base["max_rss_kb"] else None
+        rows[mode] = {
+            "throughput_ratio": round(speed, 3) if speed else None,
+            "rss_ratio": round(rss, 3) if rss else None,
+            "regressed": bool(speed and speed < 1 - tolerance),
+        }
+    return rows
+
+
+def main():
+    p = argparse.ArgumentParser(description="Benchmark translator pipeline modes")
+    p.add_argument("--corpus", default=str(CORPUS_DEFAULT), help="Pinned corpus JSON")
+    p.add_argument("--modes", default=",".join(MODES), help="Comma-separated modes to run")
+    p.add_argument("--repeat", type=int, default=3, help="Cold runs per mode (best time is reported)")
+    p.add_argument(
+        "--compile-profile",
+        default="tools/c_translator/compile_profile.json",
+        help="Compile profile JSON path",
+    )
+    p.add_argument(
+        "--boundary-rules",
+        default="tools/c_translator/rulesets/boundary_calls.json",
+        help="Boundary rules JSON path",
+    )
+    p.add_argument("--baseline", default=str(BASELINE_DEFAULT), help="Baseline report to compare against")
+    p.add_argument("--write-baseline", action="store_true", help="Store this run as the baseline")
+    p.add_argument("--tolerance", type=float, default=0.10, help="Throughput drop counted as a regression")
+    p.add_argument("--check", action="store_true", help="Exit 1 if any mode regressed")
+    p.add_argument("--out", help="Optional JSON report path")
+    p.add_argument("--worker", metavar="MODE", help=argparse.SUPPRESS)
+    p.add_argument("sources", nargs="*", help=argparse.SUPPRESS)
+    args = p.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_worker(args.worker, args.sources, args.compile_profile, args.boundary_rules)))
+        return 0
+
+    modes = [m.strip() for m in args.modes.split(",") if m.strip()]
+    unknown = [m for m in modes if m not in MODES]
+    if unknown:
+        p.error(f"unknown modes: {', '.join(unknown)}")
+    sources, changed = load_corpus(args.corpus)
+    if changed:
+        print(f"translator: corpus files changed since pinning: {', '.join(changed)}", file=sys.stderr)
+
+    from frontend.clang_frontend import libclang_available
+
+    stats = corpus_stats(sources)
+    report = {
+        "corpus": str(Path(args.corpus).name),
+        "corpus_changed": changed,
+        "frontend": "libclang" if libclang_available() else "regex-only",
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        **stats,
+        "modes": {},
+    }
+    print(
+        f"translator: pipeline benchmark over {stats['files']} files, {stats['lines']} lines, "
+        f"{stats['functions']} functions ({report['frontend']})"
+    )
+    for mode in modes:
+        row = report["modes"][mode] = bench_mode(mode, sources, args, stats)
+        print(
+            f"  {mode:18s} {row['seconds']:8.3f}s {row['functions_per_sec']:9.1f} fn/s "
+            f"{row['lines_per_sec']:10.1f} lines/s  rss={row['max_rss_kb'] / 1024:.1f}MiB"
+        )
+
+    regressed = []
+    baseline_path = Path(args.baseline)
+    if args.write_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"translator: baseline -> {baseline_path}")
+    elif baseline_path.exists():
+        baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+        if changed or baseline.get("corpus_changed"):
+            print("translator: corpus differs from its pin; not comparing with the baseline")
+        elif baseline.get("frontend") != report["frontend"]:
+            print(f"translator: baseline used the {baseline.get('frontend')} frontend; not comparing")
+        else:
+            report["comparison"] = compare(report, baseline, args.tolerance)
+            print(f"translator: vs baseline {baseline_path}")
+            for mode, row in report["comparison"].items():
+                flag = "  REGRESSED" if row["regressed"] else ""
+                print(f"  {mode:18s} throughput x{row['throughput_ratio']}  rss x{row['rss_ratio']}{flag}")
+                if row["regressed"]:
+                    regressed.append(mode)
+
+    if args.out:
+        out = Path(args.out)
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"translator: pipeline benchmark -> {out}")
+    return 1 if args.check and regressed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,42 @@
 #!/usr/bin/env python3
+"""Translator capability matrix: per-file translated/blocked counts.
+
+--jobs N computes files in N worker processes; results are merged in
+source order, so the report is byte-identical to a serial run.  A file
+that crashes its worker (e.g. in libclang) gets an "error" row and is
+listed under "errors"; the other files are unaffected.
+
+--incremental keeps per-file results next to the report (<out stem>
+.incremental.json) and reuses them while the file's inputs are unchanged:
+source hash, async-index digest, compile profile + headers, rulesets,
+translator code and libclang availability.  Only changed files are
+re-analyzed.
+"""
+
 import argparse
 import fnmatch
+import hashlib
 import json
+import os
 from collections import Counter
 from pathlib import Path
 
-from backend import emit_capability_summary
+from artifact_store import (
+    configure_artifact_store,
+    format_stats,
+    get_artifact_store,
+    merge_stats,
+    tool_digest,
+)
+from async_infer import configure_async_index
+from backend import capability_input_parts, emit_capability_summary
 from frontend import load_compile_profile
+from frontend.clang_frontend import libclang_available, reset_clang_index
+from source_context import clear_source_contexts
+from worker_pool import ordered_map
+
+
+INCREMENTAL_VERSION = 1
 
 
 def _normalize_source_path(src):
@@ -65,6 +95,85 @@ def _top_blockers(file_payloads, n=12):
     return [{"code": code, "count": count} for code, count in c.most_common(n)]
 
 
+def _drain_cache_stats():
+    store = get_artifact_store()
+    return store.drain_stats() if store is not None else {}
+
+
+def file_result(src, profile):
+    """One file's matrix row plus its ordered (code, message, count) diag details."""
+    payload = emit_capability_summary(src, profile)
+    function_count = int(payload.get("function_count") or 0)
+    translated_count = int(payload.get("translated_count") or 0)
+    blocked_count = int(payload.get("blocked_count") or 0)
+    ratio = (translated_count / function_count) if function_count else 0.0
+    details = Counter()
+    for fn in (payload.get("functions") or []):
+        for d in (fn.get("diag") or []):
+            code = d.get("code")
+            if not code:
+                continue
+            details[(code, d.get("message") or "")] += 1
+    return {
+        "file": {
+            "source": payload.get("source"),
+            "function_count": function_count,
+            "translated_count": translated_count,
+            "blocked_count": blocked_count,
+            "translated_ratio": ratio,
+            "diag_histogram": payload.get("diag_histogram") or {},
+        },
+        # First-seen order, so merging rows in source order rebuilds the
+        # serial Counter (and its most_common() tie order) exactly.
+        "details": [[code, msg, count] for (code, msg), count in details.items()],
+        "cache_stats": _drain_cache_stats(),
+    }
+
+
+def _crashed_result(task):
+    src = task[0]
+    return {
+        "file": {
+            "source": src,
+            "function_count": 0,
+            "translated_count": 0,
+            "blocked_count": 0,
+            "translated_ratio": 0.0,
+            "diag_histogram": {},
+            "error": "worker process crashed",
+        },
+        "details": [],
+    }
+
+
+def _init_worker(cache_dir, async_index):
+    reset_clang_index()
+    clear_source_contexts()
+    configure_artifact_store(cache_dir)
+    configure_async_index(async_index)
+
+
+def _input_key(src, profile, clang_ok):
+    parts = capability_input_parts(str(src), profile)
+    canon = json.dumps({"tool": tool_digest(), "libclang": clang_ok, **parts}, sort_keys=True)
+    return hashlib.sha256(canon.encode("utf-8")).hexdigest()
+
+
+def _load_incremental(path):
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("incremental_version") != INCREMENTAL_VERSION:
+        return {}
+    return data.get("sources", {})
+
+
+def _write_incremental(path, entries):
+    payload = {"incremental_version": INCREMENTAL_VERSION, "sources": entries}
+    path.write_text(json.dumps(payload, sort_keys=True) + "\n", encoding="utf-8")
+
+
 def main():
     ap = argparse.ArgumentParser(description="Translator capability matrix report")
     ap.add_argument(
@@ -99,45 +208,87 @@ def main():
         help="Disable source exclusions (useful for fixture-focused translator tests)",
     )
     ap.add_argument("--out", required=True, help="Output JSON path")
+    ap.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Artifact store directory for cached capability summaries "
+        "(default: $C_TRANSLATOR_CACHE_DIR, else off)",
+    )
+    ap.add_argument(
+        "--async-index",
+        default=None,
+        help="Whole-program async index from async_index.py (default: per-file async inference)",
+    )
+    ap.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Worker processes, one source file per task (0 = one per CPU; default 1 = serial)",
+    )
+    ap.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Reuse per-file results from the previous run (kept in <out stem>.incremental.json) "
+        "for files whose inputs are unchanged",
+    )
     args = ap.parse_args()
 
     profile = load_compile_profile(args.compile_profile)
+    store = configure_artifact_store(args.cache_dir)
+    configure_async_index(args.async_index)
     excluded_exact, excluded_globs = (set(), [])
     if not args.no_exclude_sources:
         excluded_exact, excluded_globs = _load_source_exclusions(args.exclude_sources_file)
-    sources = list(_iter_sources(args.src, args.include_glob, args.max_files, excluded_exact, excluded_globs))
+    sources = [str(p) for p in _iter_sources(args.src, args.include_glob, args.max_files, excluded_exact, excluded_globs)]
+    out_path = Path(args.out)
+
+    results = {}
+    keys = {}
+    state_path = out_path.with_suffix(".incremental.json")
+    if args.incremental:
+        previous = _load_incremental(state_path)
+        clang_ok = libclang_available()
+        for src in sources:
+            keys[src] = _input_key(src, profile, clang_ok)
+            entry = previous.get(src)
+            if entry and entry.get("key") == keys[src]:
+                results[src] = entry
+    pending = [src for src in sources if src not in results]
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    if jobs > 1 and len(pending) > 1:
+        cache_dir = None if store is None else str(store.root)
+        fresh = ordered_map(
+            file_result,
+            [(src, profile) for src in pending],
+            min(jobs, len(pending)),
+            _crashed_result,
+            initializer=_init_worker,
+            initargs=(cache_dir, args.async_index),
+        )
+        results.update(zip(pending, fresh))
+    else:
+        for src in pending:
+            results[src] = file_result(src, profile)
 
     files = []
+    errors = []
     totals = Counter()
     detail_counter = Counter()
-    for path in sources:
-        payload = emit_capability_summary(str(path), profile)
-        function_count = int(payload.get("function_count") or 0)
-        translated_count = int(payload.get("translated_count") or 0)
-        blocked_count = int(payload.get("blocked_count") or 0)
-        ratio = (translated_count / function_count) if function_count else 0.0
-
-        files.append(
-            {
-                "source": payload.get("source"),
-                "function_count": function_count,
-                "translated_count": translated_count,
-                "blocked_count": blocked_count,
-                "translated_ratio": ratio,
-                "diag_histogram": payload.get("diag_histogram") or {},
-            }
-        )
-        for fn in (payload.get("functions") or []):
-            for d in (fn.get("diag") or []):
-                code = d.get("code")
-                if not code:
-                    continue
-                msg = d.get("message") or ""
-                detail_counter[(code, msg)] += 1
+    cache_stats = {}
+    for src in sources:
+        result = results[src]
+        row = result["file"]
+        files.append(dict(row))
+        if "error" in row:
+            errors.append({"source": src, "error": row["error"]})
+        for code, msg, count in result["details"]:
+            detail_counter[(code, msg)] += count
+        merge_stats(cache_stats, result.get("cache_stats", {}))
         totals["files"] += 1
-        totals["functions"] += function_count
-        totals["translated"] += translated_count
-        totals["blocked"] += blocked_count
+        totals["functions"] += row["function_count"]
+        totals["translated"] += row["translated_count"]
+        totals["blocked"] += row["blocked_count"]
 
     files.sort(key=lambda x: (-x["translated_ratio"], -x["translated_count"], x["source"]))
     overall_ratio = (totals["translated"] / totals["functions"]) if totals["functions"] else 0.0
@@ -159,11 +310,27 @@ def main():
         ],
         "files": files,
     }
+    if errors:
+        out["errors"] = errors
 
-    out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
     out_path.write_text(json.dumps(out, indent=2, sort_keys=True) + "\n", encoding="utf-8")
     print(f"translator: wrote {out_path}")
+    if args.incremental:
+        _write_incremental(
+            state_path,
+            {
+                src: {"key": keys[src], "file": results[src]["file"], "details": results[src]["details"]}
+                for src in sources
+                # Crashed files are retried next run.
+                if "error" not in results[src]["file"]
+            },
+        )
+        print(f"translator: incremental reused={len(sources) - len(pending)} analyzed={len(pending)}")
+    if store is not None:
+        print(f"translator: {format_stats(cache_stats)}")
+    if errors:
+        print(f"translator: {len(errors)} file(s) crashed their worker: {', '.join(e['source'] for e in errors)}")
 
 
 if __name__ == "__main__":
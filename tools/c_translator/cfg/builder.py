@@ -92,11 +92,12 @@ def _tag_reducible_patterns(goto_edges, labels, body_end_line):
     return sorted(set(tags))
 
 
-def build_cfg_summary(src_path, func_filter=None):
+def build_cfg_summary(src_path, func_filter=None, *, text=None, nir=None):
     path = Path(src_path)
-    text = path.read_text(encoding="utf-8", errors="replace")
+    if text is None:
+        text = path.read_text(encoding="utf-8", errors="replace")
     source_lines = text.splitlines()
-    base_nir = build_nir_snapshot(src_path, func_filter)
+    base_nir = nir if nir is not None else build_nir_snapshot(src_path, func_filter, text=text)
 
     functions = []
     for fn in base_nir["functions"]:
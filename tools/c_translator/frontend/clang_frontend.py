@@ -4,16 +4,18 @@ import re
 import subprocess
 from pathlib import Path
 
+from .preprocess import preprocess
+
 
 FUNC_SIG_RE = re.compile(
     r"^\s*(?:[A-Za-z_][\w\s\*\(\)]*?\s+)?([A-Za-z_]\w*)\s*\([^;]*\)\s*$"
 )
 DEFINE_RE = re.compile(r"^\s*#\s*define\s+([A-Za-z_]\w*)\b")
 MACRO_CALL_RE = re.compile(r"\b([A-Z][A-Z0-9_]*)\s*\(")
-PP_LINE_RE = re.compile(r'^\s*#\s+(\d+)\s+"([^"]+)"(?:\s+\d+)*\s*$')
 FUNC_NAME_RE = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
 
 _GCC_INCLUDE_CACHE = None
+_CLANG_INDEX = None
 
 
 def _extract_functions_regex(source_text):
@@ -149,7 +151,7 @@ def _try_libclang(path, compile_args):
     _configure_libclang(cindex)
 
     try:
-        index = cindex.Index.create()
+        index = _clang_index(cindex)
         tu = index.parse(str(path), args=_augment_compile_args_for_clang(compile_args))
     except Exception as err:
         return {"available": False, "reason": f"clang parse failed: {err}"}
@@ -169,11 +171,37 @@ def _parse_tu_with_clang(path, compile_args):
     from clang import cindex  # type: ignore
 
     _configure_libclang(cindex)
-    index = cindex.Index.create()
+    index = _clang_index(cindex)
     args = _augment_compile_args_for_clang(compile_args)
     return cindex, index.parse(str(path), args=args)
 
 
+def _clang_index(cindex):
+    # One index per process, reused for every parse.
+    global _CLANG_INDEX
+    if _CLANG_INDEX is None:
+        _CLANG_INDEX = cindex.Index.create()
+    return _CLANG_INDEX
+
+
+def libclang_available():
+    """True if the clang bindings import and can create an index."""
+    try:
+        from clang import cindex  # type: ignore
+
+        _configure_libclang(cindex)
+        _clang_index(cindex)
+    except Exception:
+        return False
+    return True
+
+
+def reset_clang_index():
+    """Forget this process's libclang index (e.g. in a freshly forked worker)."""
+    global _CLANG_INDEX
+    _CLANG_INDEX = None
+
+
 def _discover_gcc_include_dir():
     global _GCC_INCLUDE_CACHE
     if _GCC_INCLUDE_CACHE is not None:
@@ -366,15 +394,6 @@ def _collect_macro_definitions(lines):
     return definitions
 
 
-def _collect_pp_macro_names(pp_text):
-    names = set()
-    for line in pp_text.splitlines():
-        m = DEFINE_RE.match(line)
-        if m:
-            names.add(m.group(1))
-    return names
-
-
 def _collect_macro_invocations(lines, macro_names):
     invocations = []
     macro_name_set = set(macro_names)
@@ -396,59 +415,6 @@ def _collect_macro_invocations(lines, macro_names):
     return invocations
 
 
-def _filter_cpp_args(compile_args):
-    filtered = []
-    skip_next = False
-    for i, arg in enumerate(compile_args):
-        if skip_next:
-            skip_next = False
-            continue
-        if arg == "-x":
-            skip_next = True
-            continue
-        if arg.startswith("-std="):
-            continue
-        filtered.append(arg)
-    return filtered
-
-
-def _run_cpp(path, compile_args):
-    cpp_cmd = ["cpp", "-E", "-dD", *_filter_cpp_args(compile_args), str(path)]
-    try:
-        proc = subprocess.run(
-            cpp_cmd,
-            check=False,
-            capture_output=True,
-            text=True,
-        )
-    except Exception as err:
-        return {"available": False, "reason": f"cpp invocation failed: {err}"}
-    if proc.returncode != 0:
-        return {
-            "available": False,
-            "reason": f"cpp returned {proc.returncode}",
-            "stderr": proc.stderr.strip().splitlines()[:10],
-        }
-    return {"available": True, "stdout": proc.stdout}
-
-
-def _build_pp_crosswalk(pp_text, source_path):
-    logical_file = None
-    logical_line = 0
-    crosswalk = []
-    source_norm = str(source_path).replace("\\", "/")
-    for i, raw_line in enumerate(pp_text.splitlines(), start=1):
-        marker = PP_LINE_RE.match(raw_line)
-        if marker:
-            logical_line = int(marker.group(1)) - 1
-            logical_file = marker.group(2).replace("\\", "/")
-            continue
-        logical_line += 1
-        if logical_file == source_norm:
-            crosswalk.append({"pp_line": i, "source_line": logical_line})
-    return crosswalk
-
-
 def parse_summary(src_path, compile_profile, func_filter=None):
     path = Path(src_path)
     text = path.read_text(encoding="utf-8", errors="replace")
@@ -480,18 +446,18 @@ def provenance_summary(src_path, compile_profile):
     definitions = _collect_macro_definitions(lines)
     macro_names = {entry["name"] for entry in definitions}
 
-    cpp_result = _run_cpp(path, compile_profile.get("args", []))
+    cpp_result = preprocess(path, compile_profile.get("args", []))
     pp = {
         "available": bool(cpp_result.get("available")),
         "crosswalk_count": 0,
         "crosswalk_sample": [],
     }
     if cpp_result.get("available"):
-        macro_names.update(_collect_pp_macro_names(cpp_result["stdout"]))
+        macro_names.update(cpp_result["macro_names"])
         invocations = _collect_macro_invocations(lines, macro_names)
-        crosswalk = _build_pp_crosswalk(cpp_result["stdout"], path)
+        crosswalk = cpp_result["crosswalk"]
         pp["crosswalk_count"] = len(crosswalk)
-        pp["crosswalk_sample"] = crosswalk[:200]
+        pp["crosswalk_sample"] = crosswalk.sample(200)
     else:
         invocations = _collect_macro_invocations(lines, macro_names)
         pp["reason"] = cpp_result.get("reason")
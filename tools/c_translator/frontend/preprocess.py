@@ -0,0 +1,274 @@
+"""`cpp -E -dD` runs for provenance, cached by source and include closure.
+
+A run is keyed by (source path + SHA-256, filtered cpp args, SHA-256 of
+every file the run included).  The include closure is only known after a
+run, so lookups go through two artifact-store stages, as in make's
+depfiles:
+
+- cpp_deps: (source, args) -> the include list of the last run;
+- cpp:      (source, args, {include: sha256}) -> macro names + crosswalk.
+
+Editing the source, any header in its include chain or the compile args
+misses; anything else is a hit without starting cpp.  Results are also
+memoized per process, so the store is optional.
+
+The crosswalk (preprocessed line -> source line) is kept as runs of
+consecutive lines in arrays (PpCrosswalk), not one dict per line.
+"""
+
+import bisect
+import hashlib
+import re
+import subprocess
+from array import array
+from pathlib import Path
+
+from artifact_store import get_artifact_store
+
+
+PP_LINE_RE = re.compile(r'^\s*#\s+(\d+)\s+"([^"]+)"(?:\s+\d+)*\s*$')
+DEFINE_RE = re.compile(r"^\s*#\s*define\s+([A-Za-z_]\w*)\b")
+
+_memo = {}
+_include_digests = {}
+
+
+class PpCrosswalk:
+    """Monotone runs of (pp_line, source_line) pairs, both 1-based.
+
+    Run i maps pp lines pp_starts[i] .. pp_starts[i] + lengths[i] - 1 to
+    source lines source_starts[i] onwards.  A #include or #define in the
+    source starts a new run, so a file has a few hundred runs rather than
+    thousands of pairs.
+    """
+
+    __slots__ = ("pp_starts", "source_starts", "lengths", "_count")
+
+    def __init__(self, runs=()):
+        self.pp_starts = array("l")
+        self.source_starts = array("l")
+        self.lengths = array("l")
+        self._count = 0
+        for pp_line, source_line, length in runs:
+            self.pp_starts.append(pp_line)
+            self.source_starts.append(source_line)
+            self.lengths.append(length)
+            self._count += length
+
+    def add(self, pp_line, source_line):
+        """Append a pair; pp_line must exceed every pp_line already added."""
+        if self.lengths:
+            n = self.lengths[-1]
+            if pp_line == self.pp_starts[-1] + n and source_line == self.source_starts[-1] + n:
+                self.lengths[-1] = n + 1
+                self._count += 1
+                return
+        self.pp_starts.append(pp_line)
+        self.source_starts.append(source_line)
+        self.lengths.append(1)
+        self._count += 1
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        for pp_line, source_line, length in zip(self.pp_starts, self.source_starts, self.lengths):
+            for k in range(length):
+                yield pp_line + k, source_line + k
+
+    def run_count(self):
+        return len(self.lengths)
+
+    def source_line(self, pp_line):
+        """Source line of a preprocessed line, or None if it is not from the source."""
+        i = bisect.bisect_right(self.pp_starts, pp_line) - 1
+        if i < 0 or pp_line >= self.pp_starts[i] + self.lengths[i]:
+            return None
+        return self.source_starts[i] + (pp_line - self.pp_starts[i])
+
+    def pp_lines(self, source_line):
+        """Every preprocessed line that came from a source line."""
+        return [
+            pp_line + (source_line - start)
+            for pp_line, start, length in zip(self.pp_starts, self.source_starts, self.lengths)
+            if start <= source_line < start + length
+        ]
+
+    def sample(self, limit):
+        """The first `limit` pairs as {"pp_line", "source_line"} dicts."""
+        out = []
+        for pp_line, source_line in self:
+            if len(out) >= limit:
+                break
+            out.append({"pp_line": pp_line, "source_line": source_line})
+        return out
+
+    def to_json(self):
+        return [list(run) for run in zip(self.pp_starts, self.source_starts, self.lengths)]
+
+    @classmethod
+    def from_json(cls, runs):
+        return cls(runs)
+
+
+def build_pp_crosswalk(pp_text, source_path):
+    """PpCrosswalk of the lines of pp_text that come from source_path."""
+    logical_file = None
+    logical_line = 0
+    crosswalk = PpCrosswalk()
+    source_norm = str(source_path).replace("\\", "/")
+    for i, raw_line in enumerate(pp_text.splitlines(), start=1):
+        if raw_line.startswith("#"):
+            marker = PP_LINE_RE.match(raw_line)
+            if marker:
+                logical_line = int(marker.group(1)) - 1
+                logical_file = marker.group(2).replace("\\", "/")
+                continue
+        logical_line += 1
+        if logical_file == source_norm:
+            crosswalk.add(i, logical_line)
+    return crosswalk
+
+
+def collect_pp_macro_names(pp_text):
+    names = set()
+    for line in pp_text.splitlines():
+        m = DEFINE_RE.match(line)
+        if m:
+            names.add(m.group(1))
+    return names
+
+
+def _collect_includes(pp_text, source_path):
+    """Files named by cpp line markers, other than the source and <built-in>s."""
+    source_norm = str(source_path).replace("\\", "/")
+    files = set()
+    for m in re.finditer(r'^#\s+\d+\s+"([^"]+)"', pp_text, re.MULTILINE):
+        name = m.group(1).replace("\\", "/")
+        if name != source_norm and not name.startswith("<"):
+            files.add(name)
+    return sorted(files)
+
+
+def filter_cpp_args(compile_args):
+    filtered = []
+    skip_next = False
+    for arg in compile_args:
+        if skip_next:
+            skip_next = False
+            continue
+        if arg == "-x":
+            skip_next = True
+            continue
+        if arg.startswith("-std="):
+            continue
+        filtered.append(arg)
+    return filtered
+
+
+def run_cpp(path, compile_args):
+    cpp_cmd = ["cpp", "-E", "-dD", *filter_cpp_args(compile_args), str(path)]
+    try:
+        proc = subprocess.run(
+            cpp_cmd,
+            check=False,
+            capture_output=True,
+            text=True,
+        )
+    except Exception as err:
+        return {"available": False, "reason": f"cpp invocation failed: {err}"}
+    if proc.returncode != 0:
+        return {
+            "available": False,
+            "reason": f"cpp returned {proc.returncode}",
+            "stderr": proc.stderr.strip().splitlines()[:10],
+        }
+    return {"available": True, "stdout": proc.stdout}
+
+
+def _include_digest(name):
+    """SHA-256 of an included file (None if gone), hashed once per version."""
+    p = Path(name)
+    try:
+        st = p.stat()
+    except OSError:
+        return None
+    key = (name, st.st_mtime_ns, st.st_size)
+    if key not in _include_digests:
+        _include_digests[key] = hashlib.sha256(p.read_bytes()).hexdigest()
+    return _include_digests[key]
+
+
+def _closure_digests(includes):
+    digests = {name: _include_digest(name) for name in includes}
+    return None if None in digests.values() else digests
+
+
+def preprocess(src_path, compile_args, source_sha256=None):
+    """Macro names and source crosswalk of one `cpp -E -dD` run, cached.
+
+    Returns {"available": True, "macro_names": set, "crosswalk":
+    PpCrosswalk, "includes": [...]}, or run_cpp()'s failure dict (failures
+    are not cached).
+    """
+    path = Path(src_path)
+    source = str(path).replace("\\", "/")
+    args = filter_cpp_args(compile_args)
+    if source_sha256 is None:
+        source_sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+    base = {"source": source, "source_sha256": source_sha256, "args": args}
+    store = get_artifact_store()
+
+    deps_key = store.key("cpp_deps", **base) if store else None
+    includes = _memo.get(("deps", repr(base)))
+    if includes is None and store:
+        deps = store.get("cpp_deps", deps_key)
+        includes = deps.get("includes") if deps else None
+    digests = _closure_digests(includes) if includes is not None else None
+    if digests is not None:
+        memo_key = ("cpp", repr(base), repr(sorted(digests.items())))
+        if memo_key in _memo:
+            return _memo[memo_key]
+        value = store.get("cpp", store.key("cpp", includes=digests, **base)) if store else None
+        if value is not None:
+            result = _from_cached(value)
+            _memo[memo_key] = result
+            return result
+
+    cpp_result = run_cpp(path, compile_args)
+    if not cpp_result.get("available"):
+        return cpp_result
+    pp_text = cpp_result["stdout"]
+    includes = _collect_includes(pp_text, path)
+    result = {
+        "available": True,
+        "macro_names": collect_pp_macro_names(pp_text),
+        "crosswalk": build_pp_crosswalk(pp_text, path),
+        "includes": includes,
+    }
+    _memo[("deps", repr(base))] = includes
+    digests = _closure_digests(includes)
+    if digests is not None:
+        _memo[("cpp", repr(base), repr(sorted(digests.items())))] = result
+        if store:
+            store.put("cpp_deps", deps_key, {"includes": includes})
+            store.put(
+                "cpp",
+                store.key("cpp", includes=digests, **base),
+                {
+                    "available": True,
+                    "macro_names": sorted(result["macro_names"]),
+                    "crosswalk": result["crosswalk"].to_json(),
+                    "includes": includes,
+                },
+            )
+    return result
+
+
+def _from_cached(value):
+    return {
+        "available": True,
+        "macro_names": set(value["macro_names"]),
+        "crosswalk": PpCrosswalk.from_json(value["crosswalk"]),
+        "includes": value["includes"],
+    }
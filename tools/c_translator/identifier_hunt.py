@@ -13,11 +13,18 @@ from collections import defaultdict
 from difflib import SequenceMatcher
 from pathlib import Path
 
+from js_symbols import get_js_symbol_index
+
 
 def parse_args():
     p = argparse.ArgumentParser(description="Find unresolved identifier follow-ups")
     p.add_argument("--queue", required=True, help="refactor_queue JSON path")
     p.add_argument("--out", required=True, help="output JSON path")
+    p.add_argument(
+        "--js-symbols",
+        default=None,
+        help="Persisted JS symbol index (default: $C_TRANSLATOR_CACHE_DIR/js_symbols.json, else not persisted)",
+    )
     return p.parse_args()
 
 
@@ -25,31 +32,6 @@ def normalize(name):
     return re.sub(r"[_\W]+", "", name).lower()
 
 
-def module_symbols(path):
-    text = path.read_text(encoding="utf-8", errors="replace")
-    syms = set()
-    syms.update(re.findall(r"\b(?:export\s+)?(?:async\s+)?function\s+([A-Za-z_]\w*)\s*\(", text))
-    syms.update(re.findall(r"\bclass\s+([A-Za-z_]\w*)\b", text))
-    for m in re.finditer(r"^\s*import\s*\{([^}]*)\}\s*from\s*['\"][^'\"]+['\"]\s*;", text, re.MULTILINE):
-        for part in m.group(1).split(","):
-            token = part.strip()
-            if not token:
-                continue
-            syms.add(token.split(" as ")[-1].strip())
-    return syms
-
-
-def global_exports(js_root):
-    exports = defaultdict(set)
-    for p in sorted(Path(js_root).glob("*.js")):
-        text = p.read_text(encoding="utf-8", errors="replace")
-        for fn in re.findall(r"\bexport\s+(?:async\s+)?function\s+([A-Za-z_]\w*)\s*\(", text):
-            exports[fn].add(str(p))
-        for var in re.findall(r"\bexport\s+(?:const|let|var)\s+([A-Za-z_]\w*)\b", text):
-            exports[var].add(str(p))
-    return exports
-
-
 def main():
     args = parse_args()
     queue = json.loads(Path(args.queue).read_text(encoding="utf-8"))
@@ -63,10 +45,8 @@ def main():
         if mod and ident:
             by_module[mod].add(ident)
 
-    mod_sym_cache = {}
-    for mod in by_module:
-        p = Path(mod)
-        mod_sym_cache[mod] = module_symbols(p) if p.exists() else set()
+    symbol_index = get_js_symbol_index("js", args.js_symbols)
+    mod_sym_cache = {mod: symbol_index.symbols(mod) for mod in by_module}
 
     alias_candidates = []
     for mod, idents in sorted(by_module.items()):
@@ -94,7 +74,8 @@ def main():
                     "candidates": cands[:3],
                 })
 
-    exports = global_exports("js")
+    exports = symbol_index.exports()
+    symbol_index.save()
     binding_candidates = []
     for mod, idents in sorted(by_module.items()):
         for ident in sorted(idents):
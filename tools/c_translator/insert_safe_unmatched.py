@@ -13,18 +13,16 @@ import json
 import re
 from pathlib import Path
 
+from js_symbols import get_js_symbol_index
+from js_syntax import MODES as SYNTAX_CHECK_MODES, get_syntax_checker
 from runtime_candidate_safety import (
     candidate_syntax_ok,
     candidate_unknown_calls,
     candidate_unknown_identifiers,
     load_identifier_aliases,
-    parse_module_symbols,
 )
 
 
-EXPORT_RE_TMPL = r"^\s*export\s+(?:async\s+)?function\s+{name}\s*\("
-LOCAL_RE_TMPL = r"^\s*(?:async\s+)?function\s+{name}\s*\("
-
 EXPORT_FN_RE = re.compile(
     r"^\s*export\s+(?:async\s+)?function\s+([A-Za-z_]\w*)\s*\(",
     re.MULTILINE,
@@ -51,189 +49,21 @@ def parse_args():
         default="strict",
         help="strict: require no unknown symbols; syntax: require syntax only",
     )
+    p.add_argument(
+        "--js-symbols",
+        default=None,
+        help="Persisted JS symbol index (default: $C_TRANSLATOR_CACHE_DIR/js_symbols.json, else not persisted)",
+    )
+    p.add_argument(
+        "--syntax-check",
+        choices=SYNTAX_CHECK_MODES,
+        default="service",
+        help="service: one long-lived node checker; node: node --check per snippet; "
+        "python: in-process structural check (no node needed)",
+    )
     return p.parse_args()
 
 
-def is_escaped(text, i):
-    backslashes = 0
-    j = i - 1
-    while j >= 0 and text[j] == "\\":
-        backslashes += 1
-        j -= 1
-    return (backslashes % 2) == 1
-
-
-def find_matching_paren(text, open_i):
-    depth = 0
-    in_str = None
-    in_line_comment = False
-    in_block_comment = False
-    i = open_i
-    n = len(text)
-    while i < n:
-        c = text[i]
-        nxt = text[i + 1] if i + 1 < n else ""
-        if in_line_comment:
-            if c == "\n":
-                in_line_comment = False
-            i += 1
-            continue
-        if in_block_comment:
-            if c == "*" and nxt == "/":
-                in_block_comment = False
-                i += 2
-                continue
-            i += 1
-            continue
-        if in_str:
-            if c == in_str and not is_escaped(text, i):
-                in_str = None
-            i += 1
-            continue
-        if c == "/" and nxt == "/":
-            in_line_comment = True
-            i += 2
-            continue
-        if c == "/" and nxt == "*":
-            in_block_comment = True
-            i += 2
-            continue
-        if c in ("'", '"', "`"):
-            in_str = c
-            i += 1
-            continue
-        if c == "(":
-            depth += 1
-        elif c == ")":
-            depth -= 1
-            if depth == 0:
-                return i
-        i += 1
-    return -1
-
-
-def find_matching_brace(text, open_i):
-    depth = 0
-    in_str = None
-    in_line_comment = False
-    in_block_comment = False
-    i = open_i
-    n = len(text)
-    while i < n:
-        c = text[i]
-        nxt = text[i + 1] if i + 1 < n else ""
-        if in_line_comment:
-            if c == "\n":
-                in_line_comment = False
-            i += 1
-            continue
-        if in_block_comment:
-            if c == "*" and nxt == "/":
-                in_block_comment = False
-                i += 2
-                continue
-            i += 1
-            continue
-        if in_str:
-            if c == in_str and not is_escaped(text, i):
-                in_str = None
-            i += 1
-            continue
-        if c == "/" and nxt == "/":
-            in_line_comment = True
-            i += 2
-            continue
-        if c == "/" and nxt == "*":
-            in_block_comment = True
-            i += 2
-            continue
-        if c in ("'", '"', "`"):
-            in_str = c
-            i += 1
-            continue
-        if c == "{":
-            depth += 1
-        elif c == "}":
-            depth -= 1
-            if depth == 0:
-                return i
-        i += 1
-    return -1
-
-
-def find_function_span(text, fn_name):
-    local_re = re.compile(LOCAL_RE_TMPL.format(name=re.escape(fn_name)), re.MULTILINE)
-    m = local_re.search(text)
-    if not m:
-        return None
-    if not _is_top_level_at(text, m.start()):
-        return None
-    line_start = text.rfind("\n", 0, m.start()) + 1
-    sig_open = text.find("(", m.start())
-    if sig_open < 0:
-        return None
-    sig_close = find_matching_paren(text, sig_open)
-    if sig_close < 0:
-        return None
-    brace_open = text.find("{", sig_close + 1)
-    if brace_open < 0:
-        return None
-    brace_close = find_matching_brace(text, brace_open)
-    if brace_close < 0:
-        return None
-    end = brace_close + 1
-    if end < len(text) and text[end] == "\n":
-        end += 1
-    return (line_start, end)
-
-
-def _is_top_level_at(text, pos):
-    depth = 0
-    in_str = None
-    in_line_comment = False
-    in_block_comment = False
-    i = 0
-    n = min(pos, len(text))
-    while i < n:
-        c = text[i]
-        nxt = text[i + 1] if i + 1 < n else ""
-        if in_line_comment:
-            if c == "\n":
-                in_line_comment = False
-            i += 1
-            continue
-        if in_block_comment:
-            if c == "*" and nxt == "/":
-                in_block_comment = False
-                i += 2
-                continue
-            i += 1
-            continue
-        if in_str:
-            if c == in_str and not is_escaped(text, i):
-                in_str = None
-            i += 1
-            continue
-        if c == "/" and nxt == "/":
-            in_line_comment = True
-            i += 2
-            continue
-        if c == "/" and nxt == "*":
-            in_block_comment = True
-            i += 2
-            continue
-        if c in ("'", '"', "`"):
-            in_str = c
-            i += 1
-            continue
-        if c == "{":
-            depth += 1
-        elif c == "}":
-            depth = max(0, depth - 1)
-        i += 1
-    return depth == 0
-
-
 def dedupe_export_lists(source_text):
     export_fns = set(EXPORT_FN_RE.findall(source_text))
     block_comment_re = re.compile(r"/\*.*?\*/", re.DOTALL)
@@ -307,8 +137,9 @@ def main():
     cand = json.loads(Path(args.candidates).read_text(encoding="utf-8"))
     unmatched = cand.get("unmatched", [])
     alias_map = load_identifier_aliases()
+    checker = get_syntax_checker(args.syntax_check)
 
-    module_symbols = {}
+    symbol_index = get_js_symbol_index("js", args.js_symbols)
     edits = []
     skipped = []
 
@@ -334,12 +165,8 @@ def main():
             skipped.append({"record": rec, "reason": "empty_emit"})
             continue
 
-        if module not in module_symbols:
-            module_symbols[module] = parse_module_symbols(
-                mpath.read_text(encoding="utf-8", errors="replace")
-            )
-        known = module_symbols[module]
-        ok, syntax_detail = candidate_syntax_ok(emitted_js)
+        known = symbol_index.symbols(mpath)
+        ok, syntax_detail = candidate_syntax_ok(emitted_js, checker)
         if not ok:
             skipped.append(
                 {"record": rec, "reason": "syntax_bad", "syntax_error": syntax_detail}
@@ -355,28 +182,27 @@ def main():
         if AUTOGEN_HEADER_RE.search(source_text):
             skipped.append({"record": rec, "reason": "autogenerated_module"})
             continue
-        exp_re = re.compile(EXPORT_RE_TMPL.format(name=re.escape(fn)), re.MULTILINE)
-        loc_re = re.compile(LOCAL_RE_TMPL.format(name=re.escape(fn)), re.MULTILINE)
-        if exp_re.search(source_text):
+        defs = symbol_index.functions(mpath, fn)
+        if any(d["exported"] for d in defs):
             skipped.append({"record": rec, "reason": "already_exported"})
             continue
 
-        local_matches = list(loc_re.finditer(source_text))
+        local_matches = [d for d in defs if not d["exported"]]
         if len(local_matches) == 1:
             # Overwrite existing by-hand local implementation with emitted body.
-            span = find_function_span(source_text, fn)
-            if not span:
+            local = local_matches[0]
+            if not local["top_level"] or local["start"] is None:
                 # local def exists but isn't top-level; fall through to append path.
                 pass
             else:
-                start, end = span
+                start, end = local["start"], local["end"]
                 replacement = emitted_js.rstrip() + "\n"
                 patched = source_text[:start] + replacement + source_text[end:]
                 patched = dedupe_export_lists(patched)
                 if args.write:
                     mpath.write_text(patched, encoding="utf-8")
                 edits.append({"record": rec, "mode": "replace_local"})
-                module_symbols.pop(module, None)
+                symbol_index.invalidate(mpath)
                 continue
 
         if len(local_matches) > 1:
@@ -394,7 +220,7 @@ def main():
         # If function name was previously bound by alias/import/local var, only
         # keep this append when the whole module still parses.
         if fn in known:
-            parse_ok, _ = candidate_syntax_ok(appended)
+            parse_ok, _ = candidate_syntax_ok(appended, checker)
             if not parse_ok:
                 # If blocked by an imported binding, try dropping that import name
                 # and appending again.
@@ -405,19 +231,21 @@ def main():
                         retry += "\n"
                     retry += "\n" + emitted_js.rstrip() + "\n"
                     retry = dedupe_export_lists(retry)
-                    retry_ok, _ = candidate_syntax_ok(retry)
+                    retry_ok, _ = candidate_syntax_ok(retry, checker)
                     if retry_ok:
                         if args.write:
                             mpath.write_text(retry, encoding="utf-8")
                         edits.append({"record": rec, "mode": "append_emit_drop_import"})
-                        module_symbols.pop(module, None)
+                        symbol_index.invalidate(mpath)
                         continue
                 skipped.append({"record": rec, "reason": "name_already_bound"})
                 continue
         if args.write:
             mpath.write_text(appended, encoding="utf-8")
         edits.append({"record": rec, "mode": "append_emit"})
-        module_symbols.pop(module, None)
+        symbol_index.invalidate(mpath)
+
+    symbol_index.save()
 
     report = {
         "candidates": args.candidates,
@@ -0,0 +1,464 @@
+#!/usr/bin/env python3
+"""Shared symbol index for the JS modules the stitching tools target.
+
+scan_module(text) reads one module once and records what the stitching
+tools ask about:
+
+- functions: every line-start `[export] [async] function name(` with its
+  line, end_line, [start, end) character span (the range
+  insert_safe_unmatched replaces) and whether it is exported/top level;
+- bindings: `const/let/var name` declarations at the start of a line;
+- classes, imports (local name, imported name, source module) and
+  exports (declarations plus `export { a as b }` lists);
+- markers: `// Autotranslated from file.c:N` comments and the exported
+  function they label (the first one within the next seven lines).
+
+Matches inside comments, strings, template text and regex literals are
+ignored, so a commented-out `function foo(` is not a symbol.
+
+JsSymbolIndex keeps one entry per module.  A module is re-read only when
+its mtime or size changed, and re-scanned only when its SHA-256 changed as
+well.  With a path (default: js_symbols.json in $C_TRANSLATOR_CACHE_DIR)
+the index is persisted, so a pipeline run scans js/ once instead of once
+per tool.
+"""
+
+import argparse
+import bisect
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from artifact_store import CACHE_DIR_ENV
+from js_syntax import REGEX_PREV_CHARS, REGEX_PREV_WORDS, skip_quoted, skip_regex
+
+
+SYMBOL_INDEX_VERSION = 1
+INDEX_FILENAME = "js_symbols.json"
+MARKER_WINDOW = 7
+
+FUNCTION_RE = re.compile(r"^\s*(export\s+)?(async\s+)?function\s+([A-Za-z_]\w*)\s*\(", re.MULTILINE)
+BINDING_RE = re.compile(
+    r"^\s*(?:[{}]\s*)*(export\s+)?(?:const|let|var)\s+([A-Za-z_]\w*)\s*[=;,]",
+    re.MULTILINE,
+)
+CLASS_RE = re.compile(r"^\s*(export\s+)?(?:default\s+)?class\s+([A-Za-z_]\w*)\b", re.MULTILINE)
+IMPORT_RE = re.compile(
+    r"^\s*import\s+(?:([A-Za-z_$][\w$]*)\s*,?\s*)?(?:\{([^}]*)\}|\*\s*as\s+([A-Za-z_$][\w$]*))?"
+    r"\s*from\s*['\"]([^'\"]+)['\"]",
+    re.MULTILINE,
+)
+EXPORT_LIST_RE = re.compile(r"^\s*export\s*\{([^}]*)\}", re.MULTILINE)
+MARKER_RE = re.compile(r"^\s*//\s*Autotranslated from ([A-Za-z0-9_.-]+\.c:\d+)\s*$")
+EXPORT_FN_LINE_RE = re.compile(r"^\s*export\s+(?:async\s+)?function\s+([A-Za-z_]\w*)\s*\(")
+
+_CODE_RE = re.compile(r"[\n'\"`/(){}\[\]]")
+_TEMPLATE_RE = re.compile(r"[\n\\`]|\$\{")
+_OPENER_OF = {")": "(", "]": "[", "}": "{"}
+_COMMENT_RE = re.compile(r"/\*.*?\*/|//[^\n]*", re.DOTALL)
+
+_indexes = {}
+
+
+def _regex_allowed(text, i):
+    """True if a '/' at text[i] starts a regex literal rather than division."""
+    j = i - 1
+    while j >= 0 and text[j] in " \t\r\n":
+        j -= 1
+    if j < 0:
+        return True
+    ch = text[j]
+    if ch.isalnum() or ch in "_$":
+        k = j
+        while k > 0 and (text[k - 1].isalnum() or text[k - 1] in "_$"):
+            k -= 1
+        return text[k:j + 1] in REGEX_PREV_WORDS
+    return ch in REGEX_PREV_CHARS
+
+
+def _scan_structure(text):
+    """One lexical pass over a module.
+
+    Returns (noncode, closes, line_depth): a bytearray marking comment,
+    string, template-text and regex characters; the matching close index
+    of every '(', '[' and '{'; and the bracket nesting depth at the start
+    of each line.
+    """
+    n = len(text)
+    noncode = bytearray(n)
+    closes = {}
+    line_depth = [0]
+    stack = []  # (opener, index); "`" is a template literal being scanned
+
+    def mark(a, b):
+        noncode[a:b] = b"\x01" * (b - a)
+
+    i = 0
+    while i < n:
+        if stack and stack[-1][0] == "`":
+            m = _TEMPLATE_RE.search(text, i)
+            if not m:
+                mark(i, n)
+                break
+            j = m.start()
+            tok = m.group(0)
+            if tok == "${":
+                mark(i, j)
+                stack.append(("{", j + 1))
+                i = j + 2
+                continue
+            end = j + (2 if tok == "\\" else 1)
+            mark(i, end)
+            if tok == "\n":
+                line_depth.append(len(stack))
+            elif tok == "`":
+                stack.pop()
+            i = end
+            continue
+
+        m = _CODE_RE.search(text, i)
+        if not m:
+            break
+        j = m.start()
+        ch = m.group(0)
+        i = j + 1
+        if ch == "\n":
+            line_depth.append(len(stack))
+        elif ch in "'\"":
+            end = skip_quoted(text, j, ch)
+            if end < 0:
+                end = text.find("\n", j)
+                end = n if end < 0 else end
+            mark(j, end)
+            i = end
+        elif ch == "`":
+            mark(j, i)
+            stack.append(("`", j))
+        elif ch == "/":
+            nxt = text[i:i + 1]
+            end = -1
+            if nxt == "/":
+                end = text.find("\n", j)
+                end = n if end < 0 else end
+            elif nxt == "*":
+                end = text.find("*/", j + 2)
+                end = n if end < 0 else end + 2
+                line_depth.extend([len(stack)] * text.count("\n", j, end))
+            elif _regex_allowed(text, j):
+                end = skip_regex(text, j)
+            if end > 0:
+                mark(j, end)
+                i = end
+        elif ch in "([{":
+            stack.append((ch, j))
+        else:
+            want = _OPENER_OF[ch]
+            for k in range(len(stack) - 1, -1, -1):
+                if stack[k][0] == "`":
+                    break
+                if stack[k][0] == want:
+                    closes[stack[k][1]] = j
+                    del stack[k:]
+                    break
+    return noncode, closes, line_depth
+
+
+def _binding_names(part_list):
+    """[(imported, local)] for the comma list inside `{ ... }`."""
+    out = []
+    for part in _COMMENT_RE.sub("", part_list).split(","):
+        token = part.strip()
+        if not token:
+            continue
+        if " as " in token:
+            src, local = [x.strip() for x in token.split(" as ", 1)]
+        else:
+            src = local = token
+        if local:
+            out.append((src, local))
+    return out
+
+
+def scan_module(text):
+    """Symbol facts for one JS module (see the module docstring)."""
+    noncode, closes, line_depth = _scan_structure(text)
+    line_starts = [0] + [m.end() for m in re.finditer(r"\n", text)]
+
+    def code_at(pos):
+        return pos < len(noncode) and not noncode[pos]
+
+    def line_of(pos):
+        return bisect.bisect_right(line_starts, pos)
+
+    exports = set()
+    functions = []
+    for m in FUNCTION_RE.finditer(text):
+        name_pos = m.start(3)
+        if not code_at(name_pos):
+            continue
+        line = line_of(name_pos)
+        rec = {
+            "name": m.group(3),
+            "line": line,
+            "end_line": None,
+            "start": None,
+            "end": None,
+            "exported": bool(m.group(1)),
+            "async": bool(m.group(2)),
+            "top_level": line_depth[line - 1] == 0 if line - 1 < len(line_depth) else False,
+        }
+        sig_close = closes.get(m.end() - 1)
+        brace_open = text.find("{", sig_close + 1) if sig_close is not None else -1
+        brace_close = closes.get(brace_open) if brace_open >= 0 else None
+        if brace_close is not None:
+            end = brace_close + 1
+            if end < len(text) and text[end] == "\n":
+                end += 1
+            rec["start"] = m.start()
+            rec["end"] = end
+            rec["end_line"] = line_of(brace_close)
+        if rec["exported"]:
+            exports.add(rec["name"])
+        functions.append(rec)
+
+    bindings = set()
+    for m in BINDING_RE.finditer(text):
+        if code_at(m.start(2)):
+            bindings.add(m.group(2))
+            if m.group(1):
+                exports.add(m.group(2))
+
+    classes = set()
+    for m in CLASS_RE.finditer(text):
+        if code_at(m.start(2)):
+            classes.add(m.group(2))
+            if m.group(1):
+                exports.add(m.group(2))
+
+    imports = []
+    for m in IMPORT_RE.finditer(text):
+        if not code_at(text.find("import", m.start())):
+            continue
+        default, named, namespace, source = m.groups()
+        if not (default or named is not None or namespace):
+            continue
+        if default:
+            imports.append({"local": default, "imported": "default", "from": source})
+        if namespace:
+            imports.append({"local": namespace, "imported": "*", "from": source})
+        for src, local in _binding_names(named or ""):
+            imports.append({"local": local, "imported": src, "from": source})
+
+    for m in EXPORT_LIST_RE.finditer(text):
+        if code_at(m.end() - 1):
+            exports.update(local for _, local in _binding_names(m.group(1)))
+
+    lines = text.splitlines()
+    markers = []
+    for i, line in enumerate(lines):
+        m = MARKER_RE.match(line)
+        if not m:
+            continue
+        rec = {"marker": m.group(1), "line": i + 1, "function": None, "function_line": None}
+        for j in range(i + 1, min(i + 1 + MARKER_WINDOW, len(lines))):
+            fm = EXPORT_FN_LINE_RE.match(lines[j])
+            if fm:
+                rec["function"] = fm.group(1)
+                rec["function_line"] = j + 1
+                break
+        markers.append(rec)
+
+    return {
+        "exports": sorted(exports),
+        "functions": functions,
+        "bindings": sorted(bindings),
+        "classes": sorted(classes),
+        "imports": imports,
+        "markers": markers,
+    }
+
+
+def module_symbols(entry):
+    """Every name bound in a module's scope: functions, bindings, classes, imports."""
+    syms = {fn["name"] for fn in entry["functions"]}
+    syms.update(entry["bindings"])
+    syms.update(entry["classes"])
+    syms.update(imp["local"] for imp in entry["imports"])
+    return syms
+
+
+class JsSymbolIndex:
+    """scan_module() results for the *.js files of js_root, kept fresh by mtime/hash.
+
+    Modules outside js_root can be looked up too; they are indexed the
+    same way under their absolute path.
+    """
+
+    def __init__(self, js_root="js", path=None):
+        self.js_dir = Path(js_root)
+        self.js_root = self.js_dir.resolve()
+        self.path = Path(path) if path else None
+        self.modules = {}
+        self.dirty = False
+        self.stats = {"reused": 0, "rehashed": 0, "scanned": 0}
+        self._checked = set()
+        self._symbols = {}
+        self._load()
+
+    def _load(self):
+        if not self.path or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if data.get("symbol_index_version") != SYMBOL_INDEX_VERSION or data.get("js_root") != str(self.js_root):
+            return
+        self.modules = data.get("modules", {})
+
+    def _key(self, module_path):
+        p = Path(module_path).resolve()
+        try:
+            return p.relative_to(self.js_root).as_posix(), p
+        except ValueError:
+            return str(p), p
+
+    def entry(self, module_path):
+        """The symbol entry for a module, or None if it does not exist."""
+        key, p = self._key(module_path)
+        if key in self._checked:
+            return self.modules.get(key)
+        self._checked.add(key)
+        try:
+            st = p.stat()
+        except OSError:
+            if self.modules.pop(key, None) is not None:
+                self.dirty = True
+            return None
+        entry = self.modules.get(key)
+        if entry and entry["mtime_ns"] == st.st_mtime_ns and entry["size"] == st.st_size:
+            self.stats["reused"] += 1
+            return entry
+        data = p.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        if entry and entry["sha256"] == digest:
+            self.stats["rehashed"] += 1
+        else:
+            self.stats["scanned"] += 1
+            entry = scan_module(data.decode("utf-8", errors="replace"))
+            entry["sha256"] = digest
+        entry["mtime_ns"] = st.st_mtime_ns
+        entry["size"] = st.st_size
+        self.modules[key] = entry
+        self._symbols.pop(key, None)
+        self.dirty = True
+        return entry
+
+    def invalidate(self, module_path):
+        """Re-hash a module on its next lookup (call after writing it).
+
+        A write can keep both size and mtime (coarse timestamps), so the
+        stat shortcut is skipped once.
+        """
+        key = self._key(module_path)[0]
+        self._checked.discard(key)
+        entry = self.modules.get(key)
+        if entry:
+            entry["mtime_ns"] = None
+
+    def symbols(self, module_path):
+        """module_symbols() of a module (empty if it does not exist)."""
+        entry = self.entry(module_path)
+        if entry is None:
+            return set()
+        key = self._key(module_path)[0]
+        if key not in self._symbols:
+            self._symbols[key] = module_symbols(entry)
+        return self._symbols[key]
+
+    def functions(self, module_path, name):
+        entry = self.entry(module_path)
+        return [fn for fn in entry["functions"] if fn["name"] == name] if entry else []
+
+    def root_modules(self):
+        """[(path, entry)] for every *.js directly under js_root, sorted.
+
+        Paths are js_root-relative as given (js/hack.js for "js").
+        """
+        out = []
+        seen = set()
+        for p in sorted(self.js_dir.glob("*.js")):
+            entry = self.entry(p)
+            if entry is not None:
+                out.append((p, entry))
+                seen.add(p.name)
+        for key in [k for k in self.modules if "/" not in k and k not in seen]:
+            del self.modules[key]
+            self.dirty = True
+        return out
+
+    def exports(self):
+        """name -> sorted paths of the js_root modules that export it."""
+        out = {}
+        for p, entry in self.root_modules():
+            for name in entry["exports"]:
+                out.setdefault(name, []).append(str(p))
+        return out
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = {
+            "symbol_index_version": SYMBOL_INDEX_VERSION,
+            "js_root": str(self.js_root),
+            "modules": self.modules,
+        }
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name + ".")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, sort_keys=True)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+
+def default_index_path():
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    return Path(cache_dir) / INDEX_FILENAME if cache_dir else None
+
+
+def get_js_symbol_index(js_root="js", path=None):
+    """The process-wide index for js_root (persisted at path, or the default)."""
+    path = path or default_index_path()
+    key = (str(Path(js_root).resolve()), str(path) if path else None)
+    if key not in _indexes:
+        _indexes[key] = JsSymbolIndex(js_root, path)
+    return _indexes[key]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Build or refresh the JS module symbol index")
+    ap.add_argument("--js-root", default="js", help="Directory of JS modules")
+    ap.add_argument(
+        "--index",
+        default=None,
+        help=f"Index JSON path (default: $C_TRANSLATOR_CACHE_DIR/{INDEX_FILENAME})",
+    )
+    args = ap.parse_args()
+    index = JsSymbolIndex(args.js_root, args.index or default_index_path())
+    modules = index.root_modules()
+    index.save()
+    print(
+        f"translator: js symbols modules={len(modules)} "
+        f"functions={sum(len(e['functions']) for _, e in modules)} "
+        f"markers={sum(len(e['markers']) for _, e in modules)} "
+        f"(scanned={index.stats['scanned']} rehashed={index.stats['rehashed']} reused={index.stats['reused']})"
+    )
+    if index.path:
+        print(f"translator: js symbol index -> {index.path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""ES module syntax checks for emitted translator snippets.
+
+JsSyntaxChecker answers check(text) -> (ok, detail), where detail is the
+compact "<loc> <message>" form (e.g. "snippet.mjs:2 SyntaxError: Unexpected
+token ';'").  Three backends:
+
+- "service": one long-lived `node js_syntax_check.mjs` process fed JSON
+  lines over stdin/stdout, so Node starts once per run instead of once
+  per snippet.
+- "node": a fresh `node --check` on a temp .mjs file per snippet (the
+  original behaviour; slow, kept as a reference).
+- "python": an in-process structural check (brackets, strings, template
+  literals, comments).  It catches truncated or unbalanced output but not
+  grammar errors, so it can only pass more snippets than Node would.
+
+"service" falls back to "python" (with a warning on stderr) when node is
+missing or cannot start the checker.
+
+The lexing helpers the python backend is built on (skip_quoted,
+skip_regex and the REGEX_PREV_* tables that tell a regex literal from
+division) are public so js_symbols can scan JS the same way.
+"""
+
+import atexit
+import json
+import re
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+
+SNIPPET_NAME = "snippet.mjs"
+CHECKER_SCRIPT = Path(__file__).with_name("js_syntax_check.mjs")
+MODES = ("service", "node", "python")
+
+_OPENERS = {"(": ")", "[": "]", "{": "}"}
+_CLOSERS = {")", "]", "}"}
+# A '/' after one of these starts a regex literal rather than division.
+REGEX_PREV_CHARS = set("(,=:[!&|?{};+-*%<>~^")
+REGEX_PREV_WORDS = {"return", "typeof", "case", "do", "else", "in", "of", "new", "delete", "void", "throw", "yield", "await"}
+_WORD_RE = re.compile(r"[A-Za-z_$][\w$]*")
+
+
+def compact_node_error(detail, source_path=None):
+    """Reduce `node --check` stderr to "<loc> <message>"."""
+    detail = (detail or "").strip()
+    if not detail:
+        return "node --check failed"
+    if source_path:
+        detail = detail.replace(str(source_path), SNIPPET_NAME)
+    lines = [ln.rstrip() for ln in detail.splitlines() if ln.strip()]
+    loc = ""
+    msg = ""
+    for ln in lines:
+        stripped = ln.strip()
+        if stripped.startswith("Node.js "):
+            continue
+        if not loc and re.search(r"\.mjs:\d+", stripped):
+            loc = stripped
+            continue
+        if not msg and "SyntaxError:" in stripped:
+            msg = stripped
+            break
+    if msg and loc:
+        return f"{loc} {msg}"
+    if msg:
+        return msg
+    for ln in lines:
+        stripped = ln.strip()
+        if not stripped.startswith("Node.js "):
+            return stripped
+    return lines[0].strip()
+
+
+def node_check(text):
+    """Return (ok, detail) from one `node --check` run on a temp .mjs file."""
+    with tempfile.NamedTemporaryFile("w", suffix=".mjs", delete=False, encoding="utf-8") as tmp:
+        tmp.write(text)
+        tmp_path = Path(tmp.name)
+    try:
+        proc = subprocess.run(
+            ["node", "--check", str(tmp_path)],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+        if proc.returncode == 0:
+            return True, ""
+        return False, compact_node_error(proc.stderr or proc.stdout, tmp_path)
+    finally:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+def skip_quoted(text, i, quote):
+    """Return the index past the string literal opened at text[i]."""
+    n = len(text)
+    i += 1
+    while i < n:
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == quote:
+            return i + 1
+        if ch == "\n":
+            break
+        i += 1
+    return -1
+
+
+def skip_regex(text, i):
+    """Return the index past the regex literal opened at text[i], or -1."""
+    n = len(text)
+    i += 1
+    in_class = False
+    while i < n:
+        ch = text[i]
+        if ch == "\\":
+            i += 2
+            continue
+        if ch == "\n":
+            return -1
+        if in_class:
+            in_class = ch != "]"
+        elif ch == "[":
+            in_class = True
+        elif ch == "/":
+            i += 1
+            while i < n and (text[i].isalnum() or text[i] in "_$"):
+                i += 1
+            return i
+        i += 1
+    return -1
+
+
+def python_check(text):
+    """Structural (not grammatical) syntax check; return (ok, detail)."""
+    stack = []  # (closer, line); "`" marks a template literal being scanned
+    i = 0
+    n = len(text)
+    line = 1
+    prev = ""  # last significant char, or the last word
+
+    def fail(message, at_line):
+        return False, f"{SNIPPET_NAME}:{at_line} SyntaxError: {message}"
+
+    while i < n:
+        if stack and stack[-1][0] == "`":
+            ch = text[i]
+            if ch == "\\":
+                line += text[i:i + 2].count("\n")
+                i += 2
+                continue
+            if ch == "`":
+                stack.pop()
+                prev = ")"
+                i += 1
+                continue
+            if text.startswith("${", i):
+                stack.append(("}", line))
+                prev = "{"
+                i += 2
+                continue
+            if ch == "\n":
+                line += 1
+            i += 1
+            continue
+
+        ch = text[i]
+        if ch == "\n":
+            line += 1
+            i += 1
+            continue
+        if ch in " \t\r":
+            i += 1
+            continue
+        if text.startswith("//", i):
+            end = text.find("\n", i)
+            i = n if end < 0 else end
+            continue
+        if text.startswith("/*", i):
+            end = text.find("*/", i + 2)
+            if end < 0:
+                return fail("Invalid or unexpected token", line)
+            line += text.count("\n", i, end)
+            i = end + 2
+            continue
+        if ch in "'\"":
+            end = skip_quoted(text, i, ch)
+            if end < 0:
+                return fail("Invalid or unexpected token", line)
+            i = end
+            prev = ")"
+            continue
+        if ch == "`":
+            stack.append(("`", line))
+            i += 1
+            continue
+        if ch == "/" and (not prev or prev in REGEX_PREV_CHARS or prev in REGEX_PREV_WORDS):
+            end = skip_regex(text, i)
+            if end < 0:
+                return fail("Invalid regular expression: missing /", line)
+            i = end
+            prev = ")"
+            continue
+        if ch in _OPENERS:
+            stack.append((_OPENERS[ch], line))
+        elif ch in _CLOSERS:
+            if not stack or stack[-1][0] != ch:
+                return fail(f"Unexpected token '{ch}'", line)
+            stack.pop()
+            if ch == "}" and stack and stack[-1][0] == "`":
+                i += 1
+                continue
+        word = _WORD_RE.match(text, i)
+        if word:
+            prev = word.group(0)
+            i = word.end()
+            continue
+        prev = ch
+        i += 1
+
+    if stack:
+        if stack[-1][0] == "`":
+            return fail("Unterminated template literal", stack[-1][1])
+        return fail("Unexpected end of input", line)
+    return True, ""
+
+
+class JsSyntaxChecker:
+    """Reusable snippet checker; use as a context manager or call close()."""
+
+    def __init__(self, mode="service"):
+        if mode not in MODES:
+            raise ValueError(f"unknown syntax check mode: {mode}")
+        self.requested_mode = mode
+        self.mode = mode
+        self._proc = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+        if mode == "service":
+            self._start_service()
+        elif mode == "node" and not shutil.which("node"):
+            self._fall_back("node not found on PATH")
+
+    def _fall_back(self, reason):
+        print(f"translator: js syntax {self.mode} unavailable ({reason}); using python structural check",
+              file=sys.stderr)
+        self.mode = "python"
+
+    def _start_service(self):
+        node = shutil.which("node")
+        if not node:
+            self._fall_back("node not found on PATH")
+            return
+        try:
+            self._proc = subprocess.Popen(
+                [node, "--experimental-vm-modules", "--no-warnings", str(CHECKER_SCRIPT)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                encoding="utf-8",
+                bufsize=1,
+            )
+            hello = json.loads(self._proc.stdout.readline() or "{}")
+        except (OSError, ValueError) as exc:
+            hello = {"error": str(exc)}
+        if not hello.get("ready"):
+            self.close()
+            self._fall_back(hello.get("error") or "checker did not start")
+
+    def _request(self, text):
+        req_id = self._next_id
+        self._next_id += 1
+        return req_id, json.dumps({"id": req_id, "source": text}) + "\n"
+
+    def _service_failed(self, exc):
+        self.close()
+        self._fall_back(f"checker process failed: {exc}")
+
+    def check(self, text):
+        """Return (ok, detail) for one ES module source text."""
+        return self.check_many([text])[0]
+
+    def check_many(self, texts):
+        """Check several sources; results are in input order.
+
+        The service path streams all requests from a writer thread while
+        reading replies, so a large batch never deadlocks on pipe buffers.
+        """
+        texts = list(texts)
+        if self.mode == "node":
+            return [node_check(t) for t in texts]
+        if self.mode == "python" or not texts:
+            return [python_check(t) for t in texts]
+
+        with self._lock:
+            requests = [self._request(t) for t in texts]
+            results = {}
+            write_error = []
+
+            def writer():
+                try:
+                    for _, payload in requests:
+                        self._proc.stdin.write(payload)
+                    self._proc.stdin.flush()
+                except OSError as exc:
+                    write_error.append(exc)
+
+            thread = threading.Thread(target=writer, daemon=True)
+            thread.start()
+            try:
+                for _ in requests:
+                    line = self._proc.stdout.readline()
+                    if not line:
+                        raise OSError(write_error[0] if write_error else "checker exited")
+                    reply = json.loads(line)
+                    results[reply.get("id")] = (bool(reply.get("ok")), reply.get("detail", ""))
+            except (OSError, ValueError) as exc:
+                thread.join()
+                self._service_failed(exc)
+                return [results.get(req_id) or python_check(t)
+                        for (req_id, _), t in zip(requests, texts)]
+            thread.join()
+        return [results[req_id] for req_id, _ in requests]
+
+    def close(self):
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            proc.stdin.close()
+        except OSError:
+            pass
+        try:
+            proc.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+        proc.stdout.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_checker = None
+
+
+def get_syntax_checker(mode="service"):
+    """Return the shared checker, (re)starting it when the mode changes."""
+    global _default_checker
+    if _default_checker is None or _default_checker.requested_mode != mode:
+        if _default_checker is not None:
+            _default_checker.close()
+        _default_checker = JsSyntaxChecker(mode)
+    return _default_checker
+
+
+@atexit.register
+def _close_default_checker():
+    if _default_checker is not None:
+        _default_checker.close()
@@ -0,0 +1,103 @@
+#!/usr/bin/env node
+// Long-lived ES module syntax checker for the C translator safety passes.
+//
+// Reads JSON lines {"id": n, "source": "..."} on stdin and answers each with
+// {"id": n, "ok": true} or {"id": n, "ok": false, "detail": "<loc> <message>"},
+// the same compact form runtime_candidate_safety.py derives from
+// `node --check`.  Sources are parsed with the module goal (as a .mjs file
+// would be) and never evaluated; only a failure whose line cannot be
+// recovered in-process costs a `node --check` subprocess.
+//
+// Needs --experimental-vm-modules for vm.SourceTextModule; the first line
+// written is {"ready": true} or {"ready": false, "error": "..."} so the
+// Python client can fall back when it is unavailable.
+
+import { spawnSync } from 'node:child_process';
+import fs from 'node:fs';
+import os from 'node:os';
+import path from 'node:path';
+import readline from 'node:readline';
+import vm from 'node:vm';
+
+const FILENAME = 'snippet.mjs';
+
+// Blank out module-only syntax (keeping line numbers) so a script-goal
+// compile can report the line of an error the module parse found.
+const IMPORT_RE = /^[ \t]*import\b[^;]*;/gm;
+const EXPORT_LIST_RE = /^[ \t]*export\s*\{[^}]*\}\s*(?:from\s*['"][^'"]*['"]\s*)?;/gm;
+const EXPORT_DECL_RE = /^([ \t]*)export\s+(?:default\s+)?(?=(?:async\s+)?function\b|class\b|const\b|let\b|var\b)/gm;
+
+function blank(text) {
+    return text.replace(/[^\n]/g, ' ');
+}
+
+function scriptify(source) {
+    return '"use strict";' + source
+        .replace(IMPORT_RE, blank)
+        .replace(EXPORT_LIST_RE, blank)
+        .replace(EXPORT_DECL_RE, (m, indent) => indent + ' '.repeat(m.length - indent.length));
+}
+
+function errorLine(source, message) {
+    try {
+        new vm.Script(scriptify(source), { filename: FILENAME });
+    } catch (err) {
+        const lines = String(err.stack || '').split('\n');
+        if (err instanceof SyntaxError && err.message === message
+            && lines[0].startsWith(`${FILENAME}:`)) {
+            return lines[0];
+        }
+    }
+    return '';
+}
+
+// Rare fallback when the script-goal compile disagrees (a broken import,
+// top-level await, ...): ask `node --check` itself for the location.
+function checkedLine(source) {
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'js-syntax-'));
+    const file = path.join(dir, FILENAME);
+    try {
+        fs.writeFileSync(file, source);
+        const proc = spawnSync(process.execPath, ['--check', file], { encoding: 'utf8' });
+        const first = String(proc.stderr || '').split('\n')[0].replace(file, FILENAME);
+        return /^snippet\.mjs:\d+$/.test(first) ? first : '';
+    } finally {
+        fs.rmSync(dir, { recursive: true, force: true });
+    }
+}
+
+function check(source) {
+    try {
+        new vm.SourceTextModule(source, { identifier: FILENAME });
+        return { ok: true };
+    } catch (err) {
+        if (!(err instanceof SyntaxError)) {
+            return { ok: false, detail: String(err && err.message || err) };
+        }
+        const msg = `SyntaxError: ${err.message}`;
+        const loc = errorLine(source, err.message) || checkedLine(source);
+        return { ok: false, detail: loc ? `${loc} ${msg}` : msg };
+    }
+}
+
+if (typeof vm.SourceTextModule !== 'function') {
+    process.stdout.write(JSON.stringify({
+        ready: false,
+        error: 'vm.SourceTextModule unavailable (needs node --experimental-vm-modules)',
+    }) + '\n');
+    process.exit(0);
+}
+process.stdout.write(JSON.stringify({ ready: true }) + '\n');
+
+const rl = readline.createInterface({ input: process.stdin, crlfDelay: Infinity });
+rl.on('line', (line) => {
+    if (!line.trim()) return;
+    let req;
+    try {
+        req = JSON.parse(line);
+    } catch (err) {
+        process.stdout.write(JSON.stringify({ id: null, ok: false, detail: `bad request: ${err.message}` }) + '\n');
+        return;
+    }
+    process.stdout.write(JSON.stringify({ id: req.id, ...check(String(req.source ?? '')) }) + '\n');
+});
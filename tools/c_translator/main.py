@@ -3,11 +3,12 @@ import argparse
 import json
 from pathlib import Path
 
-from async_infer import build_async_summary
+from artifact_store import configure_artifact_store, format_stats
+from async_infer import build_async_summary, configure_async_index
 from backend import emit_capability_summary, emit_helper_scaffold
-from cfg import build_cfg_summary
 from frontend import load_compile_profile, parse_summary, provenance_summary
-from nir import build_nir_snapshot
+from profiling import configure_profiler, cprofile_to, finish_profile, stage
+from source_context import load_source_context
 
 
 def build_parser():
@@ -41,12 +42,39 @@ def build_parser():
         help="Output mode",
     )
     p.add_argument("--out", required=True, help="Output file path")
+    p.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Artifact store directory for cached stage outputs (default: $C_TRANSLATOR_CACHE_DIR, else off)",
+    )
+    p.add_argument(
+        "--async-index",
+        default=None,
+        help="Whole-program async index from async_index.py (default: per-file async inference)",
+    )
+    p.add_argument(
+        "--profile",
+        default=None,
+        metavar="TRACE_JSON",
+        help="Time stages and functions; write a Chrome trace-event JSON here and print a summary",
+    )
+    p.add_argument("--cprofile", default=None, help="Also write cProfile stats of the run here")
     return p
 
 
 def main():
     args = build_parser().parse_args()
+    profiler = configure_profiler(bool(args.profile))
+    with cprofile_to(args.cprofile):
+        _run(args)
+    if profiler is not None:
+        finish_profile(args.profile)
+
+
+def _run(args):
     profile = load_compile_profile(args.compile_profile)
+    store = configure_artifact_store(args.cache_dir)
+    configure_async_index(args.async_index)
 
     out_path = Path(args.out)
     out_path.parent.mkdir(parents=True, exist_ok=True)
@@ -56,11 +84,16 @@ def main():
     elif args.emit == "provenance-summary":
         payload = provenance_summary(args.src, profile)
     elif args.emit == "nir-snapshot":
-        payload = build_nir_snapshot(args.src, args.func)
+        payload = load_source_context(args.src, profile).nir_snapshot(args.func)
     elif args.emit == "cfg-summary":
-        payload = build_cfg_summary(args.src, args.func)
+        payload = load_source_context(args.src, profile).cfg_summary(args.func)
     elif args.emit == "async-summary":
-        payload = build_async_summary(args.src, args.func, args.boundary_rules)
+        if args.func:
+            # The async fixpoint only sees the filtered functions, so a
+            # filtered summary is not a slice of the whole-file one.
+            payload = build_async_summary(args.src, args.func, args.boundary_rules)
+        else:
+            payload = load_source_context(args.src, profile, args.boundary_rules).async_summary()
     elif args.emit == "emit-helper":
         payload = emit_helper_scaffold(args.src, args.func, profile)
     elif args.emit == "capability-summary":
@@ -74,8 +107,11 @@ def main():
             "function": args.func,
         }
 
-    out_path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+    with stage("json_write", source=str(out_path)):
+        out_path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
     print(f"translator: wrote {out_path}")
+    if store is not None:
+        print(f"translator: {format_stats(store.drain_stats())}")
 
 
 if __name__ == "__main__":
@@ -212,9 +212,10 @@ def _collect_assignments(body):
     return out
 
 
-def build_nir_snapshot(src_path, func_filter=None):
+def build_nir_snapshot(src_path, func_filter=None, *, text=None):
     path = Path(src_path)
-    text = path.read_text(encoding="utf-8", errors="replace")
+    if text is None:
+        text = path.read_text(encoding="utf-8", errors="replace")
     src_hash = hashlib.sha256(text.encode("utf-8")).hexdigest()
     lines = text.splitlines()
     regions = _find_function_regions(text)
@@ -0,0 +1,252 @@
+"""Per-stage timing for translator runs (--profile).
+
+Stages are marked with `with stage("nir", source=path):` /
+`with stage("lower", function=name):`.  Without a configured profiler
+stage() returns a shared no-op context manager, so instrumented code pays
+one global lookup per call.
+
+The profiler records, per stage name, call count, wall and CPU time
+(inclusive) and self wall time (minus nested stages).  A stage tagged
+with `function` also counts towards that function's total; nested stages
+inherit `source` and `function` from the enclosing one, and a function is
+only charged for its outermost stage, so nothing is counted twice.
+
+Every stage opened with trace=True (the default) becomes a Chrome
+trace-event "complete" event (chrome://tracing, https://ui.perfetto.dev).
+Hot, tiny stages such as the rewrite engines pass trace=False and are
+only aggregated.
+
+Worker processes drain() their data and the parent merge()s it, so a
+--jobs run yields one report; timestamps are CLOCK_MONOTONIC based and
+line up across processes.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+
+_profiler = None
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("profiler", "name", "args", "trace", "wall0", "cpu0", "child_wall", "charged")
+
+    def __init__(self, profiler, name, trace, args):
+        self.profiler = profiler
+        self.name = name
+        self.trace = trace
+        self.args = args
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        if stack:
+            parent = stack[-1].args
+            for key in ("source", "function"):
+                if key not in self.args and key in parent:
+                    self.args[key] = parent[key]
+        function = self.args.get("function")
+        self.charged = function is not None and not any(
+            frame.args.get("function") == function for frame in stack
+        )
+        self.child_wall = 0
+        stack.append(self)
+        self.cpu0 = time.process_time()
+        self.wall0 = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall1 = time.perf_counter()
+        cpu = time.process_time() - self.cpu0
+        wall = wall1 - self.wall0
+        stack = self.profiler._stack()
+        stack.pop()
+        if stack:
+            stack[-1].child_wall += wall
+        self.profiler._record(self, wall, cpu, wall - self.child_wall)
+        return False
+
+
+class Profiler:
+    def __init__(self):
+        self.stages = {}     # name -> [calls, wall, cpu, self_wall]
+        self.functions = {}  # "source\0function" -> [calls, wall, cpu]
+        self.events = []
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _record(self, frame, wall, cpu, self_wall):
+        agg = self.stages.get(frame.name)
+        if agg is None:
+            agg = self.stages[frame.name] = [0, 0.0, 0.0, 0.0]
+        agg[0] += 1
+        agg[1] += wall
+        agg[2] += cpu
+        agg[3] += self_wall
+        if frame.charged:
+            key = f"{frame.args.get('source', '')}\0{frame.args['function']}"
+            fagg = self.functions.get(key)
+            if fagg is None:
+                fagg = self.functions[key] = [0, 0.0, 0.0]
+            fagg[0] += 1
+            fagg[1] += wall
+            fagg[2] += cpu
+        if frame.trace:
+            self.events.append(
+                {
+                    "name": frame.name,
+                    "cat": "translator",
+                    "ph": "X",
+                    "ts": round(frame.wall0 * 1e6, 1),
+                    "dur": round(wall * 1e6, 1),
+                    "pid": self._pid,
+                    "tid": threading.get_ident(),
+                    "args": {**frame.args, "cpu_ms": round(cpu * 1e3, 3)},
+                }
+            )
+
+    def stage(self, name, trace=True, **args):
+        return _Stage(self, name, trace, args)
+
+    def drain(self):
+        """Return and reset this process's data (JSON-safe, for merge())."""
+        out = {"stages": self.stages, "functions": self.functions, "events": self.events}
+        self.stages = {}
+        self.functions = {}
+        self.events = []
+        return out
+
+    def merge(self, data):
+        for name, (calls, wall, cpu, self_wall) in data.get("stages", {}).items():
+            agg = self.stages.setdefault(name, [0, 0.0, 0.0, 0.0])
+            agg[0] += calls
+            agg[1] += wall
+            agg[2] += cpu
+            agg[3] += self_wall
+        for key, (calls, wall, cpu) in data.get("functions", {}).items():
+            fagg = self.functions.setdefault(key, [0, 0.0, 0.0])
+            fagg[0] += calls
+            fagg[1] += wall
+            fagg[2] += cpu
+        self.events.extend(data.get("events", []))
+
+    def summary(self, top=20):
+        stages = [
+            {
+                "stage": name,
+                "calls": calls,
+                "wall_s": round(wall, 6),
+                "cpu_s": round(cpu, 6),
+                "self_wall_s": round(self_wall, 6),
+            }
+            for name, (calls, wall, cpu, self_wall) in self.stages.items()
+        ]
+        stages.sort(key=lambda s: (-s["self_wall_s"], s["stage"]))
+        functions = []
+        for key, (calls, wall, cpu) in self.functions.items():
+            source, function = key.split("\0", 1)
+            functions.append(
+                {
+                    "source": source,
+                    "function": function,
+                    "calls": calls,
+                    "wall_s": round(wall, 6),
+                    "cpu_s": round(cpu, 6),
+                }
+            )
+        functions.sort(key=lambda f: (-f["wall_s"], f["source"], f["function"]))
+        return {
+            "stages": stages,
+            "function_count": len(functions),
+            "slowest_functions": functions[:top],
+        }
+
+    def write_trace(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        events = sorted(self.events, key=lambda e: (e["pid"], e["ts"]))
+        payload = {"traceEvents": events, "displayTimeUnit": "ms", "otherData": self.summary()}
+        path.write_text(json.dumps(payload) + "\n", encoding="utf-8")
+
+
+def stage(name, trace=True, **args):
+    """Context manager timing one stage (a no-op unless profiling is on)."""
+    if _profiler is None:
+        return _NULL_STAGE
+    return _profiler.stage(name, trace, **args)
+
+
+def configure_profiler(enabled=False):
+    """Turn per-stage profiling on (fresh data) or off for this process."""
+    global _profiler
+    _profiler = Profiler() if enabled else None
+    return _profiler
+
+
+def get_profiler():
+    return _profiler
+
+
+def format_summary(summary, top=10):
+    """Human-readable lines for Profiler.summary()."""
+    lines = ["translator: profile (self wall / wall / cpu, seconds)"]
+    for s in summary["stages"]:
+        lines.append(
+            f"  {s['stage']:<18} calls={s['calls']:<7} self={s['self_wall_s']:.3f} "
+            f"wall={s['wall_s']:.3f} cpu={s['cpu_s']:.3f}"
+        )
+    if summary["slowest_functions"]:
+        lines.append(f"translator: slowest functions (of {summary['function_count']})")
+        for f in summary["slowest_functions"][:top]:
+            lines.append(f"  {f['wall_s']:.4f}s  {f['source']}:{f['function']}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def cprofile_to(path):
+    """Run the block under cProfile and dump pstats to path (no-op without path)."""
+    if not path:
+        yield
+        return
+    import cProfile
+
+    prof = cProfile.Profile()
+    prof.enable()
+    try:
+        yield
+    finally:
+        prof.disable()
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        prof.dump_stats(str(path))
+        print(f"translator: cProfile stats -> {path}")
+
+
+def finish_profile(trace_path, top=10):
+    """Write the Chrome trace and print the summary, if profiling is on."""
+    if _profiler is None:
+        return
+    _profiler.write_trace(trace_path)
+    print(format_summary(_profiler.summary(), top))
+    print(f"translator: profile trace -> {trace_path}")
@@ -9,19 +9,13 @@ import argparse
 import json
 from pathlib import Path
 import re
-import subprocess
-import tempfile
+
+from js_symbols import get_js_symbol_index, module_symbols, scan_module
+from js_syntax import MODES as SYNTAX_CHECK_MODES, get_syntax_checker
 
 
-EXPORT_FN_RE = re.compile(r"^\s*export\s+(?:async\s+)?function\s+([A-Za-z_]\w*)\s*\(", re.MULTILINE)
 LOCAL_FN_RE = re.compile(r"^\s*(?:async\s+)?function\s+([A-Za-z_]\w*)\s*\(", re.MULTILINE)
 LOCAL_VAR_RE = re.compile(r"^\s*(?:[{}]\s*)*(?:const|let|var)\s+([A-Za-z_]\w*)\s*=", re.MULTILINE)
-EXPORT_VAR_RE = re.compile(r"^\s*export\s+(?:const|let|var)\s+([A-Za-z_]\w*)\s*=", re.MULTILINE)
-IMPORT_RE = re.compile(r"^\s*import\s*\{([^}]*)\}\s*from\s*['\"][^'\"]+['\"]\s*;", re.MULTILINE)
-IMPORT_DEFAULT_RE = re.compile(
-    r"^\s*import\s+([A-Za-z_]\w*)\s+from\s*['\"][^'\"]+['\"]\s*;",
-    re.MULTILINE,
-)
 CALL_RE = re.compile(r"\b([A-Za-z_]\w*)\s*\(")
 IDENT_RE = re.compile(r"\b([A-Za-z_]\w*)\b")
 
@@ -60,6 +54,18 @@ def parse_args():
     p.add_argument("--candidates", required=True, help="runtime_stitch_candidates JSON path")
     p.add_argument("--repo-root", default=".", help="Repo root")
     p.add_argument("--out", required=True, help="Output JSON path")
+    p.add_argument(
+        "--js-symbols",
+        default=None,
+        help="Persisted JS symbol index (default: $C_TRANSLATOR_CACHE_DIR/js_symbols.json, else not persisted)",
+    )
+    p.add_argument(
+        "--syntax-check",
+        choices=SYNTAX_CHECK_MODES,
+        default="service",
+        help="service: one long-lived node checker; node: node --check per snippet; "
+        "python: in-process structural check (no node needed)",
+    )
     return p.parse_args()
 
 
@@ -97,21 +103,8 @@ def load_semantic_block_modules():
 
 
 def parse_module_symbols(js_text):
-    syms = set(EXPORT_FN_RE.findall(js_text))
-    syms.update(LOCAL_FN_RE.findall(js_text))
-    syms.update(LOCAL_VAR_RE.findall(js_text))
-    syms.update(EXPORT_VAR_RE.findall(js_text))
-    for m in IMPORT_RE.findall(js_text):
-        for part in m.split(","):
-            token = part.strip()
-            if not token:
-                continue
-            token = token.split(" as ")[-1].strip()
-            if token:
-                syms.add(token)
-    for m in IMPORT_DEFAULT_RE.findall(js_text):
-        syms.add(m.strip())
-    return syms
+    """Module-scope symbols of unindexed JS text (see js_symbols.module_symbols)."""
+    return module_symbols(scan_module(js_text))
 
 
 def candidate_unknown_calls(emitted_js, known_syms):
@@ -291,51 +284,13 @@ def candidate_unknown_identifiers(emitted_js, known_syms, js_module, alias_map):
     return sorted(unknown), alias_candidates
 
 
-def candidate_syntax_ok(emitted_js):
-    """Return (ok, detail) by validating emitted snippet with node --check."""
-    with tempfile.NamedTemporaryFile("w", suffix=".mjs", delete=False, encoding="utf-8") as tmp:
-        tmp.write(emitted_js)
-        tmp_path = Path(tmp.name)
-    try:
-        proc = subprocess.run(
-            ["node", "--check", str(tmp_path)],
-            capture_output=True,
-            text=True,
-            check=False,
-        )
-        if proc.returncode == 0:
-            return True, ""
-        detail = (proc.stderr or proc.stdout or "").strip()
-        if not detail:
-            return False, "node --check failed"
-        # Keep a compact, actionable syntax summary: "<loc> <message>".
-        lines = [ln.rstrip() for ln in detail.splitlines() if ln.strip()]
-        loc = ""
-        msg = ""
-        for ln in lines:
-            stripped = ln.strip()
-            if stripped.startswith("Node.js "):
-                continue
-            if not loc and re.search(r"\.mjs:\d+", stripped):
-                loc = stripped
-                continue
-            if not msg and "SyntaxError:" in stripped:
-                msg = stripped
-                break
-        if msg and loc:
-            return False, f"{loc} {msg}"
-        if msg:
-            return False, msg
-        for ln in lines:
-            stripped = ln.strip()
-            if not stripped.startswith("Node.js "):
-                return False, stripped
-        return False, lines[0].strip()
-    finally:
-        try:
-            tmp_path.unlink(missing_ok=True)
-        except OSError:
-            pass
+def candidate_syntax_ok(emitted_js, checker=None):
+    """Return (ok, detail) by validating emitted snippet as an ES module.
+
+    detail is a compact "<loc> <message>" summary.  Uses the shared
+    long-lived checker (see js_syntax.py) unless one is passed in.
+    """
+    return (checker or get_syntax_checker()).check(emitted_js)
 
 
 def candidate_semantic_hazards(emitted_js):
@@ -377,25 +332,24 @@ def main():
     safe = []
     unsafe = []
 
-    module_cache = {}
+    symbol_index = get_js_symbol_index(repo / "js", args.js_symbols)
+    checked = []
     for rec in cand.get("matched", []):
         js_module = rec.get("js_module")
         out_file = rec.get("out_file")
         if not js_module or not out_file:
             continue
+        payload = json.loads(Path(out_file).read_text(encoding="utf-8"))
+        checked.append((rec, payload.get("js", "")))
 
-        module_path = repo / Path(js_module)
-        module_key = str(module_path)
-        if module_key not in module_cache:
-            if module_path.exists():
-                text = module_path.read_text(encoding="utf-8", errors="replace")
-                module_cache[module_key] = parse_module_symbols(text)
-            else:
-                module_cache[module_key] = set()
-        known_syms = module_cache[module_key]
+    # One batch through the long-lived checker instead of a node per snippet.
+    checker = get_syntax_checker(args.syntax_check)
+    syntax_results = checker.check_many(emitted_js for _, emitted_js in checked)
+
+    for (rec, emitted_js), (syntax_ok, syntax_error) in zip(checked, syntax_results):
+        js_module = rec["js_module"]
+        known_syms = symbol_index.symbols(repo / Path(js_module))
 
-        payload = json.loads(Path(out_file).read_text(encoding="utf-8"))
-        emitted_js = payload.get("js", "")
         unknown = candidate_unknown_calls(emitted_js, known_syms)
         unknown_idents, alias_candidates = candidate_unknown_identifiers(
             emitted_js,
@@ -406,7 +360,6 @@ def main():
         semantic_hazards = candidate_semantic_hazards(emitted_js)
         if js_module in semantic_block_modules:
             semantic_hazards = sorted(set(semantic_hazards + ["MODULE_SEMANTIC_BLOCK"]))
-        syntax_ok, syntax_error = candidate_syntax_ok(emitted_js)
         out_rec = {
             **rec,
             "unknown_calls": unknown,
@@ -423,6 +376,8 @@ def main():
         else:
             safe.append(out_rec)
 
+    symbol_index.save()
+
     output = {
         "input": args.candidates,
         "totals": {
@@ -6,11 +6,14 @@ snippets for records marked safe by runtime_candidate_safety.py.
 """
 
 import argparse
+import bisect
 import json
 from pathlib import Path
 import re
 from collections import defaultdict
 
+from js_symbols import get_js_symbol_index
+
 
 FN_HEAD_RE_TMPL = r"(?:^|\n)(?:export\s+)?(?:async\s+)?function\s+{name}\s*\("
 FN_HEAD_RE_FLAGS = re.MULTILINE
@@ -51,6 +54,19 @@ def parse_args():
             "when set, only these pairs are eligible for stitching"
         ),
     )
+    p.add_argument(
+        "--diff-out",
+        default="",
+        help=(
+            "Write a unified diff of the planned edits to this path (also in dry run); "
+            "a dry run without it reports the diff in the summary's \"diff\" field"
+        ),
+    )
+    p.add_argument(
+        "--js-symbols",
+        default=None,
+        help="Persisted JS symbol index (default: $C_TRANSLATOR_CACHE_DIR/js_symbols.json, else not persisted)",
+    )
     return p.parse_args()
 
 
@@ -63,55 +79,6 @@ def is_escaped(text, i):
     return (backslashes % 2) == 1
 
 
-def find_matching_brace(text, open_i):
-    depth = 0
-    in_str = None
-    in_line_comment = False
-    in_block_comment = False
-    i = open_i
-    n = len(text)
-    while i < n:
-        c = text[i]
-        nxt = text[i + 1] if i + 1 < n else ""
-        if in_line_comment:
-            if c == "\n":
-                in_line_comment = False
-            i += 1
-            continue
-        if in_block_comment:
-            if c == "*" and nxt == "/":
-                in_block_comment = False
-                i += 2
-                continue
-            i += 1
-            continue
-        if in_str:
-            if c == in_str and not is_escaped(text, i):
-                in_str = None
-            i += 1
-            continue
-        if c == "/" and nxt == "/":
-            in_line_comment = True
-            i += 2
-            continue
-        if c == "/" and nxt == "*":
-            in_block_comment = True
-            i += 2
-            continue
-        if c in ("'", '"', "`"):
-            in_str = c
-            i += 1
-            continue
-        if c == "{":
-            depth += 1
-        elif c == "}":
-            depth -= 1
-            if depth == 0:
-                return i
-        i += 1
-    return -1
-
-
 def find_matching_paren(text, open_i):
     depth = 0
     in_str = None
@@ -161,32 +128,120 @@ def find_matching_paren(text, open_i):
     return -1
 
 
-def find_function_span(text, name):
-    pat = re.compile(FN_HEAD_RE_TMPL.format(name=re.escape(name)), FN_HEAD_RE_FLAGS)
-    m = pat.search(text)
-    if not m:
-        return None
-    # Anchor at actual "function", skipping optional leading newline.
-    fn_idx = text.find("function", m.start(), m.end() + 64)
-    if fn_idx < 0:
-        return None
-    line_start = text.rfind("\n", 0, fn_idx) + 1
-    sig_open = text.find("(", fn_idx)
-    if sig_open < 0:
-        return None
-    sig_close = find_matching_paren(text, sig_open)
-    if sig_close < 0:
-        return None
-    open_i = text.find("{", sig_close + 1)
-    if open_i < 0:
-        return None
-    close_i = find_matching_brace(text, open_i)
-    if close_i < 0:
-        return None
-    end = close_i + 1
-    if end < len(text) and text[end] == "\n":
-        end += 1
-    return (line_start, end)
+def locate_functions(text, entry, names):
+    """name -> (start, end) of its first column-0 declaration in text.
+
+    Spans come from the module's js_symbols entry (one brace-aware scan),
+    widened to the start of the declaration line; a name whose first
+    declaration has no closing brace maps to None.
+    """
+    line_starts = [0] + [m.end() for m in re.finditer(r"\n", text)]
+    spans = {}
+    for fn in entry["functions"]:
+        name = fn["name"]
+        if name not in names or name in spans:
+            continue
+        line_start = line_starts[fn["line"] - 1]
+        if not text.startswith(("export", "async", "function"), line_start):
+            continue
+        spans[name] = (line_start, fn["end"]) if fn["end"] is not None else None
+    return spans
+
+
+class SplicePlan:
+    """Non-overlapping replacements on one text, applied in a single pass.
+
+    Edits are kept sorted by start; apply() joins the untouched pieces of
+    the original text with the replacements, so the cost is linear in the
+    module size however many functions are stitched.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.starts = []
+        self.edits = []  # (start, end, replacement), sorted by start
+
+    def __len__(self):
+        return len(self.edits)
+
+    def add(self, start, end, replacement):
+        """Record text[start:end] -> replacement; False if it overlaps an edit."""
+        i = bisect.bisect_left(self.starts, start)
+        if i > 0 and self.edits[i - 1][1] > start:
+            return False
+        if i < len(self.edits) and self.edits[i][0] < end:
+            return False
+        self.starts.insert(i, start)
+        self.edits.insert(i, (start, end, replacement))
+        return True
+
+    def apply(self):
+        pieces = []
+        last = 0
+        for start, end, replacement in self.edits:
+            pieces.append(self.text[last:start])
+            pieces.append(replacement)
+            last = end
+        pieces.append(self.text[last:])
+        return "".join(pieces)
+
+    def unified_diff(self, label, context=3):
+        """Unified diff (a/label -> b/label) of the planned edits.
+
+        Hunks are built from the edit spans directly; each edit shows as
+        its old lines removed and new lines added.
+        """
+        text = self.text
+        old_lines = text.splitlines(keepends=True)
+        starts = [0] + [m.end() for m in re.finditer(r"\n", text)]
+        if len(starts) > len(old_lines):
+            starts.pop()
+
+        def bound(k):
+            return starts[k] if k < len(starts) else len(text)
+
+        changes = []  # (first old line, end old line, new lines)
+        for start, end, replacement in self.edits:
+            l0 = bisect.bisect_right(starts, start) - 1
+            l1 = bisect.bisect_left(starts, end)
+            new_lines = (text[bound(l0):start] + replacement + text[end:bound(l1)]).splitlines(keepends=True)
+            if new_lines != old_lines[l0:l1]:
+                changes.append((l0, l1, new_lines))
+        if not changes:
+            return ""
+
+        def fmt(prefix, line):
+            return prefix + line if line.endswith("\n") else prefix + line + "\n\\ No newline at end of file\n"
+
+        out = [f"--- a/{label}\n", f"+++ b/{label}\n"]
+        delta = 0
+        i = 0
+        while i < len(changes):
+            j = i
+            while j + 1 < len(changes) and changes[j + 1][0] - changes[j][1] <= 2 * context:
+                j += 1
+            a0 = max(0, changes[i][0] - context)
+            a1 = min(len(old_lines), changes[j][1] + context)
+            body = [fmt(" ", line) for line in old_lines[a0:changes[i][0]]]
+            group_delta = 0
+            for k in range(i, j + 1):
+                l0, l1, new_lines = changes[k]
+                body.extend(fmt("-", line) for line in old_lines[l0:l1])
+                body.extend(fmt("+", line) for line in new_lines)
+                group_delta += len(new_lines) - (l1 - l0)
+                tail = changes[k + 1][0] if k < j else a1
+                body.extend(fmt(" ", line) for line in old_lines[l1:tail])
+            old_count = a1 - a0
+            new_count = old_count + group_delta
+            b0 = a0 + delta
+            out.append(
+                f"@@ -{a0 + 1 if old_count else a0},{old_count} "
+                f"+{b0 + 1 if new_count else b0},{new_count} @@\n"
+            )
+            out.extend(body)
+            delta += group_delta
+            i = j + 1
+        return "".join(out)
 
 
 def extract_function_param_tokens(text, name):
@@ -298,10 +353,13 @@ def main():
             continue
         grouped[rec["js_module"]].append(rec)
 
+    symbol_index = get_js_symbol_index(repo / "js", args.js_symbols)
     changes = []
+    diffs = []
     stitched = 0
     skipped_marked = 0
     skipped_missing = 0
+    skipped_overlap = 0
     skipped_signature_mismatch = 0
     skipped_signature_details = []
 
@@ -310,31 +368,29 @@ def main():
         if not module_path.exists():
             continue
         text = module_path.read_text(encoding="utf-8")
-        module_changed = False
+        entry = symbol_index.entry(module_path)
+        spans = locate_functions(text, entry, {rec["function"] for rec in records})
+        plan = SplicePlan(text)
 
-        # Process in file-order by function position when present.
+        # All spans refer to the original text; visit them bottom-up so the
+        # --max-functions cap keeps the same records as before.
         indexed = []
         for rec in records:
-            span = find_function_span(text, rec["function"])
+            span = spans.get(rec["function"])
             if not span:
                 skipped_missing += 1
                 continue
-            indexed.append((span[0], rec))
-        indexed.sort(key=lambda t: t[0], reverse=True)
+            indexed.append((span, rec))
+        indexed.sort(key=lambda t: t[0][0], reverse=True)
 
-        for _, rec in indexed:
+        for (start, end), rec in indexed:
             if args.max_functions > 0 and stitched >= args.max_functions:
                 break
-            span = find_function_span(text, rec["function"])
-            if not span:
-                skipped_missing += 1
-                continue
-            start, end = span
             if args.only_unmarked and has_auto_marker_near(text, start):
                 skipped_marked += 1
                 continue
             emitted_js = load_emitted_js(rec["out_file"])
-            existing_tokens = extract_function_param_tokens(text, rec["function"])
+            existing_tokens = extract_function_param_tokens(text[start:end], rec["function"])
             emitted_tokens = extract_function_param_tokens(emitted_js, rec["function"])
             compatible, reason = signature_compatible(existing_tokens, emitted_tokens)
             if not compatible:
@@ -349,9 +405,11 @@ def main():
                     "out_file": rec.get("out_file"),
                 })
                 continue
-            text = text[:start] + emitted_js + text[end:]
+            if not plan.add(start, end, emitted_js):
+                # A second record for an already-stitched function.
+                skipped_overlap += 1
+                continue
             stitched += 1
-            module_changed = True
             changes.append({
                 "js_module": js_module,
                 "function": rec["function"],
@@ -359,19 +417,35 @@ def main():
                 "out_file": rec.get("out_file"),
             })
 
-        if module_changed and args.write:
-            module_path.write_text(text, encoding="utf-8")
+        if not plan:
+            continue
+        if args.diff_out or not args.write:
+            diffs.append(plan.unified_diff(js_module))
+        if args.write:
+            module_path.write_text(plan.apply(), encoding="utf-8")
+            symbol_index.invalidate(module_path)
+
+    symbol_index.save()
+    if args.diff_out:
+        diff_path = Path(args.diff_out)
+        diff_path.parent.mkdir(parents=True, exist_ok=True)
+        diff_path.write_text("".join(diffs), encoding="utf-8")
 
     summary = {
         "safe_total": len(safe),
         "stitched": stitched,
         "skipped_marked": skipped_marked,
         "skipped_missing": skipped_missing,
+        "skipped_overlap": skipped_overlap,
         "skipped_signature_mismatch": skipped_signature_mismatch,
         "skipped_signature_details": skipped_signature_details,
         "write": bool(args.write),
         "changes": changes,
     }
+    if not args.write and not args.diff_out:
+        # The summary is the dry run's only output (callers capture it as
+        # JSON), so the planned splices ride along in it.
+        summary["diff"] = "".join(diffs)
     print(json.dumps(summary, indent=2, sort_keys=True))
 
 
@@ -0,0 +1,3 @@
+from .context import SourceContext, clear_source_contexts, load_source_context
+
+__all__ = ["SourceContext", "load_source_context", "clear_source_contexts"]
@@ -0,0 +1,211 @@
+import hashlib
+import json
+from collections import OrderedDict
+from pathlib import Path
+
+from artifact_store import compile_profile_digest, get_artifact_store, ruleset_digest
+from async_infer import build_async_summary, get_async_index
+from async_infer.builder import BOUNDARY_RULES_DEFAULT
+from cfg import build_cfg_summary
+from frontend import all_function_ast_summaries
+from nir import build_nir_snapshot
+from profiling import stage
+
+
+# Contexts kept per process; batch runs walk sources in order, so a few
+# are enough and the libclang AST of a large file is not held forever.
+MAX_CACHED_CONTEXTS = 4
+
+_contexts = OrderedDict()
+
+
+class SourceContext:
+    """Per-source analysis shared by every function of one translation unit.
+
+    The NIR regions, async summary and libclang AST are each built at most
+    once, on first use; per-function views are sliced from them and match
+    what build_nir_snapshot/build_cfg_summary/function_ast_summary return
+    for a single function.  With an artifact store configured, those
+    whole-file stages are also read from / written to the on-disk cache.
+    """
+
+    def __init__(self, src_path, text, compile_profile=None, boundary_rules_path=BOUNDARY_RULES_DEFAULT):
+        self.src_path = src_path
+        self.text = text
+        self.lines = text.splitlines()
+        self.source_sha256 = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        self.compile_profile = compile_profile
+        self.boundary_rules_path = boundary_rules_path
+        self._nir = None
+        self._async = None
+        self._async_by_name = None
+        self._ast = None
+        self._ast_by_name = None
+        self._outside_digest = None
+        self.store = get_artifact_store()
+
+    def source_key_parts(self):
+        """Key parts identifying this exact source file for the artifact store."""
+        return {
+            "source": str(Path(self.src_path)).replace("\\", "/"),
+            "source_sha256": self.source_sha256,
+        }
+
+    def cached(self, stage, parts, build, keep=None):
+        """build() through the artifact store, if one is configured.
+
+        keep(value) -> False leaves a freshly built value out of the store
+        (e.g. results that only reflect a missing tool).
+        """
+        if self.store is None:
+            return build()
+        key = self.store.key(stage, **parts)
+        value = self.store.get(stage, key)
+        if value is None:
+            value = build()
+            if keep is None or keep(value):
+                self.store.put(stage, key, value)
+        return value
+
+    def outside_bodies_digest(self):
+        """SHA-256 of every line outside function bodies.
+
+        Macros, declarations and signatures live there; a function's
+        translation can depend on them but not on other functions' bodies.
+        """
+        if self._outside_digest is None:
+            inside = set()
+            for fn in self.nir_snapshot()["functions"]:
+                span = fn["span"]
+                inside.update(range(span["body_start_line"] - 1, span["body_end_line"]))
+            outside = "\n".join(line for i, line in enumerate(self.lines) if i not in inside)
+            self._outside_digest = hashlib.sha256(outside.encode("utf-8")).hexdigest()
+        return self._outside_digest
+
+    def _source_label(self):
+        return str(Path(self.src_path)).replace("\\", "/")
+
+    def nir_snapshot(self, func_filter=None):
+        if self._nir is None:
+            def build():
+                with stage("nir", source=self._source_label()):
+                    return build_nir_snapshot(self.src_path, text=self.text)
+
+            self._nir = self.cached("nir", self.source_key_parts(), build)
+        if not func_filter:
+            return self._nir
+        functions = []
+        for fn in self._nir["functions"]:
+            if fn["name"] != func_filter:
+                continue
+            # ids are numbered within the filtered list, as in build_nir_snapshot
+            functions.append({**fn, "id": f"fn_{len(functions) + 1:04d}_{fn['name']}"})
+        return {**self._nir, "function_count": len(functions), "functions": functions}
+
+    def cfg_summary(self, func_filter=None):
+        nir = self.nir_snapshot(func_filter)
+        with stage("cfg", source=self._source_label()):
+            return build_cfg_summary(self.src_path, func_filter, text=self.text, nir=nir)
+
+    def async_summary(self):
+        if self._async is None:
+            def build():
+                nir = self.nir_snapshot()
+                with stage("async", source=self._source_label()):
+                    return build_async_summary(self.src_path, None, self.boundary_rules_path, nir=nir)
+
+            self._async = self.cached(
+                "async",
+                {
+                    **self.source_key_parts(),
+                    "boundary_rules": ruleset_digest(self.boundary_rules_path),
+                },
+                build,
+            )
+        return self._async
+
+    def async_functions(self):
+        """Function name -> async facts for this source.
+
+        Served from the configured whole-program index (configure_async_index)
+        when it covers this file, else from the per-file async_summary().
+        """
+        index = get_async_index()
+        if self._async_by_name is None or self._async_by_name[0] is not index:
+            entries = index.entries_for(self.src_path, self.boundary_rules_path) if index else None
+            if entries is None:
+                entries = {}
+                for fn in self.async_summary().get("functions", []):
+                    entries.setdefault(fn["name"], fn)
+            self._async_by_name = (index, entries)
+        return self._async_by_name[1]
+
+    def async_key_parts(self):
+        """Artifact-store key parts for async facts that come from the index."""
+        index = get_async_index()
+        if index is None or index.entries_for(self.src_path, self.boundary_rules_path) is None:
+            return {}
+        return {"async_index": index.source_digest(self.src_path)}
+
+    def ast_summaries(self):
+        """all_function_ast_summaries() for this source (one libclang parse)."""
+        if self._ast is None:
+            def build():
+                with stage("clang_parse", source=self._source_label()):
+                    return all_function_ast_summaries(self.src_path, self.compile_profile or {})
+
+            self._ast = self.cached(
+                "ast",
+                {**self.source_key_parts(), "profile": compile_profile_digest(self.compile_profile or {})},
+                build,
+                keep=lambda value: bool(value.get("available")),
+            )
+            self._ast_by_name = {}
+            for fn in self._ast.get("functions", []):
+                self._ast_by_name.setdefault(fn.get("name"), fn)
+        return self._ast
+
+    def function_ast(self, func_name):
+        """function_ast_summary() for one function, served from ast_summaries()."""
+        status = self.ast_summaries()
+        if not status.get("available"):
+            return {"available": False, "reason": status.get("reason", "unknown clang AST failure")}
+        found = self._ast_by_name.get(func_name)
+        if found is None:
+            return {"available": False, "reason": f"function not found: {func_name}"}
+        return found
+
+
+def _profile_key(compile_profile):
+    if compile_profile is None:
+        return None
+    return json.dumps(compile_profile, sort_keys=True)
+
+
+def load_source_context(src_path, compile_profile=None, boundary_rules_path=BOUNDARY_RULES_DEFAULT):
+    """Return the cached SourceContext for src_path, building it if needed.
+
+    The cache is keyed on the source SHA-256 and the compile profile, so an
+    edited file (or a different profile) gets a fresh context.
+    """
+    path = Path(src_path)
+    text = path.read_text(encoding="utf-8", errors="replace")
+    key = (
+        str(path.resolve()),
+        hashlib.sha256(text.encode("utf-8")).hexdigest(),
+        _profile_key(compile_profile),
+        str(boundary_rules_path),
+    )
+    ctx = _contexts.get(key)
+    if ctx is not None:
+        _contexts.move_to_end(key)
+        return ctx
+    ctx = SourceContext(src_path, text, compile_profile, boundary_rules_path)
+    _contexts[key] = ctx
+    while len(_contexts) > MAX_CACHED_CONTEXTS:
+        _contexts.popitem(last=False)
+    return ctx
+
+
+def clear_source_contexts():
+    _contexts.clear()
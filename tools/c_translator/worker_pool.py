@@ -0,0 +1,88 @@
+"""Ordered process-pool map that survives worker crashes.
+
+ordered_map() runs fn(*task) for each task in worker processes and yields
+the results in task order, each as soon as it and every earlier one are
+done, so callers can write outputs while later tasks still run and only
+out-of-order results are held in memory.
+
+A worker that dies (e.g. libclang crashing) breaks its whole
+ProcessPoolExecutor.  Workers report each task they start, so after a
+break only the tasks that were running are suspects: each is retried in a
+single-worker pool of its own, where a second crash pins it as the culprit
+(its result comes from crashed(task)), while all other unfinished tasks go
+to one rebuilt shared pool.
+"""
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+
+
+_started = None
+
+
+def _init(started, initializer, initargs):
+    global _started
+    _started = started
+    if initializer is not None:
+        initializer(*initargs)
+
+
+def _call(fn, index, args):
+    if _started is not None:
+        _started.put(index)
+    return fn(*args)
+
+
+def ordered_map(fn, tasks, jobs, crashed, initializer=None, initargs=()):
+    """Yield fn(*task) for every task, in order, from `jobs` worker processes.
+
+    fn, the tasks and initializer must be picklable; crashed(task) runs in
+    the caller and supplies the result for a task that kills its worker.
+    """
+    tasks = list(tasks)
+    started = multiprocessing.SimpleQueue()
+    results = {}
+    next_index = 0
+    pending = list(range(len(tasks)))
+    suspects = []
+    while pending or suspects:
+        pools = []
+        futures = {}
+        unfinished = []
+        try:
+            if pending:
+                workers = max(1, min(jobs - len(suspects), len(pending)))
+                shared = ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init, initargs=(started, initializer, initargs)
+                )
+                pools.append(shared)
+                for i in pending:
+                    futures[shared.submit(_call, fn, i, tasks[i])] = (i, False)
+            for i in suspects:
+                alone = ProcessPoolExecutor(max_workers=1, initializer=_init, initargs=(None, initializer, initargs))
+                pools.append(alone)
+                futures[alone.submit(_call, fn, i, tasks[i])] = (i, True)
+            for future in as_completed(futures):
+                i, isolated = futures[future]
+                try:
+                    results[i] = future.result()
+                except BrokenProcessPool:
+                    if isolated:
+                        results[i] = crashed(tasks[i])
+                    else:
+                        unfinished.append(i)
+                while next_index in results:
+                    yield results.pop(next_index)
+                    next_index += 1
+        finally:
+            for pool in pools:
+                pool.shutdown(cancel_futures=True)
+        ran = set()
+        while not started.empty():
+            ran.add(started.get())
+        unfinished.sort()
+        # A pool that broke before any task started (say, in the
+        # initializer) still isolates one task, so every round progresses.
+        suspects = [i for i in unfinished if i in ran] or unfinished[:1]
+        pending = [i for i in unfinished if i not in suspects]